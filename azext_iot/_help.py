@@ -71,6 +71,15 @@ helps[
     - name: Receive the specified number of messages from hub and then shut down.
       text: >
         az iot hub monitor-events -n {iothub_name} --message-count {message_count}
+    - name: Aggregate throughput and latency statistics instead of printing messages, with a summary every 10 seconds.
+      text: >
+        az iot hub monitor-events -n {iothub_name} --stats --stats-interval 10
+    - name: Catch up on the last hour of events with batched receive and a large prefetch.
+      text: >
+        az iot hub monitor-events -n {iothub_name} --enqueued-time {epoch_milliseconds} --prefetch 1000 --stats
+    - name: Checkpoint partition offsets every 30 seconds and resume from the last checkpoint after a restart.
+      text: >
+        az iot hub monitor-events -n {iothub_name} --cg {consumer_group_name} --checkpoint-interval 30 --resume
 """
 
 helps[
@@ -407,6 +416,10 @@ helps[
       text: >
         az iot hub device-identity children add -d {edge_device_id} --child-list {child_device_id_1} {child_device_id_2}
         -n {iothub_name} -f
+    - name: Add a large list of devices as children to the edge device with concurrent updates and a per-device summary.
+      text: >
+        az iot hub device-identity children add -d {edge_device_id} --child-list $(cat child_ids.txt)
+        -n {iothub_name} --bulk --max-workers 32
 """
 
 helps[
@@ -436,6 +449,9 @@ helps[
     - name: Remove all child devices from a target parent device.
       text: >
         az iot hub device-identity children remove -d {edge_device_id} --remove-all
+    - name: Remove all child devices from a target parent device with concurrent updates and a per-device summary.
+      text: >
+        az iot hub device-identity children remove -d {edge_device_id} --remove-all --bulk
 """
 
 helps[
@@ -503,6 +519,30 @@ helps[
         az iot hub device-twin replace -d {device_id} -n {iothub_name} -j ../mydevicetwin.json
 """
 
+helps[
+    "iot hub device-twin bulk-update"
+] = """
+    type: command
+    short-summary: Patch the tags and desired properties of many device twins, each with its own values.
+    long-summary: |
+      Patches are read from a JSON lines file, one device per line, and applied concurrently. The etags of each
+      chunk of devices are read with a single query and every patch is applied only to the twin version it was
+      read for. If the twin changes in between (412), it is read again and the patch is retried. Lines may carry
+      their own "etag", in which case a changed twin fails instead of being retried.
+
+      When the hub throttles requests (429), the number of patches in flight is halved and all workers pause for
+      the Retry-After of the response, then concurrency grows back as patches succeed. The result of every patch
+      is written to --results-file and a summary with succeeded, failed, throttled counts and patches per minute
+      is returned.
+    examples:
+    - name: Apply per device desired properties from a file and keep the result of every patch.
+      text: >
+        az iot hub device-twin bulk-update -n {iothub_name} --patch-file calibration.ndjson --results-file results.ndjson
+    - name: Apply patches with at most 64 patches in flight.
+      text: >
+        az iot hub device-twin bulk-update -n {iothub_name} --patch-file patches.ndjson --max-workers 64
+"""
+
 helps[
     "iot hub module-identity"
 ] = """
@@ -679,13 +719,22 @@ helps[
 ] = """
     type: command
     short-summary: Invoke a module method.
-    long-summary: This command supports both edge and non-edge device modules.
+    long-summary: |
+      This command supports both edge and non-edge device modules.
+
+      The method can be fanned out to the same module of many devices with --device-ids or --device-query.
+      Invocations run concurrently (--max-workers), each device result is written as a line of JSON as soon
+      as it arrives and a summary with status counts and latency percentiles is returned.
 
     examples:
     - name: Invoke a direct method on an edge device module.
       text: >
         az iot hub invoke-module-method -n {iothub_name} -d {device_id}
         -m '$edgeAgent' --method-name 'RestartModule' --method-payload '{"schemaVersion": "1.0"}'
+    - name: Invoke a direct method on the edge agent of all edge devices.
+      text: >
+        az iot hub invoke-module-method -n {iothub_name} --device-query "SELECT deviceId FROM devices WHERE capabilities.iotEdge = true"
+        -m '$edgeAgent' --method-name 'ping'
 """
 
 helps[
@@ -694,11 +743,25 @@ helps[
     type: command
     short-summary: Invoke a device method.
 
+    long-summary: |
+      The method can be fanned out to many devices with --device-ids or --device-query. Invocations run
+      concurrently (--max-workers) over a shared service client, each device result is written as a line of JSON
+      with its status, payload and latency as soon as it arrives, and a summary with status counts and latency
+      percentiles is returned.
+
     examples:
     - name: Invoke a direct method on a device.
       text: >
         az iot hub invoke-device-method --hub-name {iothub_name} --device-id {device_id}
         --method-name Reboot --method-payload '{"version":"1.0"}'
+    - name: Invoke a direct method on a list of devices.
+      text: >
+        az iot hub invoke-device-method --hub-name {iothub_name} --device-ids {device_id_1} {device_id_2}
+        --method-name Reboot
+    - name: Invoke a direct method on all devices matching a query, 100 at a time.
+      text: >
+        az iot hub invoke-device-method --hub-name {iothub_name} --device-query "SELECT deviceId FROM devices WHERE tags.role = 'gateway'"
+        --method-name Reboot --max-workers 100
 """
 
 helps[
@@ -717,6 +780,14 @@ helps[
     - name: Query all module twin data on target device.
       text: >
         az iot hub query -n {iothub_name} -q "select * from devices.modules where devices.deviceId = '{device_id}'"
+    - name: Stream all device twins as newline-delimited JSON to a file as pages arrive.
+      text: >
+        az iot hub query -n {iothub_name} -q "select * from devices" --stream > twins.ndjson
+    - name: Stream all device twins using four concurrent page chains partitioned by device status and edge capability.
+      text: >
+        az iot hub query -n {iothub_name} -q "select * from devices" --stream --mw 4
+        --pp "status = 'enabled' AND capabilities.iotEdge = true" "status = 'enabled' AND capabilities.iotEdge = false"
+        "status = 'disabled' AND capabilities.iotEdge = true" "status = 'disabled' AND capabilities.iotEdge = false"
 """
 
 helps[
@@ -1043,6 +1114,27 @@ helps[
     short-summary: Manage IoT Edge deployments at scale.
 """
 
+helps[
+    "iot edge deployment validate"
+] = """
+    type: command
+    short-summary: Validate a directory of IoT Edge deployment manifests against the bundled deployment schemas.
+    long-summary: |
+      Every manifest matching --pattern is checked the same way as `az iot edge deployment create`, with the
+      $edgeAgent and $edgeHub desired properties validated against the schema of their schemaVersion. Schemas are
+      loaded and compiled once and manifests are validated concurrently.
+
+      When any manifest is invalid the command fails with the validation errors of every invalid manifest and
+      the most common errors across them. No IoT Hub is required.
+    examples:
+    - name: Validate every deployment manifest in a directory tree.
+      text: >
+        az iot edge deployment validate --manifest-dir ./deployments
+    - name: Validate only layered deployment manifests.
+      text: >
+        az iot edge deployment validate --manifest-dir ./deployments --pattern "layered*.json"
+"""
+
 helps[
     "iot edge deployment create"
 ] = """
@@ -1171,6 +1263,14 @@ helps[
 ] = """
     type: command
     short-summary: List individual device enrollments in an Azure IoT Hub Device Provisioning Service.
+    examples:
+    - name: Basic usage
+      text: >
+        az iot dps enrollment list --dps-name {dps_name} -g {resource_group}
+    - name: Stream the registration id and provisioning status of disabled enrollments as newline-delimited JSON.
+      text: >
+        az iot dps enrollment list --dps-name {dps_name} -g {resource_group} --stream
+        --fields registrationId provisioningStatus --filter "provisioningStatus=='disabled'"
 """
 
 helps[
@@ -1302,6 +1402,37 @@ helps[
     short-summary: Delete an individual device enrollment in an Azure IoT Hub Device Provisioning Service.
 """
 
+helps[
+    "iot dps enrollment bulk"
+] = """
+    type: command
+    short-summary: Create, update or delete individual device enrollments listed in a manifest file with the
+        service bulk operation.
+    long-summary: |
+                  The manifest is either a JSON lines file of enrollment bodies, for example the output of
+                  `az iot dps enrollment list --stream`, or a CSV file (.csv extension) with the columns
+                  registrationId, deviceId, attestationType, primaryKey, secondaryKey, endorsementKey,
+                  certificatePath, secondaryCertificatePath, iotHubHostName, iotHubs, allocationPolicy,
+                  webhookUrl, apiVersion, provisioningStatus, reprovisionPolicy, edgeEnabled, initialTwinTags,
+                  initialTwinProperties, deviceInformation and etag. Only registrationId is required, the
+                  attestation type defaults to symmetricKey.
+
+                  Enrollments are submitted in chunks of 10, the service maximum, with bounded concurrency.
+                  Failures are reported per enrollment with their manifest line and can be written to a retry
+                  file, a JSON lines manifest that can be passed back to this command.
+    examples:
+    - name: Create the enrollments of a CSV manifest and write the failed enrollments to a retry file.
+      text: >
+        az iot dps enrollment bulk --dps-name {dps_name} -g {resource_group} --manifest enrollments.csv
+        --retry-file retry.jsonl
+    - name: Delete the disabled enrollments of a DPS instance.
+      text: >
+        az iot dps enrollment list --dps-name {dps_name} -g {resource_group} --stream
+        --fields registrationId --filter "provisioningStatus=='disabled'" > disabled.jsonl
+
+        az iot dps enrollment bulk --dps-name {dps_name} -g {resource_group} --manifest disabled.jsonl --mode delete
+"""
+
 helps[
     "iot dps enrollment registration"
 ] = """
@@ -1339,6 +1470,14 @@ helps[
 ] = """
     type: command
     short-summary: List enrollments groups in an Azure IoT Hub Device Provisioning Service.
+    examples:
+    - name: Basic usage
+      text: >
+        az iot dps enrollment-group list --dps-name {dps_name} -g {resource_group}
+    - name: Stream the id and attestation type of every enrollment group as newline-delimited JSON.
+      text: >
+        az iot dps enrollment-group list --dps-name {dps_name} -g {resource_group} --stream
+        --fields enrollmentGroupId attestation.type
 """
 
 helps[
@@ -1490,6 +1629,10 @@ helps[
       text: >
         az iot dps enrollment-group compute-device-key -g {resource_group_name} --dps-name {dps_name}
         --enrollment-id {enrollment_id} --registration-id {registration_id}
+    - name: Compute the device keys of the registration IDs listed in a file and write them to a CSV file.
+      text: >
+        az iot dps enrollment-group compute-device-key -g {resource_group_name} --dps-name {dps_name}
+        --enrollment-id {enrollment_id} --registration-id-file registration_ids.txt --output-file device_keys.csv
 """
 
 helps[
@@ -1537,6 +1680,10 @@ helps[
       text: >
         az iot dps compute-device-key -g {resource_group_name} --dps-name {dps_name}
         --enrollment-id {enrollment_id} --registration-id {registration_id}
+    - name: Compute the device keys of the registration IDs listed in a file and write them to a CSV file.
+      text: >
+        az iot dps compute-device-key -g {resource_group_name} --dps-name {dps_name}
+        --enrollment-id {enrollment_id} --registration-id-file registration_ids.txt --output-file device_keys.csv
 """
 
 helps[
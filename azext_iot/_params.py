@@ -21,6 +21,7 @@ from azext_iot.common.shared import (
     DeviceAuthType,
     KeyType,
     AttestationType,
+    BulkEnrollmentOperationMode,
     ProtocolType,
     AckType,
     MetricType,
@@ -303,6 +304,27 @@ def load_arguments(self, _):
             type=int,
             help="Maximum number of seconds to wait for the device method result.",
         )
+        context.argument(
+            "device_ids",
+            options_list=["--device-ids", "--dids"],
+            nargs="+",
+            help="Space-separated list of device Ids to invoke the method on concurrently.",
+            arg_group="Fan-out",
+        )
+        context.argument(
+            "device_query",
+            options_list=["--device-query", "--dq"],
+            help="IoT Hub query selecting the devices to invoke the method on concurrently, for example "
+            "\"SELECT deviceId FROM devices WHERE tags.role = 'gateway'\".",
+            arg_group="Fan-out",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent method invocations when fanning out. Defaults to 32.",
+            arg_group="Fan-out",
+        )
 
     with self.argument_context("iot hub invoke-module-method") as context:
         context.argument(
@@ -311,6 +333,27 @@ def load_arguments(self, _):
             type=int,
             help="Maximum number of seconds to wait for the module method result.",
         )
+        context.argument(
+            "device_ids",
+            options_list=["--device-ids", "--dids"],
+            nargs="+",
+            help="Space-separated list of device Ids to invoke the method on concurrently.",
+            arg_group="Fan-out",
+        )
+        context.argument(
+            "device_query",
+            options_list=["--device-query", "--dq"],
+            help="IoT Hub query selecting the devices to invoke the method on concurrently, for example "
+            "\"SELECT deviceId FROM devices WHERE tags.role = 'gateway'\".",
+            arg_group="Fan-out",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent method invocations when fanning out. Defaults to 32.",
+            arg_group="Fan-out",
+        )
 
     with self.argument_context("iot hub connection-string") as context:
         context.argument(
@@ -384,6 +427,33 @@ def load_arguments(self, _):
             help="Total duration in seconds where job status will be checked if --wait flag is passed in.",
         )
 
+    with self.argument_context("iot hub job watch") as context:
+        context.argument(
+            "job_ids",
+            options_list=["--job-ids", "--jids"],
+            nargs="+",
+            help="Space-separated list of job Ids to watch.",
+        )
+        context.argument(
+            "poll_interval",
+            options_list=["--poll-interval", "--interval"],
+            type=int,
+            help="Interval in seconds between polls of a job that is making progress.",
+        )
+        context.argument(
+            "max_poll_interval",
+            options_list=["--max-poll-interval", "--max-interval"],
+            type=int,
+            help="Upper bound in seconds of the poll interval. The interval of a job doubles up to this value "
+            "while its status and device statistics do not change.",
+        )
+        context.argument(
+            "poll_duration",
+            options_list=["--poll-duration", "--duration"],
+            type=int,
+            help="Total duration in seconds to watch the jobs.",
+        )
+
     with self.argument_context("iot hub job create") as context:
         context.argument(
             "job_type",
@@ -407,6 +477,70 @@ def load_arguments(self, _):
             help="Number of telemetry messages to capture before the monitor is terminated. "
             "If not specified, monitor keeps running until meeting the timeout threshold of not receiving messages from hub.",
         )
+        context.argument(
+            "stats",
+            options_list=["--stats"],
+            arg_type=get_three_state_flag(),
+            help="Aggregate events instead of printing them. A rolling summary of message rates per partition, device "
+            "and module is printed every --stats-interval seconds, and final rate, payload size and end-to-end latency "
+            "statistics are printed as JSON when the monitor stops.",
+            arg_group="Statistics",
+        )
+        context.argument(
+            "stats_interval",
+            options_list=["--stats-interval", "--si"],
+            type=int,
+            help="Seconds between rolling summaries in stats mode. Use 0 to only print the final statistics.",
+            arg_group="Statistics",
+        )
+        context.argument(
+            "timestamp_field",
+            options_list=["--timestamp-field", "--tf"],
+            help="Top level payload field holding the device side timestamp used for end-to-end latency in stats mode, "
+            "when the message has no iothub-creation-time-utc property. "
+            "Accepts ISO 8601 strings or epoch seconds/milliseconds.",
+            arg_group="Statistics",
+        )
+        context.argument(
+            "prefetch",
+            options_list=["--prefetch"],
+            type=int,
+            help="Link credit (messages prefetched) of each partition receiver. When set, events are received in "
+            "batches and a measured events/sec readout is written to stderr. Use a large value such as 1000 "
+            "to catch up on a backlog with --enqueued-time.",
+            arg_group="Receive",
+        )
+        context.argument(
+            "batch_size",
+            options_list=["--batch-size", "--bs"],
+            type=int,
+            help="Maximum number of events handed to the handler per batch. Cannot exceed --prefetch, "
+            "which defaults to this value when not set.",
+            arg_group="Receive",
+        )
+        context.argument(
+            "checkpoint_interval",
+            options_list=["--checkpoint-interval", "--ci"],
+            type=int,
+            help="Enables checkpointing the last processed offset and sequence number of each partition, "
+            "written to the checkpoint file at most once per this many seconds and when the monitor stops.",
+            arg_group="Checkpoint",
+        )
+        context.argument(
+            "checkpoint_file",
+            options_list=["--checkpoint-file", "--cf"],
+            help="Path of the checkpoint file. Defaults to a file per hub and consumer group in the Azure CLI "
+            "config directory.",
+            arg_group="Checkpoint",
+        )
+        context.argument(
+            "resume",
+            options_list=["--resume"],
+            arg_type=get_three_state_flag(),
+            help="Start each partition after its checkpointed offset instead of --enqueued-time and keep "
+            "checkpointing. Partitions without a checkpoint start from --enqueued-time.",
+            arg_group="Checkpoint",
+        )
 
     with self.argument_context("iot hub monitor-feedback") as context:
         context.argument(
@@ -568,6 +702,19 @@ def load_arguments(self, _):
     with self.argument_context("iot hub device-identity children") as context:
         context.argument("device_id", help="Id of edge device.")
         context.argument("child_list", arg_type=children_list_prop_type)
+        context.argument(
+            "bulk",
+            options_list=["--bulk"],
+            arg_type=get_three_state_flag(),
+            help="Validate child devices with a batched query and update them concurrently. Failures are "
+            "reported per device in a summary instead of stopping the operation.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent device updates in bulk mode. Defaults to 16.",
+        )
 
     with self.argument_context("iot hub device-identity children add") as context:
         context.argument(
@@ -605,6 +752,27 @@ def load_arguments(self, _):
             "a percentage. Only values from 0 to 100 (inclusive) are permitted.",
         )
 
+    with self.argument_context("iot hub device-twin bulk-update") as context:
+        context.argument(
+            "patch_file",
+            options_list=["--patch-file", "--pf"],
+            help="Path to a JSON lines file with one twin patch per line, for example "
+            "{\"deviceId\": \"d1\", \"patch\": {\"properties\": {\"desired\": {\"offset\": 0.42}}}}. "
+            "Tags and desired properties can be patched. An optional \"etag\" applies the patch only to that twin version.",
+        )
+        context.argument(
+            "results_file",
+            options_list=["--results-file", "--rf"],
+            help="Path of a JSON lines file to write the result of every patch to. The file is overwritten.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent twin patches. The number of patches in flight is reduced while the "
+            "hub throttles requests. Defaults to 16.",
+        )
+
     with self.argument_context("iot hub query") as context:
         context.argument(
             "query_command",
@@ -617,6 +785,30 @@ def load_arguments(self, _):
             type=int,
             help="Maximum number of elements to return. By default query has no cap.",
         )
+        context.argument(
+            "stream",
+            options_list=["--stream"],
+            arg_type=get_three_state_flag(),
+            help="Write results to stdout as newline-delimited JSON (NDJSON) page by page as they are "
+            "received, instead of collecting the full result set before output. Memory usage is bound by "
+            "the page size rather than the result size.",
+        )
+        context.argument(
+            "partition_predicates",
+            options_list=["--partition-predicates", "--pp"],
+            nargs="+",
+            help="Space-separated list of disjoint query conditions used to split the query into "
+            "independent page chains that run concurrently, i.e. \"STARTSWITH(deviceId, 'a')\" "
+            "\"STARTSWITH(deviceId, 'b')\". Each condition is AND-ed with the WHERE clause of the query. "
+            "Aggregate queries are not supported.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of partitioned page chains to run at once. "
+            "Defaults to the number of partition predicates.",
+        )
 
     with self.argument_context("iot device") as context:
         context.argument(
@@ -880,6 +1072,24 @@ def load_arguments(self, _):
             arg_type=hub_auth_type_dataplane_param_type,
         )
 
+    with self.argument_context("iot edge deployment validate") as context:
+        context.argument(
+            "manifest_dir",
+            options_list=["--manifest-dir", "--md"],
+            help="Directory of IoT Edge deployment manifests to validate. Subdirectories are included.",
+        )
+        context.argument(
+            "pattern",
+            options_list=["--pattern"],
+            help="Glob pattern of manifest file names to validate.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of manifests validated concurrently. Defaults to 8.",
+        )
+
     with self.argument_context("iot dps") as context:
         context.argument(
             "login",
@@ -1001,6 +1211,26 @@ def load_arguments(self, _):
             "parameters aside from registration ID will be ignored.",
         )
         context.argument("registration_id", help="ID of device registration. ")
+        context.argument(
+            "registration_id_file",
+            options_list=["--registration-id-file", "--rif"],
+            help="Path to a file of registration IDs, one per line, or '-' to read them from stdin. Device keys are "
+            "written as registrationId,key CSV rows as they are derived, the group key is fetched once.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="Path of the CSV file to write device keys to. Defaults to stdout.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Number of worker processes deriving device keys. Defaults to the number of CPUs, up to 8.",
+            arg_group="Batch",
+        )
 
     with self.argument_context("iot dps connection-string") as context:
         context.argument(
@@ -1081,6 +1311,30 @@ def load_arguments(self, _):
             help="TPM endorsement key for a TPM device.",
         )
 
+    with self.argument_context("iot dps enrollment bulk") as context:
+        context.argument(
+            "manifest",
+            options_list=["--manifest"],
+            help="Path to a JSON lines file of enrollments, or a CSV file (.csv extension) with one enrollment per row.",
+        )
+        context.argument(
+            "mode",
+            options_list=["--mode"],
+            arg_type=get_enum_type(BulkEnrollmentOperationMode),
+            help="Bulk operation mode.",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent bulk operations of 10 enrollments. Defaults to 8.",
+        )
+        context.argument(
+            "retry_file",
+            options_list=["--retry-file"],
+            help="Path of a JSON lines manifest to write the enrollments that failed. The file is overwritten.",
+        )
+
     with self.argument_context("iot dps enrollment registration") as context:
         context.argument(
             "registration_id",
@@ -1148,6 +1402,32 @@ def load_arguments(self, _):
             help="Include attestation keys and information in enrollment group results.",
         )
 
+    for scope in ["iot dps enrollment list", "iot dps enrollment-group list"]:
+        with self.argument_context(scope) as context:
+            context.argument(
+                "stream",
+                options_list=["--stream"],
+                arg_type=get_three_state_flag(),
+                help="Write enrollments to stdout as newline-delimited JSON (NDJSON) page by page as they are "
+                "received, while the next page is fetched. Memory usage is bound by the page size rather than "
+                "the number of enrollments.",
+            )
+            context.argument(
+                "fields",
+                options_list=["--fields"],
+                nargs="+",
+                help="Space-separated list of enrollment fields to keep, using dots for nested fields, i.e. "
+                "registrationId provisioningStatus attestation.type. Other fields, including attestation "
+                "key material, are dropped as each page is received.",
+            )
+            context.argument(
+                "item_filter",
+                options_list=["--filter"],
+                help="JMESPath expression evaluated against each enrollment as pages are received. Only "
+                "enrollments with a truthy result are kept, i.e. \"provisioningStatus=='disabled'\". "
+                "When used with --top, up to --top matching enrollments are returned.",
+            )
+
     with self.argument_context("iot dps enrollment-group compute-device-key") as context:
         context.argument(
             "symmetric_key",
@@ -1157,6 +1437,26 @@ def load_arguments(self, _):
             "from the supplied symmetric key without further validation. All other command "
             "parameters aside from registration ID will be ignored.",
         )
+        context.argument(
+            "registration_id_file",
+            options_list=["--registration-id-file", "--rif"],
+            help="Path to a file of registration IDs, one per line, or '-' to read them from stdin. Device keys are "
+            "written as registrationId,key CSV rows as they are derived, the group key is fetched once.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "output_file",
+            options_list=["--output-file", "--of"],
+            help="Path of the CSV file to write device keys to. Defaults to stdout.",
+            arg_group="Batch",
+        )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Number of worker processes deriving device keys. Defaults to the number of CPUs, up to 8.",
+            arg_group="Batch",
+        )
 
     with self.argument_context("iot dps registration") as context:
         context.argument("registration_id", help="ID of device registration.")
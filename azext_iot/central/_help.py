@@ -1464,6 +1464,8 @@ def _load_central_monitors_help():
         short-summary: Validate messages sent to the IoT Hub for an IoT Central app.
         long-summary: |
                     Performs validations on the telemetry messages and reports back data that is not modeled in the device template or data where the data type doesn’t match what is defined in the device template.
+                    Issues are aggregated per device, template, severity and kind of issue with a count, first and last seen
+                    timestamps and a few sample messages.
         examples:
         - name: Basic usage
           text: >
@@ -1486,6 +1488,9 @@ def _load_central_monitors_help():
         - name: Filter device and specify an Event Hub consumer group to bind to.
           text: >
             az iot central diagnostics validate-messages --app-id {app_id} -d {device_id} --cg {consumer_group_name}
+        - name: Validate without a message limit, printing a summary of the aggregated issues every minute.
+          text: >
+            az iot central diagnostics validate-messages --app-id {app_id} --mm 0 --dr 0 --style json --si 60
     """
 
     helps[
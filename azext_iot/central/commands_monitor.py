@@ -5,8 +5,9 @@
 # --------------------------------------------------------------------------------------------
 
 
+from azure.cli.core.azclierror import InvalidArgumentValueError
 from azure.cli.core.commands import AzCliCommand
-from azext_iot.constants import CENTRAL_ENDPOINT
+from azext_iot.constants import CENTRAL_ENDPOINT, MONITOR_ISSUE_SAMPLE_SIZE
 from azext_iot.central.providers.monitor_provider import MonitorProvider
 from azext_iot.monitor.models.enum import Severity
 from azext_iot.monitor.models.arguments import (
@@ -33,9 +34,16 @@ def validate_messages(
     duration=300,
     style="scroll",
     minimum_severity=Severity.warning.name,
+    summary_interval=0,
+    issue_samples=MONITOR_ISSUE_SAMPLE_SIZE,
     token=None,
     central_dns_suffix=CENTRAL_ENDPOINT,
 ):
+    if summary_interval < 0:
+        raise InvalidArgumentValueError("--summary-interval must be 0 or greater.")
+    if issue_samples < 0:
+        raise InvalidArgumentValueError("--issue-samples must be 0 or greater.")
+
     telemetry_args = TelemetryArguments(
         cmd,
         timeout=timeout,
@@ -58,6 +66,8 @@ def validate_messages(
         max_messages=max_messages,
         style=style,
         minimum_severity=Severity[minimum_severity],
+        summary_interval=summary_interval,
+        issue_sample_size=issue_samples,
         common_handler_args=common_handler_args,
     )
     provider = MonitorProvider(
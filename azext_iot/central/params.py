@@ -341,6 +341,20 @@ def load_central_arguments(self, _):
             help="The IoT Edge Module ID if the device type is IoT Edge.",
         )
 
+    with self.argument_context("iot central diagnostics validate-messages") as context:
+        context.argument(
+            "summary_interval",
+            options_list=["--summary-interval", "--si"],
+            type=int,
+            help="Print a summary of the aggregated issues every interval in seconds. Use 0 to disable.",
+        )
+        context.argument(
+            "issue_samples",
+            options_list=["--issue-samples"],
+            type=int,
+            help="Number of raw messages kept as samples for each aggregated issue.",
+        )
+
     with self.argument_context("iot central role") as context:
         context.argument(
             "role_id",
@@ -104,6 +104,7 @@ def load_command_table(self, _):
         cmd_group.show_command("show", "iot_device_twin_show")
         cmd_group.command("list", "iot_device_twin_list")
         cmd_group.command("replace", "iot_device_twin_replace")
+        cmd_group.command("bulk-update", "iot_device_twin_bulk_update", is_experimental=True)
         cmd_group.generic_update_command(
             "update",
             getter_name="iot_device_twin_show",
@@ -145,6 +146,7 @@ def load_command_table(self, _):
     ) as cmd_group:
         cmd_group.command("show-metric", "iot_edge_deployment_metric_show")
         cmd_group.command("create", "iot_edge_deployment_create")
+        cmd_group.command("validate", "iot_edge_deployment_validate", is_experimental=True)
         cmd_group.show_command("show", "iot_hub_configuration_show")
         cmd_group.command("list", "iot_edge_deployment_list")
         cmd_group.command("delete", "iot_hub_configuration_delete")
@@ -184,6 +186,7 @@ def load_command_table(self, _):
         cmd_group.show_command("show", "iot_dps_device_enrollment_get")
         cmd_group.command("update", "iot_dps_device_enrollment_update")
         cmd_group.command("delete", "iot_dps_device_enrollment_delete")
+        cmd_group.command("bulk", "iot_dps_device_enrollment_bulk")
 
     with self.command_group(
         "iot dps enrollment registration", command_type=iotdps_ops
@@ -9,6 +9,7 @@ from azure.cli.core.azclierror import ResourceNotFoundError
 from azure.core.exceptions import HttpResponseError
 from knack.log import get_logger
 from azext_iot.common.shared import AuthenticationTypeDataplane
+from azext_iot.common.target_cache import get_target_cache
 from typing import Any, Dict, List
 from types import SimpleNamespace
 
@@ -268,6 +269,9 @@ class BaseDiscovery(ABC):
         resource and return the first usable policy (the first policy that the IoT
         extension can use).
 
+        If the target cache is enabled (iotext.target_cache_ttl config), a previously resolved
+        target is returned without control plane calls until its TTL expires.
+
         Raises ResourceNotFoundError if no resource is found.
 
         :param resource_name: Resource Name
@@ -289,6 +293,33 @@ class BaseDiscovery(ABC):
             return self.get_target_by_cstring(connection_string=cstring)
 
         resource_group_name = resource_group_name or kwargs.get("rg")
+        target_cache = get_target_cache(self.cmd, self.resource_type)
+        if not target_cache:
+            return self._resolve_target(resource_name=resource_name, resource_group_name=resource_group_name, **kwargs)
+
+        self._initialize_client()
+        cache_key = {
+            "subscription": self.sub_id,
+            "resource_name": resource_name,
+            "resource_group": resource_group_name or "",
+            "policy_name": kwargs.get("policy_name", "auto"),
+            "key_type": kwargs.get("key_type", "primary"),
+            "auth_type": kwargs.get("auth_type", AuthenticationTypeDataplane.key.value),
+            "include_events": kwargs.get("include_events", False),
+        }
+        target = target_cache.get(**cache_key)
+        if target:
+            target["cmd"] = self.cmd
+            return target
+
+        target = self._resolve_target(resource_name=resource_name, resource_group_name=resource_group_name, **kwargs)
+        target_cache.set({k: v for k, v in target.items() if k != "cmd"}, **cache_key)
+        return target
+
+    def _resolve_target(
+        self, resource_name: str, resource_group_name: str = None, **kwargs
+    ) -> Dict[str, str]:
+        """Resolves the target through the control plane, see get_target for details."""
         resource = self.find_resource(resource_name=resource_name, rg=resource_group_name)
 
         key_type = kwargs.get("key_type", "primary")
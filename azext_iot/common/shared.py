@@ -143,6 +143,17 @@ class AllocationType(Enum):
     custom = "custom"
 
 
+class BulkEnrollmentOperationMode(Enum):
+    """
+    Mode of a bulk individual enrollment operation.
+    """
+
+    create = "create"
+    update = "update"
+    update_if_match_etag = "updateIfMatchETag"
+    delete = "delete"
+
+
 class DistributedTracingSamplingModeType(Enum):
     """
     Enable distributed tracing to add correlation IDs to messages.
@@ -298,6 +309,7 @@ class DiscoveryResourceType(Enum):
     """
     IoTHub = "IoT Hub"
     DPS = "IoT Hub Device Provisioning Service"
+    DigitalTwins = "Digital Twins"
 
 
 class SHAHashVersions(Enum):
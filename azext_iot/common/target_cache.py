@@ -0,0 +1,116 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+On-disk cache of resolved resource targets.
+
+Resolving a target (resource lookup and policy key discovery) costs several ARM round trips. When
+enabled through `az config set iotext.target_cache_ttl=<seconds>`, resolved targets are stored in
+the Azure CLI config directory with owner-only file permissions and reused until the TTL expires.
+Entries served from the cache are evicted when a data-plane call using them fails with 401.
+"""
+
+import hashlib
+import json
+import os
+import stat
+from time import time
+from typing import Optional, Set
+from knack.log import get_logger
+from azext_iot.constants import EXTENSION_CONFIG_ROOT_KEY
+
+logger = get_logger(__name__)
+
+TARGET_CACHE_TTL_CONFIG_KEY = "target_cache_ttl"
+TARGET_CACHE_DIR_NAME = "target_cache"
+
+# Cache entries used by the current process, evicted on a data-plane 401
+_served_entries: Set[str] = set()
+
+
+def get_target_cache(cmd, resource_type: str) -> Optional["TargetCache"]:
+    """Returns a TargetCache if the target cache is enabled for the current CLI context, otherwise None."""
+    cli_ctx = getattr(cmd, "cli_ctx", None)
+    if not cli_ctx:
+        return None
+
+    try:
+        ttl = cli_ctx.config.getint(EXTENSION_CONFIG_ROOT_KEY, TARGET_CACHE_TTL_CONFIG_KEY, fallback=0)
+    except ValueError:
+        logger.warning("Invalid value for %s.%s, target cache disabled.", EXTENSION_CONFIG_ROOT_KEY, TARGET_CACHE_TTL_CONFIG_KEY)
+        return None
+    if not ttl or ttl <= 0:
+        return None
+
+    return TargetCache(cloud_name=cli_ctx.cloud.name, resource_type=resource_type, ttl=ttl)
+
+
+def invalidate_served_targets():
+    """Removes every cache entry served to the current process."""
+    while _served_entries:
+        _remove_file(_served_entries.pop())
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+        logger.info("Evicted cached target: %s", path)
+    except (OSError, IOError):
+        pass
+
+
+class TargetCache(object):
+    def __init__(self, cloud_name: str, resource_type: str, ttl: int):
+        self.cloud_name = cloud_name
+        self.resource_type = resource_type
+        self.ttl = ttl
+
+    @classmethod
+    def get_cache_dir(cls) -> str:
+        config_dir = os.getenv("AZURE_CONFIG_DIR") or os.path.expanduser(os.path.join("~", ".azure"))
+        return os.path.join(config_dir, EXTENSION_CONFIG_ROOT_KEY, TARGET_CACHE_DIR_NAME)
+
+    def _get_file_path(self, **key_parts) -> str:
+        key = json.dumps(
+            {"cloud": self.cloud_name, "type": self.resource_type, **key_parts}, sort_keys=True
+        ).lower()
+        filename = "{}.json".format(hashlib.sha256(key.encode("utf-8")).hexdigest())
+        return os.path.join(self.get_cache_dir(), filename)
+
+    def get(self, **key_parts) -> Optional[dict]:
+        path = self._get_file_path(**key_parts)
+        try:
+            with open(path, mode="r", encoding="utf8") as f:
+                obj_data = json.loads(f.read())
+        except (OSError, IOError, ValueError):
+            return None
+
+        if obj_data.get("expires", 0) < time():
+            _remove_file(path)
+            return None
+
+        logger.info("Loading %s target from cache: %s", self.resource_type, path)
+        _served_entries.add(path)
+        return obj_data.get("_payload")
+
+    def set(self, payload: dict, **key_parts):
+        cache_dir = self.get_cache_dir()
+        path = self._get_file_path(**key_parts)
+        try:
+            os.makedirs(cache_dir, mode=stat.S_IRWXU, exist_ok=True)
+            # Entries may contain access keys, so restrict to owner read/write before writing content
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IRUSR | stat.S_IWUSR)
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+            with os.fdopen(fd, mode="w", encoding="utf8") as f:
+                f.write(json.dumps({"expires": time() + self.ttl, "_payload": payload}))
+            logger.info("Caching %s target to: %s", self.resource_type, path)
+        except (OSError, IOError) as e:
+            logger.warning("Unable to cache %s target. %s", self.resource_type, e)
+
+    def remove(self, **key_parts):
+        path = self._get_file_path(**key_parts)
+        _served_entries.discard(path)
+        _remove_file(path)
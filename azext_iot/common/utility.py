@@ -389,6 +389,9 @@ def handle_service_exception(e):
     if op_status == 400:
         raise BadRequestError(err)
     if op_status == 401:
+        # Cached targets may hold rotated keys or stale endpoints
+        from azext_iot.common.target_cache import invalidate_served_targets
+        invalidate_served_targets()
         raise UnauthorizedError(err)
     if op_status == 403:
         raise ForbiddenError(err)
@@ -567,6 +570,45 @@ def compute_device_key(primary_key, registration_id):
     return device_key
 
 
+def compute_device_keys(primary_key, registration_ids):
+    """
+    Compute device SAS keys for many registration IDs. The HMAC context keyed with the group key is
+    built once and copied for each registration ID.
+    Args:
+        primary_key: Primary group SAS token to compute device keys
+        registration_ids: Iterable of registration IDs.
+    Returns:
+        generator of (registration ID, device key) tuples
+    """
+    context = hmac.new(base64.b64decode(primary_key), digestmod=hashlib.sha256)
+    for registration_id in registration_ids:
+        device_hmac = context.copy()
+        device_hmac.update(registration_id.encode("utf8"))
+        yield registration_id, base64.b64encode(device_hmac.digest()).decode("ascii")
+
+
+def compute_percentiles(values, percentiles):
+    """
+    Compute percentiles of a list of numbers with linear interpolation between closest ranks.
+    Args:
+        values: Sample values, not required to be sorted.
+        percentiles: Percentiles to compute, within [0, 100].
+    Returns:
+        dict of percentile to value rounded to 2 decimals, or None when there are no values.
+    """
+    ordered = sorted(values)
+    result = {}
+    for percentile in percentiles:
+        if not ordered:
+            result[percentile] = None
+            continue
+        rank = (len(ordered) - 1) * percentile / 100.0
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        result[percentile] = round(ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower), 2)
+    return result
+
+
 def generate_key(byte_length=32):
     """
     Generate cryptographically secure device key.
@@ -31,8 +31,27 @@ METHOD_INVOKE_MIN_TIMEOUT_SEC = 10
 MIN_SIM_MSG_INTERVAL = 1
 MIN_SIM_MSG_COUNT = 1
 SIM_RECEIVE_SLEEP_SEC = 3
+FLEET_SIM_MAX_IN_FLIGHT = 100
+FLEET_SIM_REGISTRY_BATCH_SIZE = 100
+FLEET_SIM_HTTP_API_VERSION = "2019-10-01"
 CENTRAL_ENDPOINT = "azureiotcentral.com"
 DEVICE_DEVICESCOPE_PREFIX = "ms-azure-iot-edge://"
+DEVICE_QUERY_ID_CHUNK_SIZE = 100
+DEVICE_BULK_UPDATE_MAX_WORKERS = 16
+DEVICE_BULK_UPDATE_ETAG_RETRIES = 3
+# Default number of concurrent direct method invocations when fanning out to many devices
+DEVICE_METHOD_FANOUT_MAX_WORKERS = 32
+DEVICE_TWIN_BULK_MAX_WORKERS = 16
+DEVICE_TWIN_BULK_MAX_THROTTLE_RETRIES = 10
+DEVICE_TWIN_BULK_BACKOFF_MAX_SEC = 60
+EDGE_DEPLOYMENT_VALIDATE_MAX_WORKERS = 8
+EDGE_DEPLOYMENT_COMMON_ERROR_COUNT = 10
+# Service maximum of enrollments per bulk operation
+DPS_BULK_ENROLLMENT_CHUNK_SIZE = 10
+DPS_BULK_ENROLLMENT_MAX_WORKERS = 8
+DPS_DEVICE_KEY_CHUNK_SIZE = 5000
+DPS_DEVICE_KEY_MAX_WORKERS = 8
+DPS_FLEET_MAX_IN_FLIGHT = 50
 TRACING_PROPERTY = "azureiot*com^dtracing^1"
 TRACING_ALLOWED_FOR_LOCATION = ("northeurope", "westus2", "southeastasia")
 TRACING_ALLOWED_FOR_SKU = "standard"
@@ -43,6 +62,10 @@ DIGITALTWINS_RESOURCE_ID = "https://digitaltwins.azure.net"
 IOTDPS_PROVISIONING_HOST = "global.azure-devices-provisioning.net"
 DEVICETWIN_POLLING_INTERVAL_SEC = 10
 DEVICETWIN_MONITOR_TIME_SEC = 15
+MONITOR_THROUGHPUT_READOUT_SEC = 5
+MONITOR_CHECKPOINT_INTERVAL_SEC = 10
+MONITOR_ISSUE_SAMPLE_SIZE = 3
+MONITOR_ISSUE_MAX_GROUPS = 10000
 # (Lib name, minimum version (including), maximum version (excluding))
 EVENT_LIB = ("uamqp", "1.2", "1.3")
 PNP_DTDLV2_COMPONENT_MARKER = "__t"
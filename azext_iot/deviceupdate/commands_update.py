@@ -453,8 +453,7 @@ def calculate_hash(
     hash_algo: str = ADUValidHashAlgorithmType.SHA256.value,
 ):
     result = []
-    for path in file_paths:
-        file_metadata = DeviceUpdateDataManager.calculate_file_metadata(path)
+    for file_metadata in DeviceUpdateDataManager.calculate_files_metadata(file_paths):
         result.append(
             {
                 "bytes": file_metadata.bytes,
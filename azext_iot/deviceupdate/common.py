@@ -100,6 +100,9 @@ FP_HANDLERS_REQUIRE_CRITERIA: List[str] = [
 SYSTEM_IDENTITY_ARG = "[system]"
 AUTH_RESOURCE_ID = "https://api.adu.microsoft.com/"
 CACHE_RESOURCE_TYPE = "DeviceUpdate"
+# Update payloads are hashed in fixed size chunks, so memory per file stays constant
+FILE_HASH_CHUNK_SIZE = 1024 * 1024
+FILE_HASH_MAX_WORKERS = 8
 
 
 def get_cache_entry_name(account_name: str, instance_name: str):
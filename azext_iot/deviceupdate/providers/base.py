@@ -17,7 +17,12 @@ from azext_iot.sdk.deviceupdate.controlplane import (
 from azext_iot.sdk.deviceupdate.dataplane import DeviceUpdateClient
 from azext_iot.sdk.deviceupdate.dataplane import models as DeviceUpdateDataModels
 
-from azext_iot.deviceupdate.common import SYSTEM_IDENTITY_ARG, AUTH_RESOURCE_ID
+from azext_iot.deviceupdate.common import (
+    AUTH_RESOURCE_ID,
+    FILE_HASH_CHUNK_SIZE,
+    FILE_HASH_MAX_WORKERS,
+    SYSTEM_IDENTITY_ARG,
+)
 from azext_iot.common.embedded_cli import EmbeddedCLI
 from azext_iot.common.utility import handle_service_exception
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
@@ -241,20 +246,52 @@ class DeviceUpdateDataManager(DeviceUpdateAccountManager):
         from urllib.request import urlopen
 
         with urlopen(url) as f:
-            file_content: bytes = f.read()
-            hash = self.calculate_hash_from_bytes(file_content)
-            return UpdateManifestMeta(len(file_content), hash)
+            size_in_bytes, hash = self.calculate_hash_from_stream(f)
+            return UpdateManifestMeta(size_in_bytes, hash)
 
     @classmethod
     def calculate_file_metadata(cls, file_path: str) -> FileMetadata:
         file_pure_path = PurePath(file_path)
-        with open(file_pure_path.as_posix(), "rb") as file_path:
+        with open(file_pure_path.as_posix(), "rb", buffering=0) as file_path:
             logger.debug("Attempting to read file %s as binary", file_path)
-            raw_bytes = file_path.read()
-            size_in_bytes = len(raw_bytes)
-            hash = cls.calculate_hash_from_bytes(raw_bytes)
+            size_in_bytes, hash = cls.calculate_hash_from_stream(file_path)
             return FileMetadata(size_in_bytes, hash, file_pure_path.name, file_pure_path)
 
+    @classmethod
+    def calculate_files_metadata(cls, file_paths: List[str], max_workers: Optional[int] = None) -> List[FileMetadata]:
+        """
+        Calculates the metadata of many files in parallel, in input order. Hashing releases the GIL
+        for each chunk, so a thread per file keeps several cores busy.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if len(file_paths) < 2:
+            return [cls.calculate_file_metadata(file_path) for file_path in file_paths]
+        workers = max_workers or min(len(file_paths), os.cpu_count() or 1, FILE_HASH_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(cls.calculate_file_metadata, file_paths))
+
+    @classmethod
+    def calculate_hash_from_stream(cls, stream, chunk_size: int = FILE_HASH_CHUNK_SIZE) -> Tuple[int, str]:
+        """
+        Calculates the size and the base64 sha256 digest of a binary stream in one pass, reading
+        fixed size chunks into a reused buffer.
+        """
+        from base64 import b64encode
+        from hashlib import sha256
+
+        digest = sha256()
+        size_in_bytes = 0
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            read = stream.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+            size_in_bytes += read
+        return size_in_bytes, b64encode(digest.digest()).decode("utf8")
+
     @classmethod
     def calculate_hash_from_bytes(cls, raw_bytes: bytes) -> str:
         from base64 import b64encode
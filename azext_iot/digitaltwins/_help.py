@@ -791,6 +791,10 @@ def load_digitaltwins_help():
         - name: Query leveraging `$dtId` with powershell compatible syntax
           text: >
             az dt twin query -n {instance_or_hostname} --query-command "SELECT * FROM DigitalTwins T Where T.`$dtId = 'room0'"
+
+        - name: Stream all digital twins as newline-delimited JSON to a file, reporting per page query charge to stderr.
+          text: >
+            az dt twin query -n {instance_or_hostname} -q "select * from digitaltwins" --stream > twins.ndjson
     """
 
     helps["dt twin delete"] = """
@@ -815,6 +819,10 @@ def load_digitaltwins_help():
         - name: Delete all digital twins. Any relationships referencing the twins will also be deleted.
           text: >
             az dt twin delete-all -n {instance_or_hostname}
+
+        - name: Delete all relationships and digital twins concurrently, logging failed deletions to a file.
+          text: >
+            az dt twin delete-all -n {instance_or_hostname} --bulk --max-workers 32 --failure-log failures.ndjson
     """
 
     helps["dt twin relationship"] = """
@@ -934,6 +942,10 @@ def load_digitaltwins_help():
         - name: Delete all digital twin relationships within the Digital Twins instace.
           text: >
             az dt twin relationship delete-all -n {instance_or_hostname}
+
+        - name: Delete all digital twin relationships within the Digital Twins instance concurrently.
+          text: >
+            az dt twin relationship delete-all -n {instance_or_hostname} --bulk
     """
 
     helps["dt twin telemetry"] = """
@@ -1012,6 +1024,10 @@ def load_digitaltwins_help():
           text: >
             az dt model create -n {instance_or_hostname} --from-directory {directory_path}
 
+        - name: Bulk upload a large ontology from a directory, creating up to 8 dependency ordered batches concurrently.
+          text: >
+            az dt model create -n {instance_or_hostname} --from-directory {directory_path} --max-workers 8
+
         - name: Upload model json inline or from file path.
           text: >
             az dt model create -n {instance_or_hostname} --models {file_path_or_inline_json}
@@ -1077,6 +1093,10 @@ def load_digitaltwins_help():
         - name: Delete all models.
           text: >
             az dt model delete-all -n {instance_or_hostname}
+
+        - name: Delete all models with up to 32 concurrent delete requests per dependency layer.
+          text: >
+            az dt model delete-all -n {instance_or_hostname} --max-workers 32
     """
 
     helps["dt job"] = """
@@ -1089,6 +1109,26 @@ def load_digitaltwins_help():
         short-summary: Manage and configure jobs for importing model, twin and relationships data to a digital twin instance.
     """
 
+    helps["dt job import build"] = """
+        type: command
+        short-summary: Build a bulk import data file locally from CSV or JSON lines sources of twins and relationships.
+        long-summary: |
+                      Sources are streamed row by row and written to the data file in chunks, so large graphs can be
+                      prepared with constant memory. Twins are validated against the provided models, invalid rows
+                      are skipped and reported. The data file can then be uploaded to a blob container and imported
+                      with `az dt job import create`.
+
+        examples:
+        - name: Build a data file from CSV twins and relationships, validating twins against a directory of models.
+          text: >
+            az dt job import build --data-file {data_file_path} --from-directory {models_directory}
+            --twin-source twins.csv --relationship-source relationships.csv
+        - name: Build a data file from JSON lines twins without validation, writing invalid rows to a failure log.
+          text: >
+            az dt job import build --data-file {data_file_path} --twin-source twins.jsonl --skip-validation
+            --failure-log invalid.ndjson
+    """
+
     helps["dt job import create"] = """
         type: command
         short-summary: Create and execute a data import job on a digital twin instance.
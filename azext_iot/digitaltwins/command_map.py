@@ -233,6 +233,7 @@ def load_digitaltwins_commands(self, _):
         command_type=digitaltwins_job_ops,
         is_preview=True,
     ) as cmd_group:
+        cmd_group.command("build", "build_import_file")
         cmd_group.command("create", "create_import_job")
         cmd_group.show_command("show", "show_import_job")
         cmd_group.command("list", "list_import_jobs")
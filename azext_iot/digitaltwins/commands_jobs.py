@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 from azext_iot.digitaltwins.providers.import_job import ImportJobProvider
+from azext_iot.digitaltwins.providers.import_builder import ImportFileBuilder, load_models
 
 
 def create_import_job(
@@ -33,3 +34,17 @@ def list_import_jobs(cmd, name_or_hostname: str, resource_group_name: str = None
 def delete_import_job(cmd, name_or_hostname: str, job_id: str, resource_group_name: str = None):
     import_job_provider = ImportJobProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
     return import_job_provider.delete(job_id=job_id)
+
+
+def build_import_file(
+    cmd, data_file_name: str, twin_sources: list = None, relationship_sources: list = None, models: str = None,
+    from_directory: str = None, skip_validation: bool = False, failure_log: str = None, author: str = None,
+    organization: str = None
+):
+    builder = ImportFileBuilder(
+        models=load_models(models=models, from_directory=from_directory), validate=not skip_validation,
+        failure_log=failure_log, author=author, organization=organization
+    )
+    return builder.build(
+        output=data_file_name, twin_sources=twin_sources, relationship_sources=relationship_sources
+    )
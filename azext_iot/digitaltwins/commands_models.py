@@ -13,11 +13,13 @@ logger = get_logger(__name__)
 
 def add_models(
     cmd, name_or_hostname, models=None, from_directory=None,
-    resource_group_name=None, failure_policy=ADTModelCreateFailurePolicy.ROLLBACK.value
+    resource_group_name=None, failure_policy=ADTModelCreateFailurePolicy.ROLLBACK.value, max_workers=None
 ):
     model_provider = ModelProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
     logger.debug("Received models input: %s", models)
-    return model_provider.add(models=models, from_directory=from_directory, failure_policy=failure_policy)
+    return model_provider.add(
+        models=models, from_directory=from_directory, failure_policy=failure_policy, max_workers=max_workers
+    )
 
 
 def show_model(cmd, name_or_hostname, model_id, definition=False, resource_group_name=None):
@@ -48,6 +50,6 @@ def delete_model(cmd, name_or_hostname, model_id, resource_group_name=None):
     return model_provider.delete(id=model_id)
 
 
-def delete_all_models(cmd, name_or_hostname, resource_group_name=None):
+def delete_all_models(cmd, name_or_hostname, resource_group_name=None, max_workers=None):
     model_provider = ModelProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
-    return model_provider.delete_all()
+    return model_provider.delete_all(max_workers=max_workers)
@@ -11,10 +11,10 @@ logger = get_logger(__name__)
 
 
 def query_twins(
-    cmd, name_or_hostname, query_command, show_cost=False, resource_group_name=None
+    cmd, name_or_hostname, query_command, show_cost=False, resource_group_name=None, stream=False
 ):
     twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
-    return twin_provider.invoke_query(query=query_command, show_cost=show_cost)
+    return twin_provider.invoke_query(query=query_command, show_cost=show_cost, stream=stream)
 
 
 def create_twin(
@@ -47,8 +47,12 @@ def delete_twin(cmd, name_or_hostname, twin_id, resource_group_name=None, etag=N
     return twin_provider.delete(twin_id=twin_id, etag=etag)
 
 
-def delete_all_twin(cmd, name_or_hostname, resource_group_name=None):
+def delete_all_twin(
+    cmd, name_or_hostname, resource_group_name=None, bulk=False, max_workers=None, failure_log=None
+):
     twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
+    if bulk:
+        return twin_provider.bulk_delete_all(max_workers=max_workers, failure_log=failure_log)
     return twin_provider.delete_all()
 
 
@@ -124,9 +128,13 @@ def delete_relationship(
 
 
 def delete_all_relationship(
-    cmd, name_or_hostname, twin_id=None, resource_group_name=None
+    cmd, name_or_hostname, twin_id=None, resource_group_name=None, bulk=False, max_workers=None, failure_log=None
 ):
     twin_provider = TwinProvider(cmd=cmd, name=name_or_hostname, rg=resource_group_name)
+    if bulk:
+        return twin_provider.bulk_delete_all(
+            only_relationships=True, twin_id=twin_id, max_workers=max_workers, failure_log=failure_log
+        )
     if twin_id:
         return twin_provider.delete_all_relationship(twin_id=twin_id)
     return twin_provider.delete_all(only_relationships=True)
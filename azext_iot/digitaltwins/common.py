@@ -16,6 +16,16 @@ MAX_ADT_CREATE_RETRIES = 5
 ADT_CREATE_RETRY_AFTER = 60
 MAX_ADT_DH_CREATE_RETRIES = 20
 
+# Bulk operation constants
+ADT_BULK_MAX_WORKERS = 16
+ADT_BULK_MAX_THROTTLE_RETRIES = 10
+ADT_BULK_BACKOFF_MAX_SEC = 60
+ADT_BULK_PROGRESS_SEC = 5
+ADT_BULK_MAX_PASSES = 3
+ADT_MODEL_UPLOAD_MAX_WORKERS = 4
+ADT_IMPORT_FILE_VERSION = "1.0.0"
+ADT_IMPORT_CHUNK_ROWS = 1000
+
 
 # Identity params
 SYSTEM_IDENTITY = "[system]"
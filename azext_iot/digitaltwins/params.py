@@ -349,6 +349,14 @@ def load_digitaltwins_arguments(self, _):
             help="Calculates and shows the query charge.",
             arg_type=get_three_state_flag(),
         )
+        context.argument(
+            "stream",
+            options_list=["--stream"],
+            arg_type=get_three_state_flag(),
+            help="Write query results to stdout as newline-delimited JSON (NDJSON) page by page while the next page is "
+            "prefetched, instead of collecting all results before output. Per page query-charge, rows/sec and the "
+            "cumulative cost are reported to stderr.",
+        )
         context.argument(
             "relationship_id",
             options_list=["--relationship-id", "-r"],
@@ -445,6 +453,31 @@ def load_digitaltwins_arguments(self, _):
             help="Filter result by the kind of relationship.",
         )
 
+    for scope in ["dt twin delete-all", "dt twin relationship delete-all"]:
+        with self.argument_context(scope) as context:
+            context.argument(
+                "bulk",
+                options_list=["--bulk"],
+                arg_type=get_three_state_flag(),
+                help="Gather relationships and twins with queries and delete them concurrently, backing off on "
+                "throttled (429) responses. Throughput is reported to stderr and a summary is returned.",
+                arg_group="Bulk",
+            )
+            context.argument(
+                "max_workers",
+                options_list=["--max-workers", "--mw"],
+                type=int,
+                help="Maximum number of concurrent delete requests in bulk mode.",
+                arg_group="Bulk",
+            )
+            context.argument(
+                "failure_log",
+                options_list=["--failure-log"],
+                help="File that failed deletions are appended to as newline-delimited JSON in bulk mode. "
+                "Running the command again resumes with whatever is left.",
+                arg_group="Bulk",
+            )
+
     with self.argument_context("dt model") as context:
         context.argument(
             "from_directory",
@@ -475,6 +508,14 @@ def load_digitaltwins_arguments(self, _):
             arg_group="Models Input",
             arg_type=get_enum_type(ADTModelCreateFailurePolicy),
         )
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of model batches created concurrently when the input has more than 250 models. "
+            "A batch is only created once the batches holding its dependencies have been created.",
+            arg_group="Models Input",
+        )
         context.argument(
             "definition",
             options_list=["--definition", "--def"],
@@ -492,6 +533,15 @@ def load_digitaltwins_arguments(self, _):
             arg_type=depfor_type,
         )
 
+    with self.argument_context("dt model delete-all") as context:
+        context.argument(
+            "max_workers",
+            options_list=["--max-workers", "--mw"],
+            type=int,
+            help="Maximum number of concurrent delete requests. Models are deleted in dependency layers, "
+            "dependents first, and the models of a layer are deleted concurrently.",
+        )
+
     with self.argument_context("dt network private-link") as context:
         context.argument(
             "link_name",
@@ -669,3 +719,64 @@ def load_digitaltwins_arguments(self, _):
             "If not provided, will use the input storage account.",
             arg_group="Bulk Import Job",
         )
+
+    with self.argument_context("dt job import build") as context:
+        context.argument(
+            "data_file_name",
+            options_list=["--data-file", "--df"],
+            help="Path of the import data file to write in 'ndjson' format. An existing file is overwritten.",
+        )
+        context.argument(
+            "twin_sources",
+            options_list=["--twin-source", "--ts"],
+            nargs="+",
+            help="Space-separated list of twin source files. Files ending with .csv are read as CSV with a $dtId "
+            "column, a $model column and one column per property, using dots for component and object fields. "
+            "Other files are read as JSON lines of twins.",
+            arg_group="Sources",
+        )
+        context.argument(
+            "relationship_sources",
+            options_list=["--relationship-source", "--rs"],
+            nargs="+",
+            help="Space-separated list of relationship source files. Files ending with .csv are read as CSV with "
+            "$dtId (or $sourceId), $targetId, $relationshipName and optional $relationshipId columns plus one column "
+            "per relationship property. Other files are read as JSON lines of relationships.",
+            arg_group="Sources",
+        )
+        context.argument(
+            "models",
+            options_list=["--models", "-m"],
+            help="Inline model JSON or file path to model JSON. Models are written to the data file and used to "
+            "validate twins.",
+            arg_group="Models Input",
+        )
+        context.argument(
+            "from_directory",
+            options_list=["--from-directory", "--fd"],
+            help="The directory JSON model files will be parsed from. Models are written to the data file and used to "
+            "validate twins.",
+            arg_group="Models Input",
+        )
+        context.argument(
+            "skip_validation",
+            options_list=["--skip-validation"],
+            arg_type=get_three_state_flag(),
+            help="Write twins and relationships without validating them against the models.",
+        )
+        context.argument(
+            "failure_log",
+            options_list=["--failure-log"],
+            help="File that invalid rows are written to as newline-delimited JSON. If omitted, invalid rows are "
+            "logged as warnings.",
+        )
+        context.argument(
+            "author",
+            options_list=["--author"],
+            help="Author recorded in the header of the data file.",
+        )
+        context.argument(
+            "organization",
+            options_list=["--organization"],
+            help="Organization recorded in the header of the data file.",
+        )
@@ -10,6 +10,8 @@ from azext_iot.sdk.digitaltwins.dataplane import AzureDigitalTwinsAPI
 from azext_iot.sdk.digitaltwins.dataplane.models import ErrorResponseException
 from azext_iot.constants import DIGITALTWINS_RESOURCE_ID, USER_AGENT
 from azext_iot.common.utility import valid_hostname
+from azext_iot.common.shared import DiscoveryResourceType
+from azext_iot.common.target_cache import get_target_cache
 
 __all__ = ["DigitalTwinsProvider", "ErrorResponseException"]
 
@@ -36,17 +38,37 @@ class DigitalTwinsProvider(object):
             self.name = self.name[len(http_prefix) :]
 
         if not all([valid_hostname(self.name), "." in self.name]):
-            instance = self.rp.find_instance(
-                name=self.name, resource_group_name=self.rg
-            )
-            host_name = instance.host_name
-            if not host_name:
-                raise AzureResponseError("Instance has invalid hostName. Aborting operation...")
+            host_name = self._find_host_name()
         else:
             host_name = self.name
 
         return "https://{}".format(host_name)
 
+    def _find_host_name(self):
+        from azure.cli.core.commands.client_factory import get_subscription_id
+
+        target_cache = get_target_cache(self.cmd, DiscoveryResourceType.DigitalTwins.value)
+        if target_cache:
+            cache_key = {
+                "subscription": get_subscription_id(self.cmd.cli_ctx),
+                "resource_name": self.name,
+                "resource_group": self.rg or "",
+            }
+            target = target_cache.get(**cache_key)
+            if target:
+                return target["host_name"]
+
+        instance = self.rp.find_instance(
+            name=self.name, resource_group_name=self.rg
+        )
+        host_name = instance.host_name
+        if not host_name:
+            raise AzureResponseError("Instance has invalid hostName. Aborting operation...")
+
+        if target_cache:
+            target_cache.set({"host_name": host_name}, **cache_key)
+        return host_name
+
     def get_sdk(self):
         from azure.cli.core.commands.client_factory import get_mgmt_service_client
 
@@ -4,7 +4,19 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from azext_iot.digitaltwins.common import ADT_CREATE_RETRY_AFTER, ProvisioningStateType
+import json
+import sys
+from queue import Queue
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from azext_iot.digitaltwins.common import (
+    ADT_BULK_BACKOFF_MAX_SEC,
+    ADT_BULK_MAX_THROTTLE_RETRIES,
+    ADT_BULK_PROGRESS_SEC,
+    ADT_CREATE_RETRY_AFTER,
+    ProvisioningStateType,
+)
 from knack.log import get_logger
 
 logger = get_logger(__name__)
@@ -19,33 +31,239 @@ def accumulate_result(
     **kwargs
 ):
     result_accumulator = []
+    query_cost_sum = 0
 
-    nextlink = None
-    token_keyword = {token_arg_name: nextlink}
+    for values, query_charge in iterate_result_pages(
+        method, token_name=token_name, token_arg_name=token_arg_name, values_name=values_name, **kwargs
+    ):
+        result_accumulator.extend(values)
+        query_cost_sum = query_cost_sum + query_charge
+
+    return result_accumulator, query_cost_sum
 
-    # TODO: Genericize
-    query_cost_sum = 0
+
+def iterate_result_pages(
+    method,
+    token_name="continuationToken",
+    token_arg_name="continuation_token",
+    values_name="items",
+    **kwargs
+) -> Iterator[Tuple[list, float]]:
+    """
+    Lazily walk the continuation token chain of a paged result, yielding the values and the
+    query-charge of one page at a time.
+    """
+    token_keyword = {token_arg_name: None}
 
     while True:
         response = method(raw=True, **token_keyword, **kwargs).response
+        query_charge = 0
         headers = response.headers
-        if headers:
-            query_charge = headers.get("query-charge")
-            if query_charge:
-                query_cost_sum = query_cost_sum + float(query_charge)
+        if headers and headers.get("query-charge"):
+            query_charge = float(headers.get("query-charge"))
 
         result = response.json()
-        if result and result.get(values_name):
-            result_values = result.get(values_name)
-            result_accumulator.extend(result_values)
-            nextlink = result.get(token_name)
-            if not nextlink:
-                break
-            token_keyword[token_arg_name] = nextlink
-        else:
+        if not result or not result.get(values_name):
+            # an empty page is still charged
+            yield [], query_charge
             break
 
-    return result_accumulator, query_cost_sum
+        yield result.get(values_name), query_charge
+        nextlink = result.get(token_name)
+        if not nextlink:
+            break
+        token_keyword[token_arg_name] = nextlink
+
+
+def prefetch(iterable: Iterable, buffer: int = 1) -> Iterator:
+    """
+    Produce the items of iterable on a background thread, at most buffer items ahead of the
+    consumer, so the next page is requested while the current one is processed.
+
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    item_queue = Queue(maxsize=buffer)
+    stop_token = object()
+    cancelled = Event()
+
+    def _produce():
+        try:
+            for item in iterable:
+                if cancelled.is_set():
+                    return
+                item_queue.put((item, None))
+        except Exception as e:  # pylint: disable=broad-except
+            item_queue.put((None, e))
+        finally:
+            item_queue.put((stop_token, None))
+
+    producer = Thread(target=_produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = item_queue.get()
+            if error:
+                raise error
+            if item is stop_token:
+                break
+            yield item
+    finally:
+        cancelled.set()
+        # Drain so that a blocked producer can observe cancellation and exit
+        while not item_queue.empty():
+            item_queue.get_nowait()
+
+
+class QueryPageMeter(object):
+    """Tracks rows and query charge per page and reports progress to stderr."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self.start = monotonic()
+        self.pages = 0
+        self.rows = 0
+        self.cost = 0
+
+    def add(self, rows: int, query_charge: float):
+        self.pages += 1
+        self.rows += rows
+        self.cost += query_charge
+        print(
+            "Page {}: {} row(s), query-charge {}. {} row(s) in total, {:.1f} rows/sec, cumulative cost {}.".format(
+                self.pages, rows, query_charge, self.rows, self.rate, self.cost
+            ),
+            file=self.stream,
+            flush=True,
+        )
+
+    @property
+    def rate(self) -> float:
+        return self.rows / max(monotonic() - self.start, 1e-6)
+
+
+def write_ndjson_pages(pages: Iterable[Tuple[list, float]], meter: QueryPageMeter, stream=None) -> int:
+    """
+    Write each value of each page as a single line of JSON, flushing and reporting to the
+    meter after every page. Returns the number of values written.
+    """
+    stream = stream or sys.stdout
+    for values, query_charge in pages:
+        for value in values:
+            stream.write(json.dumps(value, separators=(",", ":")))
+            stream.write("\n")
+        stream.flush()
+        meter.add(len(values), query_charge)
+    return meter.rows
+
+
+class AdaptiveBackoff(object):
+    """
+    Back-off shared by all workers of a bulk operation. A throttled (429) response pauses every
+    worker for the Retry-After of the response, or an exponentially growing delay, and the delay
+    decays again as requests succeed.
+    """
+
+    def __init__(self, initial: float = 1.0, maximum: float = ADT_BULK_BACKOFF_MAX_SEC):
+        self.initial = initial
+        self.maximum = maximum
+        self.delay = 0
+        self.resume_at = 0
+        self.throttled = 0
+        self._lock = Lock()
+
+    def wait(self):
+        while True:
+            with self._lock:
+                remaining = self.resume_at - monotonic()
+            if remaining <= 0:
+                return
+            sleep(remaining)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.throttled += 1
+            self.delay = min(max(self.delay * 2, self.initial), self.maximum)
+            delay = self.delay if retry_after is None else retry_after
+            self.resume_at = max(self.resume_at, monotonic() + delay)
+
+    def on_success(self):
+        if self.delay:
+            with self._lock:
+                self.delay = self.delay / 2 if self.delay > self.initial else 0
+
+    def call(self, method: Callable, max_retries: int = ADT_BULK_MAX_THROTTLE_RETRIES, **kwargs):
+        """Call method, retrying throttled attempts after the shared back-off."""
+        attempt = 0
+        while True:
+            self.wait()
+            try:
+                result = method(**kwargs)
+                self.on_success()
+                return result
+            except Exception as e:  # pylint: disable=broad-except
+                response = getattr(e, "response", None)
+                if getattr(response, "status_code", None) != 429 or attempt >= max_retries:
+                    raise
+                attempt += 1
+                self.on_throttled(_get_retry_after(response))
+
+
+def _get_retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class BulkProgress(object):
+    """Counts completed and failed items of a bulk operation and reports throughput to stderr."""
+
+    def __init__(self, item_name: str, interval: int = ADT_BULK_PROGRESS_SEC, stream=None, action: str = "Deleted"):
+        self.item_name = item_name
+        self.action = action
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.start = monotonic()
+        self.last_report = self.start
+        self.succeeded = 0
+        self.failed = 0
+        # items that were already gone, e.g. a delete answered with 404
+        self.missing = 0
+        self._lock = Lock()
+
+    def add(self, succeeded: bool, missing: bool = False):
+        with self._lock:
+            if missing:
+                self.missing += 1
+            elif succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            if monotonic() - self.last_report < self.interval:
+                return
+            self.last_report = monotonic()
+        self.report()
+
+    def report(self):
+        print(
+            "{} {} {}(s), {} failed, {:.1f} {}s/sec.".format(
+                self.action, self.succeeded, self.item_name, self.failed, self.rate, self.item_name
+            ),
+            file=self.stream,
+            flush=True,
+        )
+
+    @property
+    def rate(self) -> float:
+        return self.succeeded / max(monotonic() - self.start, 1e-6)
+
+    def summary(self) -> dict:
+        return {
+            "deleted": self.succeeded,
+            "alreadyDeleted": self.missing,
+            "failed": self.failed,
+            "perSecond": round(self.rate, 2),
+        }
 
 
 def remove_prefix(text, prefix):
@@ -0,0 +1,471 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Local builder of bulk import data files.
+
+Twins and relationships are read one row at a time from CSV or JSON lines sources, checked against
+locally loaded DTDL models and written in chunks to the NDJSON import format, so memory usage depends
+on the models and the chunk size rather than on the number of rows. Twin ids are not tracked, hence
+relationship targets are not checked for existence.
+"""
+
+import csv
+import json
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from knack.log import get_logger
+from azure.cli.core.azclierror import FileOperationError, InvalidArgumentValueError
+from azext_iot.digitaltwins.common import ADT_IMPORT_CHUNK_ROWS, ADT_IMPORT_FILE_VERSION
+from azext_iot.digitaltwins.providers.generic import BulkProgress
+from azext_iot.digitaltwins.providers.model_graph import ModelDependencyGraph
+
+logger = get_logger(__name__)
+
+TWIN_ID = "$dtId"
+METADATA = "$metadata"
+MODEL = "$model"
+SOURCE_ID = "$sourceId"
+TARGET_ID = "$targetId"
+RELATIONSHIP_ID = "$relationshipId"
+RELATIONSHIP_NAME = "$relationshipName"
+
+INTEGER_SCHEMAS = frozenset(["integer", "long"])
+NUMBER_SCHEMAS = frozenset(["double", "float"])
+STRING_SCHEMAS = frozenset(["string", "date", "dateTime", "duration", "time"])
+
+
+class InterfaceContents(NamedTuple):
+    properties: Dict[str, object]
+    components: Dict[str, object]
+    relationships: Dict[str, dict]
+
+
+def _has_type(content: dict, content_type: str) -> bool:
+    types = content.get("@type")
+    return types == content_type or (isinstance(types, list) and content_type in types)
+
+
+class ModelIndex(object):
+    """Properties, components and relationships declared by each model, extended interfaces included."""
+
+    def __init__(self, models: List[dict]):
+        self.graph = ModelDependencyGraph(models)
+        # validate up front that models can be ordered
+        self.graph.layers()
+        self._contents: Dict[str, InterfaceContents] = {}
+        self.relationship_names = frozenset(
+            name for model_id in self.graph.models for name in self.get(model_id).relationships
+        )
+
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self.graph.models
+
+    def get(self, model_id: str) -> Optional[InterfaceContents]:
+        model = self.graph.models.get(model_id)
+        if model is None:
+            return None
+        if model_id not in self._contents:
+            self._contents[model_id] = self._collect(model)
+        return self._contents[model_id]
+
+    def resolve(self, schema) -> Optional[InterfaceContents]:
+        """Contents of a component schema, given as a DTMI or an inline interface."""
+        if isinstance(schema, dict):
+            return self._collect(schema)
+        return self.get(schema)
+
+    def _collect(self, model: dict) -> InterfaceContents:
+        result = InterfaceContents({}, {}, {})
+        pending = [model]
+        visited = set()
+        while pending:
+            interface = pending.pop()
+            if isinstance(interface, str):
+                if interface in visited:
+                    continue
+                visited.add(interface)
+                interface = self.graph.models.get(interface)
+                if interface is None:
+                    # extends a model that was not loaded, its contents are unknown
+                    continue
+
+            for content in interface.get("contents", []):
+                name = content.get("name")
+                if not name:
+                    continue
+                if _has_type(content, "Property"):
+                    result.properties[name] = content.get("schema")
+                elif _has_type(content, "Component"):
+                    result.components[name] = content.get("schema")
+                elif _has_type(content, "Relationship"):
+                    result.relationships[name] = content
+
+            extends = interface.get("extends", [])
+            pending.extend(extends if isinstance(extends, list) else [extends])
+        return result
+
+
+def matches_schema(schema, value) -> bool:
+    """Check a value against a DTDL schema. Schemas referenced by DTMI are not resolved and always match."""
+    if isinstance(schema, str):
+        if schema == "boolean":
+            return isinstance(value, bool)
+        if schema in INTEGER_SCHEMAS:
+            return isinstance(value, int) and not isinstance(value, bool)
+        if schema in NUMBER_SCHEMAS:
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+        if schema in STRING_SCHEMAS:
+            return isinstance(value, str)
+        return True
+    if not isinstance(schema, dict):
+        return True
+
+    if _has_type(schema, "Enum"):
+        return value in [item.get("enumValue") for item in schema.get("enumValues", [])]
+    if _has_type(schema, "Object"):
+        if not isinstance(value, dict):
+            return False
+        fields = {field.get("name"): field.get("schema") for field in schema.get("fields", [])}
+        return all(key in fields and matches_schema(fields[key], val) for key, val in value.items())
+    if _has_type(schema, "Map"):
+        if not isinstance(value, dict):
+            return False
+        value_schema = schema.get("mapValue", {}).get("schema")
+        return all(matches_schema(value_schema, val) for val in value.values())
+    if _has_type(schema, "Array"):
+        return isinstance(value, list) and all(matches_schema(schema.get("elementSchema"), val) for val in value)
+    return True
+
+
+def _parse_cell(text: str):
+    """CSV cells without a known schema are read as JSON values, falling back to plain strings."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _coerce_cell(schema, text: str):
+    if isinstance(schema, dict) and _has_type(schema, "Enum"):
+        schema = schema.get("valueSchema")
+    if not isinstance(schema, str):
+        return _parse_cell(text)
+    if schema in INTEGER_SCHEMAS:
+        return int(text)
+    if schema in NUMBER_SCHEMAS:
+        return float(text)
+    if schema == "boolean":
+        lowered = text.strip().lower()
+        if lowered not in ("true", "false"):
+            raise ValueError("'{}' is not a boolean".format(text))
+        return lowered == "true"
+    if schema in STRING_SCHEMAS:
+        return text
+    return _parse_cell(text)
+
+
+def _set_path(target: dict, path: List[str], value):
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+        if not isinstance(target, dict):
+            raise ValueError("Column '{}' conflicts with another column".format(".".join(path)))
+    target[path[-1]] = value
+
+
+class ImportFileBuilder(object):
+    def __init__(
+        self,
+        models: Optional[List[dict]] = None,
+        validate: bool = True,
+        failure_log: Optional[str] = None,
+        chunk_size: int = ADT_IMPORT_CHUNK_ROWS,
+        author: Optional[str] = None,
+        organization: Optional[str] = None,
+    ):
+        self.models = models or []
+        self.index = ModelIndex(self.models) if self.models and validate else None
+        self.failure_log = failure_log
+        self.chunk_size = chunk_size
+        self.header = {"fileVersion": ADT_IMPORT_FILE_VERSION}
+        if author:
+            self.header["author"] = author
+        if organization:
+            self.header["organization"] = organization
+        self._log_lock = Lock()
+
+        if failure_log:
+            try:
+                open(failure_log, mode="w", encoding="utf8").close()
+            except (OSError, IOError) as e:
+                raise FileOperationError("Unable to write failure log {}. {}".format(failure_log, e))
+
+    def build(
+        self,
+        output: str,
+        twin_sources: Optional[Iterable[str]] = None,
+        relationship_sources: Optional[Iterable[str]] = None,
+    ) -> dict:
+        start = monotonic()
+        twins = BulkProgress("twin", action="Wrote")
+        relationships = BulkProgress("relationship", action="Wrote")
+        try:
+            with open(output, mode="w", encoding="utf8", newline="\n") as stream:
+                writer = ChunkedWriter(stream, self.chunk_size)
+                writer.write({"Section": "Header"})
+                writer.write(self.header)
+                if self.models:
+                    writer.write({"Section": "Models"})
+                    graph = self.index.graph if self.index else ModelDependencyGraph(self.models)
+                    for model_id in graph.topological_order():
+                        writer.write(graph.models[model_id])
+                if twin_sources:
+                    writer.write({"Section": "Twins"})
+                    self._write_rows(writer, twin_sources, self.convert_twin, twins)
+                if relationship_sources:
+                    writer.write({"Section": "Relationships"})
+                    self._write_rows(writer, relationship_sources, self.convert_relationship, relationships)
+                writer.flush()
+        except (OSError, IOError) as e:
+            raise FileOperationError("Unable to write import data file {}. {}".format(output, e))
+
+        duration = max(monotonic() - start, 1e-6)
+        rows = twins.succeeded + relationships.succeeded
+        result = {
+            "dataFile": output,
+            "models": len(self.models),
+            "twins": {"written": twins.succeeded, "invalid": twins.failed},
+            "relationships": {"written": relationships.succeeded, "invalid": relationships.failed},
+            "rowsPerSecond": round(rows / duration, 2),
+            "durationSeconds": round(duration, 3),
+        }
+        if self.failure_log:
+            result["failureLog"] = self.failure_log
+        return result
+
+    def _write_rows(self, writer: "ChunkedWriter", sources: Iterable[str], convert, progress: BulkProgress):
+        for source in sources:
+            for line, row in read_rows(source):
+                try:
+                    entry = convert(_check_row(row))
+                except ValueError as e:
+                    self._record_failure(source, line, e)
+                    progress.add(False)
+                    continue
+                writer.write(entry)
+                progress.add(True)
+        progress.report()
+
+    def convert_twin(self, row) -> dict:
+        """Convert a CSV row (dict of strings) or a JSON lines entry into a validated import twin."""
+        if isinstance(row, dict) and not isinstance(row, _CsvRow):
+            twin = row
+            metadata = twin.get(METADATA)
+            if MODEL in twin and not metadata:
+                # $model shorthand of JSON lines sources
+                twin = dict(twin)
+                twin[METADATA] = {MODEL: twin.pop(MODEL)}
+        else:
+            twin = self._twin_from_csv(row)
+
+        twin_id = twin.get(TWIN_ID)
+        if not twin_id or not isinstance(twin_id, str):
+            raise ValueError("Twin is missing {}".format(TWIN_ID))
+        metadata = twin.get(METADATA)
+        model_id = metadata.get(MODEL) if isinstance(metadata, dict) else None
+        if not model_id or not isinstance(model_id, str):
+            raise ValueError("Twin '{}' is missing {}.{}".format(twin_id, METADATA, MODEL))
+        if self.index:
+            self._validate_twin(twin_id, model_id, twin)
+        return twin
+
+    def convert_relationship(self, row) -> dict:
+        if isinstance(row, _CsvRow):
+            relationship = {}
+            for column, text in row.items():
+                if column is None or text is None or text == "":
+                    continue
+                if column.startswith("$"):
+                    relationship[column] = text
+                else:
+                    _set_path(relationship, column.split("."), _parse_cell(text))
+        else:
+            relationship = dict(row)
+
+        if SOURCE_ID in relationship and TWIN_ID not in relationship:
+            relationship[TWIN_ID] = relationship.pop(SOURCE_ID)
+        for key in (TWIN_ID, TARGET_ID, RELATIONSHIP_NAME):
+            if not relationship.get(key) or not isinstance(relationship[key], str):
+                raise ValueError("Relationship is missing {}".format(key))
+        if not relationship.get(RELATIONSHIP_ID):
+            # deterministic id, so that rebuilding the file yields the same relationships
+            relationship[RELATIONSHIP_ID] = "{}-{}".format(relationship[RELATIONSHIP_NAME], relationship[TARGET_ID])
+        if self.index and relationship[RELATIONSHIP_NAME] not in self.index.relationship_names:
+            raise ValueError(
+                "Relationship '{}' is not defined by any model".format(relationship[RELATIONSHIP_NAME])
+            )
+        return relationship
+
+    def _twin_from_csv(self, row: dict) -> dict:
+        model_id = row.get(MODEL) or row.get("{}.{}".format(METADATA, MODEL))
+        contents = self.index.get(model_id) if self.index and model_id else None
+        twin = {METADATA: {MODEL: model_id}}
+        for column, text in row.items():
+            if column is None or text is None or text == "":
+                continue
+            if column == TWIN_ID:
+                twin[TWIN_ID] = text
+                continue
+            if column.startswith("$"):
+                continue
+            path = column.split(".")
+            value = _coerce_cell(self._column_schema(contents, path), text)
+            if contents and path[0] in contents.components:
+                twin.setdefault(path[0], {METADATA: {}})
+            _set_path(twin, path, value)
+        return twin
+
+    def _column_schema(self, contents: Optional[InterfaceContents], path: List[str]):
+        if not contents:
+            return None
+        if path[0] in contents.components and len(path) > 1:
+            contents = self.index.resolve(contents.components[path[0]])
+            path = path[1:]
+            if not contents:
+                return None
+        schema = contents.properties.get(path[0])
+        for key in path[1:]:
+            if not isinstance(schema, dict) or not _has_type(schema, "Object"):
+                return None
+            schema = {field.get("name"): field.get("schema") for field in schema.get("fields", [])}.get(key)
+        return schema
+
+    def _validate_twin(self, twin_id: str, model_id: str, twin: dict):
+        contents = self.index.get(model_id)
+        if contents is None:
+            raise ValueError("Twin '{}' uses model '{}' which was not loaded".format(twin_id, model_id))
+        self._validate_contents(twin_id, contents, twin, allow_components=True)
+
+    def _validate_contents(self, twin_id: str, contents: InterfaceContents, values: dict, allow_components: bool):
+        for name, value in values.items():
+            if name.startswith("$"):
+                continue
+            if name in contents.properties:
+                if not matches_schema(contents.properties[name], value):
+                    raise ValueError("Twin '{}' property '{}' does not match its schema".format(twin_id, name))
+            elif allow_components and name in contents.components:
+                component = self.index.resolve(contents.components[name])
+                if not isinstance(value, dict):
+                    raise ValueError("Twin '{}' component '{}' must be an object".format(twin_id, name))
+                if component:
+                    self._validate_contents(twin_id, component, value, allow_components=False)
+            else:
+                raise ValueError("Twin '{}' property '{}' is not defined by its model".format(twin_id, name))
+
+    def _record_failure(self, source: str, line: int, error: Exception):
+        entry = {"source": source, "line": line, "error": str(error)}
+        if not self.failure_log:
+            logger.warning("Skipping invalid row %s:%s. %s", source, line, error)
+            return
+        with self._log_lock:
+            try:
+                with open(self.failure_log, mode="a", encoding="utf8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except (OSError, IOError) as e:
+                logger.warning("Unable to write to failure log %s. %s", self.failure_log, e)
+
+
+class _CsvRow(dict):
+    """Marks rows whose values are CSV strings that still have to be converted."""
+
+
+class ChunkedWriter(object):
+    """Buffers NDJSON lines and writes them to the stream chunk_size lines at a time."""
+
+    def __init__(self, stream, chunk_size: int = ADT_IMPORT_CHUNK_ROWS):
+        self.stream = stream
+        self.chunk_size = max(chunk_size, 1)
+        self.lines = 0
+        self._buffer: List[str] = []
+
+    def write(self, entry: dict):
+        self._buffer.append(json.dumps(entry, separators=(",", ":")))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self.stream.write("\n".join(self._buffer) + "\n")
+        self.lines += len(self._buffer)
+        self._buffer = []
+
+
+def read_rows(source: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line number, row) of a .csv file or a JSON lines file. CSV rows are yielded as _CsvRow dicts
+    of string values and JSON lines as dicts. Lines that are not valid JSON objects are yielded as
+    _InvalidRow instances carrying the error, so that they can be reported without stopping the build.
+    """
+    try:
+        if source.lower().endswith(".csv"):
+            with open(source, mode="r", encoding="utf-8-sig", newline="") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    yield reader.line_num, _CsvRow(row)
+            return
+
+        with open(source, mode="r", encoding="utf-8-sig") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, _InvalidRow("Invalid JSON. {}".format(e))
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, _InvalidRow("Row must be a JSON object")
+                    continue
+                yield line_number, row
+    except (OSError, IOError) as e:
+        raise FileOperationError("Unable to read source file {}. {}".format(source, e))
+
+
+class _InvalidRow(object):
+    """A source line that could not be read as a row, with the reason in error."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def _check_row(row):
+    if isinstance(row, _InvalidRow):
+        raise ValueError(row.error)
+    return row
+
+
+def load_models(models: Optional[str] = None, from_directory: Optional[str] = None) -> List[dict]:
+    """Models given inline, as a file path or as a directory of model files. --models wins."""
+    from azext_iot.common.utility import process_json_arg
+    from azext_iot.digitaltwins.providers.model import process_model_directory
+
+    if models:
+        payload = process_json_arg(content=models, argument_name="models")
+    elif from_directory:
+        payload = process_model_directory(from_directory)
+    else:
+        return []
+
+    result = []
+    for entry in payload if isinstance(payload, list) else [payload]:
+        # model files may hold a single model or a list of models
+        result.extend(entry if isinstance(entry, list) else [entry])
+    for model in result:
+        if not isinstance(model, dict) or "@id" not in model:
+            raise InvalidArgumentValueError("Every model must be a JSON object with an @id.")
+    return result
@@ -5,11 +5,19 @@
 # --------------------------------------------------------------------------------------------
 
 import json
+import sys
+from time import monotonic
 from knack.log import get_logger
 from azure.cli.core.azclierror import ForbiddenError, RequiredArgumentMissingError, InvalidArgumentValueError
 from azext_iot.common.utility import process_json_arg, handle_service_exception, scantree
-from azext_iot.digitaltwins.common import ADTModelCreateFailurePolicy
+from azext_iot.digitaltwins.common import (
+    ADT_BULK_MAX_WORKERS,
+    ADT_MODEL_UPLOAD_MAX_WORKERS,
+    ADTModelCreateFailurePolicy,
+)
 from azext_iot.digitaltwins.providers.base import DigitalTwinsProvider
+from azext_iot.digitaltwins.providers.generic import AdaptiveBackoff, BulkProgress
+from azext_iot.digitaltwins.providers.model_graph import ModelDependencyGraph
 from azext_iot.sdk.digitaltwins.dataplane.models import ErrorResponseException
 from tqdm import tqdm
 
@@ -20,7 +28,12 @@ MAX_MODELS_PER_BATCH = 35
 
 
 def get_model_dependencies(model, model_id_to_model_map=None):
-    """Return a list of dependency DTMIs for a given model"""
+    """
+    Return a list of dependency DTMIs for a given model.
+
+    Passing model_id_to_model_map re-walks the transitive dependencies on every call, use
+    ModelDependencyGraph to resolve the dependencies of many models.
+    """
     dependencies = []
 
     # Add everything that would have dependency DTMIs, worry about flattening later
@@ -63,6 +76,28 @@ def get_model_dependencies(model, model_id_to_model_map=None):
     return list(no_dup)
 
 
+def process_model_directory(from_directory):
+    """Parse every .json or .dtdl model file of a directory, recursively."""
+    logger.debug(
+        "Documents contained in directory: {}, processing...".format(from_directory)
+    )
+    payload = []
+    for entry in scantree(from_directory):
+        if all(
+            [not entry.name.endswith(".json"), not entry.name.endswith(".dtdl")]
+        ):
+            logger.debug(
+                "Skipping {} - model file must end with .json or .dtdl".format(
+                    entry.path
+                )
+            )
+            continue
+        entry_json = process_json_arg(content=entry.path, argument_name=entry.name)
+        payload.append(entry_json)
+
+    return payload
+
+
 class ModelProvider(DigitalTwinsProvider):
     def __init__(self, cmd, name, rg=None):
         super(ModelProvider, self).__init__(
@@ -70,9 +105,17 @@ class ModelProvider(DigitalTwinsProvider):
         )
         self.model_sdk = self.get_sdk().digital_twin_models
 
-    def add(self, models=None, from_directory=None, failure_policy=ADTModelCreateFailurePolicy.ROLLBACK.value):
+    def add(
+        self,
+        models=None,
+        from_directory=None,
+        failure_policy=ADTModelCreateFailurePolicy.ROLLBACK.value,
+        max_workers=None,
+    ):
         if not any([models, from_directory]):
             raise RequiredArgumentMissingError("Provide either --models or --from-directory.")
+        if max_workers is not None and max_workers < 1:
+            raise InvalidArgumentValueError("--max-workers must be greater than 0.")
 
         # If both arguments are provided. --models wins.
         payload = []
@@ -93,42 +136,11 @@ class ModelProvider(DigitalTwinsProvider):
         try:
             # Process models in batches if models to process exceed the API limit
             if len(payload) > MAX_MODELS_API_LIMIT:
-
-                model_id_to_model_map = {}
-                for model_def in payload:
-                    model_id_to_model_map[model_def['@id']] = model_def
-
-                # Create a dictionary to categorize models by their number of dependencies
-                dep_count_to_models_map = {}
-                for model in payload:
-                    num_dependencies = len(get_model_dependencies(model, model_id_to_model_map))
-                    if num_dependencies not in dep_count_to_models_map:
-                        dep_count_to_models_map[num_dependencies] = []
-                    dep_count_to_models_map[num_dependencies].append(model)
-
-                # Sort by dependency count
-                dep_count_to_models_tuples = sorted(dep_count_to_models_map.items())
-                models_batch = []
-                response = []
+                graph = ModelDependencyGraph(payload)
                 pbar = tqdm(total=len(payload), desc='Creating models...', ascii=' #')
-                # The tuples being iterated are sorted by dependency count, hence models with 0 dependencies go first,
-                # followed by models with 1 dependency, then 2 dependencies and so on... This ensures that all dependencies
-                # of each model being added were either already added in a previous iteration or are in the current payload.
-                for _, models_list in dep_count_to_models_tuples:
-                    while len(models_batch) + len(models_list) > MAX_MODELS_PER_BATCH:
-                        num_models_to_add = MAX_MODELS_PER_BATCH - len(models_batch)
-                        models_batch.extend(models_list[0:num_models_to_add])
-                        response.extend(self.model_sdk.add(models_batch, raw=True).response.json())
-                        models_created.extend([model['@id'] for model in models_batch])
-                        pbar.update(len(models_batch))
-                        # Remove the model ids which have been processed
-                        models_list = models_list[num_models_to_add:]
-                        models_batch = []
-                    models_batch.extend(models_list)
-                # Process the last set of model ids
-                if len(models_batch) > 0:
-                    pbar.update(len(models_batch))
-                    response.extend(self.model_sdk.add(models_batch, raw=True).response.json())
+                # Batches follow the topological order of the models, hence the dependencies of each model
+                # being added were either already added in a previous batch or are in the current batch.
+                response = self._add_batches(graph, models_created, pbar, max_workers=max_workers)
                 pbar.close()
                 return response
             return self.model_sdk.add(payload, raw=True).response.json()
@@ -162,25 +174,55 @@ class ModelProvider(DigitalTwinsProvider):
                 raise ForbiddenError(error_text)
             handle_service_exception(e)
 
-    def _process_directory(self, from_directory):
-        logger.debug(
-            "Documents contained in directory: {}, processing...".format(from_directory)
-        )
-        payload = []
-        for entry in scantree(from_directory):
-            if all(
-                [not entry.name.endswith(".json"), not entry.name.endswith(".dtdl")]
-            ):
-                logger.debug(
-                    "Skipping {} - model file must end with .json or .dtdl".format(
-                        entry.path
-                    )
-                )
-                continue
-            entry_json = process_json_arg(content=entry.path, argument_name=entry.name)
-            payload.append(entry_json)
+    def _add_batches(self, graph: ModelDependencyGraph, models_created: list, pbar, max_workers=None) -> list:
+        """
+        Upload the models of the graph in batches of MAX_MODELS_PER_BATCH. A batch is started once every
+        batch holding its dependencies has been created, with up to max_workers batches in flight.
+        Successfully created model ids are appended to models_created in creation order.
+        """
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        batches = graph.batches(MAX_MODELS_PER_BATCH)
+        prerequisites = graph.batch_prerequisites(batches)
+        max_workers = max_workers or ADT_MODEL_UPLOAD_MAX_WORKERS
+        responses = [[] for _ in batches]
+        waiting = list(range(len(batches)))
+        completed = set()
+        in_flight = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while waiting or in_flight:
+                ready = [index for index in waiting if prerequisites[index] <= completed]
+                for index in ready[:max_workers - len(in_flight)]:
+                    waiting.remove(index)
+                    models_batch = [graph.models[model_id] for model_id in batches[index]]
+                    future = executor.submit(lambda batch: self.model_sdk.add(batch, raw=True).response.json(), models_batch)
+                    in_flight[future] = index
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = in_flight.pop(future)
+                    try:
+                        responses[index] = future.result()
+                    except ErrorResponseException as e:
+                        error = error or e
+                        continue
+                    completed.add(index)
+                    models_created.extend(batches[index])
+                    pbar.update(len(batches[index]))
+                if error:
+                    # stop scheduling, let in flight batches finish so they can be rolled back
+                    waiting = []
+
+        if error:
+            raise error
+        return [item for response in responses for item in response]
 
-        return payload
+    def _process_directory(self, from_directory):
+        return process_model_directory(from_directory)
 
     def get(self, id, get_definition=False):
         try:
@@ -222,7 +264,10 @@ class ModelProvider(DigitalTwinsProvider):
         except ErrorResponseException as e:
             handle_service_exception(e)
 
-    def delete_all(self):
+    def delete_all(self, max_workers=None):
+        if max_workers is not None and max_workers < 1:
+            raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+
         # Get all models
         incoming_pager = self.list(get_definition=True)
         incoming_result = []
@@ -234,31 +279,47 @@ class ModelProvider(DigitalTwinsProvider):
         except ErrorResponseException as e:
             handle_service_exception(e)
 
-        # Build dict of model_id : set of parent_ids
-        parsed_models = {model.id: set() for model in incoming_result}
-        for model in incoming_result:
-            # Parse dependents, add current model as parent of dependents
-            dependencies = get_model_dependencies(model.model)
-            for d_id in dependencies:
-                parsed_models[d_id].add(model.id)
-
-        def delete_parents(model_id, model_dict):
-            # Check if current model has been deleted already
-            if model_id not in model_dict:
-                return
-
-            # Delete parents first
-            for parent_id in model_dict[model_id]:
-                if parent_id in model_dict:
-                    delete_parents(parent_id, model_dict)
-
-            # Delete current model and remove references
-            del model_dict[model_id]
+        graph = ModelDependencyGraph(
+            {**(model.model or {}), "@id": model.id} for model in incoming_result
+        )
+        self._delete_layers(graph, max_workers=max_workers)
+
+    def _delete_layers(self, graph: ModelDependencyGraph, max_workers=None) -> BulkProgress:
+        """
+        Delete the models of the graph in reverse topological layers. Models of a layer do not depend on
+        each other and all of their dependents were deleted with earlier layers, so every layer is
+        deleted concurrently. Throttled requests back off for all workers.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        layers = list(reversed(graph.layers()))
+        backoff = AdaptiveBackoff()
+        progress = BulkProgress("model")
+
+        def _delete(model_id: str):
             try:
-                self.delete(model_id)
-            except Exception as e:
-                logger.warning(f"Could not delete model {model_id}; error is {e}")
+                backoff.call(self.model_sdk.delete, id=model_id)
+            except Exception as e:  # pylint: disable=broad-except
+                # already deleted models count as deleted
+                if getattr(getattr(e, "response", None), "status_code", None) != 404:
+                    logger.warning(f"Could not delete model {model_id}; error is {e}")
+                    progress.add(False)
+                    return False
+            progress.add(True)
+            return True
+
+        with ThreadPoolExecutor(max_workers=max_workers or ADT_BULK_MAX_WORKERS) as executor:
+            for index, layer in enumerate(layers):
+                start = monotonic()
+                results = list(executor.map(_delete, layer))
+                print(
+                    "Layer {}/{}: deleted {} model(s), {} failed in {:.2f}s.".format(
+                        index + 1, len(layers), results.count(True), results.count(False), monotonic() - start
+                    ),
+                    file=sys.stderr,
+                    flush=True,
+                )
 
-        while len(parsed_models) > 0:
-            model_id = next(iter(parsed_models))
-            delete_parents(model_id, parsed_models)
+        if layers:
+            progress.report()
+        return progress
@@ -0,0 +1,99 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Dependency graph of a set of DTDL models.
+
+Each model is parsed once for its direct dependencies (extends and component schemas, including
+those of inline models) and the models are ordered into topological layers with Kahn's algorithm.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Set
+from azure.cli.core.azclierror import InvalidArgumentValueError
+
+
+class ModelDependencyGraph(object):
+    def __init__(self, models: Iterable[dict]):
+        from azext_iot.digitaltwins.providers.model import get_model_dependencies
+
+        self.models: Dict[str, dict] = {}
+        for model in models:
+            self.models[model["@id"]] = model
+
+        # direct dependencies, including references to models outside of the set
+        self.dependencies: Dict[str, FrozenSet[str]] = {
+            model_id: frozenset(get_model_dependencies(model)) for model_id, model in self.models.items()
+        }
+        self.dependents: Dict[str, Set[str]] = {model_id: set() for model_id in self.models}
+        for model_id, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                if dependency in self.dependents:
+                    self.dependents[dependency].add(model_id)
+
+        self._layers = None
+
+    def __len__(self):
+        return len(self.models)
+
+    def layers(self) -> List[List[str]]:
+        """
+        Kahn-style topological layering. Models of a layer only depend on models of earlier
+        layers (or on models outside of the set), and keep their input order within a layer.
+        """
+        if self._layers is not None:
+            return self._layers
+
+        in_degree = {
+            model_id: sum(1 for dependency in dependencies if dependency in self.models)
+            for model_id, dependencies in self.dependencies.items()
+        }
+        order = {model_id: index for index, model_id in enumerate(self.models)}
+        layer = [model_id for model_id, degree in in_degree.items() if degree == 0]
+        layers = []
+        placed = 0
+        while layer:
+            layers.append(layer)
+            placed += len(layer)
+            next_layer = []
+            for model_id in layer:
+                for dependent in self.dependents[model_id]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_layer.append(dependent)
+            layer = sorted(next_layer, key=order.get)
+
+        if placed != len(self.models):
+            cyclic = sorted(model_id for model_id, degree in in_degree.items() if degree > 0)
+            raise InvalidArgumentValueError(
+                "Circular model dependency detected between models: {}.".format(", ".join(cyclic))
+            )
+        self._layers = layers
+        return layers
+
+    def topological_order(self) -> List[str]:
+        return [model_id for layer in self.layers() for model_id in layer]
+
+    def batches(self, max_size: int) -> List[List[str]]:
+        """
+        Split the topological order into batches of up to max_size models. The dependencies of
+        every model are in the same or an earlier batch.
+        """
+        order = self.topological_order()
+        return [order[index:index + max_size] for index in range(0, len(order), max_size)]
+
+    def batch_prerequisites(self, batches: List[List[str]]) -> List[Set[int]]:
+        """For each batch, the indexes of the earlier batches holding its direct dependencies."""
+        batch_of = {model_id: index for index, batch in enumerate(batches) for model_id in batch}
+        prerequisites = []
+        for index, batch in enumerate(batches):
+            required = set()
+            for model_id in batch:
+                for dependency in self.dependencies[model_id]:
+                    dependency_batch = batch_of.get(dependency)
+                    if dependency_batch is not None and dependency_batch != index:
+                        required.add(dependency_batch)
+            prerequisites.append(required)
+        return prerequisites
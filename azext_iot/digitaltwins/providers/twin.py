@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 import json
+import sys
 from azure.cli.core.azclierror import InvalidArgumentValueError
 from azext_iot.digitaltwins.providers.base import (
     DigitalTwinsProvider,
@@ -36,9 +37,12 @@ class TwinProvider(DigitalTwinsProvider):
         self.query_sdk = self.get_sdk().query
         self.twins_sdk = self.get_sdk().digital_twins
 
-    def invoke_query(self, query, show_cost):
+    def invoke_query(self, query, show_cost, stream=False):
         from azext_iot.digitaltwins.providers.generic import accumulate_result
 
+        if stream:
+            return self.stream_query(query=query, show_cost=show_cost)
+
         try:
             accumulated_result, cost = accumulate_result(
                 self.query_sdk.query_twins,
@@ -57,6 +61,34 @@ class TwinProvider(DigitalTwinsProvider):
 
         return query_result
 
+    def stream_query(self, query, show_cost=False, output=None):
+        """
+        Write query results as newline-delimited JSON page by page, while the next page is
+        prefetched. Only the current and the prefetched page are held in memory.
+        """
+        from azext_iot.digitaltwins.providers.generic import (
+            QueryPageMeter,
+            iterate_result_pages,
+            prefetch,
+            write_ndjson_pages,
+        )
+
+        meter = QueryPageMeter()
+        pages = iterate_result_pages(
+            self.query_sdk.query_twins,
+            values_name="value",
+            token_name="continuationToken",
+            token_arg_name="continuation_token",
+            query=query,
+        )
+        try:
+            write_ndjson_pages(prefetch(pages), meter=meter, stream=output)
+        except ErrorResponseException as e:
+            handle_service_exception(e)
+
+        if show_cost:
+            print("Total query cost: {}".format(meter.cost), file=sys.stderr, flush=True)
+
     def create(self, twin_id, model_id, if_none_match=False, properties=None):
         twin_request = {
             "$dtId": twin_id,
@@ -114,6 +146,15 @@ class TwinProvider(DigitalTwinsProvider):
         except ErrorResponseException as e:
             handle_service_exception(e)
 
+    def bulk_delete_all(self, only_relationships=False, twin_id=None, max_workers=None, failure_log=None):
+        from azext_iot.digitaltwins.providers.twin_bulk import TwinBulkDeleter
+
+        deleter = TwinBulkDeleter(self, max_workers=max_workers, failure_log=failure_log)
+        try:
+            return deleter.delete_all(only_relationships=only_relationships, twin_id=twin_id)
+        except ErrorResponseException as e:
+            handle_service_exception(e)
+
     def delete_all(self, only_relationships=False):
         # need to get all twins
         query = "select * from digitaltwins"
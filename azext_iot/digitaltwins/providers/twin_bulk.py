@@ -0,0 +1,177 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Bulk teardown of digital twins and relationships.
+
+Relationship edges and twin ids are gathered with queries instead of listing relationships twin by
+twin, then deleted on a bounded worker pool that shares an adaptive back-off on throttled responses.
+Relationships are removed first so that twins can be deleted afterwards.
+"""
+
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+from time import monotonic
+from typing import Callable, Optional, Set
+from knack.log import get_logger
+from azure.cli.core.azclierror import FileOperationError, InvalidArgumentValueError
+from azext_iot.digitaltwins.common import ADT_BULK_MAX_PASSES, ADT_BULK_MAX_WORKERS
+from azext_iot.digitaltwins.providers.base import ErrorResponseException
+from azext_iot.digitaltwins.providers.generic import (
+    AdaptiveBackoff,
+    BulkProgress,
+    iterate_result_pages,
+    prefetch,
+)
+
+logger = get_logger(__name__)
+
+# Upper bound of submitted deletes per worker, the query is paged lazily behind it
+PENDING_PER_WORKER = 4
+
+
+def _quote(value: str) -> str:
+    return "'{}'".format(value.replace("\\", "\\\\").replace("'", "\\'"))
+
+
+class TwinBulkDeleter(object):
+    def __init__(self, twin_provider, max_workers: Optional[int] = None, failure_log: Optional[str] = None):
+        if max_workers is not None and max_workers < 1:
+            raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+
+        from azext_iot.digitaltwins.providers.twin import TwinOptions
+
+        self.twin_provider = twin_provider
+        self.max_workers = max_workers or ADT_BULK_MAX_WORKERS
+        self.failure_log = failure_log
+        self.backoff = AdaptiveBackoff()
+        self._options = TwinOptions(if_match="*")
+        self._log_lock = Lock()
+        # keys of every item submitted for deletion, queries may return deleted items for a while
+        self._attempted: Set[tuple] = set()
+
+        if failure_log:
+            try:
+                # fail fast on an unwritable path, failures are appended as they happen
+                open(failure_log, mode="a", encoding="utf8").close()
+            except (OSError, IOError) as e:
+                raise FileOperationError("Unable to write failure log {}. {}".format(failure_log, e))
+
+    def delete_all(self, only_relationships: bool = False, twin_id: Optional[str] = None) -> dict:
+        start = monotonic()
+        result = {"relationships": self.delete_relationships(twin_id=twin_id).summary()}
+        if not only_relationships:
+            result["twins"] = self.delete_twins().summary()
+        result["throttled"] = self.backoff.throttled
+        result["durationSeconds"] = round(monotonic() - start, 3)
+        if self.failure_log:
+            result["failureLog"] = self.failure_log
+        return result
+
+    def delete_relationships(self, twin_id: Optional[str] = None) -> BulkProgress:
+        query = "SELECT * FROM RELATIONSHIPS R"
+        if twin_id:
+            query += " WHERE R.$sourceId = {0} OR R.$targetId = {0}".format(_quote(twin_id))
+
+        def _delete(relationship: dict):
+            self.backoff.call(
+                self.twin_provider.twins_sdk.delete_relationship,
+                id=relationship["$sourceId"],
+                relationship_id=relationship["$relationshipId"],
+                digital_twins_delete_relationship_options=self._options,
+            )
+
+        return self._run(
+            query=query,
+            progress=BulkProgress("relationship"),
+            key=lambda item: ("relationship", item["$sourceId"], item["$relationshipId"]),
+            delete=_delete,
+        )
+
+    def delete_twins(self) -> BulkProgress:
+        def _delete(twin: dict):
+            self.backoff.call(
+                self.twin_provider.twins_sdk.delete,
+                id=twin["$dtId"],
+                digital_twins_delete_options=self._options,
+            )
+
+        return self._run(
+            query="SELECT T.$dtId FROM DIGITALTWINS T",
+            progress=BulkProgress("twin"),
+            key=lambda item: ("twin", item["$dtId"]),
+            delete=_delete,
+        )
+
+    def _run(self, query: str, progress: BulkProgress, key: Callable, delete: Callable) -> BulkProgress:
+        """
+        Delete every item returned by query. Deleting while paging may shift the continuation
+        chain, so the query is repeated until a pass finds no item that was not already tried.
+        Queries are eventually consistent and may still return deleted items, every item is
+        submitted at most once.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for _ in range(ADT_BULK_MAX_PASSES):
+                found = 0
+                pending = set()
+                pages = iterate_result_pages(
+                    self.twin_provider.query_sdk.query_twins,
+                    values_name="value",
+                    token_name="continuationToken",
+                    token_arg_name="continuation_token",
+                    query=query,
+                )
+                for values, _ in prefetch(pages):
+                    for item in values:
+                        item_key = key(item)
+                        if item_key in self._attempted:
+                            continue
+                        self._attempted.add(item_key)
+                        found += 1
+                        if len(pending) >= self.max_workers * PENDING_PER_WORKER:
+                            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        pending.add(executor.submit(self._delete_item, item, item_key, delete, progress))
+                wait(pending)
+                if not found:
+                    break
+
+        progress.report()
+        return progress
+
+    def _delete_item(self, item: dict, item_key: tuple, delete: Callable, progress: BulkProgress):
+        try:
+            delete(item)
+        except ErrorResponseException as e:
+            if getattr(e.response, "status_code", None) == 404:
+                # deleted by someone else in the meantime
+                progress.add(False, missing=True)
+                return
+            self._record_failure(item_key, e)
+            progress.add(False)
+            return
+        except Exception as e:  # pylint: disable=broad-except
+            self._record_failure(item_key, e)
+            progress.add(False)
+            return
+        progress.add(True)
+
+    def _record_failure(self, item_key: tuple, error: Exception):
+        if item_key[0] == "relationship":
+            entry = {"type": "relationship", "twinId": item_key[1], "relationshipId": item_key[2]}
+        else:
+            entry = {"type": "twin", "twinId": item_key[1]}
+        entry["error"] = str(error)
+
+        if not self.failure_log:
+            logger.warning("Could not delete %s. The error is %s", item_key[0], entry)
+            return
+        with self._log_lock:
+            try:
+                with open(self.failure_log, mode="a", encoding="utf8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except (OSError, IOError) as e:
+                logger.warning("Unable to write to failure log %s. %s", self.failure_log, e)
@@ -57,3 +57,21 @@ def load_deviceprovisioningservice_help():
             the certificate file is the registration id.
           text: az iot device registration create --id-scope {id_scope} --rid {registration_id} --cp {certificate_file} --kp {key_file}
     """
+
+    helps["iot device registration create-fleet"] = """
+        type: command
+        short-summary: Register a fleet of IoT devices with the IoT Device Provisioning Service and summarize
+          the results.
+        long-summary: |
+          Registrations use symmetric key attestation and run concurrently. Discovery and the enrollment group
+          key lookup happen once, device keys are derived locally from the group key.
+          The summary holds the registration latency percentiles, the number of devices assigned to each hub
+          and the failures grouped by reason.
+        examples:
+        - name: Register 1000 devices of an enrollment group.
+          text: az iot device registration create-fleet -n {dps_name} --gid {group_enrollment_id} --rip sim- --count 1000
+        - name: Register the devices listed in a file with the given enrollment group symmetric key and the
+            Device Provisioning Service ID Scope, with at most 20 registrations in flight.
+          text: az iot device registration create-fleet --id-scope {id_scope} --rif {registration_id_file} --key {symmetric_key} --ck
+            --mif 20
+    """
@@ -24,3 +24,4 @@ def load_dps_commands(self, _):
         is_preview=True
     ) as cmd_group:
         cmd_group.command("create", "create_device_registration")
+        cmd_group.command("create-fleet", "create_device_registration_fleet", is_experimental=True)
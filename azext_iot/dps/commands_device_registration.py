@@ -7,7 +7,7 @@
 
 from knack.log import get_logger
 
-from azext_iot.constants import IOTDPS_PROVISIONING_HOST
+from azext_iot.constants import DPS_FLEET_MAX_IN_FLIGHT, IOTDPS_PROVISIONING_HOST
 from azext_iot.dps.providers.device_registration import DeviceRegistrationProvider
 
 logger = get_logger(__name__)
@@ -49,3 +49,43 @@ def create_device_registration(
         payload=payload,
         provisioning_host=provisioning_host
     )
+
+
+def create_device_registration_fleet(
+    cmd,
+    registration_id_file: str = None,
+    registration_id_prefix: str = None,
+    count: int = None,
+    enrollment_group_id: str = None,
+    device_symmetric_key: str = None,
+    compute_key: bool = False,
+    payload: str = None,
+    max_in_flight: int = DPS_FLEET_MAX_IN_FLIGHT,
+    id_scope: str = None,
+    dps_name: str = None,
+    resource_group_name: str = None,
+    login: str = None,
+    auth_type_dataplane: str = None,
+    provisioning_host: str = IOTDPS_PROVISIONING_HOST,
+):
+    from azext_iot.dps.providers.fleet_registration import FleetRegistrationProvider
+
+    fleet_provider = FleetRegistrationProvider(
+        cmd=cmd,
+        id_scope=id_scope,
+        dps_name=dps_name,
+        resource_group_name=resource_group_name,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+    return fleet_provider.create_fleet(
+        registration_id_file=registration_id_file,
+        registration_id_prefix=registration_id_prefix,
+        count=count,
+        enrollment_group_id=enrollment_group_id,
+        device_symmetric_key=device_symmetric_key,
+        compute_key=compute_key,
+        payload=payload,
+        provisioning_host=provisioning_host,
+        max_in_flight=max_in_flight,
+    )
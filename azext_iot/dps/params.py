@@ -93,3 +93,28 @@ def load_dps_arguments(self, _):
             help="Passphrase for the certificate.",
             arg_group=CERT_AUTH
         )
+
+    with self.argument_context("iot device registration create-fleet") as context:
+        context.argument(
+            "registration_id_file",
+            options_list=["--registration-id-file", "--rif"],
+            help="Path to a file listing the registrations, one per line as `registrationId` or "
+            "`registrationId,symmetricKey`. Missing keys are derived from the enrollment group key.",
+        )
+        context.argument(
+            "registration_id_prefix",
+            options_list=["--registration-id-prefix", "--rip"],
+            help="Registration id prefix used with --count.",
+        )
+        context.argument(
+            "count",
+            options_list=["--count"],
+            type=int,
+            help="Number of devices to register with the ids {registration-id-prefix}{0..count-1}.",
+        )
+        context.argument(
+            "max_in_flight",
+            options_list=["--max-in-flight", "--mif"],
+            type=int,
+            help="Maximum number of registrations in flight.",
+        )
@@ -55,14 +55,18 @@ class DeviceRegistrationProvider():
         self.id_scope = id_scope or self._get_idscope()
         self.registration_id = registration_id
 
-    def _get_idscope(self) -> str:
+    def _get_target(self) -> dict:
         discovery = DPSDiscovery(self.cmd)
-        target = discovery.get_target(
+        return discovery.get_target(
             self.dps_name,
             self.resource_group_name,
             login=self.login,
             auth_type=self.auth_type_dataplane,
         )
+
+    def _get_idscope(self) -> str:
+        discovery = DPSDiscovery(self.cmd)
+        target = self._get_target()
         if target.get("idscope"):
             return target["idscope"]
         # If cstring is used, will need to retrieve the id scope manually
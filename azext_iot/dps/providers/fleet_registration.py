@@ -0,0 +1,277 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Provisioning of many devices against a Device Provisioning Service.
+
+Discovery and the enrollment group key lookup happen once for the whole fleet, device keys are
+derived locally and registrations run on a single asyncio event loop with bounded concurrency.
+Registrars only need an async `register(registration_id, symmetric_key)`, so tests can swap the
+device SDK for a stand-in.
+"""
+
+import asyncio
+from collections import Counter
+from time import monotonic
+from typing import Dict, List, Optional
+from knack.log import get_logger
+from azure.cli.core.azclierror import (
+    FileOperationError,
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    RequiredArgumentMissingError,
+)
+from azext_iot.common.utility import compute_device_keys, compute_percentiles, read_file_content
+from azext_iot.constants import DPS_FLEET_MAX_IN_FLIGHT, IOTDPS_PROVISIONING_HOST
+from azext_iot.dps.common import (
+    COMPUTE_KEY_ERROR,
+    DISABLED_REGISTRATION_ERROR,
+    FAILED_REGISTRATION_ERROR,
+    UNAUTHORIZED_ERROR,
+)
+from azext_iot.dps.providers.device_registration import DeviceRegistrationProvider
+from azext_iot.operations.dps import _get_enrollment_group_symmetric_key
+
+logger = get_logger(__name__)
+
+# Registration ids kept per failure reason in the summary
+FAILURE_SAMPLE_SIZE = 5
+
+
+class FleetRegistrationProvider(DeviceRegistrationProvider):
+    def __init__(
+        self,
+        cmd,
+        id_scope: Optional[str] = None,
+        dps_name: Optional[str] = None,
+        resource_group_name: Optional[str] = None,
+        login: Optional[str] = None,
+        auth_type_dataplane: Optional[str] = None,
+    ):
+        super(FleetRegistrationProvider, self).__init__(
+            cmd=cmd,
+            registration_id=None,
+            id_scope=id_scope,
+            dps_name=dps_name,
+            resource_group_name=resource_group_name,
+            login=login,
+            auth_type_dataplane=auth_type_dataplane,
+        )
+
+    def create_fleet(
+        self,
+        registration_id_file: Optional[str] = None,
+        registration_id_prefix: Optional[str] = None,
+        count: Optional[int] = None,
+        enrollment_group_id: Optional[str] = None,
+        device_symmetric_key: Optional[str] = None,
+        compute_key: bool = False,
+        payload: Optional[str] = None,
+        provisioning_host: str = IOTDPS_PROVISIONING_HOST,
+        max_in_flight: int = DPS_FLEET_MAX_IN_FLIGHT,
+    ) -> dict:
+        if registration_id_file and (registration_id_prefix or count):
+            raise MutuallyExclusiveArgumentError(
+                "Provide either --registration-id-file or --registration-id-prefix with --count, not both."
+            )
+        if not registration_id_file and not (registration_id_prefix and count):
+            raise RequiredArgumentMissingError(
+                "Provide --registration-id-file or --registration-id-prefix with --count to select the fleet."
+            )
+        if count is not None and count < 1:
+            raise InvalidArgumentValueError("count must be at least 1")
+        if max_in_flight < 1:
+            raise InvalidArgumentValueError("max in flight must be at least 1")
+        if compute_key and not (enrollment_group_id or device_symmetric_key):
+            raise RequiredArgumentMissingError(COMPUTE_KEY_ERROR)
+
+        registrations = (
+            _read_registration_id_file(registration_id_file)
+            if registration_id_file
+            else {"{}{}".format(registration_id_prefix, i): None for i in range(count)}
+        )
+        self._fill_device_keys(registrations, enrollment_group_id, device_symmetric_key, compute_key)
+
+        registrar = ProvisioningRegistrar(
+            provisioning_host=provisioning_host, id_scope=self.id_scope, payload=payload
+        )
+        return FleetRegistration(registrar=registrar, registrations=registrations, max_in_flight=max_in_flight).run()
+
+    def _fill_device_keys(
+        self,
+        registrations: Dict[str, Optional[str]],
+        enrollment_group_id: Optional[str] = None,
+        device_symmetric_key: Optional[str] = None,
+        compute_key: bool = False,
+    ):
+        """
+        Resolve the key of every registration. Keys listed in the registration id file are used as is,
+        the others are derived from the group key, which is looked up at most once.
+        """
+        missing = [registration_id for registration_id, key in registrations.items() if not key]
+        if device_symmetric_key and compute_key:
+            missing = list(registrations)
+        if not missing:
+            return
+
+        if device_symmetric_key and not compute_key:
+            for registration_id in missing:
+                registrations[registration_id] = device_symmetric_key
+            return
+
+        group_key = device_symmetric_key
+        if not group_key:
+            if not enrollment_group_id:
+                raise RequiredArgumentMissingError(
+                    "Device keys are required for fleet registration. Provide the enrollment group via --group-id, "
+                    "a key via --symmetric-key or list keys in the registration id file."
+                )
+            group_key = _get_enrollment_group_symmetric_key(self._get_target(), enrollment_group_id)
+        registrations.update(compute_device_keys(group_key, missing))
+
+
+def _read_registration_id_file(registration_id_file: str) -> Dict[str, Optional[str]]:
+    """
+    Read registrations from a file with one device per line, as `registrationId` or `registrationId,symmetricKey`.
+    Blank lines and lines starting with # are skipped.
+    """
+    try:
+        content = read_file_content(registration_id_file)
+    except (OSError, IOError) as e:
+        raise FileOperationError("Unable to read registration id file '{}'. {}".format(registration_id_file, e))
+
+    registrations = {}
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        registration_id, _, key = line.partition(",")
+        registrations[registration_id.strip()] = key.strip() or None
+
+    if not registrations:
+        raise InvalidArgumentValueError(
+            "Registration id file '{}' does not list any registrations.".format(registration_id_file)
+        )
+    return registrations
+
+
+def _failure_reason(error: Exception) -> str:
+    from azure.iot.device.exceptions import ClientError
+
+    if isinstance(error, ClientError):
+        cause = str(error.__cause__)
+        if cause == DISABLED_REGISTRATION_ERROR:
+            return "disabled"
+        if cause == FAILED_REGISTRATION_ERROR:
+            return "failed"
+        if cause == UNAUTHORIZED_ERROR:
+            return "unauthorized"
+        if "429" in cause:
+            return "throttled"
+    return type(error).__name__
+
+
+class FleetRegistration(object):
+    def __init__(
+        self,
+        registrar,
+        registrations: Dict[str, str],
+        max_in_flight: int = DPS_FLEET_MAX_IN_FLIGHT,
+    ):
+        self.registrar = registrar
+        self.registrations = registrations
+        self.max_in_flight = max_in_flight
+
+        self.assigned = 0
+        self.latencies: List[float] = []
+        self.assigned_hubs = Counter()
+        self.substatus = Counter()
+        self.failures = Counter()
+        self.failure_samples: Dict[str, List[str]] = {}
+
+    def run(self) -> dict:
+        loop = asyncio.new_event_loop()
+        try:
+            duration = loop.run_until_complete(self._run())
+        finally:
+            loop.close()
+        return self.summary(duration)
+
+    async def _run(self) -> float:
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        start = monotonic()
+        await asyncio.gather(
+            *[self._register(registration_id, key, in_flight) for registration_id, key in self.registrations.items()]
+        )
+        return monotonic() - start
+
+    async def _register(self, registration_id: str, symmetric_key: str, in_flight: asyncio.Semaphore):
+        async with in_flight:
+            start = monotonic()
+            try:
+                result = await self.registrar.register(registration_id, symmetric_key)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("Registration '%s' failed: %s", registration_id, e)
+                self._add_failure(_failure_reason(e), registration_id)
+                return
+            self.latencies.append((monotonic() - start) * 1000)
+
+        state = getattr(result, "registration_state", None)
+        if result.status != "assigned":
+            self._add_failure(result.status or "unknown", registration_id)
+            return
+        self.assigned += 1
+        self.assigned_hubs[getattr(state, "assigned_hub", None) or "unknown"] += 1
+        self.substatus[getattr(state, "sub_status", None) or "unknown"] += 1
+
+    def _add_failure(self, reason: str, registration_id: str):
+        self.failures[reason] += 1
+        samples = self.failure_samples.setdefault(reason, [])
+        if len(samples) < FAILURE_SAMPLE_SIZE:
+            samples.append(registration_id)
+
+    def summary(self, duration: float) -> dict:
+        percentiles = compute_percentiles(self.latencies, [50, 90, 99])
+        return {
+            "registrations": len(self.registrations),
+            "assigned": self.assigned,
+            "failed": sum(self.failures.values()),
+            "durationSeconds": round(duration, 3),
+            "registrationsPerSecond": round(self.assigned / duration, 2) if duration else 0.0,
+            "latencyMs": {
+                "p50": percentiles[50],
+                "p90": percentiles[90],
+                "p99": percentiles[99],
+                "max": round(max(self.latencies), 2) if self.latencies else None,
+            },
+            "assignedHubs": dict(self.assigned_hubs.most_common()),
+            "substatus": dict(self.substatus.most_common()),
+            "failures": {
+                reason: {"count": count, "registrationIds": self.failure_samples[reason]}
+                for reason, count in self.failures.most_common()
+            },
+        }
+
+
+class ProvisioningRegistrar(object):
+    """Registers each device with its own async provisioning client over mqtt."""
+
+    def __init__(self, provisioning_host: str, id_scope: str, payload: Optional[str] = None):
+        self.provisioning_host = provisioning_host
+        self.id_scope = id_scope
+        self.payload = payload
+
+    async def register(self, registration_id: str, symmetric_key: str):
+        from azure.iot.device.aio import ProvisioningDeviceClient
+
+        client = ProvisioningDeviceClient.create_from_symmetric_key(
+            provisioning_host=self.provisioning_host,
+            registration_id=registration_id,
+            id_scope=self.id_scope,
+            symmetric_key=symmetric_key,
+        )
+        client.provisioning_payload = self.payload
+        return await client.register()
@@ -83,6 +83,27 @@ def load_iothub_help():
             az iot hub job list --hub-name {iothub_name} --job-type export --job-status completed
     """
 
+    helps["iot hub job watch"] = """
+        type: command
+        short-summary: Watch the progress of one or more IoT Hub jobs until they finish.
+        long-summary: |
+                      All jobs are polled concurrently. A job that makes no progress is polled less often, doubling
+                      the interval up to --max-poll-interval, and polled every --poll-interval seconds again once its
+                      status or device statistics change.
+                      Each change is written as a line of JSON with the job status, device job statistics, the delta
+                      since the last change and the devices processed per second. When all jobs are completed, failed or
+                      cancelled, or the poll duration is over, a merged summary of all jobs is returned.
+
+        examples:
+        - name: Watch two jobs until they finish.
+          text: >
+            az iot hub job watch --hub-name {iothub_name} --job-ids {job_id_1} {job_id_2}
+        - name: Watch jobs for up to an hour, polling idle jobs at most every two minutes.
+          text: >
+            az iot hub job watch --hub-name {iothub_name} --job-ids {job_id_1} {job_id_2} --poll-duration 3600
+            --max-poll-interval 120
+    """
+
     helps["iot hub job cancel"] = """
         type: command
         short-summary: Cancel an IoT Hub job.
@@ -309,6 +330,26 @@ def load_iothub_help():
           text: az iot device simulate -n {iothub_name} -d {device_id} --rs abandon --protocol http
     """
 
+    helps[
+        "iot device simulate-fleet"
+    ] = """
+        type: command
+        short-summary: |
+                        Simulate a fleet of devices sending device-to-cloud messages to an Azure IoT Hub for load testing.
+                        Devices are multiplexed on a single event loop, each following its own send schedule. When finished,
+                        a summary of sent, failed and throttled (429/QuotaExceeded) messages, achieved throughput and
+                        send latency percentiles is returned.
+                        Note: http messages are signed with the hub shared access policy, which requires DeviceConnect rights.
+                        Devices created with --device-count are not deleted once the simulation completes.
+        examples:
+        - name: Create 500 devices and send 100 messages from each at 2 messages per second (http)
+          text: az iot device simulate-fleet -n {iothub_name} --device-count 500 --device-rate 2
+        - name: Simulate the devices listed in a file with poisson distributed sends, capping the fleet at 1000 messages per second
+          text: az iot device simulate-fleet -n {iothub_name} --device-file devices.txt --schedule poisson --total-rate 1000
+        - name: Send bursts of 20 messages over mqtt
+          text: az iot device simulate-fleet -n {iothub_name} --device-count 50 --protocol mqtt --schedule burst --burst-size 20
+    """
+
     helps[
         "iot device upload-file"
     ] = """
@@ -601,6 +642,36 @@ def load_iothub_help():
               az iot hub message-route test -n {iothub_name} -b {body} --ap {app_properties} --sp {system_properties}
     """
 
+    helps[
+        "iot hub message-route evaluate"
+    ] = """
+        type: command
+        short-summary: Evaluate the routes of an IoT Hub against a corpus of messages locally.
+        long-summary: |
+          Routes are read from the IoT Hub once and their conditions are evaluated locally for every message of the
+          corpus, so large message sets can be tested without a service call per message. The result has the number
+          of matches per route, fallback route hits and messages that no route picked up.
+
+          The corpus has one JSON message per line, for example
+          {"body": "{\\"temp\\": 31}", "appProperties": {"level": "critical"},
+          "systemProperties": {"contentType": "application/json", "contentEncoding": "utf-8"},
+          "twin": {"tags": {"floor": 1}}, "routingSource": "DeviceMessages"}.
+          The json output of `az iot hub monitor-events --props all`, which prints each event across several lines,
+          can be saved and used as a corpus as is. As in the service, message
+          bodies are only queryable when the content type is application/json and the encoding is utf-8, utf-16
+          or utf-32.
+        examples:
+          - name: Evaluate all routes of an IoT Hub against a message corpus.
+            text: >
+              az iot hub message-route evaluate -n {iothub_name} --corpus {corpus_file}
+          - name: Evaluate the routes of source type "DeviceMessages" against a message corpus.
+            text: >
+              az iot hub message-route evaluate -n {iothub_name} --corpus {corpus_file} --source DeviceMessages
+          - name: Evaluate a single route against a message corpus.
+            text: >
+              az iot hub message-route evaluate -n {iothub_name} --corpus {corpus_file} --route-name {route_name}
+    """
+
     helps[
         "iot hub message-route fallback"
     ] = """
@@ -45,6 +45,7 @@ def load_iothub_commands(self, _):
         cmd_group.show_command("show", "job_show")
         cmd_group.command("list", "job_list")
         cmd_group.command("cancel", "job_cancel")
+        cmd_group.command("watch", "job_watch", is_experimental=True)
 
     with self.command_group("iot hub digital-twin", command_type=pnp_runtime_ops) as cmd_group:
         cmd_group.command("invoke-command", "invoke_device_command")
@@ -113,6 +114,7 @@ def load_iothub_commands(self, _):
             'update', 'message_route_update', transform=RouteUpdateResultTransform(self.cli_ctx)
         )
         cmd_group.command('test', 'message_route_test')
+        cmd_group.command('evaluate', 'message_route_evaluate', is_experimental=True)
 
     with self.command_group("iot hub message-route fallback", command_type=iothub_message_route_ops) as cmd_group:
         cmd_group.show_command("show", "message_fallback_route_show")
@@ -121,6 +123,7 @@ def load_iothub_commands(self, _):
     with self.command_group("iot device", command_type=device_messaging_ops) as cmd_group:
         cmd_group.command("send-d2c-message", "iot_device_send_message")
         cmd_group.command("simulate", "iot_simulate_device", is_experimental=True)
+        cmd_group.command("simulate-fleet", "iot_simulate_device_fleet", is_experimental=True)
         cmd_group.command("upload-file", "iot_device_upload_file")
 
     with self.command_group(
@@ -208,6 +208,45 @@ def iot_simulate_device(
     )
 
 
+def iot_simulate_device_fleet(
+    cmd,
+    device_file: Optional[str] = None,
+    device_count: Optional[int] = None,
+    device_prefix: str = "fleet-sim-",
+    data: str = "Ping from Az CLI IoT Extension",
+    properties: Optional[str] = None,
+    msg_count: int = 100,
+    device_rate: float = 1.0,
+    total_rate: Optional[float] = None,
+    schedule: str = "constant",
+    burst_size: int = 10,
+    protocol_type: str = "http",
+    max_in_flight: int = 100,
+    hub_name: Optional[str] = None,
+    resource_group_name: Optional[str] = None,
+    login: Optional[str] = None,
+):
+    from azext_iot.iothub.providers.fleet_simulation import FleetSimulationProvider
+
+    fleet_provider = FleetSimulationProvider(
+        cmd=cmd, hub_name=hub_name, rg=resource_group_name, login=login
+    )
+    return fleet_provider.simulate_fleet(
+        device_file=device_file,
+        device_count=device_count,
+        device_prefix=device_prefix,
+        data=data,
+        properties=properties,
+        msg_count=msg_count,
+        device_rate=device_rate,
+        total_rate=total_rate,
+        schedule=schedule,
+        burst_size=burst_size,
+        protocol_type=protocol_type,
+        max_in_flight=max_in_flight,
+    )
+
+
 def iot_device_upload_file(
     cmd,
     device_id: str,
@@ -55,6 +55,32 @@ def job_create(
     )
 
 
+def job_watch(
+    cmd,
+    job_ids,
+    poll_interval=10,
+    max_poll_interval=60,
+    poll_duration=600,
+    hub_name=None,
+    resource_group_name=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    jobs = JobProvider(
+        cmd=cmd,
+        hub_name=hub_name,
+        rg=resource_group_name,
+        login=login,
+        auth_type_dataplane=auth_type_dataplane,
+    )
+    return jobs.watch(
+        job_ids=job_ids,
+        poll_interval=poll_interval,
+        max_poll_interval=max_poll_interval,
+        poll_duration=poll_duration,
+    )
+
+
 def job_show(
     cmd,
     job_id,
@@ -114,6 +114,24 @@ def message_route_test(
     )
 
 
+def message_route_evaluate(
+    cmd,
+    hub_name: str,
+    corpus: str,
+    route_name: Optional[str] = None,
+    source_type: Optional[str] = None,
+    resource_group_name: Optional[str] = None,
+):
+    message_route_provider = MessageRoute(
+        cmd=cmd, hub_name=hub_name, rg=resource_group_name
+    )
+    return message_route_provider.evaluate(
+        corpus=corpus,
+        route_name=route_name,
+        source_type=source_type,
+    )
+
+
 def message_fallback_route_show(
     cmd,
     hub_name: str,
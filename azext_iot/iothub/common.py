@@ -102,3 +102,12 @@ class CertificateAuthorityVersions(Enum):
     """
     v2 = "v2"
     v1 = "v1"
+
+
+class FleetScheduleType(Enum):
+    """
+    Per device send schedule of the fleet simulation.
+    """
+    constant = "constant"
+    poisson = "poisson"
+    burst = "burst"
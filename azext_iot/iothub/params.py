@@ -9,7 +9,7 @@ from azure.cli.core.commands.parameters import get_enum_type, get_three_state_fl
 from azext_iot.common.shared import SettleType, ProtocolType, AckType
 from azext_iot.assets.user_messages import info_param_properties_device
 from azext_iot._params import hub_auth_type_dataplane_param_type
-from azext_iot.iothub.common import EncodingFormat, EndpointType, RouteSourceType
+from azext_iot.iothub.common import EncodingFormat, EndpointType, FleetScheduleType, RouteSourceType
 from azext_iot.iothub._validators import validate_device_model_id
 
 
@@ -150,6 +150,68 @@ def load_iothub_arguments(self, _):
             "Optional param, only supported for mqtt.",
         )
 
+    with self.argument_context("iot device simulate-fleet") as context:
+        context.argument(
+            "properties",
+            options_list=["--properties", "--props", "-p"],
+            help=info_param_properties_device(include_http=True),
+        )
+        context.argument(
+            "device_file",
+            options_list=["--device-file", "--df"],
+            help="Path to a file listing the devices to simulate, one per line as `deviceId` or `deviceId,primaryKey`. "
+            "Keys are looked up in the registry when missing and the mqtt protocol is used.",
+        )
+        context.argument(
+            "device_count",
+            options_list=["--device-count", "--dc"],
+            type=int,
+            help="Number of devices to simulate. Device identities are created (or reused if they exist) "
+            "with the ids {device-prefix}{0..count-1}.",
+        )
+        context.argument(
+            "device_prefix",
+            options_list=["--device-prefix", "--dp"],
+            help="Device id prefix used with --device-count.",
+        )
+        context.argument(
+            "msg_count",
+            options_list=["--msg-count", "--mc"],
+            type=int,
+            help="Number of device messages to send per device.",
+        )
+        context.argument(
+            "device_rate",
+            options_list=["--device-rate", "--dr"],
+            type=float,
+            help="Average messages per second sent by each device.",
+        )
+        context.argument(
+            "total_rate",
+            options_list=["--total-rate", "--tr"],
+            type=float,
+            help="Cap on the messages per second sent by the whole fleet. By default only the per device rate applies.",
+        )
+        context.argument(
+            "schedule",
+            options_list=["--schedule"],
+            arg_type=get_enum_type(FleetScheduleType),
+            help="Send schedule of each device. `constant` sends at fixed intervals, `poisson` uses exponentially "
+            "distributed intervals and `burst` sends --burst-size messages back to back followed by an idle period.",
+        )
+        context.argument(
+            "burst_size",
+            options_list=["--burst-size", "--bs"],
+            type=int,
+            help="Number of messages per burst when using the burst schedule.",
+        )
+        context.argument(
+            "max_in_flight",
+            options_list=["--max-in-flight", "--mif"],
+            type=int,
+            help="Maximum number of sends in flight across the fleet. For http this is also the connection pool size.",
+        )
+
     with self.argument_context("iot device c2d-message") as context:
         context.argument(
             "correlation_id",
@@ -449,6 +511,15 @@ def load_iothub_arguments(self, _):
             help="System properties of the route message.",
         )
 
+    with self.argument_context("iot hub message-route evaluate") as context:
+        context.argument(
+            "corpus",
+            options_list=["--corpus"],
+            help="Path to a file of messages to evaluate, one JSON message per line. Each message follows the test "
+            "route shape {body, appProperties, systemProperties} and may carry 'twin' and 'routingSource'. "
+            "The json output of `az iot hub monitor-events --props all` can be used as a corpus as well.",
+        )
+
     with self.argument_context("iot hub certificate root-authority set") as context:
         context.argument(
             "ca_version",
@@ -0,0 +1,469 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Multi-device load generation for IoT Hub.
+
+Device senders are multiplexed on a single asyncio event loop. Each device follows its own send
+schedule (constant, poisson or burst) while an optional shared rate limiter caps the total
+messages per second. Transports only need async `connect(device_id)`, `send(device_id, payload,
+properties)` and `close()`, so tests can point the engine at a local stand-in endpoint.
+"""
+
+import asyncio
+import datetime
+import json
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Dict, List, Optional
+from knack.log import get_logger
+from azure.cli.core.azclierror import (
+    ArgumentUsageError,
+    FileOperationError,
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    RequiredArgumentMissingError,
+)
+from azext_iot.common.sas_token_auth import SasTokenAuthentication
+from azext_iot.common.shared import AuthenticationTypeDataplane, ProtocolType, SdkType
+from azext_iot.common.utility import (
+    compute_percentiles,
+    generate_key,
+    handle_service_exception,
+    read_file_content,
+    validate_key_value_pairs,
+)
+from azext_iot.constants import (
+    FLEET_SIM_HTTP_API_VERSION,
+    FLEET_SIM_MAX_IN_FLIGHT,
+    FLEET_SIM_REGISTRY_BATCH_SIZE,
+    USER_AGENT,
+)
+from azext_iot.iothub.common import FleetScheduleType
+from azext_iot.iothub.providers.base import IoTHubProvider, CloudError
+from azext_iot.iothub.providers.device_messaging import _simulate_get_default_properties
+
+logger = get_logger(__name__)
+
+
+class FleetThrottledError(Exception):
+    """Raised by transports when the hub throttles a send (429 / QuotaExceeded)."""
+
+
+class FleetSimulationProvider(IoTHubProvider):
+    def __init__(
+        self,
+        cmd,
+        hub_name: Optional[str] = None,
+        rg: Optional[str] = None,
+        login: Optional[str] = None,
+    ):
+        super(FleetSimulationProvider, self).__init__(
+            cmd=cmd, hub_name=hub_name, rg=rg, login=login
+        )
+
+    def simulate_fleet(
+        self,
+        device_file: Optional[str] = None,
+        device_count: Optional[int] = None,
+        device_prefix: str = "fleet-sim-",
+        data: str = "Ping from Az CLI IoT Extension",
+        properties: Optional[str] = None,
+        msg_count: int = 100,
+        device_rate: float = 1.0,
+        total_rate: Optional[float] = None,
+        schedule: str = FleetScheduleType.constant.value,
+        burst_size: int = 10,
+        protocol_type: str = ProtocolType.http.name,
+        max_in_flight: int = FLEET_SIM_MAX_IN_FLIGHT,
+    ) -> dict:
+        protocol_type = protocol_type.lower()
+        if device_file and device_count:
+            raise MutuallyExclusiveArgumentError("Provide either --device-file or --device-count, not both.")
+        if not device_file and not device_count:
+            raise RequiredArgumentMissingError("Provide --device-file or --device-count to select the simulated fleet.")
+        if device_count is not None and device_count < 1:
+            raise InvalidArgumentValueError("device count must be at least 1")
+        if msg_count < 1:
+            raise InvalidArgumentValueError("msg count must be at least 1")
+        if device_rate <= 0:
+            raise InvalidArgumentValueError("device rate must be greater than 0")
+        if total_rate is not None and total_rate <= 0:
+            raise InvalidArgumentValueError("total rate must be greater than 0")
+        if burst_size < 1:
+            raise InvalidArgumentValueError("burst size must be at least 1")
+        if max_in_flight < 1:
+            raise InvalidArgumentValueError("max in flight must be at least 1")
+        if protocol_type == ProtocolType.http.name and self.target["policy"] == AuthenticationTypeDataplane.login.value:
+            raise ArgumentUsageError(
+                "Fleet simulation over http signs messages with the hub shared access policy. "
+                "Use key based auth or --protocol mqtt."
+            )
+
+        devices = (
+            _read_device_file(device_file) if device_file else self._create_devices(device_prefix, device_count)
+        )
+        message_properties = _simulate_get_default_properties(protocol_type)
+        message_properties.update(validate_key_value_pairs(properties) or {})
+
+        if protocol_type == ProtocolType.mqtt.name:
+            self._fill_device_keys(devices)
+            transport = MqttFleetTransport(hub_hostname=self.target["entity"], device_keys=devices)
+        else:
+            transport = HttpFleetTransport(
+                hub_hostname=self.target["entity"],
+                policy_name=self.target["policy"],
+                policy_key=self.target["primarykey"],
+                max_connections=max_in_flight,
+            )
+
+        simulator = FleetSimulator(
+            transport=transport,
+            device_ids=list(devices),
+            msg_count=msg_count,
+            device_rate=device_rate,
+            total_rate=total_rate,
+            schedule=schedule,
+            burst_size=burst_size,
+            max_in_flight=max_in_flight,
+            data=data,
+            properties=message_properties,
+        )
+        return simulator.run()
+
+    def _create_devices(self, device_prefix: str, device_count: int) -> Dict[str, Optional[str]]:
+        """
+        Create the fleet identities through the bulk registry API. Devices that already exist are reused,
+        their keys are resolved later if the transport needs them.
+        """
+        from azext_iot.sdk.iothub.service.models import (
+            AuthenticationMechanism,
+            ExportImportDevice,
+            SymmetricKey,
+        )
+
+        service_sdk = self.get_sdk(SdkType.service_sdk)
+        devices = {"{}{}".format(device_prefix, i): generate_key() for i in range(device_count)}
+        device_ids = list(devices)
+        for start in range(0, len(device_ids), FLEET_SIM_REGISTRY_BATCH_SIZE):
+            batch = [
+                ExportImportDevice(
+                    id=device_id,
+                    import_mode="create",
+                    status="enabled",
+                    authentication=AuthenticationMechanism(
+                        type="sas",
+                        symmetric_key=SymmetricKey(primary_key=devices[device_id], secondary_key=generate_key()),
+                    ),
+                )
+                for device_id in device_ids[start:start + FLEET_SIM_REGISTRY_BATCH_SIZE]
+            ]
+            try:
+                result = service_sdk.bulk_registry.update_registry(devices=batch)
+            except CloudError as e:
+                handle_service_exception(e)
+
+            for error in (result.errors or []):
+                if error.error_code == "DeviceAlreadyExists":
+                    devices[error.device_id] = None
+                    continue
+                raise InvalidArgumentValueError(
+                    "Unable to create device '{}': {} {}".format(error.device_id, error.error_code, error.error_status)
+                )
+        logger.info("Fleet of %s devices ready.", device_count)
+        return devices
+
+    def _fill_device_keys(self, devices: Dict[str, Optional[str]]):
+        from azext_iot.operations.hub import _iot_device_show
+
+        for device_id, key in devices.items():
+            if key:
+                continue
+            device = _iot_device_show(self.target, device_id)
+            key = device["authentication"]["symmetricKey"]["primaryKey"]
+            if not key:
+                raise InvalidArgumentValueError(
+                    "Device '{}' does not use symmetric key auth and cannot be simulated over mqtt.".format(device_id)
+                )
+            devices[device_id] = key
+
+
+def _read_device_file(device_file: str) -> Dict[str, Optional[str]]:
+    """
+    Read fleet identities from a file with one device per line, as `deviceId` or `deviceId,primaryKey`.
+    Blank lines and lines starting with # are skipped.
+    """
+    try:
+        content = read_file_content(device_file)
+    except (OSError, IOError) as e:
+        raise FileOperationError("Unable to read device file '{}'. {}".format(device_file, e))
+
+    devices = {}
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        device_id, _, key = line.partition(",")
+        devices[device_id.strip()] = key.strip() or None
+
+    if not devices:
+        raise InvalidArgumentValueError("Device file '{}' does not list any devices.".format(device_file))
+    return devices
+
+
+def _send_delays(schedule: str, rate: float, burst_size: int, rng: random.Random):
+    """Infinite generator of delays (seconds) between consecutive sends of a single device."""
+    if schedule == FleetScheduleType.constant.value:
+        while True:
+            yield 1.0 / rate
+    elif schedule == FleetScheduleType.poisson.value:
+        while True:
+            yield rng.expovariate(rate)
+    elif schedule == FleetScheduleType.burst.value:
+        # A burst of messages back to back, then idle so the average rate is preserved
+        while True:
+            yield burst_size / rate
+            for _ in range(burst_size - 1):
+                yield 0.0
+    else:
+        raise InvalidArgumentValueError(
+            "Unsupported schedule '{}'. Use constant, poisson or burst.".format(schedule)
+        )
+
+
+class _RateLimiter(object):
+    """Shared pacing across all device senders on the event loop."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = monotonic()
+
+    async def acquire(self):
+        now = monotonic()
+        wait = self.next_slot - now
+        self.next_slot = max(self.next_slot, now) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class FleetSimulator(object):
+    def __init__(
+        self,
+        transport,
+        device_ids: List[str],
+        msg_count: int,
+        device_rate: float,
+        total_rate: Optional[float] = None,
+        schedule: str = FleetScheduleType.constant.value,
+        burst_size: int = 10,
+        max_in_flight: int = FLEET_SIM_MAX_IN_FLIGHT,
+        data: str = "Ping from Az CLI IoT Extension",
+        properties: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.transport = transport
+        self.device_ids = device_ids
+        self.msg_count = msg_count
+        self.device_rate = device_rate
+        self.total_rate = total_rate
+        self.schedule = schedule
+        self.burst_size = burst_size
+        self.max_in_flight = max_in_flight
+        self.data = data
+        self.properties = properties or {}
+        self.rng = random.Random(seed)
+
+        self.sent = 0
+        self.failed = 0
+        self.throttled = 0
+        self.latencies: List[float] = []
+
+    def run(self) -> dict:
+        # Validate before any device task is scheduled
+        next(_send_delays(self.schedule, self.device_rate, self.burst_size, self.rng))
+
+        loop = asyncio.new_event_loop()
+        try:
+            duration = loop.run_until_complete(self._run())
+        finally:
+            loop.close()
+        return self.summary(duration)
+
+    async def _run(self) -> float:
+        limiter = _RateLimiter(self.total_rate) if self.total_rate else None
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        start = monotonic()
+        try:
+            await asyncio.gather(
+                *[self._device_sender(device_id, limiter, in_flight) for device_id in self.device_ids]
+            )
+        finally:
+            await self.transport.close()
+        return monotonic() - start
+
+    async def _device_sender(self, device_id: str, limiter: Optional[_RateLimiter], in_flight: asyncio.Semaphore):
+        delays = _send_delays(self.schedule, self.device_rate, self.burst_size, self.rng)
+        # Spread device start times over one send interval to avoid a thundering herd
+        await asyncio.sleep(self.rng.uniform(0, 1.0 / self.device_rate))
+        try:
+            await self.transport.connect(device_id)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning("Unable to connect device '%s': %s", device_id, e)
+            self.failed += self.msg_count
+            return
+        next_send = monotonic()
+        for i in range(self.msg_count):
+            if limiter:
+                await limiter.acquire()
+            async with in_flight:
+                await self._send(device_id, i + 1)
+            next_send += next(delays)
+            wait = next_send - monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    async def _send(self, device_id: str, sequence: int):
+        payload = json.dumps(
+            {
+                "id": str(uuid.uuid4()),
+                "deviceId": device_id,
+                "timestamp": str(datetime.datetime.utcnow()),
+                "data": "{} #{}".format(self.data, sequence),
+            }
+        )
+        start = monotonic()
+        try:
+            await self.transport.send(device_id, payload, self.properties)
+        except FleetThrottledError:
+            self.throttled += 1
+            return
+        except Exception as e:  # pylint: disable=broad-except
+            self.failed += 1
+            logger.debug("Send failed for device '%s': %s", device_id, e)
+            return
+        self.latencies.append((monotonic() - start) * 1000)
+        self.sent += 1
+
+    def summary(self, duration: float) -> dict:
+        percentiles = compute_percentiles(self.latencies, [50, 90, 99])
+        return {
+            "devices": len(self.device_ids),
+            "sent": self.sent,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "durationSeconds": round(duration, 3),
+            "messagesPerSecond": round(self.sent / duration, 2) if duration else 0.0,
+            "latencyMs": {
+                "p50": percentiles[50],
+                "p90": percentiles[90],
+                "p99": percentiles[99],
+                "max": round(max(self.latencies), 2) if self.latencies else None,
+            },
+        }
+
+
+class HttpFleetTransport(object):
+    """
+    Sends device-to-cloud events over https using a single pooled session. Requests are signed with a
+    hub level shared access policy token (the policy needs DeviceConnect rights).
+    """
+
+    def __init__(
+        self,
+        hub_hostname: str,
+        policy_name: str,
+        policy_key: str,
+        max_connections: int = FLEET_SIM_MAX_IN_FLIGHT,
+        endpoint: Optional[str] = None,
+    ):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.endpoint = endpoint or "https://{}".format(hub_hostname)
+        self.auth = SasTokenAuthentication(
+            uri=hub_hostname, shared_access_policy_name=policy_name, shared_access_key=policy_key
+        )
+        self.token = self.auth.generate_sas_token()
+        self.token_refresh = monotonic() + self.auth.expiry / 2
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_connections)
+
+    def _post(self, device_id: str, payload: str, properties: Dict[str, str]):
+        if monotonic() > self.token_refresh:
+            self.token = self.auth.generate_sas_token()
+            self.token_refresh = monotonic() + self.auth.expiry / 2
+
+        headers = {"Authorization": self.token, "User-Agent": USER_AGENT}
+        headers.update(properties)
+        response = self.session.post(
+            "{}/devices/{}/messages/events".format(self.endpoint, device_id),
+            params={"api-version": FLEET_SIM_HTTP_API_VERSION},
+            data=payload.encode("utf-8"),
+            headers=headers,
+        )
+        if response.status_code == 429 or "QuotaExceeded" in response.text:
+            raise FleetThrottledError(response.text)
+        response.raise_for_status()
+
+    async def connect(self, device_id: str):
+        pass
+
+    async def send(self, device_id: str, payload: str, properties: Dict[str, str]):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.executor, self._post, device_id, payload, properties)
+
+    async def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+
+class MqttFleetTransport(object):
+    """Sends device-to-cloud events over mqtt with one async device client per device."""
+
+    def __init__(self, hub_hostname: str, device_keys: Dict[str, str], websockets: bool = False):
+        self.hub_hostname = hub_hostname
+        self.device_keys = device_keys
+        self.websockets = websockets
+        self.clients = {}
+
+    async def connect(self, device_id: str):
+        from azure.iot.device.aio import IoTHubDeviceClient
+
+        client = IoTHubDeviceClient.create_from_symmetric_key(
+            symmetric_key=self.device_keys[device_id],
+            hostname=self.hub_hostname,
+            device_id=device_id,
+            websockets=self.websockets,
+        )
+        self.clients[device_id] = client
+        await client.connect()
+
+    async def send(self, device_id: str, payload: str, properties: Dict[str, str]):
+        from azure.iot.device import Message
+
+        client = self.clients[device_id]
+        message = Message(payload)
+        message.custom_properties = properties
+        try:
+            await client.send_message(message)
+        except Exception as e:
+            if "QuotaExceeded" in str(e) or "429" in str(e) or "throttl" in str(e).lower():
+                raise FleetThrottledError(str(e))
+            raise
+
+    async def close(self):
+        for client in self.clients.values():
+            try:
+                await client.shutdown()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("Unable to shut down mqtt client: %s", e)
+        self.clients = {}
@@ -4,8 +4,14 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from time import sleep
-from datetime import datetime, timedelta
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+import isodate
 from knack.log import get_logger
 from azure.cli.core.azclierror import (
     CLIInternalError,
@@ -20,6 +26,18 @@ from azext_iot.iothub.providers.base import IoTHubProvider, CloudError, Serializ
 
 logger = get_logger(__name__)
 
+TERMINAL_JOB_STATUSES = [
+    JobStatusType.completed.value,
+    JobStatusType.failed.value,
+    JobStatusType.cancelled.value,
+]
+JOB_STATISTICS_KEYS = ["deviceCount", "succeededCount", "failedCount", "runningCount", "pendingCount"]
+
+# Consecutive failed polls after which a job is no longer watched
+JOB_WATCH_MAX_ERRORS = 3
+# Upper bound of concurrent job polls
+JOB_WATCH_MAX_WORKERS = 16
+
 
 class JobProvider(IoTHubProvider):
     def get(self, job_id):
@@ -228,6 +246,30 @@ class JobProvider(IoTHubProvider):
             # ISO8601 parsing is handled by msrest
             raise CLIInternalError(se)
 
+    def watch(
+        self,
+        job_ids: List[str],
+        poll_interval: int = 10,
+        max_poll_interval: int = 60,
+        poll_duration: int = 600,
+    ) -> dict:
+        if not job_ids:
+            raise RequiredArgumentMissingError("Provide at least one job id to watch.")
+        if poll_duration < 1:
+            raise InvalidArgumentValueError("--poll-duration must be greater than 0.")
+        if poll_interval < 1:
+            raise InvalidArgumentValueError("--poll-interval must be greater than 0.")
+        if max_poll_interval < poll_interval:
+            raise InvalidArgumentValueError("--max-poll-interval must not be less than --poll-interval.")
+
+        return JobWatch(
+            fetch=self.get,
+            job_ids=job_ids,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            poll_duration=poll_duration,
+        ).run()
+
     def _convert_v1_to_v2(self, job_v1):
         v2_result = {}
 
@@ -255,3 +297,190 @@ class JobProvider(IoTHubProvider):
             jobs = [job for job in jobs if job["status"] == job_status]
 
         return jobs
+
+
+class WatchedJob(object):
+    """Last observed state of a watched job."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.job_type = None
+        self.status = None
+        self.statistics: Dict[str, int] = {}
+        self.progress = None
+        self.start_time = None
+        self.end_time = None
+        self.polls = 0
+        self.errors = 0
+        self.error = None
+        self.first_seen = None
+        self.initial_processed = 0
+        self.devices_per_second = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.statistics.get("succeededCount", 0) + self.statistics.get("failedCount", 0)
+
+    def update_throughput(self, now: float):
+        """
+        Devices processed per second. Finished jobs use the service start and end times, running jobs the
+        devices processed since the watch first saw them.
+        """
+        if self.status in TERMINAL_JOB_STATUSES and self.start_time and self.end_time:
+            try:
+                elapsed = (isodate.parse_datetime(self.end_time) - isodate.parse_datetime(self.start_time)).total_seconds()
+            except (isodate.ISO8601Error, ValueError, TypeError):
+                elapsed = 0
+            if elapsed > 0:
+                self.devices_per_second = round(self.processed / elapsed, 2)
+                return
+        elapsed = now - self.first_seen
+        if elapsed > 0:
+            self.devices_per_second = round((self.processed - self.initial_processed) / elapsed, 2)
+
+    def to_dict(self) -> dict:
+        result = {
+            "status": self.status,
+            "type": self.job_type,
+            "deviceJobStatistics": self.statistics,
+            "devicesPerSecond": self.devices_per_second,
+            "polls": self.polls,
+        }
+        if self.progress is not None:
+            result["progress"] = self.progress
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class JobWatch(object):
+    """
+    Watch many jobs on a single event loop. Each job is polled on its own schedule: the interval doubles up
+    to max_poll_interval while the job makes no progress and resets to poll_interval when it does. Every
+    change is written as a line of JSON to the stream as it is observed.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], dict],
+        job_ids: List[str],
+        poll_interval: int = 10,
+        max_poll_interval: int = 60,
+        poll_duration: int = 600,
+        stream=None,
+    ):
+        self.fetch = fetch
+        self.jobs = {job_id: WatchedJob(job_id) for job_id in job_ids}
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_duration = poll_duration
+        self.stream = stream or sys.stdout
+        self.deadline = None
+
+    def run(self) -> dict:
+        executor = ThreadPoolExecutor(max_workers=min(len(self.jobs), JOB_WATCH_MAX_WORKERS))
+        loop = asyncio.new_event_loop()
+        start = monotonic()
+        self.deadline = start + self.poll_duration
+        try:
+            loop.run_until_complete(self._run(executor))
+        finally:
+            loop.close()
+            executor.shutdown(wait=False)
+        return self.summary(monotonic() - start)
+
+    async def _run(self, executor: ThreadPoolExecutor):
+        await asyncio.gather(*[self._watch(job, executor) for job in self.jobs.values()])
+
+    async def _watch(self, job: WatchedJob, executor: ThreadPoolExecutor):
+        loop = asyncio.get_event_loop()
+        interval = self.poll_interval
+        while True:
+            try:
+                result = await loop.run_in_executor(executor, self.fetch, job.job_id)
+            except Exception as e:  # pylint: disable=broad-except
+                job.errors += 1
+                job.error = str(e)
+                logger.debug("Polling job '%s' failed: %s", job.job_id, e)
+                if job.errors >= JOB_WATCH_MAX_ERRORS:
+                    logger.warning("Stopped watching job '%s' after %s failed polls.", job.job_id, job.errors)
+                    return
+                interval = min(interval * 2, self.max_poll_interval)
+            else:
+                job.errors = 0
+                job.error = None
+                changed = self._observe(job, result)
+                if job.status in TERMINAL_JOB_STATUSES:
+                    return
+                interval = self.poll_interval if changed else min(interval * 2, self.max_poll_interval)
+
+            remaining = self.deadline - monotonic()
+            if remaining <= 0:
+                logger.info("Job '%s' not finished within poll duration.", job.job_id)
+                return
+            await asyncio.sleep(min(interval, remaining))
+
+    def _observe(self, job: WatchedJob, result: dict) -> bool:
+        """Record a polled job and write the progress delta. Returns whether the job changed."""
+        now = monotonic()
+        job.polls += 1
+        result = result or {}
+        raw_statistics = result.get("deviceJobStatistics") or {}
+        statistics = {key: raw_statistics.get(key) or 0 for key in JOB_STATISTICS_KEYS} if raw_statistics else {}
+        status = result.get("status")
+        progress = result.get("progress")
+
+        if job.first_seen is None:
+            job.first_seen = now
+            job.initial_processed = statistics.get("succeededCount", 0) + statistics.get("failedCount", 0)
+        if status == job.status and statistics == job.statistics and progress == job.progress:
+            return False
+
+        delta = {
+            key: statistics.get(key, 0) - job.statistics.get(key, 0)
+            for key in JOB_STATISTICS_KEYS
+            if statistics.get(key, 0) != job.statistics.get(key, 0)
+        }
+        job.job_type = result.get("type")
+        job.status = status
+        job.statistics = statistics
+        job.progress = progress
+        job.start_time = result.get("startTime")
+        job.end_time = result.get("endTime")
+        job.update_throughput(now)
+
+        update = {
+            "jobId": job.job_id,
+            "time": datetime.now(timezone.utc).isoformat(),
+            "status": status,
+            "deviceJobStatistics": statistics,
+            "delta": delta,
+            "devicesPerSecond": job.devices_per_second,
+        }
+        if progress is not None:
+            update["progress"] = progress
+        self.stream.write(json.dumps(update, separators=(",", ":")))
+        self.stream.write("\n")
+        self.stream.flush()
+        return True
+
+    def summary(self, duration: float) -> dict:
+        totals = {key: 0 for key in JOB_STATISTICS_KEYS}
+        statuses = {}
+        for job in self.jobs.values():
+            for key in JOB_STATISTICS_KEYS:
+                totals[key] += job.statistics.get(key, 0)
+            status = job.status if not job.error else "error"
+            statuses[status or "unknown"] = statuses.get(status or "unknown", 0) + 1
+
+        unfinished = [job.job_id for job in self.jobs.values() if job.status not in TERMINAL_JOB_STATUSES]
+        if unfinished:
+            logger.warning("%s of %s jobs did not finish while watched.", len(unfinished), len(self.jobs))
+        return {
+            "jobs": {job.job_id: job.to_dict() for job in self.jobs.values()},
+            "statusCounts": statuses,
+            "deviceJobStatistics": totals,
+            "devicesPerSecond": round(sum(job.devices_per_second for job in self.jobs.values()), 2),
+            "unfinished": unfinished,
+            "durationSeconds": round(duration, 3),
+        }
@@ -4,16 +4,21 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+from time import monotonic
 from typing import Optional
 from knack.log import get_logger
-from azure.cli.core.azclierror import ResourceNotFoundError
+from azure.cli.core.azclierror import FileOperationError, ResourceNotFoundError
 from azext_iot.common.utility import process_json_arg
 from azext_iot.iothub.common import RouteSourceType
 from azext_iot.iothub.providers.base import IoTHubProvider
+from azext_iot.iothub.providers.route_query import RouteSet, evaluate_corpus
 
 
 logger = get_logger(__name__)
 
+# Line numbers of invalid corpus messages kept in the evaluation summary
+INVALID_MESSAGE_SAMPLE_SIZE = 5
+
 
 class MessageRoute(IoTHubProvider):
     def __init__(
@@ -168,6 +173,48 @@ class MessageRoute(IoTHubProvider):
             routes = fallback
         return {"routes": routes}
 
+    def evaluate(
+        self,
+        corpus: str,
+        route_name: Optional[str] = None,
+        source_type: Optional[str] = None,
+    ):
+        """
+        Evaluate the hub routes against a corpus of JSON messages, see read_corpus, without calling
+        the service per message. Routes are read from the hub once and compiled once.
+        """
+        routing = self.hub_resource.properties.routing
+        routes = routing.routes if routing else []
+        fallback_route = routing.fallback_route if routing else None
+        if route_name:
+            # Like test_route, a single route is evaluated on its own, the other routes and the fallback
+            # route are not considered
+            routes = [self.show(route_name)]
+            fallback_route = None
+        elif source_type:
+            routes = [route for route in routes if route.source.lower() == source_type.lower()]
+        route_set = RouteSet(routes=routes, fallback_route=fallback_route)
+
+        start = monotonic()
+        try:
+            with open(corpus, "r", encoding="utf-8") as corpus_file:
+                messages, invalid_lines = evaluate_corpus(route_set, corpus_file, source_type=source_type)
+        except (OSError, IOError) as e:
+            raise FileOperationError("Unable to read message corpus '{}'. {}".format(corpus, e))
+        duration = monotonic() - start
+
+        if invalid_lines:
+            logger.warning("%s corpus records are not valid messages and were skipped.", len(invalid_lines))
+        return {
+            "messages": messages,
+            "invalid": {"count": len(invalid_lines), "lines": invalid_lines[:INVALID_MESSAGE_SAMPLE_SIZE]},
+            "routes": route_set.routes,
+            "fallback": route_set.fallback,
+            "unrouted": route_set.unrouted,
+            "durationSeconds": round(duration, 3),
+            "messagesPerSecond": round(messages / duration, 2) if duration else 0.0,
+        }
+
     def show_fallback(self):
         return self.hub_resource.properties.routing.fallback_route
 
@@ -0,0 +1,820 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Offline evaluation of IoT Hub message routing queries.
+
+Route conditions are parsed once and compiled into nested closures over a routing message. The
+evaluation follows the routing query semantics: references to missing values, comparisons between
+different types and arithmetic on non numbers are undefined, undefined propagates through
+expressions and logical operators use three-valued logic. A route matches only when its condition
+evaluates to true.
+
+Message bodies can only be queried when the content type is application/json and the content
+encoding is utf-8, utf-16 or utf-32. Bodies are parsed lazily, the first time a route reads them.
+
+Message corpora hold one JSON message per line, or JSON messages printed across several lines such
+as the output of `az iot hub monitor-events`.
+"""
+
+import json
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+from azure.cli.core.azclierror import InvalidArgumentValueError
+from azext_iot.iothub.common import RouteSourceType
+
+
+class _Undefined(object):
+    __slots__ = ()
+
+    def __repr__(self):
+        return "undefined"
+
+
+UNDEFINED = _Undefined()
+_UNSET = object()
+
+FALLBACK_ROUTE_NAME = "$fallback"
+JSON_BODY_ENCODINGS = frozenset(["utf-8", "utf-16", "utf-32"])
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*")
+    | (?P<system>\$[A-Za-z_][A-Za-z0-9_\-]*)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<op><=|>=|<>|!=|\|\||[=<>+\-*/%(),.\[\]])
+    """,
+    re.VERBOSE,
+)
+_KEYWORDS = frozenset(["AND", "OR", "NOT", "TRUE", "FALSE", "NULL"])
+_COMPARISON_OPERATORS = frozenset(["=", "!=", "<>", "<", "<=", ">", ">="])
+
+# Value kinds, values of different kinds never compare
+_NUMBER, _STRING, _BOOL, _NULL, _COMPLEX = range(5)
+
+
+@lru_cache(maxsize=1024)
+def normalize_system_property(name: str) -> str:
+    """
+    Canonical name of a system property, so that `$connectionDeviceId`, `iothub-connection-device-id`
+    and `connection_device_id` refer to the same property.
+    """
+    name = name.lower().replace("-", "").replace("_", "")
+    return name[6:] if name.startswith("iothub") else name
+
+
+def _kind(value: Any) -> Optional[int]:
+    value_type = type(value)
+    if value_type is str:
+        return _STRING
+    if value_type is bool:
+        return _BOOL
+    if value_type is int or value_type is float:
+        return _NUMBER
+    if value is None:
+        return _NULL
+    if value is UNDEFINED:
+        return None
+    return _COMPLEX
+
+
+def _get_object(record: dict, key: str) -> dict:
+    """Property bag of a corpus record, which must be a JSON object or null when present."""
+    value = record.get(key)
+    if value is None:
+        return {}
+    if type(value) is not dict:
+        raise InvalidArgumentValueError("'{}' must be a JSON object.".format(key))
+    return value
+
+
+class RoutingMessage(object):
+    """A message as seen by routing queries."""
+
+    __slots__ = ("source", "app_properties", "twin", "_raw_system_properties", "_system_properties", "_raw_body", "_body")
+
+    def __init__(
+        self,
+        body: Any = None,
+        app_properties: Optional[Dict[str, Any]] = None,
+        system_properties: Optional[Dict[str, Any]] = None,
+        twin: Optional[dict] = None,
+        source: str = RouteSourceType.DeviceMessages.value,
+    ):
+        self.source = (source or RouteSourceType.DeviceMessages.value).lower()
+        self.app_properties = app_properties or {}
+        self.twin = twin if twin is not None else UNDEFINED
+        self._raw_system_properties = system_properties
+        self._system_properties = None
+        self._raw_body = body
+        self._body = _UNSET
+
+    @classmethod
+    def from_json(cls, record: dict) -> "RoutingMessage":
+        """
+        Build a message from a corpus record. Records use the shape of the test route input, either the
+        message itself ({body, appProperties, systemProperties}) with optional twin and routingSource, or
+        nested under "message". Events printed by `az iot hub monitor-events --props all` in json output,
+        {"event": {payload, annotations, properties}}, are accepted too.
+        """
+        if type(record) is not dict:
+            raise InvalidArgumentValueError("Messages must be JSON objects.")
+        if "event" in record and isinstance(record["event"], dict):
+            event = record["event"]
+            properties = _get_object(event, "properties")
+            system_properties = dict(_get_object(event, "annotations"))
+            system_properties.update(_get_object(properties, "system"))
+            return cls(
+                body=event.get("payload"),
+                app_properties=_get_object(properties, "application"),
+                system_properties=system_properties,
+                twin=record.get("twin"),
+                source=record.get("routingSource"),
+            )
+        message = record["message"] if "message" in record and isinstance(record["message"], dict) else record
+        return cls(
+            body=message.get("body"),
+            app_properties=_get_object(message, "appProperties"),
+            system_properties=_get_object(message, "systemProperties"),
+            twin=record.get("twin"),
+            source=record.get("routingSource") or record.get("source"),
+        )
+
+    @property
+    def system_properties(self) -> Dict[str, Any]:
+        """System properties keyed by normalized name, see normalize_system_property."""
+        if self._system_properties is None:
+            self._system_properties = {
+                normalize_system_property(key): value for key, value in (self._raw_system_properties or {}).items()
+            }
+        return self._system_properties
+
+    @property
+    def body(self) -> Any:
+        if self._body is _UNSET:
+            self._body = self._parse_body()
+        return self._body
+
+    def _parse_body(self) -> Any:
+        content_type = self.system_properties.get("contenttype")
+        content_encoding = self.system_properties.get("contentencoding")
+        if not isinstance(content_type, str) or content_type.lower() != "application/json":
+            return UNDEFINED
+        if not isinstance(content_encoding, str) or content_encoding.lower() not in JSON_BODY_ENCODINGS:
+            return UNDEFINED
+
+        body = self._raw_body
+        if isinstance(body, (bytes, bytearray)):
+            try:
+                body = body.decode(content_encoding.lower())
+            except (UnicodeDecodeError, LookupError):
+                return UNDEFINED
+        if isinstance(body, str):
+            try:
+                return json.loads(body)
+            except ValueError:
+                return UNDEFINED
+        return UNDEFINED if body is None else body
+
+
+def _walk(value: Any, segments: tuple) -> Any:
+    for segment in segments:
+        if type(segment) is int:
+            if type(value) is not list or segment >= len(value):
+                return UNDEFINED
+        elif type(value) is not dict or segment not in value:
+            return UNDEFINED
+        value = value[segment]
+    return value
+
+
+# Functions, all of them return undefined on arguments of the wrong kind
+
+
+def _numeric(method: Callable) -> Callable:
+    def _function(value):
+        if _kind(value) != _NUMBER:
+            return UNDEFINED
+        try:
+            return method(value)
+        except (ValueError, OverflowError):
+            return UNDEFINED
+    return _function
+
+
+def _stringy(method: Callable, arg_kinds: tuple) -> Callable:
+    if arg_kinds == (_STRING,):
+        def _string_function(value):
+            return method(value) if type(value) is str else UNDEFINED
+        return _string_function
+
+    def _function(*args):
+        if len(args) != len(arg_kinds) or any(_kind(arg) != kind for arg, kind in zip(args, arg_kinds)):
+            return UNDEFINED
+        return method(*args)
+    return _function
+
+
+def _substring(value, start, length):
+    if start < 0 or length < 0:
+        return UNDEFINED
+    return value[int(start):int(start) + int(length)]
+
+
+def _concat(*args):
+    if len(args) < 2 or any(_kind(arg) != _STRING for arg in args):
+        return UNDEFINED
+    return "".join(args)
+
+
+def _power(base, exponent):
+    if _kind(base) != _NUMBER or _kind(exponent) != _NUMBER:
+        return UNDEFINED
+    try:
+        return math.pow(base, exponent)
+    except (ValueError, OverflowError):
+        return UNDEFINED
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+_FUNCTIONS: Dict[str, tuple] = {
+    # name: (function, minimum arguments, maximum arguments)
+    "IS_DEFINED": (lambda value: value is not UNDEFINED, 1, 1),
+    "IS_NULL": (lambda value: value is None, 1, 1),
+    "IS_BOOL": (lambda value: type(value) is bool, 1, 1),
+    "IS_NUMBER": (lambda value: _kind(value) == _NUMBER, 1, 1),
+    "IS_STRING": (lambda value: type(value) is str, 1, 1),
+    "IS_ARRAY": (lambda value: type(value) is list, 1, 1),
+    "IS_OBJECT": (lambda value: type(value) is dict, 1, 1),
+    "IS_PRIMITIVE": (lambda value: _kind(value) in (_NUMBER, _STRING, _BOOL, _NULL), 1, 1),
+    "ABS": (_numeric(abs), 1, 1),
+    "CEILING": (_numeric(math.ceil), 1, 1),
+    "FLOOR": (_numeric(math.floor), 1, 1),
+    "SIGN": (_numeric(_sign), 1, 1),
+    "SQRT": (_numeric(math.sqrt), 1, 1),
+    "SQUARE": (_numeric(lambda value: value * value), 1, 1),
+    "EXP": (_numeric(math.exp), 1, 1),
+    "POWER": (_power, 2, 2),
+    "CONCAT": (_concat, 2, None),
+    "LENGTH": (_stringy(len, (_STRING,)), 1, 1),
+    "LOWER": (_stringy(str.lower, (_STRING,)), 1, 1),
+    "UPPER": (_stringy(str.upper, (_STRING,)), 1, 1),
+    "SUBSTRING": (_stringy(_substring, (_STRING, _NUMBER, _NUMBER)), 3, 3),
+    "INDEX_OF": (_stringy(str.find, (_STRING, _STRING)), 2, 2),
+    "STARTS_WITH": (_stringy(str.startswith, (_STRING, _STRING)), 2, 2),
+    "ENDS_WITH": (_stringy(str.endswith, (_STRING, _STRING)), 2, 2),
+    "CONTAINS": (_stringy(lambda value, part: part in value, (_STRING, _STRING)), 2, 2),
+}
+
+
+def _compare(symbol: str) -> Callable:
+    if symbol in ("=", "!=", "<>"):
+        negate = symbol != "="
+
+        def _equality(left, right):
+            left_kind = _kind(left)
+            if left_kind is None or left_kind == _COMPLEX or left_kind != _kind(right):
+                return UNDEFINED
+            return (left != right) if negate else (left == right)
+        return _equality
+
+    method = _ORDERING_METHODS[symbol]
+
+    def _ordering(left, right):
+        left_kind = _kind(left)
+        if left_kind not in (_NUMBER, _STRING) or left_kind != _kind(right):
+            return UNDEFINED
+        return method(left, right)
+    return _ordering
+
+
+_KIND_TYPES = {
+    _NUMBER: (int, float),
+    _STRING: (str,),
+    _BOOL: (bool,),
+    _NULL: (type(None),),
+}
+_ORDERING_METHODS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def _compare_to_constant(symbol: str, left: Callable, constant: Any) -> Optional[Callable]:
+    """
+    Comparison against a literal, the most common shape of route conditions. The literal kind is known up
+    front so a single type check decides between comparing and undefined.
+    """
+    kind = _kind(constant)
+    if symbol in ("=", "!=", "<>"):
+        method = operator.eq if symbol == "=" else operator.ne
+    elif kind in (_NUMBER, _STRING):
+        method = _ORDERING_METHODS[symbol]
+    else:
+        return None
+    types = _KIND_TYPES[kind]
+    reference = getattr(left, "reference", None)
+
+    if reference and reference[0] == "app":
+        name = reference[1]
+
+        def _app_comparison(message):
+            value = message.app_properties.get(name, UNDEFINED)
+            if type(value) in types:
+                return method(value, constant)
+            return UNDEFINED
+        return _app_comparison
+
+    if reference and reference[0] == "body":
+        segment = reference[1]
+
+        def _body_comparison(message):
+            body = message._body
+            if body is _UNSET:
+                body = message.body
+            if type(body) is dict:
+                value = body.get(segment, UNDEFINED)
+                if type(value) in types:
+                    return method(value, constant)
+            return UNDEFINED
+        return _body_comparison
+
+    def _comparison(message):
+        value = left(message)
+        if type(value) in types:
+            return method(value, constant)
+        return UNDEFINED
+    return _comparison
+
+
+def _arithmetic(symbol: str) -> Callable:
+    def _operation(left, right):
+        if _kind(left) != _NUMBER or _kind(right) != _NUMBER:
+            return UNDEFINED
+        if symbol == "+":
+            return left + right
+        if symbol == "-":
+            return left - right
+        if symbol == "*":
+            return left * right
+        if right == 0:
+            return UNDEFINED
+        return left / right if symbol == "/" else math.fmod(left, right)
+    return _operation
+
+
+def _string_concat(left, right):
+    if type(left) is not str or type(right) is not str:
+        return UNDEFINED
+    return left + right
+
+
+class _Parser(object):
+    """Recursive descent parser producing closures that take a RoutingMessage."""
+
+    def __init__(self, condition: str):
+        self.condition = condition
+        self.tokens = self._tokenize(condition)
+        self.position = 0
+
+    def _tokenize(self, condition: str) -> List[tuple]:
+        tokens = []
+        index = 0
+        while index < len(condition):
+            match = _TOKEN_PATTERN.match(condition, index)
+            if not match:
+                raise self._error("Unexpected character '{}'".format(condition[index]), index)
+            kind = match.lastgroup
+            if kind != "space":
+                text = match.group(kind)
+                if kind == "name" and text.upper() in _KEYWORDS:
+                    kind, text = "keyword", text.upper()
+                tokens.append((kind, text, index))
+            index = match.end()
+        tokens.append(("end", "", len(condition)))
+        return tokens
+
+    def _error(self, message: str, index: int) -> InvalidArgumentValueError:
+        return InvalidArgumentValueError(
+            "Invalid routing query '{}': {} at position {}.".format(self.condition, message, index)
+        )
+
+    def _peek(self) -> tuple:
+        return self.tokens[self.position]
+
+    def _next(self) -> tuple:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _accept(self, kind: str, text: Optional[str] = None) -> bool:
+        token = self._peek()
+        if token[0] == kind and (text is None or token[1] == text):
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, text: str):
+        if not self._accept(kind, text):
+            token = self._peek()
+            raise self._error("Expected '{}' but found '{}'".format(text, token[1] or "end of query"), token[2])
+
+    def parse(self) -> Callable:
+        expression = self._or()
+        token = self._peek()
+        if token[0] != "end":
+            raise self._error("Unexpected '{}'".format(token[1]), token[2])
+        return expression
+
+    def _or(self) -> Callable:
+        left = self._and()
+        while self._accept("keyword", "OR"):
+            right = self._and()
+            left = self._logical_or(left, right)
+        return left
+
+    def _and(self) -> Callable:
+        left = self._not()
+        while self._accept("keyword", "AND"):
+            right = self._not()
+            left = self._logical_and(left, right)
+        return left
+
+    def _not(self) -> Callable:
+        if self._accept("keyword", "NOT"):
+            operand = self._not()
+
+            def _logical_not(message):
+                value = operand(message)
+                if value is True:
+                    return False
+                if value is False:
+                    return True
+                return UNDEFINED
+            return _logical_not
+        return self._comparison()
+
+    def _comparison(self) -> Callable:
+        left = self._additive()
+        token = self._peek()
+        if token[0] == "op" and token[1] in _COMPARISON_OPERATORS:
+            self._next()
+            right = self._additive()
+            if getattr(right, "constant", False) and not getattr(left, "constant", False):
+                comparison = _compare_to_constant(token[1], left, right(None))
+                if comparison:
+                    return comparison
+            return self._binary(left, right, _compare(token[1]))
+        return left
+
+    def _additive(self) -> Callable:
+        left = self._multiplicative()
+        while True:
+            token = self._peek()
+            if token[0] == "op" and token[1] in ("+", "-", "||"):
+                self._next()
+                right = self._multiplicative()
+                method = _string_concat if token[1] == "||" else _arithmetic(token[1])
+                left = self._binary(left, right, method)
+            else:
+                return left
+
+    def _multiplicative(self) -> Callable:
+        left = self._unary()
+        while True:
+            token = self._peek()
+            if token[0] == "op" and token[1] in ("*", "/", "%"):
+                self._next()
+                right = self._unary()
+                left = self._binary(left, right, _arithmetic(token[1]))
+            else:
+                return left
+
+    def _unary(self) -> Callable:
+        if self._accept("op", "-"):
+            operand = self._unary()
+            negate = _arithmetic("-")
+            return self._constant_or(lambda message: negate(0, operand(message)), operand)
+        if self._accept("op", "+"):
+            return self._unary()
+        return self._primary()
+
+    def _primary(self) -> Callable:
+        kind, text, index = self._next()
+        if kind == "number":
+            value = float(text) if any(c in text for c in ".eE") else int(text)
+            return self._constant(value)
+        if kind == "string":
+            return self._constant(self._unquote(text))
+        if kind == "keyword" and text in ("TRUE", "FALSE", "NULL"):
+            return self._constant({"TRUE": True, "FALSE": False, "NULL": None}[text])
+        if kind == "op" and text == "(":
+            expression = self._or()
+            self._expect("op", ")")
+            return expression
+        if kind == "name" and self._peek()[1] == "(" and self._peek()[0] == "op":
+            return self._function(text, index)
+        if kind == "system":
+            return self._system_reference(text[1:], self._segments())
+        if kind == "name":
+            return self._app_property(text, self._segments())
+        raise self._error("Unexpected '{}'".format(text or "end of query"), index)
+
+    def _segments(self) -> tuple:
+        segments = []
+        while True:
+            if self._accept("op", "."):
+                kind, text, index = self._next()
+                if kind not in ("name", "keyword"):
+                    raise self._error("Expected a property name after '.'", index)
+                segments.append(text if kind == "name" else self._raw(index))
+            elif self._accept("op", "["):
+                kind, text, index = self._next()
+                if kind == "number" and text.isdigit():
+                    segments.append(int(text))
+                elif kind == "string":
+                    segments.append(self._unquote(text))
+                else:
+                    raise self._error("Expected an array index or a quoted property name", index)
+                self._expect("op", "]")
+            else:
+                return tuple(segments)
+
+    def _raw(self, index: int) -> str:
+        # keywords are upper cased by the tokenizer, property names keep their case
+        match = _TOKEN_PATTERN.match(self.condition, index)
+        return match.group(0)
+
+    def _unquote(self, text: str) -> str:
+        quote = text[0]
+        body = text[1:-1]
+        if quote == "'":
+            body = body.replace("''", "'")
+        return re.sub(r"\\(.)", lambda match: {"n": "\n", "t": "\t", "r": "\r"}.get(match.group(1), match.group(1)), body)
+
+    def _function(self, name: str, index: int) -> Callable:
+        definition = _FUNCTIONS.get(name.upper())
+        if not definition:
+            raise self._error("Unknown function '{}'".format(name), index)
+        method, minimum, maximum = definition
+        self._expect("op", "(")
+        args = []
+        if not self._accept("op", ")"):
+            args.append(self._or())
+            while self._accept("op", ","):
+                args.append(self._or())
+            self._expect("op", ")")
+        if len(args) < minimum or (maximum is not None and len(args) > maximum):
+            raise self._error("Wrong number of arguments for function '{}'".format(name), index)
+
+        if len(args) == 1:
+            operand = args[0]
+            return self._constant_or(lambda message: method(operand(message)), *args)
+        return self._constant_or(lambda message: method(*[arg(message) for arg in args]), *args)
+
+    def _system_reference(self, name: str, segments: tuple) -> Callable:
+        lowered = name.lower()
+        if lowered == "body":
+            if not segments:
+                return lambda message: message.body
+            if len(segments) == 1 and type(segments[0]) is str:
+                segment = segments[0]
+
+                def _body_property(message):
+                    body = message._body
+                    if body is _UNSET:
+                        body = message.body
+                    return body.get(segment, UNDEFINED) if type(body) is dict else UNDEFINED
+                _body_property.reference = ("body", segment)
+                return _body_property
+            return lambda message: _walk(message.body, segments)
+        if lowered == "twin":
+            return lambda message: _walk(message.twin, segments)
+
+        key = normalize_system_property(name)
+        if not segments:
+            return lambda message: message.system_properties.get(key, UNDEFINED)
+        return lambda message: _walk(message.system_properties.get(key, UNDEFINED), segments)
+
+    def _app_property(self, name: str, segments: tuple) -> Callable:
+        if not segments:
+            def _property(message):
+                return message.app_properties.get(name, UNDEFINED)
+            _property.reference = ("app", name)
+            return _property
+        return lambda message: _walk(message.app_properties.get(name, UNDEFINED), segments)
+
+    # Expression builders
+
+    @staticmethod
+    def _constant(value: Any) -> Callable:
+        def _value(message):
+            return value
+        _value.constant = True
+        return _value
+
+    def _constant_or(self, expression: Callable, *operands: Callable) -> Callable:
+        """Fold expressions over constants into a constant."""
+        if all(getattr(operand, "constant", False) for operand in operands):
+            return self._constant(expression(None))
+        return expression
+
+    def _binary(self, left: Callable, right: Callable, method: Callable) -> Callable:
+        if getattr(right, "constant", False):
+            value = right(None)
+            return self._constant_or(lambda message: method(left(message), value), left)
+        return self._constant_or(lambda message: method(left(message), right(message)), left, right)
+
+    def _logical_and(self, left: Callable, right: Callable) -> Callable:
+        def _and(message):
+            left_value = left(message)
+            if left_value is False:
+                return False
+            right_value = right(message)
+            if right_value is False:
+                return False
+            if left_value is True and right_value is True:
+                return True
+            return UNDEFINED
+        return self._constant_or(_and, left, right)
+
+    def _logical_or(self, left: Callable, right: Callable) -> Callable:
+        def _or(message):
+            left_value = left(message)
+            if left_value is True:
+                return True
+            right_value = right(message)
+            if right_value is True:
+                return True
+            if left_value is False and right_value is False:
+                return False
+            return UNDEFINED
+        return self._constant_or(_or, left, right)
+
+
+def compile_expression(condition: str) -> Callable[[RoutingMessage], Any]:
+    """Compile a routing query into a function returning its value for a message."""
+    if condition is None or not condition.strip():
+        condition = "true"
+    return _Parser(condition).parse()
+
+
+def compile_condition(condition: str) -> Callable[[RoutingMessage], bool]:
+    """Compile a route condition into a predicate, true only when the condition evaluates to true."""
+    expression = compile_expression(condition)
+    if getattr(expression, "constant", False):
+        matched = expression(None) is True
+        return lambda message: matched
+    return lambda message: expression(message) is True
+
+
+def _route_value(route: Any, key: str, attribute: str, default: Any = None) -> Any:
+    if isinstance(route, dict):
+        return route.get(key, default)
+    return getattr(route, attribute, default)
+
+
+class RouteSet(object):
+    """
+    A routing table compiled once. Routes are grouped by source, and the fallback route applies to device
+    messages that match no enabled route.
+    """
+
+    def __init__(self, routes: List[Any], fallback_route: Optional[Any] = None):
+        self.routes = []
+        self._by_source: Dict[str, List[tuple]] = {}
+        for index, route in enumerate(routes):
+            entry = {
+                "name": _route_value(route, "name", "name"),
+                "source": (_route_value(route, "source", "source") or "").lower(),
+                "condition": _route_value(route, "condition", "condition") or "true",
+                "endpointNames": _route_value(route, "endpointNames", "endpoint_names") or [],
+                "isEnabled": bool(_route_value(route, "isEnabled", "is_enabled", True)),
+                "matched": 0,
+            }
+            try:
+                predicate = compile_expression(entry["condition"])
+            except InvalidArgumentValueError as e:
+                entry["error"] = str(e)
+                entry["matched"] = None
+                predicate = None
+            self.routes.append(entry)
+            if predicate:
+                self._by_source.setdefault(entry["source"], []).append((index, predicate, entry["isEnabled"]))
+
+        self.fallback = None
+        self._fallback_predicate = None
+        if fallback_route is not None:
+            self.fallback = {
+                "name": _route_value(fallback_route, "name", "name") or FALLBACK_ROUTE_NAME,
+                "condition": _route_value(fallback_route, "condition", "condition") or "true",
+                "endpointNames": _route_value(fallback_route, "endpointNames", "endpoint_names") or [],
+                "isEnabled": bool(_route_value(fallback_route, "isEnabled", "is_enabled", False)),
+                "matched": 0,
+            }
+            self._fallback_predicate = compile_expression(self.fallback["condition"])
+        self.unrouted = 0
+
+    def match(self, message: RoutingMessage) -> List[str]:
+        """Names of the routes matching the message, the fallback route included. Counters are updated."""
+        matched = []
+        routed = False
+        for index, predicate, enabled in self._by_source.get(message.source, ()):
+            if predicate(message) is True:
+                entry = self.routes[index]
+                entry["matched"] += 1
+                matched.append(entry["name"])
+                routed = routed or enabled
+
+        if not routed:
+            if (
+                message.source == RouteSourceType.DeviceMessages.value
+                and self.fallback
+                and self.fallback["isEnabled"]
+                and self._fallback_predicate(message) is True
+            ):
+                self.fallback["matched"] += 1
+                matched.append(self.fallback["name"])
+            else:
+                self.unrouted += 1
+        return matched
+
+
+def read_corpus(stream: IO[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Read the JSON records of a message corpus. Records are either one per line or printed across lines
+    with indentation, like `az iot hub monitor-events` prints events, where the record starts with an
+    unindented opening bracket and ends with an unindented closing bracket.
+
+    Yields (line number, record, error) with the line the record starts on, and an error instead of the
+    record when it is not valid JSON.
+    """
+    pending: List[str] = []
+    start_line = 0
+    for line_number, line in enumerate(stream, 1):
+        if pending:
+            first = line[:1]
+            if first in ("}", "]"):
+                pending.append(line)
+                try:
+                    record = json.loads("".join(pending))
+                except ValueError:
+                    continue
+                pending = []
+                yield start_line, record, None
+                continue
+            if first not in ("{", "["):
+                pending.append(line)
+                continue
+            # an unindented opening bracket starts the next record, the pending one is incomplete
+            yield start_line, None, "Incomplete JSON record."
+            pending = []
+
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            if line[:1] in ("{", "["):
+                pending = [line]
+                start_line = line_number
+            else:
+                yield line_number, None, "Invalid JSON. {}".format(e)
+    if pending:
+        yield start_line, None, "Incomplete JSON record."
+
+
+def evaluate_corpus(route_set: RouteSet, stream: IO[str], source_type: Optional[str] = None) -> Tuple[int, List[int]]:
+    """
+    Match every message of a corpus against the route set, see read_corpus for the corpus format. Messages of
+    other sources than source_type are skipped when it is provided.
+
+    Returns the number of messages evaluated and the line numbers of records that are not valid messages.
+    """
+    source_type = source_type.lower() if source_type else None
+    match = route_set.match
+    from_json = RoutingMessage.from_json
+    messages = 0
+    invalid_lines = []
+    for line_number, record, error in read_corpus(stream):
+        if error is None:
+            try:
+                message = from_json(record)
+            except InvalidArgumentValueError as e:
+                error = str(e)
+        if error is not None:
+            invalid_lines.append(line_number)
+            continue
+        if source_type and message.source != source_type:
+            continue
+        messages += 1
+        match(message)
+    return messages, invalid_lines
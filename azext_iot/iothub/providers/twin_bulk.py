@@ -0,0 +1,278 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Bulk patching of device twins.
+
+Patches are read lazily from a JSON lines file and applied on a bounded worker pool sharing one
+service client. The etags of each chunk of devices are read with a single query, so patches are
+applied with optimistic concurrency and a precondition failure (412) reads the twin again and
+retries. Throttled (429) responses halve the number of patches in flight and pause every worker,
+the limit grows back as patches succeed.
+"""
+
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Condition, Lock
+from time import monotonic
+from typing import Iterator, List, Optional, Tuple
+from knack.log import get_logger
+from azure.cli.core.azclierror import FileOperationError, InvalidArgumentValueError
+from azext_iot._factory import CloudError, SdkResolver
+from azext_iot.common.shared import SdkType
+from azext_iot.common.utility import handle_service_exception, unpack_msrest_error
+from azext_iot.constants import (
+    DEVICE_BULK_UPDATE_ETAG_RETRIES,
+    DEVICE_QUERY_ID_CHUNK_SIZE,
+    DEVICE_TWIN_BULK_BACKOFF_MAX_SEC,
+    DEVICE_TWIN_BULK_MAX_THROTTLE_RETRIES,
+    DEVICE_TWIN_BULK_MAX_WORKERS,
+)
+from azext_iot.operations.generic import _execute_query_pages
+
+logger = get_logger(__name__)
+
+# Upper bound of submitted patches per worker, the patch file is read lazily behind it
+PENDING_PER_WORKER = 4
+
+
+class AdaptiveConcurrency(object):
+    """
+    Additive increase, multiplicative decrease limit on requests in flight. A throttled response halves
+    the limit and pauses all callers for the Retry-After of the response or an exponentially growing
+    delay. Every `limit` successful requests raise the limit by one, up to the maximum.
+    """
+
+    def __init__(self, maximum: int, initial_delay: float = 1.0, max_delay: float = DEVICE_TWIN_BULK_BACKOFF_MAX_SEC):
+        self.maximum = maximum
+        self.limit = maximum
+        self.in_flight = 0
+        self.throttled = 0
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.delay = 0
+        self.resume_at = 0
+        self._successes = 0
+        self._condition = Condition()
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                remaining = self.resume_at - monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                elif self.in_flight >= self.limit:
+                    self._condition.wait()
+                else:
+                    self.in_flight += 1
+                    return
+
+    def release(self, throttled: bool = False, retry_after: Optional[float] = None):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+                self.delay = min(max(self.delay * 2, self.initial_delay), self.max_delay)
+                delay = self.delay if retry_after is None else retry_after
+                self.resume_at = max(self.resume_at, monotonic() + delay)
+            else:
+                self.delay = self.delay / 2 if self.delay > self.initial_delay else 0
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+def _get_retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def read_twin_patches(patch_file: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Lazily read a JSON lines patch file. Each line is {"deviceId", "patch", "etag"} with an optional etag,
+    or {"deviceId", "tags", "properties": {"desired"}} with the patch inline.
+
+    Yields (line number, entry, error) where entry is {"deviceId", "patch", "etag"} or None when the line
+    is not a valid patch.
+    """
+    try:
+        with open(patch_file, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, _parse_twin_patch(json.loads(line)), None
+                except ValueError as e:
+                    yield line_number, None, str(e)
+    except (OSError, IOError) as e:
+        raise FileOperationError("Unable to read twin patch file '{}'. {}".format(patch_file, e))
+
+
+def _parse_twin_patch(entry) -> dict:
+    if not isinstance(entry, dict) or not isinstance(entry.get("deviceId"), str) or not entry["deviceId"]:
+        raise ValueError("Patch lines must be objects with a deviceId.")
+
+    patch = entry["patch"] if "patch" in entry else {
+        key: value for key, value in entry.items() if key not in ("deviceId", "etag")
+    }
+    if not isinstance(patch, dict) or not patch:
+        raise ValueError("The patch must be a non empty object.")
+    if set(patch) - {"tags", "properties"}:
+        raise ValueError("Only tags and desired properties can be patched.")
+    if "tags" in patch and not isinstance(patch["tags"], dict):
+        raise ValueError("Tags must be an object.")
+    if "properties" in patch:
+        properties = patch["properties"]
+        if not isinstance(properties, dict) or set(properties) != {"desired"} or not isinstance(properties["desired"], dict):
+            raise ValueError("Properties must be an object with desired properties only.")
+    return {"deviceId": entry["deviceId"], "patch": patch, "etag": entry.get("etag")}
+
+
+class TwinBulkPatcher(object):
+    def __init__(self, target: dict, max_workers: Optional[int] = None, results_file: Optional[str] = None):
+        if max_workers is not None and max_workers < 1:
+            raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+
+        self.service_sdk = SdkResolver(target=target).get_sdk(SdkType.service_sdk)
+        self.max_workers = max_workers or DEVICE_TWIN_BULK_MAX_WORKERS
+        self.concurrency = AdaptiveConcurrency(self.max_workers)
+        self.results_file = results_file
+        self.succeeded = 0
+        self.failed = 0
+        self.etag_retries = 0
+        self._results = None
+        self._lock = Lock()
+
+    def patch_all(self, patch_file: str) -> dict:
+        start = monotonic()
+        try:
+            self._results = open(self.results_file, "w", encoding="utf-8") if self.results_file else None
+        except (OSError, IOError) as e:
+            raise FileOperationError("Unable to write results file '{}'. {}".format(self.results_file, e))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = set()
+                for chunk in self._read_chunks(patch_file):
+                    etags = self._get_etags([entry["deviceId"] for entry in chunk if not entry["etag"]])
+                    for entry in chunk:
+                        if len(pending) >= self.max_workers * PENDING_PER_WORKER:
+                            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        pending.add(executor.submit(self._patch, entry, etags))
+                wait(pending)
+        finally:
+            if self._results:
+                self._results.close()
+
+        duration = monotonic() - start
+        if self.failed:
+            logger.warning("Failed to patch %s out of %s twins.", self.failed, self.succeeded + self.failed)
+        result = {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "throttled": self.concurrency.throttled,
+            "etagRetries": self.etag_retries,
+            "durationSeconds": round(duration, 3),
+            "patchesPerMinute": round(self.succeeded * 60 / duration, 2) if duration else 0.0,
+        }
+        if self.results_file:
+            result["resultsFile"] = self.results_file
+        return result
+
+    def _read_chunks(self, patch_file: str) -> Iterator[List[dict]]:
+        chunk = []
+        for line_number, entry, error in read_twin_patches(patch_file):
+            if error:
+                self._record({"line": line_number, "status": "failed", "error": error})
+                continue
+            chunk.append(entry)
+            if len(chunk) >= DEVICE_QUERY_ID_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _get_etags(self, device_ids: List[str]) -> dict:
+        """Current twin etags of the devices with one query, keyed by device Id."""
+        etags = {}
+        if not device_ids:
+            return etags
+        query = "select deviceId, etag from devices where deviceId in [{}]".format(
+            ", ".join("'{}'".format(device_id.replace("'", "\\'")) for device_id in device_ids)
+        )
+        try:
+            for page in _execute_query_pages([query], self.service_sdk.query.get_twins):
+                etags.update((twin["deviceId"], twin.get("etag")) for twin in page)
+        except CloudError as e:
+            handle_service_exception(e)
+        return etags
+
+    def _patch(self, entry: dict, etags: dict):
+        device_id = entry["deviceId"]
+        explicit_etag = bool(entry["etag"])
+        etag = entry["etag"] or etags.get(device_id)
+        if not etag:
+            self._record({"deviceId": device_id, "status": "failed", "error": "Device not found."})
+            return
+
+        throttle_retries = 0
+        etag_retries = 0
+        while True:
+            self.concurrency.acquire()
+            try:
+                response = self.service_sdk.devices.update_twin(
+                    id=device_id,
+                    device_twin_info=entry["patch"],
+                    custom_headers={"If-Match": '"{}"'.format(etag)},
+                    raw=True,
+                )
+            except CloudError as e:
+                status_code = getattr(e.response, "status_code", None)
+                self.concurrency.release(
+                    throttled=status_code == 429, retry_after=_get_retry_after(e.response) if status_code == 429 else None
+                )
+                if status_code == 429 and throttle_retries < DEVICE_TWIN_BULK_MAX_THROTTLE_RETRIES:
+                    throttle_retries += 1
+                    continue
+                if status_code == 412 and not explicit_etag and etag_retries < DEVICE_BULK_UPDATE_ETAG_RETRIES:
+                    # The twin changed since its etag was read, read it again and reapply the patch
+                    etag_retries += 1
+                    with self._lock:
+                        self.etag_retries += 1
+                    try:
+                        etag = self.service_sdk.devices.get_twin(id=device_id, raw=True).response.json()["etag"]
+                        continue
+                    except CloudError as get_error:
+                        e = get_error
+                self._record({"deviceId": device_id, "status": "failed", "statusCode": status_code,
+                              "error": unpack_msrest_error(e)})
+                return
+            except Exception as e:  # pylint: disable=broad-except
+                self.concurrency.release()
+                self._record({"deviceId": device_id, "status": "failed", "error": str(e)})
+                return
+
+            self.concurrency.release()
+            twin = response.response.json()
+            self._record({"deviceId": device_id, "status": "succeeded", "etag": twin.get("etag"),
+                          "version": twin.get("version")})
+            return
+
+    def _record(self, result: dict):
+        with self._lock:
+            if result["status"] == "succeeded":
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            if self._results:
+                self._results.write(json.dumps(result, separators=(",", ":")))
+                self._results.write("\n")
@@ -6,9 +6,13 @@
 
 from enum import Enum
 from collections import deque
+from functools import lru_cache
+from os.path import exists, join
+from threading import Lock
+from typing import Dict, Optional
 
 from knack.log import get_logger
-from azext_iot.common.utility import process_json_arg
+from azext_iot.common.utility import process_json_arg, read_file_content, shell_safe_json_parse
 
 from jsonschema import Draft4Validator, Draft7Validator
 
@@ -26,22 +30,28 @@ class JsonSchemaType(Enum):
 
 
 class JsonSchemaValidator(object):
+    """
+    Validates content against a json schema. The underlying jsonschema validator is built once,
+    so a single instance can validate many payloads, including from several threads.
+    """
+
     def __init__(self, schema, schema_type):
         self.schema = schema
         self.schema_type = schema_type
         self.errors = []
+        self._validator = self._get_validator()
 
-    def _add_error(self, error_msg, content_path, schema_path):
+    @staticmethod
+    def _format_error(error_msg, content_path, schema_path):
         if isinstance(content_path, deque):
             content_path = ".".join(map(str, list(content_path)))
         if isinstance(schema_path, deque):
             schema_path = ".".join(map(str, list(schema_path)))
-        e = {
+        return {
             "description": error_msg,
             "contentPath": content_path,
             "schemaPath": schema_path,
         }
-        self.errors.append(e)
 
     def _get_validator(self):
         if self.schema_type == JsonSchemaType.draft4:
@@ -54,16 +64,59 @@ class JsonSchemaValidator(object):
         if isinstance(content, str):
             content = process_json_arg(content, argument_name="content")
 
-        validator = self._get_validator()
-
-        if not validator:
+        errors = []
+        if not self._validator:
             logger.info("Json schema type not supported, skipping validation...")
-            return self.errors
+            self.errors = errors
+            return errors
 
         try:
-            for error in sorted(validator.iter_errors(content), key=str):
-                self._add_error(error.message, error.path, error.schema_path)
+            for error in sorted(self._validator.iter_errors(content), key=str):
+                errors.append(self._format_error(error.message, error.path, error.schema_path))
         except Exception:
             logger.info("Invalid json schema, skipping validation...")
 
-        return self.errors
+        self.errors = errors
+        return errors
+
+
+class JsonSchemaRegistry(object):
+    """
+    Json schemas of a directory, each loaded and compiled at most once. Schemas that are missing
+    or cannot be parsed are remembered as well and yield no validator.
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        self._validators: Dict[str, Optional[JsonSchemaValidator]] = {}
+        self._lock = Lock()
+
+    def get_validator(self, schema_name: str) -> Optional[JsonSchemaValidator]:
+        with self._lock:
+            if schema_name not in self._validators:
+                self._validators[schema_name] = self._load(schema_name)
+            return self._validators[schema_name]
+
+    def _load(self, schema_name: str) -> Optional[JsonSchemaValidator]:
+        schema_path = join(self.root_path, schema_name)
+        logger.info("Attempting to fetch schema content from %s...", schema_path)
+        if not exists(schema_path):
+            logger.info("Invalid schema path %s, skipping validation...", schema_path)
+            return None
+
+        try:
+            schema = shell_safe_json_parse(str(read_file_content(schema_path)))
+        except Exception:
+            logger.info("Unable to fetch schema content from %s skipping validation...", schema_path)
+            return None
+
+        schema_type = JsonSchemaType.draft4
+        if "/draft-07/" in schema.get("$schema", ""):
+            schema_type = JsonSchemaType.draft7
+        return JsonSchemaValidator(schema, schema_type)
+
+
+@lru_cache(maxsize=None)
+def get_schema_registry(root_path: str) -> JsonSchemaRegistry:
+    """Process wide schema registry of a directory."""
+    return JsonSchemaRegistry(root_path)
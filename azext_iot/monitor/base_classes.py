@@ -23,3 +23,7 @@ class AbstractBaseEventsHandler(ABC):
     @abstractmethod
     def parse_message(self, message):
         raise NotImplementedError()
+
+    def parse_message_batch(self, messages):
+        for message in messages:
+            self.parse_message(message)
@@ -0,0 +1,177 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Device template validators compiled ahead of time.
+
+Each telemetry schema of a device template is compiled once into a direct callable, nested Object
+fields included, so validating a message is a dictionary lookup and a function call per field
+instead of re-resolving the schema type through `validate` for every value. Compiled templates
+are cached per template id and recompiled when the template etag changes.
+"""
+
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from azext_iot.monitor.central_validator import utils
+from azext_iot.monitor.central_validator.validate_schema import iso_validator
+
+Validator = Callable[[Any], bool]
+
+GEOPOINT_REQUIRED_KEYS = frozenset(["lat", "lon"])
+GEOPOINT_ALL_KEYS = frozenset(["alt", "lat", "lon"])
+VECTOR_KEYS = frozenset(["x", "y", "z"])
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (float, int))
+
+
+def _validate_geopoint(value) -> bool:
+    if not isinstance(value, dict):
+        return False
+    keys = value.keys()
+    if not GEOPOINT_REQUIRED_KEYS <= keys or not keys <= GEOPOINT_ALL_KEYS:
+        return False
+    return all(_is_number(val) for val in value.values())
+
+
+def _validate_vector(value) -> bool:
+    if not isinstance(value, dict) or value.keys() != VECTOR_KEYS:
+        return False
+    return all(_is_number(val) for val in value.values())
+
+
+primitive_validators: Dict[str, Validator] = {
+    "boolean": lambda value: isinstance(value, bool),
+    "double": _is_number,
+    "float": _is_number,
+    "integer": lambda value: isinstance(value, int),
+    "long": _is_number,
+    "string": lambda value: isinstance(value, str),
+    "date": iso_validator.is_iso8601_date,
+    "dateTime": iso_validator.is_iso8601_datetime,
+    "duration": iso_validator.is_iso8601_duration,
+    "time": iso_validator.is_iso8601_time,
+    "geopoint": _validate_geopoint,
+    "vector": _validate_vector,
+}
+
+
+def _invalid(value) -> bool:
+    return False
+
+
+def _compile_enum(schema: dict) -> Validator:
+    enum_values = schema.get("schema", {}).get("enumValues", [])
+    allowed_values = [item["enumValue"] for item in enum_values if "enumValue" in item]
+    try:
+        allowed_set = frozenset(allowed_values)
+    except TypeError:
+        return lambda value: value in allowed_values
+
+    def validate_enum(value) -> bool:
+        try:
+            return value in allowed_set
+        except TypeError:
+            # unhashable payload values can never equal an enum value
+            return False
+
+    return validate_enum
+
+
+def _compile_object(schema: dict) -> Validator:
+    fields = schema.get("schema", {}).get("fields", [])
+    field_validators = {field["name"]: compile_validator(field) for field in fields}
+
+    def validate_object(value) -> bool:
+        if not isinstance(value, dict):
+            return False
+        for key, val in value.items():
+            field_validator = field_validators.get(key)
+            if field_validator is None or not field_validator(val):
+                return False
+        return True
+
+    return validate_object
+
+
+def compile_validator(schema: dict) -> Validator:
+    """
+    Compile a template schema into a callable with the same result as
+    `validate(schema, value)` for every value.
+    """
+    schema_type = utils.extract_schema_type(schema)
+
+    if schema_type == "Enum":
+        validator = _compile_enum(schema)
+    elif schema_type == "Object":
+        validator = _compile_object(schema)
+    else:
+        validator = primitive_validators.get(schema_type, _invalid)
+
+    def validate_value(value) -> bool:
+        # if theres nothing to validate, then its valid
+        return value is None or validator(value)
+
+    return validate_value
+
+
+class CompiledField(NamedTuple):
+    schema: dict
+    expected_type: Optional[str]
+    validate: Validator
+
+
+class CompiledTemplate(object):
+    def __init__(self, template):
+        self.template_id = template.id
+        self.interfaces = self._compile_entities(template.interfaces)
+        self.components = self._compile_entities(template.components or {})
+
+    @staticmethod
+    def _compile_entities(entities: dict) -> Dict[str, Dict[str, CompiledField]]:
+        return {
+            identifier: {
+                name: CompiledField(schema, utils.extract_schema_type(schema), compile_validator(schema))
+                for name, schema in schemas.items()
+                if schema
+            }
+            for identifier, schemas in entities.items()
+        }
+
+    def get_field(self, name, is_component=False, identifier="") -> Optional[CompiledField]:
+        """Same lookup semantics as Template.get_schema."""
+        entities = self.components if is_component else self.interfaces
+        if identifier:
+            return entities.get(identifier, {}).get(name)
+
+        for fields in entities.values():
+            field = fields.get(name)
+            if field:
+                return field
+        return None
+
+
+class CompiledTemplateCache(object):
+    def __init__(self):
+        self._templates: Dict[str, tuple] = {}
+
+    def get(self, template) -> CompiledTemplate:
+        raw_template = template.raw_template or {}
+        etag = raw_template.get("etag")
+        cached = self._templates.get(template.id)
+        if cached:
+            cached_etag, cached_raw_template, compiled = cached
+            # templates without an etag are only reused for the same template object
+            if (etag and etag == cached_etag) or raw_template is cached_raw_template:
+                return compiled
+
+        compiled = CompiledTemplate(template)
+        self._templates[template.id] = (etag, raw_template, compiled)
+        return compiled
+
+    def clear(self):
+        self._templates.clear()
@@ -0,0 +1,115 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Local file checkpoint store for the event monitor.
+
+The last processed offset and sequence number of each partition is kept in memory and written to
+a JSON file at most once per interval (and when the monitor stops). A resumed monitor starts each
+checkpointed partition right after its stored offset.
+"""
+
+import json
+import os
+import re
+from time import monotonic
+from typing import Dict, Optional
+from knack.log import get_logger
+from azure.cli.core.azclierror import FileOperationError
+from azext_iot.constants import EXTENSION_CONFIG_ROOT_KEY, MONITOR_CHECKPOINT_INTERVAL_SEC
+
+logger = get_logger(__name__)
+
+OFFSET_IDENTIFIER = b"x-opt-offset"
+SEQUENCE_NUMBER_IDENTIFIER = b"x-opt-sequence-number"
+ENQUEUED_TIME_IDENTIFIER = b"x-opt-enqueued-time"
+CHECKPOINT_DIR_NAME = "checkpoints"
+
+
+def get_default_checkpoint_file(hub_name: str, consumer_group: str) -> str:
+    config_dir = os.getenv("AZURE_CONFIG_DIR") or os.path.expanduser(os.path.join("~", ".azure"))
+    filename = "{}_{}.json".format(hub_name, consumer_group)
+    filename = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return os.path.join(config_dir, EXTENSION_CONFIG_ROOT_KEY, CHECKPOINT_DIR_NAME, filename)
+
+
+class CheckpointStore(object):
+    def __init__(
+        self,
+        path: str,
+        event_hub: str,
+        consumer_group: str,
+        interval: int = MONITOR_CHECKPOINT_INTERVAL_SEC,
+        resume: bool = False,
+    ):
+        self.path = path
+        self.event_hub = event_hub
+        self.consumer_group = consumer_group
+        self.interval = interval
+        self.checkpoints: Dict[str, dict] = {}
+        self.stored: Dict[str, dict] = self._load() if resume else {}
+        self.dirty = False
+        self.last_flush = monotonic()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, mode="r", encoding="utf8") as f:
+                content = json.loads(f.read())
+        except FileNotFoundError:
+            logger.warning("No checkpoints found at %s, starting from the enqueued time.", self.path)
+            return {}
+        except (OSError, IOError, ValueError) as e:
+            raise FileOperationError("Unable to read checkpoints from {}. {}".format(self.path, e))
+
+        if content.get("eventHub") != self.event_hub or content.get("consumerGroup") != self.consumer_group:
+            logger.warning(
+                "Checkpoints at %s belong to event hub '%s' and consumer group '%s', ignoring them.",
+                self.path,
+                content.get("eventHub"),
+                content.get("consumerGroup"),
+            )
+            return {}
+        return content.get("partitions", {})
+
+    def get_offset(self, partition: str) -> Optional[str]:
+        checkpoint = self.stored.get(str(partition))
+        return checkpoint["offset"] if checkpoint else None
+
+    def update(self, partition: str, message):
+        annotations = message.annotations or {}
+        offset = annotations.get(OFFSET_IDENTIFIER)
+        if offset is None:
+            return
+        if isinstance(offset, bytes):
+            offset = str(offset, "utf8")
+
+        self.checkpoints[str(partition)] = {
+            "offset": str(offset),
+            "sequenceNumber": annotations.get(SEQUENCE_NUMBER_IDENTIFIER),
+            "enqueuedTime": annotations.get(ENQUEUED_TIME_IDENTIFIER),
+        }
+        self.dirty = True
+        if monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = monotonic()
+        if not self.dirty:
+            return
+
+        partitions = dict(self.stored)
+        partitions.update(self.checkpoints)
+        content = {"eventHub": self.event_hub, "consumerGroup": self.consumer_group, "partitions": partitions}
+        temp_path = "{}.tmp".format(self.path)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(temp_path, mode="w", encoding="utf8") as f:
+                f.write(json.dumps(content, indent=2))
+            # Atomic replace, a crash mid-write never leaves a truncated checkpoint file
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except (OSError, IOError) as e:
+            logger.warning("Unable to write checkpoints to %s. %s", self.path, e)
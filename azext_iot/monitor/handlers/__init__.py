@@ -6,5 +6,6 @@
 
 from azext_iot.monitor.handlers.common_handler import CommonHandler
 from azext_iot.monitor.handlers.central_handler import CentralHandler
+from azext_iot.monitor.handlers.stats_handler import StatsHandler
 
-__all__ = ["CommonHandler", "CentralHandler"]
+__all__ = ["CommonHandler", "CentralHandler", "StatsHandler"]
@@ -17,8 +17,9 @@ from azext_iot.central.providers import (
 )
 from azext_iot.monitor.handlers import CommonHandler
 from azext_iot.monitor.models.arguments import CentralHandlerArguments
+from azext_iot.monitor.central_validator.compiled import CompiledTemplateCache
 from azext_iot.monitor.parsers.central_parser import CentralParser
-from azext_iot.monitor.parsers.issue import Issue
+from azext_iot.monitor.parsers.issue import IssueStore
 
 logger = get_logger(__name__)
 
@@ -40,9 +41,12 @@ class CentralHandler(CommonHandler):
 
         self._central_handler_args = central_handler_args
 
-        self._messages = []
-        self._issues: List[Issue] = []
+        self._message_count = 0
+        # issues are aggregated so memory stays constant on long running validations
+        self._issues = IssueStore(sample_size=self._central_handler_args.issue_sample_size)
         self._central_dns_suffix = central_dns_suffix
+        # device templates are compiled into validators once and shared across messages
+        self._compiled_template_cache = CompiledTemplateCache()
 
         if self._central_handler_args.duration:
             loop = get_loop()
@@ -51,25 +55,26 @@ class CentralHandler(CommonHandler):
                 self._central_handler_args.duration + 5, self._quit_duration_exceeded
             )
 
+        if self._central_handler_args.summary_interval:
+            get_loop().call_later(self._central_handler_args.summary_interval, self._on_summary_interval)
+
     def validate_message(self, message):
+        if not self._message_filter.accepts(message):
+            return
+
         parser = CentralParser(
             message=message,
             common_parser_args=self._common_handler_args.common_parser_args,
             central_device_provider=self._central_device_provider,
             central_template_provider=self._central_template_provider,
             central_dns_suffix=self._central_dns_suffix,
+            compiled_template_cache=self._compiled_template_cache,
         )
 
-        if not self._should_process_device(parser.device_id):
-            return
-
-        if not self._should_process_module(parser.module_id):
-            return
-
-        parsed_message = parser.parse_message()
+        parser.parse_message()
 
-        self._messages.append(parsed_message)
-        n_messages = len(self._messages)
+        self._message_count += 1
+        n_messages = self._message_count
 
         issues = parser.issues_handler.get_issues_with_minimum_severity(
             self._central_handler_args.minimum_severity
@@ -121,8 +126,12 @@ class CentralHandler(CommonHandler):
         if (n_messages % self._central_handler_args.progress_interval) == 0:
             print("Processed {} messages...".format(n_messages), flush=True)
 
+    def _on_summary_interval(self):
+        print(self._issues.summary(), flush=True)
+        get_loop().call_later(self._central_handler_args.summary_interval, self._on_summary_interval)
+
     def _print_results(self):
-        n_messages = len(self._messages)
+        n_messages = self._message_count
 
         if not self._issues:
             print("No errors detected after parsing {} message(s).".format(n_messages))
@@ -133,7 +142,7 @@ class CentralHandler(CommonHandler):
 
         print("Processing and displaying results.")
 
-        issues = [issue.json_repr() for issue in self._issues]
+        issues = [issue.json_repr() for issue in self._issues.get_issues()]
 
         if self._central_handler_args.style.lower() == "json":
             self._handle_json_summary(issues)
@@ -143,15 +152,24 @@ class CentralHandler(CommonHandler):
             self._handle_csv_summary(issues)
             return
 
-    def _handle_json_summary(self, issues: List[Issue]):
+    def _handle_json_summary(self, issues: List[dict]):
         import json
 
         output = json.dumps(issues, indent=4)
         print(output)
 
-    def _handle_csv_summary(self, issues: List[Issue]):
-        fieldnames = ["severity", "details", "message", "device_id", "template_id"]
-        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
+    def _handle_csv_summary(self, issues: List[dict]):
+        fieldnames = [
+            "severity",
+            "details",
+            "message",
+            "device_id",
+            "template_id",
+            "count",
+            "first_seen",
+            "last_seen",
+        ]
+        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames, extrasaction="ignore")
         writer.writeheader()
         for issue in issues:
             writer.writerow(issue)
@@ -0,0 +1,280 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Dict, List, Optional
+
+import isodate
+from knack.log import get_logger
+
+from azext_iot.common.utility import compute_percentiles
+from azext_iot.monitor.handlers.common_handler import CommonHandler
+from azext_iot.monitor.models.arguments import StatsHandlerArguments
+from azext_iot.monitor.parsers.common_parser import CommonParser
+from azext_iot.monitor.utility import get_loop, stop_monitor
+
+logger = get_logger(__name__)
+
+ENQUEUED_TIME_IDENTIFIERS = (b"iothub-enqueuedtime", b"x-opt-enqueued-time")
+CREATION_TIME_IDENTIFIER = b"iothub-creation-time-utc"
+PAYLOAD_SIZE_BUCKETS = (128, 256, 512, 1024, 4096, 16384, 65536, 262144)
+RESERVOIR_SIZE = 10000
+SUMMARY_TOP_ROWS = 10
+PERCENTILES = (50, 90, 99)
+
+
+class Reservoir(object):
+    """Fixed size uniform sample of a stream of values (reservoir sampling), with exact count and max."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE, rng: Optional[random.Random] = None):
+        self.size = size
+        self.rng = rng or random.Random()
+        self.samples: List[float] = []
+        self.count = 0
+        self.max = None
+
+    def add(self, value: float):
+        self.count += 1
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+            return
+        index = self.rng.randrange(self.count)
+        if index < self.size:
+            self.samples[index] = value
+
+    def summary(self) -> dict:
+        result = {"p{}".format(p): v for p, v in compute_percentiles(self.samples, PERCENTILES).items()}
+        result["max"] = round(self.max, 2) if self.max is not None else None
+        result["samples"] = self.count
+        return result
+
+
+class StatsHandler(CommonHandler):
+    """
+    Aggregates events instead of printing them: message rates per device, module and partition,
+    payload size histogram and end-to-end latency (hub enqueued time minus device side timestamp).
+    A rolling summary is printed every interval and final statistics are available as JSON.
+    """
+
+    def __init__(self, stats_handler_args: StatsHandlerArguments):
+        super(StatsHandler, self).__init__(common_handler_args=stats_handler_args.common_handler_args)
+        self._stats_handler_args = stats_handler_args
+
+        self.start_time = monotonic()
+        self.window_start = self.start_time
+        self.device_counts = Counter()
+        self.module_counts = Counter()
+        self.partition_counts = Counter()
+        self.window_device_counts = Counter()
+        self.window_module_counts = Counter()
+        self.window_partition_counts = Counter()
+        self.size_histogram = Counter()
+        self.payload_sizes = Reservoir()
+        self.latencies = Reservoir()
+        self.latency_missing = 0
+
+        if self._stats_handler_args.summary_interval:
+            get_loop().call_later(self._stats_handler_args.summary_interval, self._on_summary_interval)
+
+    def parse_message(self, message):
+        if not self._message_filter.accepts(message):
+            return
+
+        parser = CommonParser(
+            message=message,
+            common_parser_args=self._common_handler_args.common_parser_args,
+        )
+
+        self.record(
+            device_id=parser.device_id,
+            module_id=parser.module_id,
+            partition_id=str(getattr(message, "partition_id", "")),
+            payload=_get_payload(message),
+            enqueued_time=_get_enqueued_time(message),
+            creation_time=_get_creation_time(message),
+        )
+
+        self.message_count += 1
+        if self._common_handler_args.max_messages and self.message_count == self._common_handler_args.max_messages:
+            message = "Successfully parsed {} message(s).".format(self._common_handler_args.max_messages)
+            print(message, flush=True)
+            stop_monitor()
+
+    def record(
+        self,
+        device_id: str,
+        module_id: str,
+        partition_id: str,
+        payload: bytes,
+        enqueued_time: Optional[datetime],
+        creation_time: Optional[datetime] = None,
+    ):
+        self.device_counts[device_id] += 1
+        self.window_device_counts[device_id] += 1
+        self.partition_counts[partition_id] += 1
+        self.window_partition_counts[partition_id] += 1
+        if module_id:
+            module_key = "{}/{}".format(device_id, module_id)
+            self.module_counts[module_key] += 1
+            self.window_module_counts[module_key] += 1
+
+        size = len(payload)
+        self.payload_sizes.add(size)
+        self.size_histogram[_size_bucket(size)] += 1
+
+        device_time = creation_time or self._get_payload_timestamp(payload)
+        if enqueued_time and device_time:
+            self.latencies.add((enqueued_time - device_time).total_seconds() * 1000)
+        else:
+            self.latency_missing += 1
+
+    def _get_payload_timestamp(self, payload: bytes) -> Optional[datetime]:
+        timestamp_field = self._stats_handler_args.timestamp_field
+        if not timestamp_field or not payload:
+            return None
+        try:
+            body = json.loads(payload)
+        except ValueError:
+            return None
+        if not isinstance(body, dict):
+            return None
+        return _parse_timestamp(body.get(timestamp_field))
+
+    def _on_summary_interval(self):
+        print(self.generate_summary_table(), flush=True)
+        get_loop().call_later(self._stats_handler_args.summary_interval, self._on_summary_interval)
+
+    def generate_summary_table(self) -> str:
+        now = monotonic()
+        window = max(now - self.window_start, 1e-6)
+        total = sum(self.device_counts.values())
+        window_total = sum(self.window_device_counts.values())
+        latency = compute_percentiles(self.latencies.samples, PERCENTILES)
+
+        lines = [
+            "[{}] {} message(s), {:.1f} msg/s over the last {:.0f}s. Latency ms p50: {} p90: {} p99: {}".format(
+                datetime.now().strftime("%H:%M:%S"),
+                total,
+                window_total / window,
+                window,
+                latency[50],
+                latency[90],
+                latency[99],
+            )
+        ]
+        for title, window_counts, counts in [
+            ("Partition", self.window_partition_counts, self.partition_counts),
+            ("Device", self.window_device_counts, self.device_counts),
+            ("Module", self.window_module_counts, self.module_counts),
+        ]:
+            if not counts:
+                continue
+            rows = sorted(counts, key=lambda k: (-window_counts[k], -counts[k]))[:SUMMARY_TOP_ROWS]
+            width = max(len(title), max(len(str(r)) for r in rows))
+            lines.append("  {:<{w}}  {:>10}  {:>10}".format(title, "msg/s", "total", w=width))
+            for row in rows:
+                lines.append(
+                    "  {:<{w}}  {:>10.1f}  {:>10}".format(str(row), window_counts[row] / window, counts[row], w=width)
+                )
+
+        self.window_start = now
+        self.window_device_counts.clear()
+        self.window_module_counts.clear()
+        self.window_partition_counts.clear()
+        return "\n".join(lines)
+
+    def generate_final_stats(self) -> dict:
+        duration = max(monotonic() - self.start_time, 1e-6)
+        total = sum(self.device_counts.values())
+
+        def rates(counts: Counter) -> Dict[str, dict]:
+            return {
+                str(key): {"messages": count, "messagesPerSecond": round(count / duration, 2)}
+                for key, count in counts.most_common()
+            }
+
+        payload_bytes = self.payload_sizes.summary()
+        payload_bytes["histogram"] = {
+            label: self.size_histogram[label]
+            for label in [_size_bucket(b) for b in PAYLOAD_SIZE_BUCKETS] + [_size_bucket(PAYLOAD_SIZE_BUCKETS[-1] + 1)]
+            if self.size_histogram[label]
+        }
+        latency = self.latencies.summary()
+        latency["missingTimestamps"] = self.latency_missing
+
+        return {
+            "messages": total,
+            "durationSeconds": round(duration, 3),
+            "messagesPerSecond": round(total / duration, 2),
+            "latencyMs": latency,
+            "payloadBytes": payload_bytes,
+            "partitions": rates(self.partition_counts),
+            "devices": rates(self.device_counts),
+            "modules": rates(self.module_counts),
+        }
+
+    def print_final_stats(self):
+        print(json.dumps(self.generate_final_stats(), indent=4), flush=True)
+
+
+def _size_bucket(size: int) -> str:
+    for bound in PAYLOAD_SIZE_BUCKETS:
+        if size <= bound:
+            return "<={}".format(bound)
+    return ">{}".format(PAYLOAD_SIZE_BUCKETS[-1])
+
+
+def _get_payload(message) -> bytes:
+    try:
+        data = message.get_data()
+        return b"".join(data) if data else b""
+    except Exception:
+        return b""
+
+
+def _get_enqueued_time(message) -> Optional[datetime]:
+    annotations = message.annotations or {}
+    for identifier in ENQUEUED_TIME_IDENTIFIERS:
+        value = _parse_timestamp(annotations.get(identifier))
+        if value:
+            return value
+    return None
+
+
+def _get_creation_time(message) -> Optional[datetime]:
+    properties = message.application_properties or {}
+    return _parse_timestamp(properties.get(CREATION_TIME_IDENTIFIER))
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """
+    Parse a timestamp given as a datetime, epoch seconds or milliseconds, or an ISO 8601 string.
+    Naive values are treated as UTC.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        if isinstance(value, datetime):
+            result = value
+        elif isinstance(value, (int, float)):
+            # AMQP timestamps are milliseconds since epoch
+            seconds = value / 1000 if value > 1e11 else value
+            result = datetime.fromtimestamp(seconds, tz=timezone.utc)
+        else:
+            if isinstance(value, bytes):
+                value = str(value, "utf8")
+            result = isodate.parse_datetime(value.strip().replace(" ", "T", 1))
+    except Exception:
+        return None
+
+    if result.tzinfo is None:
+        result = result.replace(tzinfo=timezone.utc)
+    return result
@@ -0,0 +1,106 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Precompiled device/module/interface filter for monitored events.
+
+Filters are compiled once per monitor and evaluated against the raw annotation bytes of each
+message, so rejected messages are dropped before any parsing or decoding happens.
+"""
+
+import re
+from typing import Iterable, Optional, Union
+
+from azext_iot.monitor.parsers.common_parser import (
+    DEVICE_ID_IDENTIFIER,
+    INTERFACE_NAME_IDENTIFIER_V1,
+    INTERFACE_NAME_IDENTIFIER_V2,
+    MODULE_ID_IDENTIFIER,
+)
+
+
+def _to_bytes(value: Union[str, bytes, None]) -> bytes:
+    if value is None:
+        return b""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf8")
+
+
+class IdMatcher(object):
+    """
+    Matches ids against exact ids with a hash lookup and against wildcard patterns (* and ?)
+    with a single compiled alternation. An empty matcher matches everything.
+    """
+
+    def __init__(self, patterns: Iterable[str] = None, wildcards: bool = True):
+        exact = set()
+        wildcard_patterns = []
+        for pattern in patterns or []:
+            if not pattern:
+                continue
+            if wildcards and ("*" in pattern or "?" in pattern):
+                wildcard_patterns.append(
+                    re.escape(_to_bytes(pattern)).replace(b"\\*", b".*").replace(b"\\?", b".")
+                )
+            else:
+                exact.add(_to_bytes(pattern))
+
+        self.exact = frozenset(exact)
+        self.regex = re.compile(b"(?:" + b"|".join(wildcard_patterns) + b")$") if wildcard_patterns else None
+        self.match_all = not self.exact and not self.regex
+
+    def matches(self, value: Union[str, bytes, None]) -> bool:
+        if self.match_all:
+            return True
+        value = _to_bytes(value)
+        if value in self.exact:
+            return True
+        return bool(self.regex and self.regex.match(value))
+
+
+class MessageFilter(object):
+    def __init__(
+        self,
+        device_id: Optional[str] = None,
+        devices: Optional[Iterable[str]] = None,
+        module_id: Optional[str] = None,
+        interface_name: Optional[str] = None,
+    ):
+        self.device_matcher = IdMatcher([device_id] if device_id else None)
+        # Ids from a device query are exact, even if they contain wildcard characters
+        self.devices_matcher = IdMatcher(devices, wildcards=False)
+        self.module_matcher = IdMatcher([module_id] if module_id else None)
+        self.interface_name = _to_bytes(interface_name) if interface_name else None
+        self.match_all = (
+            self.device_matcher.match_all
+            and self.devices_matcher.match_all
+            and self.module_matcher.match_all
+            and not self.interface_name
+        )
+
+    def should_process_device(self, device_id: Union[str, bytes, None]) -> bool:
+        return self.device_matcher.matches(device_id) and self.devices_matcher.matches(device_id)
+
+    def should_process_module(self, module_id: Union[str, bytes, None]) -> bool:
+        return self.module_matcher.matches(module_id)
+
+    def should_process_interface(self, interface_name: Union[str, bytes, None]) -> bool:
+        return not self.interface_name or self.interface_name == _to_bytes(interface_name)
+
+    def accepts(self, message) -> bool:
+        """Evaluate the filter against the raw annotations of a ~uamqp.message.Message."""
+        if self.match_all:
+            return True
+
+        annotations = message.annotations or {}
+        if not self.should_process_device(annotations.get(DEVICE_ID_IDENTIFIER)):
+            return False
+        if self.interface_name and not self.should_process_interface(
+            annotations.get(INTERFACE_NAME_IDENTIFIER_V1) or annotations.get(INTERFACE_NAME_IDENTIFIER_V2)
+        ):
+            return False
+        return self.should_process_module(annotations.get(MODULE_ID_IDENTIFIER))
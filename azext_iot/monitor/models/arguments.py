@@ -6,6 +6,7 @@
 
 from azure.cli.core.commands import AzCliCommand
 from azext_iot.common.utility import init_monitoring
+from azext_iot.constants import MONITOR_ISSUE_SAMPLE_SIZE
 from azext_iot.monitor.models.enum import Severity
 from typing import Optional
 
@@ -62,6 +63,18 @@ class CommonHandlerArguments:
         self.max_messages = max_messages
 
 
+class StatsHandlerArguments:
+    def __init__(
+        self,
+        common_handler_args: CommonHandlerArguments,
+        summary_interval: int = 5,
+        timestamp_field: Optional[str] = "timestamp",
+    ):
+        self.common_handler_args = common_handler_args
+        self.summary_interval = summary_interval
+        self.timestamp_field = timestamp_field
+
+
 class CentralHandlerArguments:
     def __init__(
         self,
@@ -71,10 +84,14 @@ class CentralHandlerArguments:
         style="json",
         minimum_severity=Severity.warning,
         progress_interval=5,
+        summary_interval: int = 0,
+        issue_sample_size: int = MONITOR_ISSUE_SAMPLE_SIZE,
     ):
         self.duration = duration
         self.max_messages = max_messages
         self.minimum_severity = minimum_severity
         self.progress_interval = progress_interval
+        self.summary_interval = summary_interval
+        self.issue_sample_size = issue_sample_size
         self.style = style
         self.common_handler_args = common_handler_args
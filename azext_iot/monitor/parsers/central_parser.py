@@ -11,7 +11,7 @@ from uamqp.message import Message
 from azext_iot.central.providers import CentralDeviceProvider
 from azext_iot.central.providers import CentralDeviceTemplateProvider
 from azext_iot.monitor.parsers import strings
-from azext_iot.monitor.central_validator import validate, extract_schema_type
+from azext_iot.monitor.central_validator.compiled import CompiledField, CompiledTemplateCache
 from azext_iot.monitor.models.arguments import CommonParserArguments
 from azext_iot.monitor.models.enum import Severity
 from azext_iot.monitor.parsers.common_parser import CommonParser
@@ -27,6 +27,7 @@ class CentralParser(CommonParser):
         central_device_provider: CentralDeviceProvider,
         central_template_provider: CentralDeviceTemplateProvider,
         central_dns_suffix=CENTRAL_ENDPOINT,
+        compiled_template_cache: CompiledTemplateCache = None,
     ):
         super(CentralParser, self).__init__(
             message=message, common_parser_args=common_parser_args
@@ -35,14 +36,16 @@ class CentralParser(CommonParser):
         self._central_template_provider = central_template_provider
         self._central_dns_suffix = central_dns_suffix
         self._template_id = None
+        self._compiled_template_cache = compiled_template_cache or CompiledTemplateCache()
 
-    def _add_central_issue(self, severity: Severity, details: str):
+    def _add_central_issue(self, severity: Severity, details: str, kind: str = None):
         self.issues_handler.add_central_issue(
             severity=severity,
             details=details,
             message=self._message,
             device_id=self.device_id,
             template_id=self._template_id,
+            kind=kind,
         )
 
     def parse_message(self) -> dict:
@@ -137,17 +140,18 @@ class CentralParser(CommonParser):
     def _validate_payload(
         self, payload: dict, template: TemplatePreview, is_component: bool
     ):
+        compiled_template = self._compiled_template_cache.get(template)
         name_miss = []
         for telemetry_name, telemetry in payload.items():
-            schema = template.get_schema(
+            field = compiled_template.get_field(
                 name=telemetry_name,
                 identifier=self.component_name,
                 is_component=is_component,
             )
-            if not schema:
+            if not field:
                 name_miss.append(telemetry_name)
             else:
-                self._process_telemetry(telemetry_name, schema, telemetry)
+                self._process_telemetry(telemetry_name, field, telemetry)
 
         if name_miss:
             if is_component:
@@ -161,11 +165,11 @@ class CentralParser(CommonParser):
                 )
             self._add_central_issue(severity=Severity.warning, details=details)
 
-    def _process_telemetry(self, telemetry_name: str, schema, telemetry):
-        expected_type = extract_schema_type(schema)
-        is_payload_valid = validate(schema, telemetry)
-        if expected_type and not is_payload_valid:
+    def _process_telemetry(self, telemetry_name: str, field: CompiledField, telemetry):
+        if field.expected_type and not field.validate(telemetry):
             details = strings.invalid_primitive_schema_mismatch_template(
-                telemetry_name, expected_type, telemetry
+                telemetry_name, field.expected_type, telemetry
             )
-            self._add_central_issue(severity=Severity.error, details=details)
+            # details embed the sent value, aggregate per field instead
+            kind = "schema_mismatch:{}".format(telemetry_name)
+            self._add_central_issue(severity=Severity.error, details=details, kind=kind)
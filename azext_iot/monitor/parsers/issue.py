@@ -4,20 +4,27 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from typing import List
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from knack.log import get_logger
 
+from azext_iot.constants import MONITOR_ISSUE_MAX_GROUPS, MONITOR_ISSUE_SAMPLE_SIZE
 from azext_iot.monitor.models.enum import Severity
 
 logger = get_logger(__name__)
 
 
 class Issue:
-    def __init__(self, severity: Severity, details: str, message, device_id=""):
+    __slots__ = ("severity", "details", "device_id", "message", "kind")
+
+    def __init__(self, severity: Severity, details: str, message, device_id="", kind=None):
         self.severity = severity
         self.details = details
         self.device_id = device_id
         self.message = str(message)
+        # issues of the same kind are aggregated together, details may vary with the payload
+        self.kind = kind or details
 
         if not self.device_id:
             self.device_id = "Unknown"
@@ -40,16 +47,21 @@ class Issue:
             logger.error(to_log)
 
     def json_repr(self):
-        json_repr = vars(self)
-        json_repr["severity"] = self.severity.name
-        return json_repr
+        return {
+            "severity": self.severity.name,
+            "details": self.details,
+            "device_id": self.device_id,
+            "message": self.message,
+        }
 
 
 class CentralIssue(Issue):
+    __slots__ = ("template_id",)
+
     def __init__(
-        self, severity: Severity, details: str, message, device_id="", template_id=""
+        self, severity: Severity, details: str, message, device_id="", template_id="", kind=None
     ):
-        super(CentralIssue, self).__init__(severity, details, message, device_id)
+        super(CentralIssue, self).__init__(severity, details, message, device_id, kind)
         self.template_id = template_id
 
         if not self.template_id:
@@ -62,19 +74,24 @@ class CentralIssue(Issue):
 
         self._log(to_log)
 
+    def json_repr(self):
+        json_repr = super(CentralIssue, self).json_repr()
+        json_repr["template_id"] = self.template_id
+        return json_repr
+
 
 class IssueHandler:
     def __init__(self):
         self._issues = []
 
-    def add_issue(self, severity: Severity, details: str, message, device_id=""):
+    def add_issue(self, severity: Severity, details: str, message, device_id="", kind=None):
         issue = Issue(
-            severity=severity, details=details, message=message, device_id=device_id
+            severity=severity, details=details, message=message, device_id=device_id, kind=kind
         )
         self._issues.append(issue)
 
     def add_central_issue(
-        self, severity: Severity, details: str, message, device_id="", template_id=""
+        self, severity: Severity, details: str, message, device_id="", template_id="", kind=None
     ):
         issue = CentralIssue(
             severity=severity,
@@ -82,6 +99,7 @@ class IssueHandler:
             message=message,
             device_id=device_id,
             template_id=template_id,
+            kind=kind,
         )
         self._issues.append(issue)
 
@@ -128,3 +146,108 @@ class IssueHandler:
             "error" will not be included
         """
         return [issue for issue in self._issues if issue.severity <= severity]
+
+
+class AggregatedIssue:
+    __slots__ = (
+        "severity",
+        "details",
+        "device_id",
+        "template_id",
+        "count",
+        "first_seen",
+        "last_seen",
+        "samples",
+    )
+
+    def __init__(self, issue: Issue, sample_size: int):
+        self.severity = issue.severity
+        self.details = issue.details
+        self.device_id = issue.device_id
+        self.template_id = getattr(issue, "template_id", None)
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.samples = deque(maxlen=sample_size)
+
+    def add(self, issue: Issue, seen: datetime):
+        self.count += 1
+        self.first_seen = self.first_seen or seen
+        self.last_seen = seen
+        self.samples.append(issue.message)
+
+    def json_repr(self):
+        json_repr = {
+            "severity": self.severity.name,
+            "details": self.details,
+            "device_id": self.device_id,
+            "count": self.count,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            # most recent raw message, the remaining samples are kept in "samples"
+            "message": self.samples[-1] if self.samples else None,
+            "samples": list(self.samples),
+        }
+        if self.template_id is not None:
+            json_repr["template_id"] = self.template_id
+        return json_repr
+
+
+class IssueStore:
+    """
+    Aggregates issues of a long running validation by (device, template, severity, kind).
+
+    Each group keeps a counter, first and last seen timestamps and a bounded ring of raw message
+    samples, and the number of groups is capped, so memory stays constant no matter how many
+    messages are validated.
+    """
+
+    def __init__(self, sample_size: int = MONITOR_ISSUE_SAMPLE_SIZE, max_groups: int = MONITOR_ISSUE_MAX_GROUPS):
+        self.sample_size = sample_size
+        self.max_groups = max_groups
+        self.total = 0
+        self.dropped = 0
+        self._groups: Dict[Tuple, AggregatedIssue] = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __bool__(self):
+        return self.total > 0
+
+    def add(self, issue: Issue, seen: Optional[datetime] = None):
+        self.total += 1
+        key = (issue.device_id, getattr(issue, "template_id", None), issue.severity, issue.kind)
+        group = self._groups.get(key)
+        if group is None:
+            if len(self._groups) >= self.max_groups:
+                self.dropped += 1
+                return
+            group = AggregatedIssue(issue, self.sample_size)
+            self._groups[key] = group
+        group.add(issue, seen or datetime.now(timezone.utc))
+
+    def extend(self, issues: List[Issue]):
+        seen = datetime.now(timezone.utc)
+        for issue in issues:
+            self.add(issue, seen)
+
+    def get_issues(self) -> List[AggregatedIssue]:
+        """Aggregated issues, most severe and most frequent first."""
+        return sorted(self._groups.values(), key=lambda group: (-group.severity.value, -group.count))
+
+    def summary(self, top: int = 10) -> str:
+        lines = [
+            "{} issue(s) in {} group(s){}.".format(
+                self.total,
+                len(self._groups),
+                ", {} issue(s) over the group limit were counted only".format(self.dropped) if self.dropped else "",
+            )
+        ]
+        for group in self.get_issues()[:top]:
+            lines.append(
+                "  [{}] [DeviceId: {}] x{} {}".format(
+                    group.severity.name.upper(), group.device_id, group.count, group.details
+                )
+            )
+        return "\n".join(lines)
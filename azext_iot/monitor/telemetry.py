@@ -8,10 +8,11 @@ import asyncio
 import sys
 import uamqp
 
+from time import monotonic
 from uuid import uuid4
 from knack.log import get_logger
 from typing import List
-from azext_iot.constants import VERSION, USER_AGENT
+from azext_iot.constants import MONITOR_THROUGHPUT_READOUT_SEC, VERSION, USER_AGENT
 from azext_iot.monitor.models.target import Target
 from azext_iot.monitor.utility import get_loop
 
@@ -25,11 +26,24 @@ def start_single_monitor(
     on_start_string: str,
     on_message_received,
     timeout=0,
+    prefetch=0,
+    batch_size=None,
+    on_batch_received=None,
+    checkpoint_store=None,
 ):
     """
     :param on_message_received:
         A callback to process messages as they arrive from the service.
         It takes a single argument, a ~uamqp.message.Message object.
+    :param prefetch:
+        Link credit of each partition receiver. When greater than 0 messages are received in
+        batches of up to batch_size (defaults to prefetch) and handed to on_batch_received.
+    :param on_batch_received:
+        A callback to process a list of ~uamqp.message.Message objects in batch mode.
+        Defaults to calling on_message_received for each message.
+    :param checkpoint_store:
+        Optional ~azext_iot.monitor.checkpoint.CheckpointStore. Partitions with a stored offset
+        start after it, and the offset of every processed message is checkpointed.
     """
     return start_multiple_monitors(
         targets=[target],
@@ -37,6 +51,10 @@ def start_single_monitor(
         on_start_string=on_start_string,
         on_message_received=on_message_received,
         timeout=timeout,
+        prefetch=prefetch,
+        batch_size=batch_size,
+        on_batch_received=on_batch_received,
+        checkpoint_store=checkpoint_store,
     )
 
 
@@ -46,18 +64,44 @@ def start_multiple_monitors(
     enqueued_time_utc,
     on_message_received,
     timeout=0,
+    prefetch=0,
+    batch_size=None,
+    on_batch_received=None,
+    checkpoint_store=None,
 ):
     """
     :param on_message_received:
         A callback to process messages as they arrive from the service.
         It takes a single argument, a ~uamqp.message.Message object.
+    :param prefetch:
+        Link credit of each partition receiver. When greater than 0 messages are received in
+        batches of up to batch_size (defaults to prefetch) and handed to on_batch_received.
+    :param on_batch_received:
+        A callback to process a list of ~uamqp.message.Message objects in batch mode.
+        Defaults to calling on_message_received for each message.
+    :param checkpoint_store:
+        Optional ~azext_iot.monitor.checkpoint.CheckpointStore. Partitions with a stored offset
+        start after it, and the offset of every processed message is checkpointed.
     """
+    meter = None
+    if prefetch:
+        meter = ThroughputMeter()
+        if not on_batch_received:
+            def on_batch_received(batch):
+                for msg in batch:
+                    on_message_received(msg)
+
     coroutines = [
         _initiate_event_monitor(
             target=target,
             enqueued_time_utc=enqueued_time_utc,
             on_message_received=on_message_received,
             timeout=timeout,
+            prefetch=prefetch,
+            batch_size=batch_size,
+            on_batch_received=on_batch_received,
+            meter=meter,
+            checkpoint_store=checkpoint_store,
         )
         for target in targets
     ]
@@ -87,6 +131,10 @@ def start_multiple_monitors(
         except RuntimeError:
             pass  # no running loop anymore
     finally:
+        if checkpoint_store:
+            checkpoint_store.flush()
+        if meter:
+            meter.report(final=True)
         if result:
             errors = result[0]
             if errors and errors[0]:
@@ -95,7 +143,15 @@ def start_multiple_monitors(
 
 
 async def _initiate_event_monitor(
-    target: Target, enqueued_time_utc, on_message_received, timeout=0
+    target: Target,
+    enqueued_time_utc,
+    on_message_received,
+    timeout=0,
+    prefetch=0,
+    batch_size=None,
+    on_batch_received=None,
+    meter=None,
+    checkpoint_store=None,
 ):
     if not target.partitions:
         logger.debug("No Event Hub partitions found to listen on.")
@@ -119,6 +175,11 @@ async def _initiate_event_monitor(
                     enqueued_time_utc=enqueued_time_utc,
                     on_message_received=on_message_received,
                     timeout=timeout,
+                    prefetch=prefetch,
+                    batch_size=batch_size,
+                    on_batch_received=on_batch_received,
+                    meter=meter,
+                    checkpoint_store=checkpoint_store,
                 )
             )
         return await asyncio.gather(*coroutines, return_exceptions=True)
@@ -131,24 +192,36 @@ async def _monitor_events(
     enqueued_time_utc,
     on_message_received,
     timeout=0,
+    prefetch=0,
+    batch_size=None,
+    on_batch_received=None,
+    meter=None,
+    checkpoint_store=None,
 ):
     source = uamqp.address.Source(
         "amqps://{}/{}/ConsumerGroups/{}/Partitions/{}".format(
             target.hostname, target.path, target.consumer_group, partition
         )
     )
-    source.set_filter(
-        bytes(
-            "amqp.annotation.x-opt-enqueuedtimeutc > " + str(enqueued_time_utc), "utf8"
+    offset = checkpoint_store.get_offset(partition) if checkpoint_store else None
+    if offset is not None:
+        logger.info("Resuming partition %s after offset %s", partition, offset)
+        source.set_filter(
+            bytes("amqp.annotation.x-opt-offset > '{}'".format(offset), "utf8")
+        )
+    else:
+        source.set_filter(
+            bytes(
+                "amqp.annotation.x-opt-enqueuedtimeutc > " + str(enqueued_time_utc), "utf8"
+            )
         )
-    )
 
     exp_cancelled = False
     receive_client = uamqp.ReceiveClientAsync(
         source,
         auth=target.auth,
         timeout=timeout,
-        prefetch=0,
+        prefetch=prefetch,
         client_name=_get_container_id(),
         debug=DEBUG,
     )
@@ -157,8 +230,26 @@ async def _monitor_events(
         if connection:
             await receive_client.open_async(connection=connection)
 
-        async for msg in receive_client.receive_messages_iter_async():
-            on_message_received(msg)
+        if prefetch:
+            while True:
+                # Returns as soon as messages are available, empty once the receiver times out
+                batch = await receive_client.receive_message_batch_async(max_batch_size=batch_size or prefetch)
+                if not batch:
+                    break
+                for msg in batch:
+                    msg.partition_id = partition
+                on_batch_received(batch)
+                if checkpoint_store:
+                    checkpoint_store.update(partition, batch[-1])
+                if meter:
+                    meter.add(len(batch))
+        else:
+            async for msg in receive_client.receive_messages_iter_async():
+                # The partition is not part of the message annotations, expose it to handlers
+                msg.partition_id = partition
+                on_message_received(msg)
+                if checkpoint_store:
+                    checkpoint_store.update(partition, msg)
 
     except asyncio.CancelledError:
         exp_cancelled = True
@@ -178,6 +269,35 @@ async def _monitor_events(
         logger.info("Closed monitor on partition %s", partition)
 
 
+class ThroughputMeter(object):
+    """Counts received events across partitions and periodically reports events/sec to stderr."""
+
+    def __init__(self, interval=MONITOR_THROUGHPUT_READOUT_SEC):
+        self.interval = interval
+        self.start = monotonic()
+        self.last_report = self.start
+        self.total = 0
+        self.window = 0
+
+    def add(self, count: int):
+        self.total += count
+        self.window += count
+        if monotonic() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self, final=False):
+        now = monotonic()
+        if final:
+            rate = self.total / max(now - self.start, 1e-6)
+            text = "Received {} event(s) in total, {:.1f} events/sec.".format(self.total, rate)
+        else:
+            rate = self.window / max(now - self.last_report, 1e-6)
+            text = "Received {} event(s), {:.1f} events/sec.".format(self.total, rate)
+        print(text, file=sys.stderr, flush=True)
+        self.last_report = now
+        self.window = 0
+
+
 def _stop_and_suppress_eloop(loop):
     try:
         loop.stop()
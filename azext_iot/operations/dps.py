@@ -4,29 +4,50 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+from os.path import exists
 from knack.log import get_logger
 from azure.cli.core.azclierror import (
     ArgumentUsageError,
     AzureResponseError,
     BadRequestError,
+    FileOperationError,
     InvalidArgumentValueError,
     MutuallyExclusiveArgumentError,
     RequiredArgumentMissingError,
     ResourceNotFoundError,
 )
 from azext_iot.common._azure import IOT_SERVICE_CS_TEMPLATE
+from azext_iot.constants import (
+    DPS_BULK_ENROLLMENT_CHUNK_SIZE,
+    DPS_BULK_ENROLLMENT_MAX_WORKERS,
+    DPS_DEVICE_KEY_CHUNK_SIZE,
+    DPS_DEVICE_KEY_MAX_WORKERS,
+)
 from azext_iot.common.shared import (
     SdkType,
     AttestationType,
+    BulkEnrollmentOperationMode,
     ReprovisionType,
     AllocationType,
     KeyType,
     IoTDPSStateType
 )
-from azext_iot.common.utility import compute_device_key, handle_service_exception, shell_safe_json_parse
+from azext_iot.common.utility import (
+    compute_device_key,
+    compute_device_keys,
+    handle_service_exception,
+    shell_safe_json_parse,
+)
 from azext_iot.common.certops import open_certificate
 from azext_iot.dps.providers.discovery import DPSDiscovery
-from azext_iot.operations.generic import _execute_query
+from azext_iot.operations.generic import (
+    _compile_item_filter,
+    _execute_query,
+    _execute_query_partitioned,
+    _filter_pages,
+    _write_ndjson,
+)
 from azext_iot._factory import SdkResolver
 from azext_iot.sdk.dps.service.models import (
     IndividualEnrollment,
@@ -60,9 +81,10 @@ def iot_dps_device_enrollment_list(
     top=None,
     login=None,
     auth_type_dataplane=None,
+    stream=None,
+    fields=None,
+    item_filter=None,
 ):
-    from azext_iot.sdk.dps.service.models.query_specification import QuerySpecification
-
     discovery = DPSDiscovery(cmd)
     target = discovery.get_target(
         dps_name,
@@ -74,10 +96,9 @@ def iot_dps_device_enrollment_list(
     try:
         resolver = SdkResolver(target=target)
         sdk = resolver.get_sdk(SdkType.dps_sdk)
-
-        query_command = "SELECT *"
-        query = [QuerySpecification(query=query_command)]
-        return _execute_query(query, sdk.individual_enrollment.query, top)
+        return _list_enrollments(
+            sdk.individual_enrollment.query, top=top, stream=stream, fields=fields, item_filter=item_filter
+        )
     except ProvisioningServiceErrorDetailsException as e:
         handle_service_exception(e)
 
@@ -161,52 +182,26 @@ def iot_dps_device_enrollment_create(
         resolver = SdkResolver(target=target)
         sdk = resolver.get_sdk(SdkType.dps_sdk)
 
-        if attestation_type == AttestationType.tpm.value:
-            if not endorsement_key:
-                raise RequiredArgumentMissingError("Endorsement key [--endorsement-key] is required")
-            attestation = AttestationMechanism(
-                type=AttestationType.tpm.value,
-                tpm=TpmAttestation(endorsement_key=endorsement_key),
-            )
-        if attestation_type == AttestationType.x509.value:
-            attestation = _get_attestation_with_x509_client_cert(
-                certificate_path, secondary_certificate_path
-            )
-        if attestation_type == AttestationType.symmetricKey.value:
-            attestation = AttestationMechanism(
-                type=AttestationType.symmetricKey.value,
-                symmetric_key=SymmetricKeyAttestation(
-                    primary_key=primary_key, secondary_key=secondary_key
-                ),
-            )
-        reprovision = _get_reprovision_policy(reprovision_policy)
-        initial_twin = _get_initial_twin(initial_twin_tags, initial_twin_properties)
-        iot_hub_list = iot_hubs.split() if iot_hubs else iot_hubs
-        _validate_allocation_policy_for_enrollment(
-            allocation_policy, iot_hub_host_name, iot_hub_list, webhook_url, api_version
-        )
-        if iot_hub_host_name and allocation_policy is None:
-            allocation_policy = AllocationType.static.value
-            iot_hub_list = iot_hub_host_name.split()
-
-        custom_allocation_definition = (
-            CustomAllocationDefinition(webhook_url=webhook_url, api_version=api_version)
-            if allocation_policy == AllocationType.custom.value
-            else None
-        )
-        capabilities = DeviceCapabilities(iot_edge=edge_enabled)
-        enrollment = IndividualEnrollment(
-            registration_id=enrollment_id,
-            attestation=attestation,
-            capabilities=capabilities,
+        enrollment = _build_individual_enrollment(
+            enrollment_id=enrollment_id,
+            attestation_type=attestation_type,
+            endorsement_key=endorsement_key,
+            certificate_path=certificate_path,
+            secondary_certificate_path=secondary_certificate_path,
+            primary_key=primary_key,
+            secondary_key=secondary_key,
             device_id=device_id,
-            initial_twin=initial_twin,
+            iot_hub_host_name=iot_hub_host_name,
+            initial_twin_tags=initial_twin_tags,
+            initial_twin_properties=initial_twin_properties,
             provisioning_status=provisioning_status,
-            reprovision_policy=reprovision,
+            reprovision_policy=reprovision_policy,
             allocation_policy=allocation_policy,
-            iot_hubs=iot_hub_list,
-            custom_allocation_definition=custom_allocation_definition,
-            optional_device_information=_get_twin_collection(device_information)
+            iot_hubs=iot_hubs,
+            edge_enabled=edge_enabled,
+            webhook_url=webhook_url,
+            device_information=device_information,
+            api_version=api_version,
         )
         return sdk.individual_enrollment.create_or_update(enrollment_id, enrollment)
     except ProvisioningServiceErrorDetailsException as e:
@@ -352,14 +347,114 @@ def iot_dps_device_enrollment_delete(
         handle_service_exception(e)
 
 
+def iot_dps_device_enrollment_bulk(
+    cmd,
+    manifest,
+    mode=BulkEnrollmentOperationMode.create.value,
+    dps_name=None,
+    resource_group_name=None,
+    max_workers=None,
+    retry_file=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    """
+    Create, update or delete individual enrollments listed in a CSV or JSON lines manifest with the
+    service bulk operation. The manifest is read lazily and submitted in chunks of the service maximum on a
+    bounded thread pool, failures are reported per enrollment and optionally written to a retry manifest.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    from threading import Lock
+    from time import monotonic
+
+    if max_workers is not None and max_workers < 1:
+        raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+    if not exists(manifest):
+        raise FileOperationError("Manifest file {} does not exist.".format(manifest))
+    if retry_file:
+        try:
+            # fail fast on an unwritable path, failures are appended as chunks complete
+            open(retry_file, mode="w", encoding="utf8").close()
+        except (OSError, IOError) as e:
+            raise FileOperationError("Unable to write retry file {}. {}".format(retry_file, e))
+
+    discovery = DPSDiscovery(cmd)
+    target = discovery.get_target(
+        dps_name,
+        resource_group_name,
+        login=login,
+        auth_type=auth_type_dataplane,
+    )
+
+    max_workers = max_workers or DPS_BULK_ENROLLMENT_MAX_WORKERS
+    start = monotonic()
+    total = 0
+    succeeded = []
+    failed = []
+    retry_lock = Lock()
+
+    def _collect(future):
+        chunk_succeeded, chunk_failed = future.result()
+        succeeded.extend(chunk_succeeded)
+        failed.extend(entry for entry, _ in chunk_failed)
+        retries = [enrollment for _, enrollment in chunk_failed if enrollment is not None]
+        if retry_file and retries:
+            with retry_lock:
+                _write_retry_manifest(retry_file, retries)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        chunk = []
+        for line, enrollment, error in _read_enrollment_manifest(manifest, mode):
+            total += 1
+            if error:
+                failed.append({"registrationId": enrollment, "line": line, "error": error})
+                continue
+            chunk.append((line, enrollment))
+            if len(chunk) < DPS_BULK_ENROLLMENT_CHUNK_SIZE:
+                continue
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _collect(future)
+            pending.add(executor.submit(_run_bulk_enrollment_chunk, target, chunk, mode))
+            chunk = []
+        if chunk:
+            pending.add(executor.submit(_run_bulk_enrollment_chunk, target, chunk, mode))
+        for future in wait(pending).done:
+            _collect(future)
+
+    duration = monotonic() - start
+    failed.sort(key=lambda entry: entry["line"])
+    if failed:
+        logger.warning("Failed to %s %s out of %s enrollments.", mode, len(failed), total)
+    result = {
+        "mode": mode,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "durationSeconds": round(duration, 3),
+        "enrollmentsPerSecond": round(total / duration, 1) if duration else None,
+    }
+    if retry_file:
+        result["retryFile"] = retry_file
+    return result
+
+
 # DPS Enrollments Group
 
 
 def iot_dps_device_enrollment_group_list(
-    cmd, dps_name=None, resource_group_name=None, top=None, login=None, auth_type_dataplane=None,
+    cmd,
+    dps_name=None,
+    resource_group_name=None,
+    top=None,
+    login=None,
+    auth_type_dataplane=None,
+    stream=None,
+    fields=None,
+    item_filter=None,
 ):
-    from azext_iot.sdk.dps.service.models.query_specification import QuerySpecification
-
     discovery = DPSDiscovery(cmd)
     target = discovery.get_target(
         dps_name,
@@ -370,10 +465,9 @@ def iot_dps_device_enrollment_group_list(
     try:
         resolver = SdkResolver(target=target)
         sdk = resolver.get_sdk(SdkType.dps_sdk)
-
-        query_command = "SELECT *"
-        query1 = [QuerySpecification(query=query_command)]
-        return _execute_query(query1, sdk.enrollment_group.query, top)
+        return _list_enrollments(
+            sdk.enrollment_group.query, top=top, stream=stream, fields=fields, item_filter=item_filter
+        )
     except ProvisioningServiceErrorDetailsException as e:
         handle_service_exception(e)
 
@@ -669,14 +763,29 @@ def iot_dps_device_enrollment_group_delete(
 
 def iot_dps_compute_device_key(
     cmd,
-    registration_id,
+    registration_id=None,
     enrollment_id=None,
     dps_name=None,
     resource_group_name=None,
     symmetric_key=None,
+    registration_id_file=None,
+    output_file=None,
+    max_workers=None,
     login=None,
     auth_type_dataplane=None,
 ):
+    if registration_id and registration_id_file:
+        raise MutuallyExclusiveArgumentError(
+            "Provide either --registration-id or --registration-id-file, not both."
+        )
+    if not registration_id and not registration_id_file:
+        raise RequiredArgumentMissingError(
+            "Please provide a registration ID via --registration-id or a file of registration IDs via "
+            "--registration-id-file."
+        )
+    if max_workers is not None and max_workers < 1:
+        raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+
     if symmetric_key is None:
         if not all([dps_name, enrollment_id]):
             raise RequiredArgumentMissingError(
@@ -692,22 +801,11 @@ def iot_dps_compute_device_key(
             login=login,
             auth_type=auth_type_dataplane,
         )
-        try:
-            resolver = SdkResolver(target=target)
-            sdk = resolver.get_sdk(SdkType.dps_sdk)
-            attestation = sdk.enrollment_group.get_attestation_mechanism(
-                enrollment_id, raw=True
-            ).response.json()
-            if attestation.get("type") != AttestationType.symmetricKey.value:
-                raise BadRequestError(
-                    "Requested enrollment group has an attestation type of '{}'. Currently, compute-device-key "
-                    "is only supported for enrollment groups with symmetric key attestation type.".format(
-                        attestation.get("type")
-                    )
-                )
-            symmetric_key = attestation["symmetricKey"]["primaryKey"]
-        except ProvisioningServiceErrorDetailsException as e:
-            raise AzureResponseError(e)
+        symmetric_key = _get_enrollment_group_symmetric_key(target, enrollment_id)
+
+    if registration_id_file:
+        _write_device_keys(symmetric_key, registration_id_file, output_file, max_workers)
+        return
 
     return compute_device_key(
         primary_key=symmetric_key, registration_id=registration_id
@@ -867,6 +965,349 @@ def iot_dps_registration_delete(
         handle_service_exception(e)
 
 
+def _build_individual_enrollment(
+    enrollment_id,
+    attestation_type,
+    endorsement_key=None,
+    certificate_path=None,
+    secondary_certificate_path=None,
+    primary_key=None,
+    secondary_key=None,
+    device_id=None,
+    iot_hub_host_name=None,
+    initial_twin_tags=None,
+    initial_twin_properties=None,
+    provisioning_status=None,
+    reprovision_policy=None,
+    allocation_policy=None,
+    iot_hubs=None,
+    edge_enabled=False,
+    webhook_url=None,
+    device_information=None,
+    api_version=None,
+    etag=None,
+):
+    """Build an individual enrollment record from command (or bulk manifest) arguments."""
+    if attestation_type == AttestationType.tpm.value:
+        if not endorsement_key:
+            raise RequiredArgumentMissingError("Endorsement key [--endorsement-key] is required")
+        attestation = AttestationMechanism(
+            type=AttestationType.tpm.value,
+            tpm=TpmAttestation(endorsement_key=endorsement_key),
+        )
+    if attestation_type == AttestationType.x509.value:
+        attestation = _get_attestation_with_x509_client_cert(
+            certificate_path, secondary_certificate_path
+        )
+    if attestation_type == AttestationType.symmetricKey.value:
+        attestation = AttestationMechanism(
+            type=AttestationType.symmetricKey.value,
+            symmetric_key=SymmetricKeyAttestation(
+                primary_key=primary_key, secondary_key=secondary_key
+            ),
+        )
+    reprovision = _get_reprovision_policy(reprovision_policy)
+    initial_twin = _get_initial_twin(initial_twin_tags, initial_twin_properties)
+    iot_hub_list = iot_hubs.split() if iot_hubs else iot_hubs
+    _validate_allocation_policy_for_enrollment(
+        allocation_policy, iot_hub_host_name, iot_hub_list, webhook_url, api_version
+    )
+    if iot_hub_host_name and allocation_policy is None:
+        allocation_policy = AllocationType.static.value
+        iot_hub_list = iot_hub_host_name.split()
+
+    custom_allocation_definition = (
+        CustomAllocationDefinition(webhook_url=webhook_url, api_version=api_version)
+        if allocation_policy == AllocationType.custom.value
+        else None
+    )
+    capabilities = DeviceCapabilities(iot_edge=edge_enabled)
+    enrollment = IndividualEnrollment(
+        registration_id=enrollment_id,
+        attestation=attestation,
+        capabilities=capabilities,
+        device_id=device_id,
+        initial_twin=initial_twin,
+        provisioning_status=provisioning_status,
+        reprovision_policy=reprovision,
+        allocation_policy=allocation_policy,
+        iot_hubs=iot_hub_list,
+        custom_allocation_definition=custom_allocation_definition,
+        optional_device_information=_get_twin_collection(device_information),
+        etag=etag,
+    )
+    return enrollment
+
+
+def _read_enrollment_manifest(manifest, mode):
+    """
+    Lazily yield (line, enrollment, error) for each manifest row. JSON lines rows are enrollment bodies as
+    returned by the service, CSV rows use the enrollment create arguments as camel cased column names.
+    On error the registration id (if any) is yielded in place of the enrollment.
+    """
+    import csv
+    import json
+
+    with open(manifest, mode="r", encoding="utf-8-sig", newline="") as f:
+        if manifest.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                row = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+                if not row:
+                    continue
+                try:
+                    yield reader.line_num, _get_enrollment_from_row(row, mode), None
+                except Exception as e:  # pylint: disable=broad-except
+                    yield reader.line_num, row.get("registrationId"), str(e)
+            return
+
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            registration_id = None
+            try:
+                body = json.loads(text)
+                if not isinstance(body, dict):
+                    raise InvalidArgumentValueError("Manifest rows must be JSON objects.")
+                registration_id = body.get("registrationId")
+                if not registration_id:
+                    raise RequiredArgumentMissingError("Enrollment registrationId is required.")
+                if mode == BulkEnrollmentOperationMode.delete.value and not body.get("attestation"):
+                    # the service ignores attestations of deleted enrollments, but the model requires one
+                    body["attestation"] = {"type": AttestationType.symmetricKey.value}
+                enrollment = IndividualEnrollment.deserialize(body)
+                errors = enrollment.validate()
+                if errors:
+                    raise InvalidArgumentValueError(str(errors[0]))
+                yield line, enrollment, None
+            except Exception as e:  # pylint: disable=broad-except
+                yield line, registration_id, str(e)
+
+
+def _get_enrollment_from_row(row, mode):
+    registration_id = row.get("registrationId")
+    if not registration_id:
+        raise RequiredArgumentMissingError("Enrollment registrationId is required.")
+    if mode == BulkEnrollmentOperationMode.delete.value:
+        return IndividualEnrollment(
+            registration_id=registration_id,
+            attestation=AttestationMechanism(type=AttestationType.symmetricKey.value),
+            etag=row.get("etag"),
+        )
+
+    attestation_type = row.get("attestationType", AttestationType.symmetricKey.value)
+    if attestation_type not in [attestation.value for attestation in AttestationType]:
+        raise InvalidArgumentValueError("Invalid attestationType '{}'.".format(attestation_type))
+    return _build_individual_enrollment(
+        enrollment_id=registration_id,
+        attestation_type=attestation_type,
+        endorsement_key=row.get("endorsementKey"),
+        certificate_path=row.get("certificatePath"),
+        secondary_certificate_path=row.get("secondaryCertificatePath"),
+        primary_key=row.get("primaryKey"),
+        secondary_key=row.get("secondaryKey"),
+        device_id=row.get("deviceId"),
+        iot_hub_host_name=row.get("iotHubHostName"),
+        initial_twin_tags=row.get("initialTwinTags"),
+        initial_twin_properties=row.get("initialTwinProperties"),
+        provisioning_status=row.get("provisioningStatus"),
+        reprovision_policy=row.get("reprovisionPolicy"),
+        allocation_policy=row.get("allocationPolicy"),
+        iot_hubs=row.get("iotHubs"),
+        edge_enabled=row.get("edgeEnabled", "").lower() == "true",
+        webhook_url=row.get("webhookUrl"),
+        device_information=row.get("deviceInformation"),
+        api_version=row.get("apiVersion"),
+        etag=row.get("etag"),
+    )
+
+
+def _run_bulk_enrollment_chunk(target, chunk, mode):
+    """
+    Submit one bulk operation. Returns the succeeded registration ids and (failure, enrollment) pairs,
+    errors reported by the service are matched to enrollments by registration id.
+    """
+    resolver = SdkResolver(target=target)
+    sdk = resolver.get_sdk(SdkType.dps_sdk)
+
+    try:
+        result = sdk.individual_enrollment.run_bulk_operation(
+            enrollments=[enrollment for _, enrollment in chunk], mode=mode
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        error = str(e)
+        return [], [
+            ({"registrationId": enrollment.registration_id, "line": line, "error": error}, enrollment)
+            for line, enrollment in chunk
+        ]
+
+    errors = {error.registration_id: error for error in (result.errors or [])}
+    succeeded = []
+    failed = []
+    for line, enrollment in chunk:
+        error = errors.get(enrollment.registration_id)
+        if error:
+            entry = {
+                "registrationId": enrollment.registration_id,
+                "line": line,
+                "errorCode": error.error_code,
+                "errorStatus": error.error_status,
+            }
+            failed.append((entry, enrollment))
+        elif not result.is_successful and not errors:
+            entry = {"registrationId": enrollment.registration_id, "line": line, "error": "Bulk operation failed."}
+            failed.append((entry, enrollment))
+        else:
+            succeeded.append(enrollment.registration_id)
+    return succeeded, failed
+
+
+def _write_retry_manifest(retry_file, enrollments):
+    import json
+
+    try:
+        with open(retry_file, mode="a", encoding="utf8") as f:
+            for enrollment in enrollments:
+                f.write(json.dumps(enrollment.serialize(), separators=(",", ":")) + "\n")
+    except (OSError, IOError) as e:
+        logger.warning("Unable to write to retry file %s. %s", retry_file, e)
+
+
+def _get_enrollment_group_symmetric_key(target, enrollment_id):
+    try:
+        resolver = SdkResolver(target=target)
+        sdk = resolver.get_sdk(SdkType.dps_sdk)
+        attestation = sdk.enrollment_group.get_attestation_mechanism(
+            enrollment_id, raw=True
+        ).response.json()
+        if attestation.get("type") != AttestationType.symmetricKey.value:
+            raise BadRequestError(
+                "Requested enrollment group has an attestation type of '{}'. Currently, compute-device-key "
+                "is only supported for enrollment groups with symmetric key attestation type.".format(
+                    attestation.get("type")
+                )
+            )
+        return attestation["symmetricKey"]["primaryKey"]
+    except ProvisioningServiceErrorDetailsException as e:
+        raise AzureResponseError(e)
+
+
+def _write_device_keys(symmetric_key, registration_id_file, output_file=None, max_workers=None):
+    """
+    Stream registrationId,key CSV rows for a file (or stdin) of registration IDs, one per line. The group key
+    is fetched once and keys are derived in chunks, across a process pool when more than one worker is used.
+    """
+    import sys
+    from functools import partial
+    from itertools import chain, islice
+    from time import monotonic
+
+    workers = max_workers or min(os.cpu_count() or 1, DPS_DEVICE_KEY_MAX_WORKERS)
+    start = monotonic()
+    total = 0
+    source = None
+    output = sys.stdout
+    try:
+        try:
+            source = sys.stdin if registration_id_file == "-" else open(registration_id_file, mode="r", encoding="utf8")
+            if output_file:
+                output = open(output_file, mode="w", encoding="utf8", newline="")
+        except (OSError, IOError) as e:
+            raise FileOperationError("Unable to open file. {}".format(e))
+
+        derive = partial(_derive_device_key_rows, symmetric_key)
+        chunks = _chunk_registration_ids(source, DPS_DEVICE_KEY_CHUNK_SIZE)
+        # worker processes only pay off past a single chunk
+        head = list(islice(chunks, 2))
+        chunks = chain(head, chunks)
+        output.write("registrationId,key\n")
+        if workers == 1 or len(head) < 2:
+            for rows in map(derive, chunks):
+                total += rows.count("\n")
+                output.write(rows)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for rows in _map_bounded(executor, derive, chunks, workers * 2):
+                    total += rows.count("\n")
+                    output.write(rows)
+        output.flush()
+    finally:
+        if source is not None and source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    duration = monotonic() - start
+    print(
+        "Derived {} device key(s) in {:.2f} s, {:.0f} keys/sec.".format(
+            total, duration, total / duration if duration else 0
+        ),
+        file=sys.stderr,
+    )
+
+
+def _chunk_registration_ids(source, chunk_size):
+    chunk = []
+    for line in source:
+        registration_id = line.strip()
+        if not registration_id:
+            continue
+        chunk.append(registration_id)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _map_bounded(executor, method, items, max_pending):
+    """Like executor.map, in order, but only keeps up to max_pending items submitted ahead of the consumer."""
+    from collections import deque
+
+    pending = deque()
+    for item in items:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(method, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _derive_device_key_rows(symmetric_key, registration_ids):
+    return "".join(
+        "{},{}\n".format(registration_id, key)
+        for registration_id, key in compute_device_keys(symmetric_key, registration_ids)
+    )
+
+
+def _list_enrollments(query_method, top=None, stream=None, fields=None, item_filter=None):
+    """
+    Query all enrollments of a kind. The query only supports SELECT *, so the filter and the field
+    projection are applied client side to each page as it arrives, while the next page of the
+    continuation chain is fetched in the background.
+    """
+    from azext_iot.sdk.dps.service.models.query_specification import QuerySpecification
+
+    query = [QuerySpecification(query="SELECT *")]
+    if not any([stream, fields, item_filter]):
+        return _execute_query(query, query_method, top)
+
+    compiled_filter = _compile_item_filter(item_filter) if item_filter else None
+    # A filtered page may hold fewer items than requested, so top applies after filtering
+    pages = _execute_query_partitioned([query], query_method, None if compiled_filter else top, max_workers=1)
+    pages = _filter_pages(pages, item_filter=compiled_filter, fields=fields, top=top)
+    if stream:
+        _write_ndjson(pages)
+        return
+
+    payload = []
+    for page in pages:
+        payload.extend(page)
+    return payload
+
+
 def _get_twin_collection(properties):
     """Convert a json into TwinCollection for use with the API."""
     from azext_iot.common.utility import dict_clean
@@ -4,35 +4,201 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from typing import Callable, Iterator, List, Optional
 from azure.cli.core.azclierror import InvalidArgumentValueError
 from azext_iot.assets.user_messages import error_param_top_out_of_bounds
 
+# Upper bound of pages buffered per page chain when running partitioned queries
+PARTITION_PAGE_BUFFER = 2
+
 
 def _execute_query(query_args, query_method, top=None):
     payload = []
+    for page in _execute_query_pages(query_args, query_method, top):
+        payload.extend(page)
+    return payload[:top] if top else payload
+
+
+def _execute_query_pages(query_args, query_method, top=None) -> Iterator[list]:
+    """
+    Lazily walk the x-ms-continuation chain of a query, yielding one page of results at a time.
+
+    Only the current page is held in memory. If top is provided, the final page is trimmed so that
+    no more than top items are yielded in total.
+    """
     headers = {"Cache-Control": "no-cache, must-revalidate"}
 
     if top:
         headers["x-ms-max-item-count"] = str(top)
 
-    result = query_method(*query_args, custom_headers=headers, raw=True)
-    token = result.response.headers.get("x-ms-continuation")
-
-    payload.extend(result.response.json())
-    while token:
+    count = 0
+    token = None
+    while True:
         # In case requested count is > service max page size
         if top:
-            pl = len(payload)
-            if pl < top:
-                page = top - pl
-                headers["x-ms-max-item-count"] = str(page)
-            else:
+            if count >= top:
                 break
-        headers["x-ms-continuation"] = token
+            headers["x-ms-max-item-count"] = str(top - count)
+        if token:
+            headers["x-ms-continuation"] = token
         result = query_method(*query_args, custom_headers=headers, raw=True)
         token = result.response.headers.get("x-ms-continuation")
-        payload.extend(result.response.json())
-    return payload[:top] if top else payload
+        page = result.response.json()
+        if top:
+            page = page[:top - count]
+        count += len(page)
+        yield page
+        if not token:
+            break
+
+
+def _execute_query_partitioned(
+    query_args_set: List[list], query_method: Callable, top: Optional[int] = None, max_workers: Optional[int] = None
+) -> Iterator[list]:
+    """
+    Run several independent page chains concurrently on a bounded thread pool, yielding pages in
+    completion order.
+
+    Each chain buffers at most PARTITION_PAGE_BUFFER pages ahead of the consumer, so memory usage is
+    bound by the number of chains and the page size rather than the total result size. If top is
+    provided, no more than top items are yielded across all chains.
+    """
+    if not max_workers:
+        max_workers = len(query_args_set)
+    page_queue = Queue(maxsize=PARTITION_PAGE_BUFFER * len(query_args_set))
+    stop_token = object()
+    cancelled = []
+
+    def _walk_chain(query_args):
+        try:
+            if cancelled:
+                return
+            for page in _execute_query_pages(query_args, query_method, top):
+                if cancelled:
+                    break
+                page_queue.put(page)
+        except Exception as e:  # pylint: disable=broad-except
+            page_queue.put(e)
+        finally:
+            page_queue.put(stop_token)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for query_args in query_args_set:
+            executor.submit(_walk_chain, query_args)
+
+        count = 0
+        pending = len(query_args_set)
+        while pending:
+            page = page_queue.get()
+            if page is stop_token:
+                pending -= 1
+                continue
+            if isinstance(page, Exception):
+                raise page
+            if top:
+                page = page[:top - count]
+            count += len(page)
+            yield page
+            if top and count >= top:
+                break
+    finally:
+        cancelled.append(True)
+        # Drain so that blocked producers can observe cancellation and exit
+        while not page_queue.empty():
+            page_queue.get_nowait()
+        executor.shutdown(wait=False)
+
+
+def _partition_query(query: str, predicates: List[str]) -> List[str]:
+    """
+    Split a query into one query per partitioning predicate by AND-ing each predicate with the
+    existing WHERE condition (or adding one). The predicates are expected to be disjoint.
+    """
+    if re.search(r"\bgroup\s+by\b", query, re.IGNORECASE):
+        raise InvalidArgumentValueError("Aggregate (GROUP BY) queries cannot be partitioned.")
+
+    match = re.search(r"\bwhere\b", query, re.IGNORECASE)
+    if not match:
+        return ["{} WHERE {}".format(query.strip(), predicate) for predicate in predicates]
+
+    select_clause = query[:match.start()].strip()
+    condition = query[match.end():].strip()
+    return [
+        "{} WHERE ({}) AND ({})".format(select_clause, condition, predicate) for predicate in predicates
+    ]
+
+
+def _compile_item_filter(expression: str):
+    """Compile a JMESPath expression used as a per item predicate."""
+    import jmespath
+    from jmespath.exceptions import JMESPathError
+
+    try:
+        return jmespath.compile(expression)
+    except JMESPathError as e:
+        raise InvalidArgumentValueError("Invalid filter expression '{}'. {}".format(expression, e))
+
+
+def _select_fields(item: dict, fields: List[str]) -> dict:
+    """Project an item onto a list of (dot separated) field paths, missing fields are omitted."""
+    result = {}
+    for field in fields:
+        path = field.split(".")
+        value = item
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+    return result
+
+
+def _filter_pages(
+    pages: Iterator[list], item_filter=None, fields: Optional[List[str]] = None, top: Optional[int] = None
+) -> Iterator[list]:
+    """
+    Apply a compiled item filter and a field projection to each page as it is received, so only the
+    selected fields of matching items are kept. If top is provided, no more than top items are yielded.
+    """
+    count = 0
+    for page in pages:
+        if item_filter:
+            page = [item for item in page if item_filter.search(item)]
+        if fields:
+            page = [_select_fields(item, fields) for item in page]
+        if top:
+            page = page[:top - count]
+        count += len(page)
+        yield page
+        if top and count >= top:
+            break
+
+
+def _write_ndjson(pages: Iterator[list], stream=None) -> int:
+    """
+    Write each item of each page as a single line of JSON, flushing after every page.
+
+    Returns the number of items written.
+    """
+    stream = stream or sys.stdout
+    count = 0
+    for page in pages:
+        for item in page:
+            stream.write(json.dumps(item, separators=(",", ":")))
+            stream.write("\n")
+        stream.flush()
+        count += len(page)
+    return count
 
 
 def _process_top(top, upper_limit=None):
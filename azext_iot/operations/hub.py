@@ -13,12 +13,19 @@ from azure.cli.core.azclierror import (
     ClientRequestError,
     FileOperationError,
     InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
     RequiredArgumentMissingError,
     ResourceNotFoundError,
     ValidationError,
 )
 from azext_iot.constants import (
+    DEVICE_BULK_UPDATE_ETAG_RETRIES,
+    DEVICE_BULK_UPDATE_MAX_WORKERS,
     DEVICE_DEVICESCOPE_PREFIX,
+    DEVICE_METHOD_FANOUT_MAX_WORKERS,
+    DEVICE_QUERY_ID_CHUNK_SIZE,
+    EDGE_DEPLOYMENT_COMMON_ERROR_COUNT,
+    EDGE_DEPLOYMENT_VALIDATE_MAX_WORKERS,
     TRACING_PROPERTY,
     TRACING_ALLOWED_FOR_LOCATION,
     TRACING_ALLOWED_FOR_SKU,
@@ -38,16 +45,27 @@ from azext_iot.common.shared import (
 )
 from azext_iot.iothub.providers.discovery import IotHubDiscovery
 from azext_iot.common.utility import (
+    compute_percentiles,
     handle_service_exception,
+    unpack_msrest_error,
     read_file_content,
     init_monitoring,
     process_json_arg,
+    shell_safe_json_parse,
     generate_key,
     generate_storage_account_sas_token,
 )
 from azext_iot._factory import SdkResolver, CloudError
-from azext_iot.operations.generic import _execute_query, _process_top
-from typing import Optional
+from azext_iot.operations.generic import (
+    _execute_query,
+    _execute_query_pages,
+    _execute_query_partitioned,
+    _partition_query,
+    _process_top,
+    _write_ndjson,
+)
+from collections import Counter
+from typing import Dict, List, Optional
 import pprint
 
 logger = get_logger(__name__)
@@ -64,8 +82,13 @@ def iot_query(
     resource_group_name=None,
     login=None,
     auth_type_dataplane=None,
+    stream=None,
+    partition_predicates=None,
+    max_workers=None,
 ):
     top = _process_top(top)
+    if max_workers is not None and max_workers < 1:
+        raise InvalidArgumentValueError("--max-workers must be greater than 0.")
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
         resource_name=hub_name,
@@ -77,10 +100,25 @@ def iot_query(
     service_sdk = resolver.get_sdk(SdkType.service_sdk)
 
     try:
-        query_args = [query_command]
         query_method = service_sdk.query.get_twins
 
-        return _execute_query(query_args, query_method, top)
+        if not stream and not partition_predicates:
+            return _execute_query([query_command], query_method, top)
+
+        if partition_predicates:
+            query_args_set = [[query] for query in _partition_query(query_command, partition_predicates)]
+            pages = _execute_query_partitioned(query_args_set, query_method, top, max_workers)
+        else:
+            pages = _execute_query_pages([query_command], query_method, top)
+
+        if stream:
+            _write_ndjson(pages)
+            return
+
+        payload = []
+        for page in pages:
+            payload.extend(page)
+        return payload
     except CloudError as e:
         handle_service_exception(e)
 
@@ -556,6 +594,8 @@ def iot_device_children_add(
     resource_group_name=None,
     login=None,
     auth_type_dataplane=None,
+    bulk=False,
+    max_workers=None,
 ):
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
@@ -567,6 +607,15 @@ def iot_device_children_add(
     devices = []
     edge_device = _iot_device_show(target, device_id)
     _validate_edge_device(edge_device)
+    if bulk:
+        return _bulk_update_device_parent(
+            target=target,
+            child_ids=[child_device_id.strip() for child_device_id in child_list],
+            device_scope=edge_device["deviceScope"],
+            validator=lambda child_device: _validate_parent_child_relation(child_device, force),
+            max_workers=max_workers,
+        )
+
     converted_child_list = child_list
     for child_device_id in converted_child_list:
         child_device = _iot_device_show(target, child_device_id.strip())
@@ -591,6 +640,8 @@ def iot_device_children_remove(
     resource_group_name=None,
     login=None,
     auth_type_dataplane=None,
+    bulk=False,
+    max_workers=None,
 ):
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
@@ -600,10 +651,17 @@ def iot_device_children_remove(
         auth_type=auth_type_dataplane,
     )
     devices = []
-    if remove_all:
-        result = _iot_device_children_list(
-            cmd, device_id, hub_name, resource_group_name, login
+    if bulk:
+        return _bulk_remove_device_children(
+            target=target,
+            device_id=device_id,
+            child_list=child_list,
+            remove_all=remove_all,
+            max_workers=max_workers,
         )
+
+    if remove_all:
+        result = _iot_device_children_list(target, device_id)
         if not result:
             raise ClientRequestError(
                 'No registered child devices found for "{}" edge device.'.format(
@@ -644,26 +702,6 @@ def iot_device_children_list(
     resource_group_name=None,
     login=None,
     auth_type_dataplane=None,
-):
-    result = _iot_device_children_list(
-        cmd=cmd,
-        device_id=device_id,
-        hub_name=hub_name,
-        resource_group_name=resource_group_name,
-        login=login,
-        auth_type_dataplane=auth_type_dataplane,
-    )
-
-    return [device["deviceId"] for device in result]
-
-
-def _iot_device_children_list(
-    cmd,
-    device_id,
-    hub_name=None,
-    resource_group_name=None,
-    login=None,
-    auth_type_dataplane=None,
 ):
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
@@ -672,6 +710,12 @@ def _iot_device_children_list(
         login=login,
         auth_type=auth_type_dataplane,
     )
+    result = _iot_device_children_list(target, device_id)
+
+    return [device["deviceId"] for device in result]
+
+
+def _iot_device_children_list(target, device_id):
     device = _iot_device_show(target, device_id)
     _validate_edge_device(device)
     query = (
@@ -680,16 +724,141 @@ def _iot_device_children_list(
         )
     )
 
-    # TODO: Inefficient
-    return iot_query(
-        cmd=cmd,
-        query_command=query,
-        hub_name=hub_name,
-        top=None,
-        resource_group_name=resource_group_name,
-        login=login,
-        auth_type_dataplane=auth_type_dataplane,
-    )
+    resolver = SdkResolver(target=target)
+    service_sdk = resolver.get_sdk(SdkType.service_sdk)
+    try:
+        return _execute_query([query], service_sdk.query.get_twins)
+    except CloudError as e:
+        handle_service_exception(e)
+
+
+def _iot_device_query_by_ids(target, device_ids):
+    """Fetch the twins of the given devices with one query per chunk of device Ids, keyed by device Id."""
+    resolver = SdkResolver(target=target)
+    service_sdk = resolver.get_sdk(SdkType.service_sdk)
+
+    result = {}
+    try:
+        for i in range(0, len(device_ids), DEVICE_QUERY_ID_CHUNK_SIZE):
+            id_chunk = device_ids[i:i + DEVICE_QUERY_ID_CHUNK_SIZE]
+            query = "select * from devices where deviceId in [{}]".format(
+                ", ".join("'{}'".format(device_id.replace("'", "\\'")) for device_id in id_chunk)
+            )
+            for page in _execute_query_pages([query], service_sdk.query.get_twins):
+                result.update((twin["deviceId"], twin) for twin in page)
+    except CloudError as e:
+        handle_service_exception(e)
+    return result
+
+
+def _bulk_remove_device_children(target, device_id, child_list=None, remove_all=False, max_workers=None):
+    edge_device = _iot_device_show(target, device_id)
+    _validate_edge_device(edge_device)
+
+    if remove_all:
+        child_ids = [str(x["deviceId"]) for x in _iot_device_children_list(target, device_id)]
+        if not child_ids:
+            raise ClientRequestError(
+                'No registered child devices found for "{}" edge device.'.format(device_id)
+            )
+    elif child_list:
+        child_ids = [child_device_id.strip() for child_device_id in child_list]
+    else:
+        raise RequiredArgumentMissingError(
+            "Please specify child list or use --remove-all to remove all children."
+        )
+
+    def _validate_child_of_edge(child_device):
+        _validate_child_device(child_device)
+        if child_device["parentScopes"] != [edge_device["deviceScope"]]:
+            raise ClientRequestError(
+                'The entered child device "{}" isn\'t assigned as a child of edge device "{}"'.format(
+                    child_device["deviceId"], device_id
+                )
+            )
+
+    return _bulk_update_device_parent(
+        target=target,
+        child_ids=child_ids,
+        validator=_validate_child_of_edge,
+        max_workers=max_workers,
+    )
+
+
+def _bulk_update_device_parent(target, child_ids, device_scope=None, validator=None, max_workers=None):
+    """
+    Validate children from one batched twin query, then set (or clear if device_scope is None) their parent on a
+    bounded thread pool. Failures are reported per device instead of aborting the operation.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    if max_workers is not None and max_workers < 1:
+        raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+
+    succeeded = []
+    failed = []
+    child_twins = _iot_device_query_by_ids(target, child_ids)
+    pending = []
+    for child_id in child_ids:
+        child_twin = child_twins.get(child_id)
+        if not child_twin:
+            failed.append({"deviceId": child_id, "error": "Device not found."})
+            continue
+        try:
+            if validator:
+                validator(child_twin)
+            pending.append(child_id)
+        except ClientRequestError as e:
+            failed.append({"deviceId": child_id, "error": str(e)})
+
+    with ThreadPoolExecutor(max_workers=max_workers or DEVICE_BULK_UPDATE_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_update_device_parent_with_retry, target, child_id, device_scope): child_id
+            for child_id in pending
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+                succeeded.append(futures[future])
+            except Exception as e:  # pylint: disable=broad-except
+                failed.append({"deviceId": futures[future], "error": str(e)})
+
+    if failed:
+        logger.warning("Failed to update the parent of %s out of %s devices.", len(failed), len(child_ids))
+    return {"succeeded": succeeded, "failed": failed}
+
+
+def _update_device_parent_with_retry(target, device_id, device_scope=None):
+    resolver = SdkResolver(target=target)
+    service_sdk = resolver.get_sdk(SdkType.service_sdk)
+
+    for attempt in range(DEVICE_BULK_UPDATE_ETAG_RETRIES + 1):
+        try:
+            device = service_sdk.devices.get_identity(id=device_id, raw=True).response.json()
+            _apply_device_parent(device, device["capabilities"]["iotEdge"], device_scope)
+            service_sdk.devices.create_or_update_identity(
+                id=device_id,
+                device=device,
+                custom_headers={"If-Match": '"{}"'.format(device["etag"])},
+            )
+            return
+        except CloudError as e:
+            # Device changed between read and write, read again and reapply
+            if getattr(e.response, "status_code", None) == 412 and attempt < DEVICE_BULK_UPDATE_ETAG_RETRIES:
+                continue
+            handle_service_exception(e)
+
+
+def _apply_device_parent(device, is_edge, device_scope=None):
+    if is_edge:
+        parent_scopes = []
+        if device_scope:
+            parent_scopes = [device_scope]
+        device["parentScopes"] = parent_scopes
+    else:
+        if not device_scope:
+            device_scope = ""
+        device["deviceScope"] = device_scope
 
 
 def _update_device_parent(target, device, is_edge, device_scope=None):
@@ -697,15 +866,7 @@ def _update_device_parent(target, device, is_edge, device_scope=None):
     service_sdk = resolver.get_sdk(SdkType.service_sdk)
 
     try:
-        if is_edge:
-            parent_scopes = []
-            if device_scope:
-                parent_scopes = [device_scope]
-            device["parentScopes"] = parent_scopes
-        else:
-            if not device_scope:
-                device_scope = ""
-            device["deviceScope"] = device_scope
+        _apply_device_parent(device, is_edge, device_scope)
         etag = device.get("etag", None)
         if etag:
             headers = {}
@@ -1384,10 +1545,28 @@ def _process_config_content(content, config_type):
 
 def _validate_payload_schema(content):
     import json
-    from os.path import join
-    from azext_iot.models.validators import JsonSchemaType, JsonSchemaValidator
+
+    for errors in _get_payload_schema_errors(content).values():
+        if errors:
+            # Pretty printing schema validation errors
+            raise ValidationError(
+                json.dumps(
+                    {"validationErrors": errors},
+                    separators=(",", ":"),
+                    indent=2,
+                )
+            )
+
+
+def _get_payload_schema_errors(content) -> Dict[str, List[dict]]:
+    """
+    Validate the system modules of an edge deployment payload against the bundled schema of their
+    schemaVersion. Schemas are loaded and compiled once per process.
+
+    Returns the schema validation errors keyed by system module, modules without a known schema are skipped.
+    """
+    from azext_iot.models.validators import get_schema_registry
     from azext_iot.constants import EDGE_DEPLOYMENT_ROOT_SCHEMAS_PATH as root_schema_path
-    from azext_iot.common.utility import shell_safe_json_parse
 
     EDGE_AGENT_SCHEMA_PATH = "azure-iot-edgeagent-deployment-{}.json"
     EDGE_HUB_SCHEMA_PATH = "azure-iot-edgehub-deployment-{}.json"
@@ -1396,8 +1575,10 @@ def _validate_payload_schema(content):
         "$edgeHub": EDGE_HUB_SCHEMA_PATH,
     }
 
+    registry = get_schema_registry(root_schema_path)
     modules_content = content["modulesContent"]
     system_modules_for_validation = ["$edgeAgent", "$edgeHub"]
+    module_errors = {}
 
     for sys_module in system_modules_for_validation:
         if sys_module in modules_content:
@@ -1409,42 +1590,72 @@ def _validate_payload_schema(content):
                 target_schema_ver = modules_content[sys_module][
                     "properties.desired"
                 ]["schemaVersion"]
-                target_schema_def_path = join(root_schema_path, f"{EDGE_SCHEMA_PATH_DICT[sys_module].format(target_schema_ver)}")
-
-                logger.info("Attempting to fetch schema content from %s...", target_schema_def_path)
-                if not exists(target_schema_def_path):
-                    logger.info("Invalid schema path %s, skipping validation...", target_schema_def_path)
-                    continue
-
-                try:
-                    target_schema_def = str(read_file_content(target_schema_def_path))
-                    target_schema_def = shell_safe_json_parse(target_schema_def)
-                except Exception:
-                    logger.info(
-                        "Unable to fetch schema content from %s skipping validation...",
-                        target_schema_def_path,
-                    )
+                validator = registry.get_validator(EDGE_SCHEMA_PATH_DICT[sys_module].format(target_schema_ver))
+                if not validator:
                     continue
 
                 logger.info(f"Validating {sys_module} of deployment payload against schema...")
                 to_validate_content = {
                     sys_module: modules_content[sys_module]
                 }
-                draft_version = JsonSchemaType.draft4
-                if "$schema" in target_schema_def and "/draft-07/" in target_schema_def["$schema"]:
-                    draft_version = JsonSchemaType.draft7
-
-                v = JsonSchemaValidator(target_schema_def, draft_version)
-                errors = v.validate(to_validate_content)
-                if errors:
-                    # Pretty printing schema validation errors
-                    raise ValidationError(
-                        json.dumps(
-                            {"validationErrors": errors},
-                            separators=(",", ":"),
-                            indent=2,
-                        )
-                    )
+                module_errors[sys_module] = validator.validate(to_validate_content)
+
+    return module_errors
+
+
+def iot_edge_deployment_validate(cmd, manifest_dir, pattern="*.json", max_workers=None):
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+    from time import monotonic
+
+    if max_workers is not None and max_workers < 1:
+        raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+    root = Path(manifest_dir)
+    if not root.is_dir():
+        raise FileOperationError("Manifest directory '{}' does not exist.".format(manifest_dir))
+    manifests = sorted(path for path in root.rglob(pattern) if path.is_file())
+    if not manifests:
+        raise InvalidArgumentValueError(
+            "No deployment manifests matching '{}' were found in '{}'.".format(pattern, manifest_dir)
+        )
+
+    start = monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers or EDGE_DEPLOYMENT_VALIDATE_MAX_WORKERS) as executor:
+        results = list(executor.map(_get_manifest_errors, manifests))
+
+    errors = {
+        str(manifest.relative_to(root)): manifest_errors
+        for manifest, manifest_errors in zip(manifests, results)
+        if manifest_errors
+    }
+    common_errors = Counter(error["description"] for manifest_errors in errors.values() for error in manifest_errors)
+    summary = {
+        "manifests": len(manifests),
+        "valid": len(manifests) - len(errors),
+        "invalid": len(errors),
+        "durationSeconds": round(monotonic() - start, 3),
+    }
+    if errors:
+        import json
+
+        summary["commonErrors"] = dict(common_errors.most_common(EDGE_DEPLOYMENT_COMMON_ERROR_COUNT))
+        summary["validationErrors"] = errors
+        raise ValidationError(json.dumps(summary, separators=(",", ":"), indent=2))
+    return summary
+
+
+def _get_manifest_errors(manifest_path) -> List[dict]:
+    """Schema validation errors of an edge deployment manifest file, across its system modules."""
+    try:
+        content = shell_safe_json_parse(str(read_file_content(str(manifest_path))))
+        content = _process_config_content(content, ConfigType.layered)
+    except Exception as e:  # pylint: disable=broad-except
+        return [{"description": str(e)}]
+
+    errors = []
+    for module_errors in _get_payload_schema_errors({"modulesContent": content["modules_content"]}).values():
+        errors.extend(module_errors)
+    return errors
 
 
 def iot_hub_configuration_update(
@@ -1817,6 +2028,28 @@ def _iot_device_twin_update(
         raise CLIInternalError(err)
 
 
+def iot_device_twin_bulk_update(
+    cmd,
+    patch_file,
+    results_file=None,
+    max_workers=None,
+    hub_name=None,
+    resource_group_name=None,
+    login=None,
+    auth_type_dataplane=None,
+):
+    from azext_iot.iothub.providers.twin_bulk import TwinBulkPatcher
+
+    discovery = IotHubDiscovery(cmd)
+    target = discovery.get_target(
+        resource_name=hub_name,
+        resource_group_name=resource_group_name,
+        login=login,
+        auth_type=auth_type_dataplane,
+    )
+    return TwinBulkPatcher(target=target, max_workers=max_workers, results_file=results_file).patch_all(patch_file)
+
+
 def iot_device_twin_replace(
     cmd,
     device_id,
@@ -1850,11 +2083,14 @@ def iot_device_twin_replace(
 
 def iot_device_method(
     cmd,
-    device_id,
     method_name,
+    device_id=None,
     hub_name=None,
     method_payload="{}",
     timeout=30,
+    device_ids=None,
+    device_query=None,
+    max_workers=None,
     resource_group_name=None,
     login=None,
     auth_type_dataplane=None,
@@ -1872,6 +2108,7 @@ def iot_device_method(
         raise InvalidArgumentValueError(
             "timeout must be at least {} seconds".format(METHOD_INVOKE_MIN_TIMEOUT_SEC)
         )
+    fanout = _validate_method_targets(device_id, device_ids, device_query, max_workers)
 
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
@@ -1898,6 +2135,15 @@ def iot_device_method(
             "connectTimeoutInSeconds": timeout,
         }
 
+        if fanout:
+            return _invoke_method_fanout(
+                service_sdk=service_sdk,
+                device_ids=device_ids or _query_device_ids(service_sdk, device_query),
+                request_body=request_body,
+                timeout=timeout,
+                max_workers=max_workers,
+            )
+
         return service_sdk.devices.invoke_method(
             device_id=device_id,
             direct_method_request=request_body,
@@ -1912,12 +2158,15 @@ def iot_device_method(
 
 def iot_device_module_method(
     cmd,
-    device_id,
     module_id,
     method_name,
+    device_id=None,
     hub_name=None,
     method_payload="{}",
     timeout=30,
+    device_ids=None,
+    device_query=None,
+    max_workers=None,
     resource_group_name=None,
     login=None,
     auth_type_dataplane=None,
@@ -1935,6 +2184,7 @@ def iot_device_module_method(
         raise InvalidArgumentValueError(
             "timeout must not be over {} seconds".format(METHOD_INVOKE_MIN_TIMEOUT_SEC)
         )
+    fanout = _validate_method_targets(device_id, device_ids, device_query, max_workers)
 
     discovery = IotHubDiscovery(cmd)
     target = discovery.get_target(
@@ -1961,6 +2211,16 @@ def iot_device_module_method(
             "connectTimeoutInSeconds": timeout,
         }
 
+        if fanout:
+            return _invoke_method_fanout(
+                service_sdk=service_sdk,
+                device_ids=device_ids or _query_device_ids(service_sdk, device_query),
+                request_body=request_body,
+                timeout=timeout,
+                module_id=module_id,
+                max_workers=max_workers,
+            )
+
         return service_sdk.modules.invoke_method(
             device_id=device_id,
             module_id=module_id,
@@ -1971,6 +2231,128 @@ def iot_device_module_method(
         handle_service_exception(e)
 
 
+def _validate_method_targets(device_id=None, device_ids=None, device_query=None, max_workers=None):
+    """
+    Ensure exactly one method target is given. Returns whether the method is fanned out to many devices.
+    """
+    targets = [target for target in [device_id, device_ids, device_query] if target]
+    if not targets:
+        raise RequiredArgumentMissingError(
+            "Provide the target device with --device-id, or many devices with --device-ids or --device-query."
+        )
+    if len(targets) > 1:
+        raise MutuallyExclusiveArgumentError(
+            "Only one of --device-id, --device-ids or --device-query can be provided."
+        )
+    if max_workers is not None and max_workers < 1:
+        raise InvalidArgumentValueError("--max-workers must be greater than 0.")
+    return not device_id
+
+
+def _query_device_ids(service_sdk, device_query):
+    # Module twins of the same device share its device Id, keep the first occurrence only
+    device_ids = list(dict.fromkeys(
+        twin["deviceId"]
+        for twin in _execute_query([device_query], service_sdk.query.get_twins, None)
+        if twin.get("deviceId")
+    ))
+    if not device_ids:
+        raise ResourceNotFoundError("No devices found for query '{}'.".format(device_query))
+    return device_ids
+
+
+def _invoke_method_fanout(
+    service_sdk, device_ids, request_body, timeout, module_id=None, max_workers=None, stream=None
+):
+    """
+    Invoke a direct method on many devices, or on the same module of many devices, on a bounded thread pool
+    sharing one service client. Each result is written as a line of JSON as soon as it arrives and a summary
+    with latency percentiles is returned.
+    """
+    import json
+    import sys
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from time import monotonic
+
+    stream = stream or sys.stdout
+    # A device listed more than once is invoked once
+    device_ids = list(dict.fromkeys(device_ids))
+
+    def _invoke(device_id):
+        result = {"deviceId": device_id}
+        if module_id:
+            result["moduleId"] = module_id
+        start = monotonic()
+        try:
+            if module_id:
+                response = service_sdk.modules.invoke_method(
+                    device_id=device_id,
+                    module_id=module_id,
+                    direct_method_request=request_body,
+                    timeout=timeout,
+                    raw=True,
+                )
+            else:
+                response = service_sdk.devices.invoke_method(
+                    device_id=device_id,
+                    direct_method_request=request_body,
+                    timeout=timeout,
+                    raw=True,
+                )
+            method_result = response.response.json()
+            result["status"] = method_result.get("status")
+            result["payload"] = method_result.get("payload")
+        except CloudError as e:
+            result["status"] = getattr(e.response, "status_code", None)
+            result["error"] = unpack_msrest_error(e)
+        except Exception as e:  # pylint: disable=broad-except
+            result["status"] = None
+            result["error"] = str(e)
+        result["latencyMs"] = round((monotonic() - start) * 1000, 2)
+        return result
+
+    latencies = []
+    statuses = Counter()
+    succeeded = 0
+    start = monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers or DEVICE_METHOD_FANOUT_MAX_WORKERS) as executor:
+        futures = [executor.submit(_invoke, device_id) for device_id in device_ids]
+        for future in as_completed(futures):
+            result = future.result()
+            stream.write(json.dumps(result, separators=(",", ":")))
+            stream.write("\n")
+            stream.flush()
+
+            status = result["status"]
+            statuses[str(status) if status is not None else "error"] += 1
+            if "error" not in result:
+                latencies.append(result["latencyMs"])
+                # the status is reported by the device and is not necessarily a number
+                if isinstance(status, int) and not isinstance(status, bool) and 200 <= status < 300:
+                    succeeded += 1
+    duration = monotonic() - start
+
+    failed = len(device_ids) - succeeded
+    if failed:
+        logger.warning("Method invocation did not succeed on %s out of %s devices.", failed, len(device_ids))
+    percentiles = compute_percentiles(latencies, [50, 90, 99])
+    return {
+        "invoked": len(device_ids),
+        "succeeded": succeeded,
+        "failed": failed,
+        "statusCounts": dict(statuses.most_common()),
+        "durationSeconds": round(duration, 3),
+        "callsPerSecond": round(len(device_ids) / duration, 2) if duration else 0.0,
+        "latencyMs": {
+            "p50": percentiles[50],
+            "p90": percentiles[90],
+            "p99": percentiles[99],
+            "max": max(latencies) if latencies else None,
+        },
+    }
+
+
 # Utility
 
 
@@ -2416,6 +2798,14 @@ def iot_hub_monitor_events(
     content_type=None,
     device_query=None,
     message_count: Optional[int] = None,
+    stats: bool = False,
+    stats_interval: int = 5,
+    timestamp_field: Optional[str] = "timestamp",
+    prefetch: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    checkpoint_interval: Optional[int] = None,
+    checkpoint_file: Optional[str] = None,
+    resume: bool = False,
 ):
     try:
         _iot_hub_monitor_events(
@@ -2435,6 +2825,14 @@ def iot_hub_monitor_events(
             content_type=content_type,
             device_query=device_query,
             message_count=message_count,
+            stats=stats,
+            stats_interval=stats_interval,
+            timestamp_field=timestamp_field,
+            prefetch=prefetch,
+            batch_size=batch_size,
+            checkpoint_interval=checkpoint_interval,
+            checkpoint_file=checkpoint_file,
+            resume=resume,
         )
     except RuntimeError as e:
         raise CLIInternalError(e)
@@ -2508,7 +2906,28 @@ def _iot_hub_monitor_events(
     content_type=None,
     device_query=None,
     message_count: Optional[int] = None,
+    stats: bool = False,
+    stats_interval: int = 5,
+    timestamp_field: Optional[str] = "timestamp",
+    prefetch: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    checkpoint_interval: Optional[int] = None,
+    checkpoint_file: Optional[str] = None,
+    resume: bool = False,
 ):
+    if checkpoint_interval is not None and checkpoint_interval <= 0:
+        raise InvalidArgumentValueError("Checkpoint interval must be greater than 0.")
+    if stats and stats_interval is not None and stats_interval < 0:
+        raise InvalidArgumentValueError("Stats interval must be 0 (final stats only) or greater.")
+    if prefetch is not None and prefetch < 0:
+        raise InvalidArgumentValueError("Prefetch must be 0 (disabled) or greater.")
+    if batch_size is not None:
+        if batch_size <= 0:
+            raise InvalidArgumentValueError("Batch size must be greater than 0.")
+        prefetch = prefetch or batch_size
+        if batch_size > prefetch:
+            raise InvalidArgumentValueError("Batch size cannot be greater than the prefetch link credit.")
+
     (enqueued_time, properties, timeout, output, message_count) = init_monitoring(
         cmd, timeout, properties, enqueued_time, repair, yes, message_count
     )
@@ -2531,17 +2950,32 @@ def _iot_hub_monitor_events(
     )
 
     from azext_iot.monitor.builders import hub_target_builder
-    from azext_iot.monitor.handlers import CommonHandler
+    from azext_iot.monitor.handlers import CommonHandler, StatsHandler
     from azext_iot.monitor.telemetry import start_single_monitor
     from azext_iot.monitor.utility import generate_on_start_string
     from azext_iot.monitor.models.arguments import (
         CommonParserArguments,
         CommonHandlerArguments,
+        StatsHandlerArguments,
     )
 
+    checkpoint_store = None
+    hub_entity = target["entity"]
     target = hub_target_builder.EventTargetBuilder().build_iot_hub_target(target)
     target.add_consumer_group(consumer_group)
 
+    if resume or checkpoint_interval or checkpoint_file:
+        from azext_iot.constants import MONITOR_CHECKPOINT_INTERVAL_SEC
+        from azext_iot.monitor.checkpoint import CheckpointStore, get_default_checkpoint_file
+
+        checkpoint_store = CheckpointStore(
+            path=checkpoint_file or get_default_checkpoint_file(hub_entity, consumer_group),
+            event_hub=target.path,
+            consumer_group=consumer_group,
+            interval=checkpoint_interval or MONITOR_CHECKPOINT_INTERVAL_SEC,
+            resume=resume,
+        )
+
     on_start_string = generate_on_start_string(device_id=device_id)
 
     parser_args = CommonParserArguments(
@@ -2557,7 +2991,16 @@ def _iot_hub_monitor_events(
         max_messages=message_count,
     )
 
-    handler = CommonHandler(handler_args)
+    if stats:
+        handler = StatsHandler(
+            StatsHandlerArguments(
+                common_handler_args=handler_args,
+                summary_interval=stats_interval,
+                timestamp_field=timestamp_field,
+            )
+        )
+    else:
+        handler = CommonHandler(handler_args)
 
     start_single_monitor(
         target=target,
@@ -2565,8 +3008,15 @@ def _iot_hub_monitor_events(
         on_start_string=on_start_string,
         on_message_received=handler.parse_message,
         timeout=timeout,
+        prefetch=prefetch or 0,
+        batch_size=batch_size,
+        on_batch_received=handler.parse_message_batch,
+        checkpoint_store=checkpoint_store,
     )
 
+    if stats:
+        handler.print_final_stats()
+
 
 def iot_hub_distributed_tracing_update(
     cmd,
@@ -9,6 +9,10 @@ import collections
 
 from azext_iot.central.models.v2022_06_30_preview import TemplatePreview
 from azext_iot.monitor.central_validator import validate, extract_schema_type
+from azext_iot.monitor.central_validator.compiled import (
+    CompiledTemplateCache,
+    compile_validator,
+)
 
 from azext_iot.tests.helpers import load_json
 from azext_iot.tests.test_constants import FileNames
@@ -385,3 +389,101 @@ class TestComplexType:
         )
         schema = template.get_schema("RidiculousObject")
         assert validate(schema, value) == expected_result
+
+
+class TestCompiledValidators:
+    values = [
+        None,
+        True,
+        1,
+        2,
+        3,
+        123.123,
+        "A",
+        "1",
+        "2020-01-01",
+        "2020-01-01T10:00:00Z",
+        "P1D",
+        "10:00:00",
+        [1, 2],
+        {"lat": 1, "lon": 2},
+        {"lat": 1, "lon": 2, "alt": "3"},
+        {"x": 1, "y": 2, "z": 3},
+        {"Double": 123},
+        {"double": 123},
+        {"LayerC": {"Depth1C": {"SomeTelemetry": 100}}},
+        {"LayerC": {"Depth1C": {"SomeTelemetry": "100"}}},
+        {
+            "LayerA": {
+                "Depth1A": {
+                    "Depth2": {
+                        "Depth3": {
+                            "Depth4": {
+                                "DeepestComplexEnum": 1,
+                                "DeepestVector": {"x": 1, "y": 2, "z": 3},
+                                "DeepestGeopoint": {"lat": 1, "lon": 2, "alt": 3},
+                                "Depth5": {"Depth6Double": 123},
+                            }
+                        }
+                    }
+                }
+            }
+        },
+    ]
+
+    @pytest.mark.parametrize(
+        "template_file",
+        [
+            FileNames.central_device_template_file,
+            FileNames.central_deeply_nested_device_template_file,
+            FileNames.central_property_validation_template_file,
+        ],
+    )
+    def test_compiled_matches_validate(self, template_file):
+        template = TemplatePreview(load_json(template_file))
+        compiled = CompiledTemplateCache().get(template)
+
+        for entities, is_component in [(template.interfaces, False), (template.components, True)]:
+            for identifier, schemas in entities.items():
+                for name, schema in schemas.items():
+                    field = compiled.get_field(name, is_component=is_component, identifier=identifier)
+                    assert field.expected_type == extract_schema_type(schema)
+                    for value in self.values:
+                        assert field.validate(value) == validate(schema, value), (name, value)
+
+                    first = compiled.get_field(name, is_component=is_component)
+                    assert first.schema is template.get_schema(name, is_component=is_component)
+
+        assert compiled.get_field("unknown") is None
+        assert compiled.get_field("Bool", identifier="unknown") is None
+
+    @pytest.mark.parametrize(
+        "schema, value, expected_result",
+        [
+            ({"schema": "unknown"}, 1, False),
+            ({"schema": "unknown"}, None, True),
+            ({}, 1, False),
+            ({"schema": {"@type": "Enum", "enumValues": [{"enumValue": 1}]}}, {"a": 1}, False),
+            ({"schema": {"@type": ["Enum"], "enumValues": [{"enumValue": "a"}]}}, "a", True),
+        ],
+    )
+    def test_compile_validator(self, schema, value, expected_result):
+        assert compile_validator(schema)(value) == expected_result
+
+    def test_cache_invalidation(self):
+        raw_template = load_json(FileNames.central_device_template_file)
+        cache = CompiledTemplateCache()
+
+        compiled = cache.get(TemplatePreview(raw_template))
+        # same etag, compiled once
+        assert cache.get(TemplatePreview(dict(raw_template))) is compiled
+
+        changed = dict(raw_template, etag="changed")
+        assert cache.get(TemplatePreview(changed)) is not compiled
+
+        # without an etag only the same template object is reused
+        no_etag = {k: v for k, v in raw_template.items() if k != "etag"}
+        template = TemplatePreview(no_etag)
+        compiled = cache.get(template)
+        assert cache.get(template) is compiled
+        assert cache.get(TemplatePreview(dict(no_etag))) is not compiled
@@ -35,3 +35,62 @@ def test_parse_manifest_json(json_input: str, expect_error: bool, mocker):
         else:
             assert invalid_arg_error_str.format(property_name=parsed_prop_name, inline_json=json_input) == str(thrown_error)
             logger_mock.warning.mock_calls[0].args == (use_help_warning,)
+
+
+def test_calculate_file_metadata(tmp_path):
+    import tracemalloc
+    from base64 import b64encode
+    from hashlib import sha256
+    from azext_iot.deviceupdate.common import FILE_HASH_CHUNK_SIZE
+    from azext_iot.deviceupdate.providers.base import DeviceUpdateDataManager
+
+    # Spans several chunks and ends on a partial one
+    content = bytes(range(256)) * (FILE_HASH_CHUNK_SIZE * 8 // 256) + b"tail"
+    payload = tmp_path / "payload.img"
+    payload.write_bytes(content)
+
+    tracemalloc.start()
+    metadata = DeviceUpdateDataManager.calculate_file_metadata(str(payload))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert metadata.bytes == len(content)
+    assert metadata.hash == b64encode(sha256(content).digest()).decode("utf8")
+    assert metadata.name == "payload.img"
+    # Memory is bound by the chunk size rather than the file size
+    assert peak < FILE_HASH_CHUNK_SIZE * 2
+
+
+@pytest.mark.parametrize("file_count", [0, 1, 5])
+def test_calculate_hash(tmp_path, file_count):
+    from base64 import b64encode
+    from hashlib import sha256
+    from azext_iot.deviceupdate.commands_update import calculate_hash
+
+    contents = [generate_generic_id().encode("utf8") * (i + 1) for i in range(file_count)]
+    contents.append(b"")
+    paths = []
+    for i, content in enumerate(contents):
+        path = tmp_path / "file{}.bin".format(i)
+        path.write_bytes(content)
+        paths.append(str(path))
+
+    result = calculate_hash(file_paths=paths)
+    assert [item["uri"] for item in result] == [(tmp_path / "file{}.bin".format(i)).as_uri() for i in range(len(contents))]
+    for item, content in zip(result, contents):
+        assert item["bytes"] == len(content)
+        assert item["hash"] == b64encode(sha256(content).digest()).decode("utf8")
+        assert item["hashAlgorithm"] == "sha256"
+
+
+def test_calculate_manifest_metadata(mocker):
+    import io
+    from azext_iot.deviceupdate.providers.base import DeviceUpdateDataManager
+
+    content = json.dumps({"updateId": {"provider": "contoso"}}).encode("utf8")
+    mocker.patch("urllib.request.urlopen", return_value=io.BytesIO(content))
+    # No account lookup is needed to hash a manifest
+    data_manager = DeviceUpdateDataManager.__new__(DeviceUpdateDataManager)
+    metadata = data_manager.calculate_manifest_metadata("https://contoso/manifest.json")
+    assert metadata.bytes == len(content)
+    assert metadata.hash == DeviceUpdateDataManager.calculate_hash_from_bytes(content)
@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 import pytest
+from threading import current_thread
 from azext_iot.digitaltwins.providers import generic as subject
 
 
@@ -27,3 +28,82 @@ class TestLROCheckStateHelper(object):
             assert output == test_input["properties"]["provisioning_state"]
         else:
             assert output is None
+
+
+class TestPrefetch(object):
+    def test_prefetch(self):
+        threads = []
+
+        def pages():
+            for i in range(5):
+                threads.append(current_thread())
+                yield i
+
+        assert list(subject.prefetch(pages())) == [0, 1, 2, 3, 4]
+        assert all(thread is not current_thread() for thread in threads)
+
+    def test_prefetch_error(self):
+        def pages():
+            yield 1
+            raise ValueError("page failed")
+
+        result = subject.prefetch(pages())
+        assert next(result) == 1
+        with pytest.raises(ValueError):
+            next(result)
+
+    def test_prefetch_close(self):
+        produced = []
+
+        def pages():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        result = subject.prefetch(pages(), buffer=1)
+        assert next(result) == 0
+        result.close()
+        # the producer stops at most a couple of items past the consumer
+        assert len(produced) < 10
+
+
+class TestAdaptiveBackoff(object):
+    class Throttled(Exception):
+        def __init__(self, status_code=429, retry_after="0"):
+            self.response = type("Response", (), {"status_code": status_code, "headers": {"Retry-After": retry_after}})()
+
+    def test_retries_throttled(self, mocker):
+        sleep = mocker.patch.object(subject, "sleep")
+        backoff = subject.AdaptiveBackoff(initial=0.01)
+        calls = []
+
+        def method(value):
+            calls.append(value)
+            if len(calls) < 3:
+                raise self.Throttled(retry_after=None)
+            return value
+
+        assert backoff.call(method, value=5) == 5
+        assert len(calls) == 3
+        assert backoff.throttled == 2
+        assert sleep.called
+        # the delay decays on success
+        assert backoff.delay == 0.01
+
+    def test_gives_up(self, mocker):
+        mocker.patch.object(subject, "sleep")
+        backoff = subject.AdaptiveBackoff()
+
+        def method():
+            raise self.Throttled(status_code=400)
+
+        with pytest.raises(self.Throttled):
+            backoff.call(method)
+        assert backoff.throttled == 0
+
+        def throttled():
+            raise self.Throttled()
+
+        with pytest.raises(self.Throttled):
+            backoff.call(throttled, max_retries=2)
+        assert backoff.throttled == 2
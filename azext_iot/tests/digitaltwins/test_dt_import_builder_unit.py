@@ -0,0 +1,218 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import pytest
+from azext_iot.digitaltwins import commands_jobs as subject
+from azext_iot.digitaltwins.providers.import_builder import ChunkedWriter, ImportFileBuilder, matches_schema
+
+base_model = {
+    "@id": "dtmi:com:example:Space;1",
+    "@type": "Interface",
+    "@context": "dtmi:dtdl:context;2",
+    "contents": [
+        {"@type": "Property", "name": "name", "schema": "string"},
+        {"@type": "Relationship", "name": "contains", "target": "dtmi:com:example:Space;1"},
+    ],
+}
+room_model = {
+    "@id": "dtmi:com:example:Room;1",
+    "@type": "Interface",
+    "@context": "dtmi:dtdl:context;2",
+    "extends": "dtmi:com:example:Space;1",
+    "contents": [
+        {"@type": ["Property", "Temperature"], "name": "temperature", "schema": "double", "unit": "degreeCelsius"},
+        {"@type": "Property", "name": "occupied", "schema": "boolean"},
+        {
+            "@type": "Property",
+            "name": "size",
+            "schema": {
+                "@type": "Object",
+                "fields": [{"name": "width", "schema": "integer"}, {"name": "length", "schema": "integer"}],
+            },
+        },
+        {"@type": "Component", "name": "sensor", "schema": "dtmi:com:example:Sensor;1"},
+        {"@type": "Telemetry", "name": "humidity", "schema": "double"},
+    ],
+}
+sensor_model = {
+    "@id": "dtmi:com:example:Sensor;1",
+    "@type": "Interface",
+    "@context": "dtmi:dtdl:context;2",
+    "contents": [
+        {
+            "@type": "Property",
+            "name": "mode",
+            "schema": {
+                "@type": "Enum",
+                "valueSchema": "integer",
+                "enumValues": [{"name": "off", "enumValue": 0}, {"name": "on", "enumValue": 1}],
+            },
+        }
+    ],
+}
+models = [room_model, sensor_model, base_model]
+
+
+def read_output(path):
+    with open(path, encoding="utf8") as f:
+        lines = [json.loads(line) for line in f]
+    sections = {}
+    current = None
+    for line in lines:
+        if "Section" in line:
+            current = sections.setdefault(line["Section"], [])
+            continue
+        current.append(line)
+    return [line["Section"] for line in lines if "Section" in line], sections
+
+
+class TestImportFileBuilder(object):
+    def test_build_csv(self, tmp_path):
+        twins = tmp_path / "twins.csv"
+        twins.write_text(
+            "$dtId,$model,name,temperature,occupied,size.width,size.length,sensor.mode\n"
+            "room1,dtmi:com:example:Room;1,Room 1,21.5,true,3,4,1\n"
+            "room2,dtmi:com:example:Room;1,,20,FALSE,,,\n"
+            "room3,dtmi:com:example:Room;1,Room 3,warm,true,,,\n"
+            "space1,dtmi:com:example:Space;1,007,,,,,\n"
+            "other,dtmi:com:example:Unknown;1,,,,,,\n",
+            encoding="utf8",
+        )
+        relationships = tmp_path / "relationships.csv"
+        relationships.write_text(
+            "$sourceId,$targetId,$relationshipName,$relationshipId,since\n"
+            "space1,room1,contains,,2023\n"
+            "space1,room2,contains,r2,\n"
+            "space1,room3,adjacent,,\n",
+            encoding="utf8",
+        )
+        output = str(tmp_path / "import.ndjson")
+        failure_log = str(tmp_path / "failures.ndjson")
+
+        result = subject.build_import_file(
+            cmd=None,
+            data_file_name=output,
+            twin_sources=[str(twins)],
+            relationship_sources=[str(relationships)],
+            models=json.dumps(models),
+            failure_log=failure_log,
+            author="contoso",
+        )
+        assert result["models"] == 3
+        assert result["twins"] == {"written": 3, "invalid": 2}
+        assert result["relationships"] == {"written": 2, "invalid": 1}
+        assert result["failureLog"] == failure_log
+
+        order, sections = read_output(output)
+        assert order == ["Header", "Models", "Twins", "Relationships"]
+        assert sections["Header"] == [{"fileVersion": "1.0.0", "author": "contoso"}]
+        # dependencies first
+        model_ids = [model["@id"] for model in sections["Models"]]
+        assert model_ids.index("dtmi:com:example:Space;1") < model_ids.index("dtmi:com:example:Room;1")
+        assert model_ids.index("dtmi:com:example:Sensor;1") < model_ids.index("dtmi:com:example:Room;1")
+
+        assert sections["Twins"] == [
+            {
+                "$metadata": {"$model": "dtmi:com:example:Room;1"},
+                "$dtId": "room1",
+                "name": "Room 1",
+                "temperature": 21.5,
+                "occupied": True,
+                "size": {"width": 3, "length": 4},
+                "sensor": {"$metadata": {}, "mode": 1},
+            },
+            {"$metadata": {"$model": "dtmi:com:example:Room;1"}, "$dtId": "room2", "temperature": 20.0, "occupied": False},
+            {"$metadata": {"$model": "dtmi:com:example:Space;1"}, "$dtId": "space1", "name": "007"},
+        ]
+        assert sections["Relationships"] == [
+            {
+                "$targetId": "room1",
+                "$relationshipName": "contains",
+                "since": 2023,
+                "$dtId": "space1",
+                "$relationshipId": "contains-room1",
+            },
+            {"$targetId": "room2", "$relationshipName": "contains", "$relationshipId": "r2", "$dtId": "space1"},
+        ]
+
+        with open(failure_log, encoding="utf8") as f:
+            failures = [json.loads(line) for line in f]
+        assert [(failure["source"], failure["line"]) for failure in failures] == [
+            (str(twins), 4),
+            (str(twins), 6),
+            (str(relationships), 4),
+        ]
+        assert "was not loaded" in failures[1]["error"]
+
+    def test_build_json_lines(self, tmp_path):
+        twins = tmp_path / "twins.jsonl"
+        rows = [
+            {"$dtId": "room1", "$model": "dtmi:com:example:Room;1", "sensor": {"$metadata": {}, "mode": 0}},
+            {"$dtId": "room2", "$metadata": {"$model": "dtmi:com:example:Room;1"}, "humidity": 40},
+            {"$dtId": "room3", "$metadata": {"$model": "dtmi:com:example:Room;1"}, "size": {"height": 1}},
+            {"$dtId": "room4", "$metadata": {"$model": "dtmi:com:example:Room;1"}, "sensor": {"mode": 3}},
+            {"$metadata": {"$model": "dtmi:com:example:Room;1"}},
+            ["not", "an", "object"],
+        ]
+        twins.write_text("\n".join(json.dumps(row) for row in rows) + "\n\n{broken\n", encoding="utf8")
+        output = str(tmp_path / "import.ndjson")
+
+        builder = ImportFileBuilder(models=models, chunk_size=2)
+        result = builder.build(output, twin_sources=[str(twins)])
+        assert result["twins"] == {"written": 1, "invalid": 6}
+
+        order, sections = read_output(output)
+        assert order == ["Header", "Models", "Twins"]
+        assert sections["Twins"] == [
+            {"$dtId": "room1", "sensor": {"$metadata": {}, "mode": 0}, "$metadata": {"$model": "dtmi:com:example:Room;1"}}
+        ]
+
+        # Without validation rows only need ids and models
+        result = ImportFileBuilder(models=models, validate=False).build(output, twin_sources=[str(twins)])
+        assert result["twins"] == {"written": 4, "invalid": 3}
+
+    def test_build_no_models(self, tmp_path):
+        twins = tmp_path / "twins.csv"
+        twins.write_text("$dtId,$metadata.$model,count,tags\nt1,dtmi:a;1,5,\"[1, 2]\"\n", encoding="utf8")
+        output = str(tmp_path / "import.ndjson")
+
+        result = subject.build_import_file(cmd=None, data_file_name=output, twin_sources=[str(twins)])
+        assert result["models"] == 0
+        order, sections = read_output(output)
+        assert order == ["Header", "Twins"]
+        assert sections["Twins"] == [{"$metadata": {"$model": "dtmi:a;1"}, "$dtId": "t1", "count": 5, "tags": [1, 2]}]
+
+    def test_chunked_writer(self):
+        stream = io.StringIO()
+        writer = ChunkedWriter(stream, chunk_size=3)
+        for i in range(5):
+            writer.write({"i": i})
+        assert stream.getvalue().count("\n") == 3
+        writer.flush()
+        assert stream.getvalue().splitlines() == ['{"i":0}', '{"i":1}', '{"i":2}', '{"i":3}', '{"i":4}']
+        assert writer.lines == 5
+
+    @pytest.mark.parametrize(
+        "schema, value, expected",
+        [
+            ("boolean", True, True),
+            ("boolean", 1, False),
+            ("integer", 1, True),
+            ("integer", True, False),
+            ("double", 1, True),
+            ("double", "1", False),
+            ("dateTime", "2023-01-01T00:00:00Z", True),
+            ("dtmi:com:example:Schema;1", object(), True),
+            ({"@type": "Map", "mapValue": {"name": "v", "schema": "integer"}}, {"a": 1}, True),
+            ({"@type": "Map", "mapValue": {"name": "v", "schema": "integer"}}, {"a": "1"}, False),
+            ({"@type": "Array", "elementSchema": "string"}, ["a"], True),
+            ({"@type": "Array", "elementSchema": "string"}, "a", False),
+        ],
+    )
+    def test_matches_schema(self, schema, value, expected):
+        assert matches_schema(schema, value) is expected
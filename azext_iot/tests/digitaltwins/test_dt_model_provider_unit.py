@@ -5,7 +5,9 @@
 # --------------------------------------------------------------------------------------------
 
 import pytest
+from azure.cli.core.azclierror import InvalidArgumentValueError
 from azext_iot.digitaltwins.providers import model as subject
+from azext_iot.digitaltwins.providers.model_graph import ModelDependencyGraph
 from azext_iot.tests.digitaltwins.dt_helpers import generate_generic_id
 
 
@@ -201,3 +203,58 @@ class TestGetModelDependencies(object):
         result = subject.get_model_dependencies(input_model)
         assert len(result) == len(set(result))
         assert set(result) == expected
+
+
+def build_model(model_id, extends=None, components=None):
+    model = {"@id": model_id, "@type": "Interface"}
+    if extends:
+        model["extends"] = extends
+    if components:
+        model["contents"] = [
+            {"@type": "Component", "name": generate_generic_id(), "schema": schema} for schema in components
+        ]
+    return model
+
+
+class TestModelDependencyGraph(object):
+    @pytest.fixture
+    def graph(self):
+        # d -> c -> a, d -> b -> a, e is independent, a extends a model outside of the set
+        return ModelDependencyGraph([
+            build_model("d", extends=["c"], components=["b"]),
+            build_model("c", extends="a"),
+            build_model("e"),
+            build_model("b", extends=["a"]),
+            build_model("a", extends="external"),
+        ])
+
+    def test_layers(self, graph):
+        assert graph.layers() == [["e", "a"], ["c", "b"], ["d"]]
+        assert graph.topological_order() == ["e", "a", "c", "b", "d"]
+        assert graph.dependents["a"] == {"b", "c"}
+
+    def test_batches(self, graph):
+        batches = graph.batches(2)
+        assert batches == [["e", "a"], ["c", "b"], ["d"]]
+        assert graph.batch_prerequisites(batches) == [set(), {0}, {1}]
+        assert graph.batches(10) == [["e", "a", "c", "b", "d"]]
+        assert graph.batch_prerequisites(graph.batches(10)) == [set()]
+
+    def test_batches_dependencies_first(self):
+        models = [build_model("m{}".format(i), extends=["m{}".format(i // 2)] if i else None) for i in range(100)]
+        models.reverse()
+        graph = ModelDependencyGraph(models)
+        position = {model_id: index for index, model_id in enumerate(graph.topological_order())}
+        for i in range(1, 100):
+            assert position["m{}".format(i // 2)] < position["m{}".format(i)]
+        for index, required in enumerate(graph.batch_prerequisites(graph.batches(7))):
+            assert all(prerequisite < index for prerequisite in required)
+
+    @pytest.mark.parametrize("models", [
+        [build_model("a", extends="b"), build_model("b", extends="a")],
+        [build_model("a", extends="b"), build_model("b", components=["c"]), build_model("c", extends="a")],
+    ])
+    def test_cycle(self, models):
+        graph = ModelDependencyGraph(models)
+        with pytest.raises(InvalidArgumentValueError):
+            graph.layers()
@@ -228,6 +228,84 @@ class TestAddModels(object):
                 )
                 assert len(models_added) == MAX_MODELS_PER_BATCH
 
+    @pytest.mark.parametrize("max_workers", [None, 1, 8])
+    @responses.activate
+    def test_large_ontology_dependency_order(self, fixture_cmd, fixture_dt_client, max_workers):
+        # Model i extends model i // 3, inputs are listed dependents first
+        models = [{"@id": "dtmi:com:example:M{};1".format(i), "@type": "Interface"} for i in range(300)]
+        for i in range(1, 300):
+            models[i]["extends"] = models[i // 3]["@id"]
+        models.reverse()
+        models_added = set()
+
+        def post_request_callback(request):
+            payload = json.loads(request.body)
+            assert len(payload) <= MAX_MODELS_PER_BATCH
+            batch_ids = set(model["@id"] for model in payload)
+            for model in payload:
+                dependency = model.get("extends")
+                assert dependency is None or dependency in models_added or dependency in batch_ids
+            models_added.update(batch_ids)
+            return (201, {}, json.dumps([{"id": model["@id"]} for model in payload]))
+
+        responses.add_callback(
+            responses.POST,
+            "https://{}/models".format(hostname),
+            callback=post_request_callback,
+            content_type="application/json",
+        )
+
+        result = subject.add_models(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            models=json.dumps(models),
+            max_workers=max_workers,
+        )
+        assert len(models_added) == 300
+        assert sorted(model["id"] for model in result) == sorted(model["@id"] for model in models)
+
+    @responses.activate
+    def test_large_ontology_rollback(self, fixture_cmd, fixture_dt_client):
+        models = [{"@id": "dtmi:com:example:M{};1".format(i), "@type": "Interface"} for i in range(300)]
+        for i in range(1, 300):
+            models[i]["extends"] = models[i - 1]["@id"]
+        models_added = []
+        models_deleted = []
+
+        def post_request_callback(request):
+            payload = json.loads(request.body)
+            if len(models_added) >= 2 * MAX_MODELS_PER_BATCH:
+                return (400, {}, json.dumps({"error": {"code": "failed"}}))
+            models_added.extend(model["@id"] for model in payload)
+            return (201, {}, json.dumps([{"status": "succeeded"}]))
+
+        def delete_request_callback(request):
+            models_deleted.append(unquote(request.url.split("?")[0]).split("/")[-1])
+            return (204, {}, "")
+
+        responses.add_callback(
+            responses.POST,
+            "https://{}/models".format(hostname),
+            callback=post_request_callback,
+            content_type="application/json",
+        )
+        responses.add_callback(
+            responses.DELETE,
+            re.compile("https://{}/models/.+".format(hostname)),
+            callback=delete_request_callback,
+            content_type="application/json",
+        )
+
+        with pytest.raises(CLIError):
+            subject.add_models(
+                cmd=fixture_cmd,
+                name_or_hostname=hostname,
+                models=json.dumps(models),
+            )
+        assert len(models_added) == 2 * MAX_MODELS_PER_BATCH
+        # Dependents are rolled back before their dependencies
+        assert models_deleted == list(reversed(models_added))
+
     def test_add_model_no_models_directory(self, fixture_cmd):
         with pytest.raises(CLIError):
             subject.add_models(
@@ -661,6 +739,59 @@ class TestDeleteAllModels(object):
 
         assert result is None
 
+    @pytest.mark.parametrize("max_workers", [None, 1, 4])
+    @responses.activate
+    def test_delete_all_models_layers(self, mocker, fixture_cmd, fixture_dt_client, max_workers):
+        mocker.patch("azext_iot.digitaltwins.providers.generic.sleep")
+        # Model i extends model i // 2, listed dependencies first
+        all_models = [generate_model_result(model_id="dtmi:com:example:M{};1".format(i)) for i in range(40)]
+        for i in range(1, 40):
+            all_models[i]["model"]["extends"] = all_models[i // 2]["id"]
+        models_deleted = []
+        throttled = []
+
+        responses.add(
+            method=responses.GET,
+            url="https://{}/models?includeModelDefinition=true".format(hostname),
+            body=json.dumps({"value" : all_models, "nextLink": None}),
+            status=200,
+            content_type="application/json",
+            match_querystring=False,
+        )
+
+        def delete_request_callback(request):
+            model = unquote(request.url.split("?")[0]).split("/")[-1]
+            # Every model is throttled once
+            if model not in throttled:
+                throttled.append(model)
+                return (429, {"Retry-After": "0"}, json.dumps({"error": {"code": "TooManyRequests"}}))
+            # Dependents have to be deleted first
+            index = int(model.split(":")[-1].split(";")[0][1:])
+            assert all(model_id in models_deleted for model_id in ["dtmi:com:example:M{};1".format(2 * index + offset)
+                       for offset in (0, 1) if 0 < 2 * index + offset < 40])
+            models_deleted.append(model)
+            return (204, {}, "")
+
+        responses.add_callback(
+            responses.DELETE,
+            re.compile("https://{}/models/.+".format(hostname)),
+            callback=delete_request_callback,
+            content_type="application/json",
+        )
+
+        result = subject.delete_all_models(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            max_workers=max_workers,
+        )
+        assert result is None
+        assert len(models_deleted) == 40
+        assert models_deleted[-1] == all_models[0]["id"]
+
+    def test_delete_all_models_invalid_workers(self, fixture_cmd):
+        with pytest.raises(CLIError):
+            subject.delete_all_models(cmd=fixture_cmd, name_or_hostname=hostname, max_workers=0)
+
     @pytest.fixture(params=[400, 401, 500])
     def service_client_error(self, mocked_response, fixture_dt_client, request):
         mocked_response.assert_all_requests_are_fired = False
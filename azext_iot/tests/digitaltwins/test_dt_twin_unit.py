@@ -169,6 +169,44 @@ class TestTwinQueryTwins(object):
                 resource_group_name=None
             )
 
+    def test_query_twins_stream(self, fixture_cmd, service_client, capsys):
+        twins = [generate_twin_result() for _ in range(3)]
+        pages = [(twins[:2], "https://{}/query?2".format(hostname)), (twins[2:], None)]
+        for i, (value, cont_token) in enumerate(pages):
+            service_client.add(
+                method=responses.POST,
+                url="https://{}/query{}".format(hostname, "?2" if i else ""),
+                body=json.dumps({"value": value, "continuationToken": cont_token}),
+                status=200,
+                content_type="application/json",
+                match_querystring=False,
+                headers={"Query-Charge": str(1.5 + i)}
+            )
+
+        result = subject.query_twins(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            query_command=generic_query,
+            show_cost=True,
+            stream=True
+        )
+
+        assert result is None
+        captured = capsys.readouterr()
+        assert [json.loads(line) for line in captured.out.splitlines()] == twins
+        assert "Page 1: 2 row(s), query-charge 1.5." in captured.err
+        assert "Page 2: 1 row(s), query-charge 2.5. 3 row(s) in total" in captured.err
+        assert "Total query cost: 4.0" in captured.err
+
+    def test_query_twins_stream_error(self, fixture_cmd, service_client_error):
+        with pytest.raises(CLIError):
+            subject.query_twins(
+                cmd=fixture_cmd,
+                name_or_hostname=hostname,
+                query_command=generic_query,
+                stream=True
+            )
+
 
 class TestTwinCreateTwin(object):
     @pytest.fixture
@@ -1505,3 +1543,121 @@ class TestTwinUpdateComponent(object):
                 resource_group_name=None,
                 etag=None
             )
+
+
+class TestTwinBulkDeleteAll(object):
+    @pytest.fixture
+    def bulk_scenario(self, mocked_response, start_twin_response):
+        state = {
+            "twins": {"t{}".format(i) for i in range(20)},
+            "relationships": {("t{}".format(i), "r{}".format(i)) for i in range(10)},
+            "throttled": False,
+            # queries are eventually consistent, deleted items are still returned by the next query
+            "stale_twins": set(),
+            "stale_relationships": set(),
+            "deletes": 0,
+        }
+
+        def query_callback(request):
+            query = json.loads(request.body)["query"]
+            if "RELATIONSHIPS" in query:
+                value = [
+                    {"$sourceId": source, "$relationshipId": rel, "$targetId": "t19"}
+                    for source, rel in sorted(state["relationships"] | state["stale_relationships"])
+                ]
+                state["stale_relationships"] = set()
+            else:
+                value = [{"$dtId": twin} for twin in sorted(state["twins"] | state["stale_twins"])]
+                state["stale_twins"] = set()
+            return (200, {"query-charge": "1.0"}, json.dumps({"value": value, "continuationToken": None}))
+
+        def delete_relationship_callback(request):
+            state["deletes"] += 1
+            source, rel = re.search(r"/digitaltwins/([^/]+)/relationships/([^/?]+)", request.url).groups()
+            if rel == "r3" and not state["throttled"]:
+                state["throttled"] = True
+                return (429, {"Retry-After": "0"}, json.dumps({"error": {"code": "TooManyRequests"}}))
+            if (source, rel) in state["relationships"]:
+                state["relationships"].discard((source, rel))
+                state["stale_relationships"].add((source, rel))
+            return (204, {}, "")
+
+        def delete_twin_callback(request):
+            state["deletes"] += 1
+            twin = re.search(r"/digitaltwins/([^/?]+)", request.url).group(1)
+            if twin in state["twins"]:
+                state["stale_twins"].add(twin)
+            if twin == "t5":
+                return (400, {}, json.dumps({"error": {"code": "BadRequest", "message": "Twin has relationships"}}))
+            if twin == "t6":
+                # deleted concurrently by someone else
+                state["twins"].discard(twin)
+                return (404, {}, json.dumps({"error": {"code": "DigitalTwinNotFound"}}))
+            state["twins"].discard(twin)
+            return (204, {}, "")
+
+        mocked_response.add_callback(
+            method=responses.POST,
+            url="https://{}/query".format(hostname),
+            callback=query_callback,
+            content_type="application/json",
+            match_querystring=False,
+        )
+        mocked_response.add_callback(
+            method=responses.DELETE,
+            url=re.compile(r"https://{}/digitaltwins/[^/]+/relationships/.+".format(hostname)),
+            callback=delete_relationship_callback,
+            content_type="application/json",
+        )
+        mocked_response.add_callback(
+            method=responses.DELETE,
+            url=re.compile(r"https://{}/digitaltwins/[^/?]+(\?.*)?$".format(hostname)),
+            callback=delete_twin_callback,
+            content_type="application/json",
+        )
+        yield state
+
+    def test_bulk_delete_all(self, fixture_cmd, bulk_scenario, tmp_path, capsys):
+        failure_log = str(tmp_path / "failures.ndjson")
+        result = subject.delete_all_twin(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            bulk=True,
+            max_workers=4,
+            failure_log=failure_log,
+        )
+
+        assert not bulk_scenario["relationships"]
+        assert bulk_scenario["twins"] == {"t5"}
+        assert result["relationships"]["deleted"] == 10
+        assert result["relationships"]["failed"] == 0
+        # t6 was already gone, deleted items returned again by the query are not deleted twice
+        assert result["twins"]["deleted"] == 18
+        assert result["twins"]["alreadyDeleted"] == 1
+        assert result["twins"]["failed"] == 1
+        assert result["throttled"] == 1
+        assert bulk_scenario["deletes"] == 10 + 1 + 20
+        assert result["failureLog"] == failure_log
+
+        with open(failure_log) as f:
+            failures = [json.loads(line) for line in f]
+        assert len(failures) == 1
+        assert failures[0]["type"] == "twin"
+        assert failures[0]["twinId"] == "t5"
+        assert "Deleted 18 twin(s), 1 failed" in capsys.readouterr().err
+
+    def test_bulk_delete_relationships(self, fixture_cmd, bulk_scenario):
+        result = subject.delete_all_relationship(
+            cmd=fixture_cmd,
+            name_or_hostname=hostname,
+            bulk=True,
+        )
+
+        assert not bulk_scenario["relationships"]
+        assert len(bulk_scenario["twins"]) == 20
+        assert "twins" not in result
+        assert result["relationships"]["deleted"] == 10
+
+    def test_bulk_delete_invalid_workers(self, fixture_cmd, bulk_scenario):
+        with pytest.raises(CLIError):
+            subject.delete_all_twin(cmd=fixture_cmd, name_or_hostname=hostname, bulk=True, max_workers=0)
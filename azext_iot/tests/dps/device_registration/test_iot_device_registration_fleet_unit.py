@@ -0,0 +1,136 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from azure.cli.core.azclierror import (
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    RequiredArgumentMissingError,
+)
+from azure.iot.device.exceptions import ClientError, ServiceError
+from azext_iot.common.utility import compute_device_key
+from azext_iot.dps.common import DISABLED_REGISTRATION_ERROR
+from azext_iot.dps.providers import fleet_registration as subject
+from azext_iot.tests.dps import TEST_ENDORSEMENT_KEY
+
+id_scope = "0ne00000000"
+
+
+class FakeRegistrar(object):
+    """Assigns devices round robin to two hubs, devices named disabled*, broken* or failed* fail."""
+
+    def __init__(self):
+        self.keys = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def register(self, registration_id, symmetric_key):
+        self.keys[registration_id] = symmetric_key
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if registration_id.startswith("disabled"):
+            raise ClientError("register failed") from ServiceError(DISABLED_REGISTRATION_ERROR)
+        if registration_id.startswith("broken"):
+            raise ValueError("broken")
+        if registration_id.startswith("failed"):
+            return SimpleNamespace(status="failed", registration_state=None)
+        index = int(registration_id.rsplit("-", 1)[-1])
+        return SimpleNamespace(
+            status="assigned",
+            registration_state=SimpleNamespace(
+                assigned_hub="hub{}.azure-devices.net".format(index % 2),
+                sub_status="initialAssignment",
+            ),
+        )
+
+
+@pytest.fixture
+def registrar(mocker):
+    fake = FakeRegistrar()
+    mocker.patch.object(subject, "ProvisioningRegistrar", return_value=fake)
+    return fake
+
+
+@pytest.fixture
+def group_key(mocker):
+    mocker.patch.object(subject.FleetRegistrationProvider, "_get_target", return_value={})
+    return mocker.patch.object(subject, "_get_enrollment_group_symmetric_key", return_value=TEST_ENDORSEMENT_KEY)
+
+
+def build_provider(fixture_cmd):
+    return subject.FleetRegistrationProvider(cmd=fixture_cmd, id_scope=id_scope)
+
+
+class TestFleetRegistration(object):
+    def test_create_fleet_prefix(self, fixture_cmd, registrar, group_key):
+        result = build_provider(fixture_cmd).create_fleet(
+            registration_id_prefix="sim-", count=25, enrollment_group_id="group", max_in_flight=4
+        )
+        # the group key is fetched once and device keys are derived locally
+        assert group_key.call_count == 1
+        assert len(registrar.keys) == 25
+        assert registrar.keys["sim-3"] == compute_device_key(TEST_ENDORSEMENT_KEY, "sim-3").decode()
+        assert registrar.max_in_flight == 4
+
+        assert result["registrations"] == 25
+        assert result["assigned"] == 25
+        assert result["failed"] == 0
+        assert result["assignedHubs"] == {"hub0.azure-devices.net": 13, "hub1.azure-devices.net": 12}
+        assert result["substatus"] == {"initialAssignment": 25}
+        assert result["failures"] == {}
+        latency = result["latencyMs"]
+        assert latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+
+    def test_create_fleet_file(self, fixture_cmd, registrar, group_key, tmp_path):
+        registration_id_file = tmp_path / "registrations.txt"
+        lines = ["# fleet", "dev-0,ownkey", "dev-1", "", "disabled-0", "disabled-1", "broken-0", "failed-0"]
+        registration_id_file.write_text("\n".join(lines), encoding="utf8")
+
+        result = build_provider(fixture_cmd).create_fleet(
+            registration_id_file=str(registration_id_file), enrollment_group_id="group"
+        )
+        assert registrar.keys["dev-0"] == "ownkey"
+        assert registrar.keys["dev-1"] == compute_device_key(TEST_ENDORSEMENT_KEY, "dev-1").decode()
+        assert result["registrations"] == 6
+        assert result["assigned"] == 2
+        assert result["failed"] == 4
+        assert result["failures"] == {
+            "disabled": {"count": 2, "registrationIds": ["disabled-0", "disabled-1"]},
+            "ValueError": {"count": 1, "registrationIds": ["broken-0"]},
+            "failed": {"count": 1, "registrationIds": ["failed-0"]},
+        }
+
+    def test_create_fleet_keys(self, fixture_cmd, registrar, group_key):
+        provider = build_provider(fixture_cmd)
+        provider.create_fleet(registration_id_prefix="a-", count=2, device_symmetric_key="samekey")
+        assert registrar.keys == {"a-0": "samekey", "a-1": "samekey"}
+
+        provider.create_fleet(
+            registration_id_prefix="b-", count=2, device_symmetric_key=TEST_ENDORSEMENT_KEY, compute_key=True
+        )
+        assert registrar.keys["b-1"] == compute_device_key(TEST_ENDORSEMENT_KEY, "b-1").decode()
+        assert group_key.call_count == 0
+
+    @pytest.mark.parametrize(
+        "kwargs, error",
+        [
+            ({}, RequiredArgumentMissingError),
+            ({"registration_id_prefix": "a-"}, RequiredArgumentMissingError),
+            ({"registration_id_file": "f", "count": 2}, MutuallyExclusiveArgumentError),
+            ({"registration_id_prefix": "a-", "count": -1, "enrollment_group_id": "g"}, InvalidArgumentValueError),
+            ({"registration_id_prefix": "a-", "count": 1, "enrollment_group_id": "g", "max_in_flight": 0},
+             InvalidArgumentValueError),
+            ({"registration_id_prefix": "a-", "count": 1, "compute_key": True}, RequiredArgumentMissingError),
+            ({"registration_id_prefix": "a-", "count": 1}, RequiredArgumentMissingError),
+        ],
+    )
+    def test_create_fleet_invalid_args(self, fixture_cmd, registrar, kwargs, error):
+        with pytest.raises(error):
+            build_provider(fixture_cmd).create_fleet(**kwargs)
@@ -581,6 +581,80 @@ class TestEnrollmentList():
         assert method == "POST"
         assert json.dumps(result)
 
+    @pytest.fixture
+    def serviceclient_pages(self, mocked_response, fixture_gdcs, fixture_dps_sas, patch_certificate_open):
+        # 3 pages of 4 enrollments, every other enrollment is enabled
+        def request_callback(request):
+            page = int(request.headers.get("x-ms-continuation", 0))
+            body = [
+                generate_enrollment_show(
+                    registrationId="e{}".format(page * 4 + i),
+                    provisioningStatus="enabled" if i % 2 else "disabled",
+                )
+                for i in range(4)
+            ]
+            headers = {"x-ms-continuation": str(page + 1)} if page < 2 else {}
+            return (200, headers, json.dumps(body))
+
+        mocked_response.add_callback(
+            method=responses.POST,
+            url="https://{}/enrollments/query".format(mock_dps_target['entity']),
+            callback=request_callback,
+            content_type="application/json",
+        )
+        yield mocked_response
+
+    @pytest.mark.parametrize(
+        "fields, item_filter, top, expected_ids",
+        [
+            (None, None, None, ["e{}".format(i) for i in range(12)]),
+            (["registrationId", "attestation.type"], None, 6, ["e{}".format(i) for i in range(6)]),
+            (["registrationId"], "provisioningStatus=='enabled'", None, ["e{}".format(i) for i in range(1, 12, 2)]),
+            (None, "provisioningStatus=='enabled'", 3, ["e1", "e3", "e5"]),
+        ],
+    )
+    def test_enrollment_list_stream(
+        self, serviceclient_pages, fixture_cmd, capsys, fields, item_filter, top, expected_ids
+    ):
+        result = subject.iot_dps_device_enrollment_list(
+            cmd=fixture_cmd,
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            top=top,
+            stream=True,
+            fields=fields,
+            item_filter=item_filter,
+        )
+        assert result is None
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [line["registrationId"] for line in lines] == expected_ids
+        if fields:
+            assert all(sorted(line) == sorted(set(field.split(".")[0] for field in fields)) for line in lines)
+            if "attestation.type" in fields:
+                assert lines[0]["attestation"] == {"type": "x509"}
+        # The filter applies after paging, so the page size is not capped by top
+        if item_filter:
+            assert all("x-ms-max-item-count" not in call.request.headers for call in serviceclient_pages.calls)
+
+    def test_enrollment_list_projection(self, serviceclient_pages, fixture_cmd):
+        result = subject.iot_dps_device_enrollment_list(
+            cmd=fixture_cmd,
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            fields=["registrationId", "missing.field"],
+        )
+        assert result == [{"registrationId": "e{}".format(i)} for i in range(12)]
+
+    def test_enrollment_list_invalid_filter(self, fixture_cmd, serviceclient_pages):
+        serviceclient_pages.assert_all_requests_are_fired = False
+        with pytest.raises(CLIError):
+            subject.iot_dps_device_enrollment_list(
+                cmd=fixture_cmd,
+                dps_name=mock_dps_target['entity'],
+                resource_group_name=resource_group,
+                item_filter="provisioningStatus==",
+            )
+
     def test_enrollment_list_error(self, fixture_cmd, serviceclient_generic_error):
         with pytest.raises(CLIError):
             subject.iot_dps_device_enrollment_list(
@@ -632,6 +706,134 @@ class TestEnrollmentDelete():
             )
 
 
+class TestEnrollmentBulk():
+    @pytest.fixture
+    def serviceclient(self, mocked_response, fixture_gdcs, fixture_dps_sas, patch_certificate_open):
+        # Enrollments named bad* are rejected by the service, a chunk holding boom* fails as a whole
+        def request_callback(request):
+            body = json.loads(request.body)
+            ids = [enrollment["registrationId"] for enrollment in body["enrollments"]]
+            if any(registration_id.startswith("boom") for registration_id in ids):
+                return (500, {}, json.dumps({"errorCode": 500000, "message": "boom"}))
+            errors = [
+                {"registrationId": registration_id, "errorCode": 409202, "errorStatus": "Conflict"}
+                for registration_id in ids
+                if registration_id.startswith("bad")
+            ]
+            return (200, {}, json.dumps({"isSuccessful": not errors, "errors": errors}))
+
+        mocked_response.add_callback(
+            method=responses.POST,
+            url="https://{}/enrollments".format(mock_dps_target['entity']),
+            callback=request_callback,
+            content_type="application/json",
+            match_querystring=False,
+        )
+        yield mocked_response
+
+    def test_enrollment_bulk_csv(self, serviceclient, fixture_cmd, tmp_path):
+        rows = ["registrationId,deviceId,attestationType,primaryKey,iotHubHostName,edgeEnabled,initialTwinTags"]
+        primary_key = "cGFzc3dvcmQ="
+        rows.extend("e{0},d{0},,{1},myhub.azure-devices.net,true,\"{{\"\"a\"\": 1}}\"".format(i, primary_key)
+                    for i in range(23))
+        rows.extend(["bad0,,,,,,", ",dx,,,,,", "bad1,,tpm,,,,", ",,,,,,"])
+        manifest = tmp_path / "enrollments.csv"
+        manifest.write_text("\n".join(rows) + "\n", encoding="utf8")
+        retry_file = str(tmp_path / "retry.jsonl")
+
+        result = subject.iot_dps_device_enrollment_bulk(
+            cmd=fixture_cmd,
+            manifest=str(manifest),
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            max_workers=2,
+            retry_file=retry_file,
+        )
+        assert result["mode"] == "create"
+        assert result["total"] == 26
+        assert sorted(result["succeeded"]) == sorted("e{}".format(i) for i in range(23))
+        assert [(entry["registrationId"], entry["line"]) for entry in result["failed"]] == [
+            ("bad0", 25), (None, 26), ("bad1", 27)
+        ]
+        assert result["failed"][0]["errorCode"] == 409202
+        assert "Endorsement key" in result["failed"][2]["error"]
+        assert result["retryFile"] == retry_file
+
+        # chunks of the service maximum
+        bodies = [json.loads(call.request.body) for call in serviceclient.calls]
+        assert sorted(len(body["enrollments"]) for body in bodies) == [4, 10, 10]
+        assert all(body["mode"] == "create" for body in bodies)
+        enrollment = next(e for body in bodies for e in body["enrollments"] if e["registrationId"] == "e0")
+        assert enrollment["deviceId"] == "d0"
+        assert enrollment["attestation"]["symmetricKey"]["primaryKey"] == primary_key
+        assert enrollment["capabilities"]["iotEdge"] is True
+        assert enrollment["iotHubs"] == ["myhub.azure-devices.net"]
+        assert enrollment["initialTwin"]["tags"] == {"a": 1}
+
+        # only enrollments rejected by the service can be retried
+        with open(retry_file, encoding="utf8") as f:
+            retries = [json.loads(line) for line in f]
+        assert [retry["registrationId"] for retry in retries] == ["bad0"]
+
+    @pytest.mark.parametrize("mode", ["delete", "updateIfMatchETag"])
+    def test_enrollment_bulk_json_lines(self, serviceclient, fixture_cmd, tmp_path, mode):
+        rows = [{"registrationId": "e{}".format(i), "etag": etag} for i in range(3)]
+        rows.append(generate_enrollment_show(registrationId="e3"))
+        rows.append({"registrationId": "boom"})
+        manifest = tmp_path / "enrollments.jsonl"
+        manifest.write_text("\n".join(json.dumps(row) for row in rows) + "\n\n[]\n", encoding="utf8")
+        retry_file = str(tmp_path / "retry.jsonl")
+
+        result = subject.iot_dps_device_enrollment_bulk(
+            cmd=fixture_cmd,
+            manifest=str(manifest),
+            mode=mode,
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            retry_file=retry_file,
+        )
+        assert result["total"] == 6
+        with open(retry_file, encoding="utf8") as f:
+            retries = [json.loads(line) for line in f]
+
+        body = json.loads(serviceclient.calls[0].request.body)
+        assert body["mode"] == mode
+        if mode == "delete":
+            # attestations default for deletes, the chunk holding boom fails as a whole
+            assert body["enrollments"][0] == {
+                "registrationId": "e0", "etag": etag, "attestation": {"type": "symmetricKey"}
+            }
+            assert result["succeeded"] == []
+            assert [entry["line"] for entry in result["failed"]] == [1, 2, 3, 4, 5, 7]
+            assert [retry["registrationId"] for retry in retries] == ["e0", "e1", "e2", "e3", "boom"]
+        else:
+            # attestation is required outside of delete mode, invalid rows are not submitted
+            assert [enrollment["registrationId"] for enrollment in body["enrollments"]] == ["e3"]
+            assert result["succeeded"] == ["e3"]
+            assert [entry["registrationId"] for entry in result["failed"]] == ["e0", "e1", "e2", "boom", None]
+            assert "attestation" in result["failed"][0]["error"]
+            assert retries == []
+
+    def test_enrollment_bulk_invalid_args(self, fixture_cmd, tmp_path):
+        with pytest.raises(CLIError):
+            subject.iot_dps_device_enrollment_bulk(
+                cmd=fixture_cmd,
+                manifest=str(tmp_path / "missing.jsonl"),
+                dps_name=mock_dps_target['entity'],
+                resource_group_name=resource_group,
+            )
+        manifest = tmp_path / "enrollments.jsonl"
+        manifest.write_text("", encoding="utf8")
+        with pytest.raises(CLIError):
+            subject.iot_dps_device_enrollment_bulk(
+                cmd=fixture_cmd,
+                manifest=str(manifest),
+                dps_name=mock_dps_target['entity'],
+                resource_group_name=resource_group,
+                max_workers=0,
+            )
+
+
 def generate_registration_state_show():
     payload = {'registrationId': enrollment_id, 'status': 'assigned', 'etag': etag, 'assignedHub': 'myHub',
                'deviceId': 'myDevice'}
@@ -5,9 +5,17 @@
 # --------------------------------------------------------------------------------------------
 
 
+import io
 import pytest
 import json
 import responses
+from azure.cli.core.azclierror import (
+    FileOperationError,
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    RequiredArgumentMissingError,
+)
+from azext_iot.common.utility import compute_device_key
 from azext_iot.operations import dps as subject
 from knack.util import CLIError
 from azext_iot.tests.conftest import mock_dps_target, mock_symmetric_key_attestation
@@ -612,6 +620,18 @@ class TestEnrollmentGroupList():
         assert json.dumps(result)
         assert str(headers.get("x-ms-max-item-count")) == str(top)
 
+    def test_enrollment_group_list_stream(self, serviceclient, fixture_cmd, capsys):
+        result = subject.iot_dps_device_enrollment_group_list(
+            cmd=fixture_cmd,
+            dps_name=mock_dps_target['entity'],
+            resource_group_name=resource_group,
+            stream=True,
+            fields=["enrollmentGroupId", "attestation.type"],
+        )
+        assert result is None
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines == [{"enrollmentGroupId": enrollment_id, "attestation": {"type": "x509"}}]
+
     def test_enrollment_group_list_error(self, fixture_cmd):
         with pytest.raises(CLIError):
             subject.iot_dps_device_enrollment_group_list(
@@ -793,3 +813,62 @@ class TestComputeDeviceKey():
         ).decode()
         offline_device_key = offline_device_key.strip("\"'\n")
         assert offline_device_key == GENERATED_KEY
+
+    @pytest.mark.parametrize("max_workers, chunk_size", [(1, 5000), (2, 3)])
+    def test_batch_compute_device_key(self, fixture_cmd, mocker, tmp_path, capsys, max_workers, chunk_size):
+        mocker.patch.object(subject, "DPS_DEVICE_KEY_CHUNK_SIZE", chunk_size)
+        registration_ids = ["{}-{}".format(TEST_KEY_REGISTRATION_ID, i) for i in range(10)]
+        registration_ids.insert(4, TEST_KEY_REGISTRATION_ID)
+        registration_id_file = tmp_path / "registration_ids.txt"
+        registration_id_file.write_text("\n".join(registration_ids) + "\n\n", encoding="utf8")
+        output_file = tmp_path / "device_keys.csv"
+
+        result = subject.iot_dps_compute_device_key(
+            cmd=fixture_cmd,
+            symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_id_file=str(registration_id_file),
+            output_file=str(output_file),
+            max_workers=max_workers,
+        )
+        assert result is None
+        rows = output_file.read_text(encoding="utf8").splitlines()
+        assert rows[0] == "registrationId,key"
+        assert [row.split(",")[0] for row in rows[1:]] == registration_ids
+        assert rows[5] == "{},{}".format(TEST_KEY_REGISTRATION_ID, GENERATED_KEY)
+        assert all(
+            row.split(",")[1] == compute_device_key(TEST_ENDORSEMENT_KEY, row.split(",")[0]).decode()
+            for row in rows[1:]
+        )
+        assert "Derived 11 device key(s)" in capsys.readouterr().err
+
+    def test_batch_compute_device_key_stdin(self, fixture_cmd, monkeypatch, capsys):
+        monkeypatch.setattr("sys.stdin", io.StringIO(TEST_KEY_REGISTRATION_ID + "\n"))
+        subject.iot_dps_compute_device_key(
+            cmd=fixture_cmd,
+            symmetric_key=TEST_ENDORSEMENT_KEY,
+            registration_id_file="-",
+        )
+        assert capsys.readouterr().out.splitlines() == [
+            "registrationId,key", "{},{}".format(TEST_KEY_REGISTRATION_ID, GENERATED_KEY)
+        ]
+
+    @pytest.mark.parametrize(
+        "registration_id, registration_id_file, max_workers, error",
+        [
+            (None, None, None, RequiredArgumentMissingError),
+            (TEST_KEY_REGISTRATION_ID, "-", None, MutuallyExclusiveArgumentError),
+            (None, "-", 0, InvalidArgumentValueError),
+            (None, "missing.txt", None, FileOperationError),
+        ],
+    )
+    def test_batch_compute_device_key_invalid_args(
+        self, fixture_cmd, registration_id, registration_id_file, max_workers, error
+    ):
+        with pytest.raises(error):
+            subject.iot_dps_compute_device_key(
+                cmd=fixture_cmd,
+                symmetric_key=TEST_ENDORSEMENT_KEY,
+                registration_id=registration_id,
+                registration_id_file=registration_id_file,
+                max_workers=max_workers,
+            )
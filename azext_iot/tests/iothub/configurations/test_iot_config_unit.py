@@ -6,12 +6,14 @@
 
 
 from azext_iot.tests.generators import generate_generic_id
+import os
 import pytest
 import responses
 import json
 from uuid import uuid4
 from random import randint
 from knack.cli import CLIError
+from azure.cli.core.azclierror import FileOperationError, InvalidArgumentValueError
 from azext_iot.operations import hub as subject
 from azext_iot.common.utility import read_file_content, evaluate_literal
 from azext_iot.tests.conftest import (
@@ -591,6 +593,70 @@ class TestConfigCreate:
             )
 
 
+class TestEdgeDeploymentValidate:
+    def test_edge_deployment_validate(self, fixture_cmd, tmp_path):
+        base_path = get_context_path(__file__)
+        manifests = {
+            "valid.json": "test_edge_deployment.json",
+            "nested/v11.json": "test_edge_deployment_v11.json",
+            "nested/layered.json": "test_edge_deployment_layered.json",
+            "malformed.json": "test_edge_deployment_malformed.json",
+            "nested/malformed.json": "test_edge_deployment_malformed.json",
+        }
+        for name, source in manifests.items():
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_text(read_file_content(os.path.join(base_path, source)), encoding="utf8")
+        (tmp_path / "broken.json").write_text("{broken", encoding="utf8")
+        (tmp_path / "notes.txt").write_text("not a manifest", encoding="utf8")
+
+        with pytest.raises(CLIError) as exc:
+            subject.iot_edge_deployment_validate(fixture_cmd, manifest_dir=str(tmp_path), max_workers=2)
+        summary = json.loads(str(exc.value))
+        assert summary["manifests"] == 6
+        assert summary["valid"] == 3
+        assert summary["invalid"] == 3
+        errors = summary["validationErrors"]
+        assert sorted(errors) == ["broken.json", "malformed.json", os.path.join("nested", "malformed.json")]
+        assert errors["malformed.json"] == errors[os.path.join("nested", "malformed.json")]
+        for error_element in errors["malformed.json"]:
+            assert error_element["contentPath"].startswith("$edge")
+            assert "schemaPath" in error_element
+            # errors shared by manifests are aggregated
+            assert summary["commonErrors"][error_element["description"]] == 2
+
+        summary = subject.iot_edge_deployment_validate(
+            fixture_cmd, manifest_dir=str(tmp_path / "nested"), pattern="v*.json"
+        )
+        assert summary["manifests"] == summary["valid"] == 1
+
+    def test_edge_deployment_validate_invalid_args(self, fixture_cmd, tmp_path):
+        with pytest.raises(FileOperationError):
+            subject.iot_edge_deployment_validate(fixture_cmd, manifest_dir=str(tmp_path / "missing"))
+        with pytest.raises(InvalidArgumentValueError):
+            subject.iot_edge_deployment_validate(fixture_cmd, manifest_dir=str(tmp_path))
+        with pytest.raises(InvalidArgumentValueError):
+            subject.iot_edge_deployment_validate(fixture_cmd, manifest_dir=str(tmp_path), max_workers=0)
+
+    def test_schema_registry(self, mocker):
+        from azext_iot.constants import EDGE_DEPLOYMENT_ROOT_SCHEMAS_PATH
+        from azext_iot.models import validators
+
+        registry = validators.JsonSchemaRegistry(EDGE_DEPLOYMENT_ROOT_SCHEMAS_PATH)
+        load = mocker.spy(registry, "_load")
+        validator = registry.get_validator("azure-iot-edgeagent-deployment-1.1.json")
+        assert validator is registry.get_validator("azure-iot-edgeagent-deployment-1.1.json")
+        assert registry.get_validator("azure-iot-edgeagent-deployment-9.0.json") is None
+        assert registry.get_validator("azure-iot-edgeagent-deployment-9.0.json") is None
+        assert load.call_count == 2
+        assert validators.get_schema_registry(EDGE_DEPLOYMENT_ROOT_SCHEMAS_PATH) is validators.get_schema_registry(
+            EDGE_DEPLOYMENT_ROOT_SCHEMAS_PATH
+        )
+
+        errors = validator.validate({"$edgeAgent": {"properties.desired": {"schemaVersion": "1.1"}}})
+        assert errors
+        assert validator.validate({"$edgeAgent": {"properties.desired": {"schemaVersion": "1.1"}}}) == errors
+
+
 class TestConfigDelete:
     @pytest.fixture(params=[204])
     def serviceclient(self, mocker, fixture_ghcs, fixture_sas, request):
@@ -1540,6 +1540,92 @@ class TestDeviceMethodInvoke:
                 method_payload='{"key":"value"}',
             )
 
+    @pytest.fixture
+    def fanout_serviceclient(self, mocker, fixture_ghcs, fixture_sas):
+        def _send(request, *args, **kwargs):
+            if "/devices/query" in request.url:
+                return build_mock_response(
+                    mocker,
+                    200,
+                    [{"deviceId": "gw1"}, {"deviceId": "gw2"}, {"deviceId": "gw1"}, {"deviceId": "offline"}],
+                    {"x-ms-continuation": None},
+                )
+            if "/twins/offline/" in request.url:
+                return build_mock_response(mocker, 404, {"Message": "DeviceNotOnline"})
+            if "/twins/odd/" in request.url:
+                return build_mock_response(mocker, 200, {"status": None, "payload": {}})
+            if "/twins/odder/" in request.url:
+                return build_mock_response(mocker, 200, {"status": "ok", "payload": {}})
+            device = request.url.split("/twins/")[1].split("/")[0]
+            return build_mock_response(mocker, 200, {"status": 200, "payload": {"device": device}})
+
+        service_client = mocker.patch(path_service_client)
+        service_client.side_effect = _send
+        return service_client
+
+    @pytest.mark.parametrize(
+        "targets",
+        [
+            {"device_ids": ["gw1", "gw2", "offline"]},
+            {"device_ids": ["gw1", "gw2", "gw1", "offline", "gw2"]},
+            {"device_query": "SELECT deviceId FROM devices.modules"},
+        ],
+    )
+    def test_device_method_fanout(self, fanout_serviceclient, capsys, targets):
+        result = subject.iot_device_method(
+            cmd=fixture_cmd,
+            hub_name=mock_target["entity"],
+            method_name="reboot",
+            method_payload='{"delay": 5}',
+            max_workers=2,
+            **targets
+        )
+        lines = {line["deviceId"]: line for line in map(json.loads, capsys.readouterr().out.splitlines())}
+        assert lines["gw1"]["status"] == 200
+        assert lines["gw1"]["payload"] == {"device": "gw1"}
+        assert lines["gw1"]["latencyMs"] >= 0
+        assert lines["offline"]["status"] == 404
+        assert "DeviceNotOnline" in str(lines["offline"]["error"])
+
+        assert result["invoked"] == 3
+        assert result["succeeded"] == 2
+        assert result["failed"] == 1
+        assert result["statusCounts"] == {"200": 2, "404": 1}
+        assert result["latencyMs"]["p50"] <= result["latencyMs"]["max"]
+
+        method_calls = [call for call in fanout_serviceclient.call_args_list if "/methods" in call[0][0].url]
+        assert len(method_calls) == 3
+        assert all(call[0][2]["payload"] == {"delay": 5} for call in method_calls)
+
+    def test_device_method_fanout_status_not_a_number(self, fanout_serviceclient, capsys):
+        result = subject.iot_device_method(
+            cmd=fixture_cmd,
+            hub_name=mock_target["entity"],
+            method_name="reboot",
+            device_ids=["odd", "gw1", "odder"],
+        )
+        assert len(capsys.readouterr().out.splitlines()) == 3
+        assert result["invoked"] == 3
+        assert result["succeeded"] == 1
+        assert result["failed"] == 2
+        # a null status is not a success, a status that is not a number fails deserialization
+        assert result["statusCounts"] == {"error": 2, "200": 1}
+
+    @pytest.mark.parametrize(
+        "targets",
+        [
+            {},
+            {"device_id": device_id, "device_ids": ["gw1"]},
+            {"device_ids": ["gw1"], "device_query": "SELECT * FROM devices"},
+            {"device_ids": ["gw1"], "max_workers": 0},
+        ],
+    )
+    def test_device_method_fanout_invalid_args(self, fanout_serviceclient, targets):
+        with pytest.raises(CLIError):
+            subject.iot_device_method(
+                cmd=fixture_cmd, hub_name=mock_target["entity"], method_name="reboot", **targets
+            )
+
 
 class TestDeviceModuleMethodInvoke:
     @pytest.fixture(params=[200])
@@ -1629,6 +1715,25 @@ class TestDeviceModuleMethodInvoke:
                 method_payload='{"key":"value"}',
             )
 
+    def test_device_module_method_fanout(self, serviceclient, capsys):
+        result = subject.iot_device_module_method(
+            cmd=fixture_cmd,
+            module_id=module_id,
+            method_name="mymethod",
+            hub_name=mock_target["entity"],
+            device_ids=["gw1", "gw2"],
+        )
+        urls = sorted(call[0][0].url for call in serviceclient.call_args_list)
+        assert "{}/twins/gw1/modules/{}/methods?".format(mock_target["entity"], module_id) in urls[0]
+        assert "{}/twins/gw2/modules/{}/methods?".format(mock_target["entity"], module_id) in urls[1]
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert sorted(line["deviceId"] for line in lines) == ["gw1", "gw2"]
+        assert all(line["moduleId"] == module_id and line["payload"] == "value" for line in lines)
+        # the module responded with a non 2xx method status
+        assert result["statusCounts"] == {"0": 2}
+        assert result["failed"] == 2
+
 
 class TestSasTokenAuth:
     def test_generate_sas_token(self):
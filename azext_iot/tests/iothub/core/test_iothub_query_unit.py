@@ -0,0 +1,142 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import pytest
+from knack.cli import CLIError
+from azext_iot.operations import generic as subject
+from azext_iot.tests.generators import generate_generic_id
+
+
+class MockQueryResult:
+    def __init__(self, payload, token):
+        self.response = self
+        self.headers = {"x-ms-continuation": token}
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def build_query_method(chains: dict, page_size: int):
+    """
+    Build a fake paged query method. chains maps the first query arg to the complete result
+    list of that chain; continuation tokens encode the next offset.
+    """
+    calls = []
+
+    def query_method(query, custom_headers=None, raw=False):
+        calls.append((query, dict(custom_headers)))
+        items = chains[query]
+        start = int(custom_headers.get("x-ms-continuation", 0))
+        size = min(page_size, int(custom_headers.get("x-ms-max-item-count", page_size)))
+        end = start + size
+        token = str(end) if end < len(items) else None
+        return MockQueryResult(items[start:end], token)
+
+    return query_method, calls
+
+
+def generate_items(count):
+    return [{"deviceId": generate_generic_id()} for _ in range(count)]
+
+
+class TestQueryPages:
+    @pytest.mark.parametrize(
+        "total, page_size, top, expected_pages",
+        [
+            (10, 3, None, 4),
+            (9, 3, None, 3),
+            (10, 3, 5, 2),
+            (10, 20, None, 1),
+            (0, 5, None, 1),
+        ],
+    )
+    def test_query_pages(self, total, page_size, top, expected_pages):
+        items = generate_items(total)
+        query_method, calls = build_query_method({"q": items}, page_size)
+
+        pages = list(subject._execute_query_pages(["q"], query_method, top))
+        assert len(pages) == expected_pages
+        assert [i for page in pages for i in page] == (items[:top] if top else items)
+        assert len(calls) == expected_pages
+
+    def test_query_pages_lazy(self):
+        query_method, calls = build_query_method({"q": generate_items(10)}, 2)
+        pages = subject._execute_query_pages(["q"], query_method)
+        assert len(calls) == 0
+        next(pages)
+        assert len(calls) == 1
+
+    def test_execute_query(self):
+        items = generate_items(7)
+        query_method, _ = build_query_method({"q": items}, 3)
+        assert subject._execute_query(["q"], query_method) == items
+        assert subject._execute_query(["q"], query_method, 4) == items[:4]
+
+
+class TestQueryPartitioned:
+    @pytest.mark.parametrize("partitions, max_workers", [(1, None), (3, None), (4, 2)])
+    def test_query_partitioned(self, partitions, max_workers):
+        chains = {"q{}".format(i): generate_items(i * 5 + 1) for i in range(partitions)}
+        query_method, _ = build_query_method(chains, 2)
+
+        pages = subject._execute_query_partitioned(
+            [[q] for q in chains], query_method, max_workers=max_workers
+        )
+        result = [i["deviceId"] for page in pages for i in page]
+        expected = [i["deviceId"] for chain in chains.values() for i in chain]
+        assert sorted(result) == sorted(expected)
+
+    def test_query_partitioned_top(self):
+        chains = {"q{}".format(i): generate_items(20) for i in range(3)}
+        query_method, _ = build_query_method(chains, 3)
+
+        pages = subject._execute_query_partitioned([[q] for q in chains], query_method, top=10)
+        assert len([i for page in pages for i in page]) == 10
+
+    def test_query_partitioned_error(self):
+        def query_method(query, custom_headers=None, raw=False):
+            raise CLIError("failure")
+
+        with pytest.raises(CLIError):
+            list(subject._execute_query_partitioned([["q0"], ["q1"]], query_method))
+
+    @pytest.mark.parametrize(
+        "query, predicates, expected",
+        [
+            (
+                "select * from devices",
+                ["status = 'enabled'", "status = 'disabled'"],
+                [
+                    "select * from devices WHERE status = 'enabled'",
+                    "select * from devices WHERE status = 'disabled'",
+                ],
+            ),
+            (
+                "SELECT deviceId FROM devices Where tags.a = 1 or tags.b = 2",
+                ["STARTSWITH(deviceId, 'a')"],
+                ["SELECT deviceId FROM devices WHERE (tags.a = 1 or tags.b = 2) AND (STARTSWITH(deviceId, 'a'))"],
+            ),
+        ],
+    )
+    def test_partition_query(self, query, predicates, expected):
+        assert subject._partition_query(query, predicates) == expected
+
+    def test_partition_query_aggregate(self):
+        with pytest.raises(CLIError):
+            subject._partition_query("select count() from devices group by status", ["a = 1"])
+
+
+class TestWriteNdjson:
+    def test_write_ndjson(self):
+        pages = [generate_items(3), [], generate_items(2)]
+        stream = io.StringIO()
+
+        assert subject._write_ndjson(iter(pages), stream) == 5
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == [i for page in pages for i in page]
@@ -0,0 +1,148 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import re
+import pytest
+import responses
+from azext_iot.operations import hub as subject
+from azext_iot.tests.conftest import mock_target
+
+edge_device_id = "myedgedevice"
+edge_scope = "ms-azure-iot-edge://{}-1234".format(edge_device_id)
+device_url = re.compile(r"https://{}/devices/([^/?]+)\?".format(mock_target["entity"]))
+query_url = "https://{}/devices/query".format(mock_target["entity"])
+
+
+def generate_device(device_id, is_edge=False, device_scope="", parent_scopes=None, etag="abcd"):
+    device = {
+        "etag": etag,
+        "capabilities": {"iotEdge": is_edge},
+        "deviceId": device_id,
+        "status": "enabled",
+        "deviceScope": device_scope,
+    }
+    if parent_scopes is not None:
+        device["parentScopes"] = parent_scopes
+    return device
+
+
+@pytest.fixture
+def bulk_scenario(mocked_response, fixture_ghcs, fixture_sas):
+    """
+    Registry of devices served through responses callbacks. Each device id maps to its identity; devices
+    listed in the stale set fail their first update with 412.
+    """
+    registry = {edge_device_id: generate_device(edge_device_id, is_edge=True, device_scope=edge_scope)}
+    stale = set()
+    updates = []
+    queries = []
+
+    def get_callback(request):
+        device_id = device_url.match(request.url).group(1)
+        if device_id not in registry:
+            return (404, {}, json.dumps({"Message": "DeviceNotFound"}))
+        return (200, {}, json.dumps(registry[device_id]))
+
+    def put_callback(request):
+        device_id = device_url.match(request.url).group(1)
+        if device_id in stale:
+            stale.discard(device_id)
+            return (412, {}, json.dumps({"Message": "PreconditionFailed"}))
+        body = json.loads(request.body)
+        updates.append(body)
+        return (200, {}, json.dumps(body))
+
+    def query_callback(request):
+        query = json.loads(request.body)["query"]
+        queries.append(query)
+        if "array_contains(parentScopes" in query:
+            twins = [d for d in registry.values() if edge_scope in (d.get("parentScopes") or [])]
+        else:
+            ids = re.findall(r"'([^']+)'", query)
+            twins = [registry[i] for i in ids if i in registry]
+        return (200, {}, json.dumps(twins))
+
+    mocked_response.add_callback(method=responses.GET, url=device_url, callback=get_callback, content_type="application/json")
+    mocked_response.add_callback(method=responses.PUT, url=device_url, callback=put_callback, content_type="application/json")
+    mocked_response.add_callback(
+        method=responses.POST, url=re.compile(query_url), callback=query_callback, content_type="application/json"
+    )
+    mocked_response.assert_all_requests_are_fired = False
+
+    yield registry, stale, updates, queries
+
+
+class TestDeviceChildrenBulk:
+    def test_children_add_bulk(self, fixture_cmd, bulk_scenario):
+        registry, stale, updates, queries = bulk_scenario
+        for i in range(20):
+            registry["leaf{}".format(i)] = generate_device("leaf{}".format(i))
+        registry["edgechild"] = generate_device("edgechild", is_edge=True, parent_scopes=[])
+        registry["parented"] = generate_device("parented", parent_scopes=["other"], device_scope="other")
+        stale.add("leaf3")
+
+        child_list = ["leaf{}".format(i) for i in range(20)] + ["edgechild", "parented", "missing"]
+        result = subject.iot_device_children_add(
+            cmd=fixture_cmd,
+            device_id=edge_device_id,
+            child_list=child_list,
+            hub_name=mock_target["entity"],
+            bulk=True,
+            max_workers=4,
+        )
+
+        assert sorted(result["succeeded"]) == sorted(child_list[:21])
+        assert sorted(f["deviceId"] for f in result["failed"]) == ["missing", "parented"]
+        assert len(updates) == 21
+        for body in updates:
+            if body["capabilities"]["iotEdge"]:
+                assert body["parentScopes"] == [edge_scope]
+            else:
+                assert body["deviceScope"] == edge_scope
+
+        # Stale etag was retried
+        assert not stale
+        # One batched query validates all children
+        assert len(queries) == 1
+
+    def test_children_add_bulk_force(self, fixture_cmd, bulk_scenario):
+        registry, _, updates, _ = bulk_scenario
+        registry["parented"] = generate_device("parented", parent_scopes=["other"], device_scope="other")
+
+        result = subject.iot_device_children_add(
+            cmd=fixture_cmd,
+            device_id=edge_device_id,
+            child_list=["parented"],
+            force=True,
+            hub_name=mock_target["entity"],
+            bulk=True,
+        )
+        assert result == {"succeeded": ["parented"], "failed": []}
+        assert updates[0]["deviceScope"] == edge_scope
+
+    @pytest.mark.parametrize("remove_all", [True, False])
+    def test_children_remove_bulk(self, fixture_cmd, bulk_scenario, remove_all):
+        registry, _, updates, _ = bulk_scenario
+        for i in range(10):
+            registry["leaf{}".format(i)] = generate_device(
+                "leaf{}".format(i), device_scope=edge_scope, parent_scopes=[edge_scope]
+            )
+        registry["other"] = generate_device("other", device_scope="other", parent_scopes=["other"])
+
+        child_list = None if remove_all else ["leaf{}".format(i) for i in range(10)] + ["other"]
+        result = subject.iot_device_children_remove(
+            cmd=fixture_cmd,
+            device_id=edge_device_id,
+            child_list=child_list,
+            remove_all=remove_all,
+            hub_name=mock_target["entity"],
+            bulk=True,
+        )
+
+        assert sorted(result["succeeded"]) == sorted("leaf{}".format(i) for i in range(10))
+        assert [f["deviceId"] for f in result["failed"]] == ([] if remove_all else ["other"])
+        assert all(body["deviceScope"] == "" for body in updates)
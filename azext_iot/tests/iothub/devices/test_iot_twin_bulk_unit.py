@@ -0,0 +1,155 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import pytest
+from azure.cli.core.azclierror import FileOperationError, InvalidArgumentValueError
+from azext_iot.operations import hub as subject
+from azext_iot.iothub.providers import twin_bulk
+from azext_iot.tests.conftest import build_mock_response, path_service_client
+
+hub_name = "hub"
+
+
+class FakeHub(object):
+    """
+    Twin endpoints of a hub. Twins of devices named stale* change once after their etag is queried,
+    devices named busy* are throttled once and devices named missing* do not exist.
+    """
+
+    def __init__(self, mocker):
+        self.mocker = mocker
+        self.etags = {}
+        self.queries = []
+        self.patches = []
+        self.throttled = set()
+
+    def send(self, request, headers=None, body=None, **kwargs):
+        if request.method == "POST" and "/devices/query" in request.url:
+            query = body["query"]
+            self.queries.append(query)
+            device_ids = [device_id.strip("'") for device_id in query.split("[")[1].rstrip("]").split(", ")]
+            twins = [
+                {"deviceId": device_id, "etag": self._etag(device_id)}
+                for device_id in device_ids
+                if not device_id.startswith("missing")
+            ]
+            for device_id in device_ids:
+                if device_id.startswith("stale"):
+                    self.etags[device_id] = "changed"
+            return build_mock_response(self.mocker, 200, twins, {"x-ms-continuation": None})
+
+        device_id = request.url.split("/twins/")[1].split("?")[0]
+        if request.method == "GET":
+            return build_mock_response(self.mocker, 200, {"deviceId": device_id, "etag": self._etag(device_id)})
+
+        if device_id.startswith("busy") and device_id not in self.throttled:
+            self.throttled.add(device_id)
+            return build_mock_response(self.mocker, 429, {}, {"Retry-After": "0"})
+        if headers["If-Match"] != '"{}"'.format(self._etag(device_id)):
+            return build_mock_response(self.mocker, 412, {})
+        self.patches.append((device_id, body))
+        return build_mock_response(
+            self.mocker, 200, {"deviceId": device_id, "etag": self._etag(device_id), "version": 2}
+        )
+
+    def _etag(self, device_id):
+        return self.etags.setdefault(device_id, "etag-{}".format(device_id))
+
+
+@pytest.fixture
+def fake_hub(mocker, fixture_ghcs, fixture_sas):
+    hub = FakeHub(mocker)
+    mocker.patch(path_service_client, side_effect=hub.send)
+    return hub
+
+
+def write_patches(tmp_path, lines):
+    patch_file = tmp_path / "patches.ndjson"
+    patch_file.write_text(
+        "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines), encoding="utf8"
+    )
+    return str(patch_file)
+
+
+def read_results(path):
+    with open(path, encoding="utf8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestTwinBulkUpdate(object):
+    def test_bulk_update(self, fixture_cmd, fake_hub, tmp_path, mocker):
+        mocker.patch.object(twin_bulk, "DEVICE_QUERY_ID_CHUNK_SIZE", 3)
+        desired = {"properties": {"desired": {"offset": 0.5}}}
+        patch_file = write_patches(
+            tmp_path,
+            [
+                {"deviceId": "d0", "patch": desired},
+                {"deviceId": "d1", "tags": {"site": "a"}},
+                {"deviceId": "stale0", "patch": desired},
+                {"deviceId": "busy0", "patch": desired},
+                "",
+                {"deviceId": "missing0", "patch": desired},
+                {"deviceId": "d2", "patch": desired, "etag": "old"},
+                {"deviceId": "d3", "patch": {"properties": {"reported": {}}}},
+                "{broken",
+            ],
+        )
+        results_file = str(tmp_path / "results.ndjson")
+
+        result = subject.iot_device_twin_bulk_update(
+            fixture_cmd, patch_file=patch_file, results_file=results_file, max_workers=2, hub_name=hub_name
+        )
+        assert result["succeeded"] == 4
+        assert result["failed"] == 4
+        assert result["throttled"] == 1
+        assert result["etagRetries"] == 1
+        assert result["resultsFile"] == results_file
+
+        # etags are read with one query per chunk, lines with their own etag are not queried
+        assert len(fake_hub.queries) == 2
+        assert "'d2'" not in "".join(fake_hub.queries)
+        assert sorted(device_id for device_id, _ in fake_hub.patches) == ["busy0", "d0", "d1", "stale0"]
+        assert ("d1", {"tags": {"site": "a"}}) in fake_hub.patches
+
+        results = {result.get("deviceId", result.get("line")): result for result in read_results(results_file)}
+        assert len(results) == 8
+        assert results["stale0"] == {"deviceId": "stale0", "status": "succeeded", "etag": "changed", "version": 2}
+        assert results["missing0"]["error"] == "Device not found."
+        # an explicit etag is a precondition, a changed twin is not retried
+        assert results["d2"]["statusCode"] == 412
+        assert results[8]["error"] == "Properties must be an object with desired properties only."
+        assert results[9]["status"] == "failed"
+
+    def test_bulk_update_invalid_args(self, fixture_cmd, fake_hub, tmp_path):
+        patch_file = write_patches(tmp_path, [{"deviceId": "d0", "tags": {"a": 1}}])
+        with pytest.raises(InvalidArgumentValueError):
+            subject.iot_device_twin_bulk_update(fixture_cmd, patch_file=patch_file, max_workers=0, hub_name=hub_name)
+        with pytest.raises(FileOperationError):
+            subject.iot_device_twin_bulk_update(
+                fixture_cmd, patch_file=str(tmp_path / "missing.ndjson"), hub_name=hub_name
+            )
+
+    def test_adaptive_concurrency(self):
+        concurrency = twin_bulk.AdaptiveConcurrency(maximum=8, initial_delay=0)
+        concurrency.acquire()
+        concurrency.release(throttled=True, retry_after=0)
+        assert concurrency.limit == 4
+        concurrency.acquire()
+        concurrency.release(throttled=True, retry_after=0)
+        assert concurrency.limit == 2
+        assert concurrency.throttled == 2
+
+        # the limit grows by one after as many successes
+        for _ in range(2):
+            concurrency.acquire()
+            concurrency.release()
+        assert concurrency.limit == 3
+        for _ in range(3 + 4 + 5 + 6 + 7):
+            concurrency.acquire()
+            concurrency.release()
+        assert concurrency.limit == 8
+        assert concurrency.in_flight == 0
@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------------------------
 
 
+import io
 import pytest
 import json
 from random import randint
@@ -12,6 +13,7 @@ from functools import partial
 from uuid import uuid4
 from knack.cli import CLIError
 from azext_iot.iothub import commands_job as subject
+from azext_iot.iothub.providers import job as job_provider
 from azext_iot.common.shared import JobStatusType, JobType
 from azext_iot.tests.conftest import build_mock_response, path_service_client, mock_target
 
@@ -957,3 +959,116 @@ class TestJobList:
     def test_job_list_error(self, fixture_cmd, serviceclient_generic_error):
         with pytest.raises(CLIError):
             subject.job_list(cmd=fixture_cmd, hub_name=mock_target["entity"])
+
+
+def job_state(status, succeeded=0, failed=0, device_count=4, **kwargs):
+    result = {
+        "jobId": "myjob",
+        "type": JobType.scheduleUpdateTwin.value,
+        "status": status,
+        "deviceJobStatistics": {
+            "deviceCount": device_count,
+            "succeededCount": succeeded,
+            "failedCount": failed,
+            "runningCount": 0,
+            "pendingCount": device_count - succeeded - failed,
+        },
+    }
+    result.update(kwargs)
+    return result
+
+
+class TestJobWatch:
+    @pytest.fixture
+    def sleeps(self, mocker):
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        mocker.patch.object(job_provider.asyncio, "sleep", fake_sleep)
+        return sleeps
+
+    def test_job_watch_backoff(self, sleeps):
+        states = iter(
+            [
+                {"jobId": "myjob", "type": JobType.scheduleUpdateTwin.value, "status": JobStatusType.queued.value},
+                job_state(JobStatusType.running.value),
+                job_state(JobStatusType.running.value),
+                job_state(JobStatusType.running.value),
+                job_state(JobStatusType.running.value, succeeded=2),
+                job_state(
+                    JobStatusType.completed.value,
+                    succeeded=3,
+                    failed=1,
+                    startTime="2020-01-06T21:44:00.0000000Z",
+                    endTime="2020-01-06T21:44:02.0000000Z",
+                ),
+            ]
+        )
+        stream = io.StringIO()
+        watch = job_provider.JobWatch(
+            fetch=lambda job_id: next(states), job_ids=["myjob"], poll_interval=1, max_poll_interval=4, stream=stream
+        )
+        result = watch.run()
+
+        # unchanged polls back off, progress resets the interval
+        assert sleeps == [1, 1, 2, 4, 1]
+        updates = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [update["status"] for update in updates] == ["queued", "running", "running", "completed"]
+        assert updates[1]["delta"] == {"deviceCount": 4, "pendingCount": 4}
+        assert updates[2]["delta"] == {"succeededCount": 2, "pendingCount": -2}
+        assert updates[3]["delta"] == {"succeededCount": 1, "failedCount": 1, "pendingCount": -2}
+
+        job = result["jobs"]["myjob"]
+        assert job["status"] == "completed"
+        assert job["polls"] == 6
+        # finished jobs use the service start and end time
+        assert job["devicesPerSecond"] == 2.0
+        assert result["statusCounts"] == {"completed": 1}
+        assert result["deviceJobStatistics"]["succeededCount"] == 3
+        assert result["unfinished"] == []
+
+    def test_job_watch_errors(self, sleeps):
+        def fetch(job_id):
+            if job_id == "missing":
+                raise CLIError("not found")
+            return job_state(JobStatusType.completed.value, succeeded=4)
+
+        watch = job_provider.JobWatch(
+            fetch=fetch, job_ids=["missing", "done"], poll_interval=1, max_poll_interval=8, stream=io.StringIO()
+        )
+        result = watch.run()
+        assert sleeps == [2, 4]
+        assert result["jobs"]["missing"]["error"] == "not found"
+        assert result["jobs"]["missing"]["polls"] == 0
+        assert result["statusCounts"] == {"error": 1, "completed": 1}
+        assert result["unfinished"] == ["missing"]
+
+    def test_job_watch(self, fixture_cmd, mocker, fixture_ghcs, fixture_sas, capsys, sleeps):
+        service_client = mocker.patch(path_service_client)
+        service_client.return_value = build_mock_response(mocker, 200, generate_job_show())
+        result = subject.job_watch(
+            cmd=fixture_cmd, job_ids=["job1", "job2"], hub_name=mock_target["entity"]
+        )
+        assert service_client.call_count == 2
+        assert set(result["jobs"]) == {"job1", "job2"}
+        assert result["statusCounts"] == {"completed": 2}
+        assert len(capsys.readouterr().out.splitlines()) == 2
+
+    @pytest.mark.parametrize(
+        "job_ids, poll_interval, max_poll_interval, poll_duration",
+        [([], 10, 60, 600), (["a"], 0, 60, 600), (["a"], 10, 5, 600), (["a"], 10, 60, 0)],
+    )
+    def test_job_watch_invalid_args(
+        self, fixture_cmd, fixture_ghcs, fixture_sas, job_ids, poll_interval, max_poll_interval, poll_duration
+    ):
+        with pytest.raises(CLIError):
+            subject.job_watch(
+                cmd=fixture_cmd,
+                job_ids=job_ids,
+                poll_interval=poll_interval,
+                max_poll_interval=max_poll_interval,
+                poll_duration=poll_duration,
+                hub_name=mock_target["entity"],
+            )
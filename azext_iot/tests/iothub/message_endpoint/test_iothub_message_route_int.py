@@ -11,6 +11,10 @@ import pytest
 from azext_iot.iothub.common import RouteSourceType
 from azext_iot.common.embedded_cli import EmbeddedCLI
 from azext_iot.tests.generators import generate_generic_id
+from azext_iot.tests.iothub.message_endpoint.test_iothub_route_query_unit import (
+    CONFORMANCE_CASES,
+    CONFORMANCE_MESSAGE,
+)
 
 cli = EmbeddedCLI()
 MAX_HUB_RETRIES = 30
@@ -426,6 +430,45 @@ def test_route_fallback_lifecycle(provisioned_only_iot_hub_module):
     wait_till_hub_state_is_active(iot_hub, iot_rg)
 
 
+@pytest.mark.hub_infrastructure(desired_tags="test=message_route")
+def test_route_query_conformance(provisioned_only_iot_hub_module, tmp_path):
+    from azext_iot._factory import iot_hub_service_factory
+    from azure.cli.core.mock import DummyCli
+
+    iot_hub = provisioned_only_iot_hub_module["name"]
+    iot_rg = provisioned_only_iot_hub_module["resourcegroup"]
+    client = iot_hub_service_factory(DummyCli()).iot_hub_resource
+
+    # The offline evaluator agrees with the service on every conformance case
+    for condition, expected in CONFORMANCE_CASES:
+        result = client.test_route(
+            iot_hub_name=iot_hub,
+            resource_group_name=iot_rg,
+            input={
+                "message": CONFORMANCE_MESSAGE["message"],
+                "twin": CONFORMANCE_MESSAGE["twin"],
+                "route": {
+                    "name": "conformance",
+                    "source": RouteSourceType.DeviceMessages.value,
+                    "condition": condition,
+                    "endpointNames": ["events"],
+                    "isEnabled": True,
+                },
+            },
+        )
+        assert (result.result.lower() == "true") is expected, condition
+
+    # Without routes every device message goes to the fallback route
+    corpus = tmp_path / "corpus.ndjson"
+    corpus.write_text("\n".join(json.dumps(CONFORMANCE_MESSAGE) for _ in range(10)), encoding="utf-8")
+    result = cli.invoke(
+        f"iot hub message-route evaluate -n {iot_hub} -g {iot_rg} --corpus '{corpus}'"
+    ).as_json()
+    assert result["messages"] == 10
+    assert result["routes"] == []
+    assert result["fallback"]["matched"] == 10
+
+
 def wait_till_hub_state_is_active(iot_hub: str, iot_rg: str):
     state = None
     retries = 0
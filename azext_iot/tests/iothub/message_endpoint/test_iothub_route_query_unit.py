@@ -0,0 +1,374 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import pytest
+from types import SimpleNamespace
+from uamqp.message import Message, MessageProperties
+from azure.cli.core.azclierror import FileOperationError, InvalidArgumentValueError
+from azext_iot.iothub.providers.message_route import MessageRoute
+from azext_iot.iothub.providers.route_query import (
+    RouteSet,
+    RoutingMessage,
+    UNDEFINED,
+    compile_condition,
+    compile_expression,
+    normalize_system_property,
+    read_corpus,
+)
+from azext_iot.monitor.handlers.common_handler import CommonHandler
+from azext_iot.monitor.models.arguments import CommonHandlerArguments, CommonParserArguments
+
+CONFORMANCE_MESSAGE = {
+    "message": {
+        "body": json.dumps(
+            {
+                "temperature": 31.5,
+                "count": 3,
+                "status": "Hot",
+                "active": True,
+                "nothing": None,
+                "weather": {"humidity": [10, {"month": "Feb"}]},
+            }
+        ),
+        "appProperties": {"level": "critical", "retries": "2"},
+        "systemProperties": {"contentType": "application/json", "contentEncoding": "utf-8"},
+    },
+    "twin": {"tags": {"floor": 2, "site": "north"}, "properties": {"desired": {"interval": 5}, "reported": {}}},
+}
+
+# Conditions and whether the conformance message matches them. The same table is checked against the
+# service test route api by the integration tests.
+CONFORMANCE_CASES = [
+    ("true", True),
+    ("false", False),
+    ("$body.temperature > 30", True),
+    ("$body.temperature >= 31.5 AND $body.temperature <= 31.5", True),
+    ("$body.temperature < 30", False),
+    ("$body.temperature = '31.5'", False),
+    ("$body.temperature != '31.5'", False),
+    ("NOT ($body.temperature = '31.5')", False),
+    ("$body.count = 3", True),
+    ("$body.count <> 3", False),
+    ("$body.count + 1 = 4", True),
+    ("$body.count * 2 - 1 = 5", True),
+    ("$body.count % 2 = 1", True),
+    ("-$body.count < 0", True),
+    ("$body.status = 'Hot'", True),
+    ("$body.status = 'hot'", False),
+    ("LOWER($body.status) = 'hot'", True),
+    ("upper($body.status) = 'HOT'", True),
+    ("$body.status > 'A'", True),
+    ("$body.active = true", True),
+    ("$body.active", True),
+    ("NOT $body.active", False),
+    ("$body.nothing = null", True),
+    ("IS_NULL($body.nothing)", True),
+    ("IS_DEFINED($body.missing)", False),
+    ("NOT IS_DEFINED($body.missing)", True),
+    ("$body.missing = 1", False),
+    ("NOT ($body.missing = 1)", False),
+    ("$body.missing = 1 OR $body.count = 3", True),
+    ("$body.missing = 1 AND $body.count = 3", False),
+    ("$body.weather.humidity[0] = 10", True),
+    ("$body.weather.humidity[1].month = 'Feb'", True),
+    ("$body.weather.humidity[5] = 10", False),
+    ("IS_OBJECT($body.weather)", True),
+    ("IS_ARRAY($body.weather.humidity)", True),
+    ("IS_NUMBER($body.count) AND IS_STRING($body.status) AND IS_BOOL($body.active)", True),
+    ("IS_PRIMITIVE($body.weather)", False),
+    ("level = 'critical'", True),
+    ("Level = 'critical'", False),
+    ("retries = 2", False),
+    ("retries = '2'", True),
+    ("level = 'critical' OR retries > 5", True),
+    ("STARTS_WITH(level, 'crit') AND ENDS_WITH(level, 'cal')", True),
+    ("CONTAINS(level, 'tic')", True),
+    ("INDEX_OF(level, 'tic') = 3", True),
+    ("LENGTH(level) = 8", True),
+    ("SUBSTRING(level, 0, 4) = 'crit'", True),
+    ("CONCAT(level, '-', retries) = 'critical-2'", True),
+    ("ABS(-$body.count) = 3 AND FLOOR($body.temperature) = 31 AND CEILING($body.temperature) = 32", True),
+    ("SQUARE($body.count) = 9 AND POWER($body.count, 2) = 9 AND SIGN(-$body.temperature) = -1", True),
+    ("$contentType = 'application/json'", True),
+    ("$contentEncoding = 'utf-8'", True),
+    ("$twin.tags.floor = 2", True),
+    ("$twin.tags.site = 'north' AND $twin.properties.desired.interval > 1", True),
+    ("$twin.tags.missing = 2", False),
+]
+
+
+def build_message(record=None) -> RoutingMessage:
+    return RoutingMessage.from_json(record or CONFORMANCE_MESSAGE)
+
+
+class TestRouteQuery(object):
+    @pytest.mark.parametrize("condition, expected", CONFORMANCE_CASES)
+    def test_conformance(self, condition, expected):
+        assert compile_condition(condition)(build_message()) is expected
+
+    @pytest.mark.parametrize(
+        "condition, expected",
+        [
+            ("$body.temperature > 30", UNDEFINED),
+            ("$body.missing = 1", UNDEFINED),
+            ("NOT ($body.missing = 1)", UNDEFINED),
+            ("$body.missing = 1 OR false", UNDEFINED),
+            ("$body.missing = 1 AND false", False),
+            ("$body.missing = 1 OR true", True),
+            ("'a' = 1", UNDEFINED),
+            ("true = 1", UNDEFINED),
+            ("true < false", UNDEFINED),
+            ("1 + '1'", UNDEFINED),
+            ("1 / 0", UNDEFINED),
+            ("3 / 2", 1.5),
+            ("'a' || 'b'", "ab"),
+            ("LENGTH(1)", UNDEFINED),
+            ("SQRT(-1)", UNDEFINED),
+        ],
+    )
+    def test_undefined(self, condition, expected):
+        # without a json content type the body is not queryable
+        message = RoutingMessage(body='{"temperature": 31}', system_properties={"contentType": "text/plain"})
+        assert compile_expression(condition)(message) == expected
+
+    @pytest.mark.parametrize(
+        "system_properties, queryable",
+        [
+            ({"contentType": "application/json", "contentEncoding": "utf-8"}, True),
+            ({"content-type": "Application/JSON", "content-encoding": "UTF-16"}, True),
+            ({"content_type": "application/json", "content_encoding": "utf-32"}, True),
+            ({"contentType": "application/json"}, False),
+            ({"contentType": "application/json", "contentEncoding": "ascii"}, False),
+            ({"contentType": "text/plain", "contentEncoding": "utf-8"}, False),
+            ({}, False),
+        ],
+    )
+    def test_body_content_type(self, system_properties, queryable):
+        message = RoutingMessage(body='{"a": 1}', system_properties=system_properties)
+        assert compile_condition("$body.a = 1")(message) is queryable
+
+    def test_body_parsed_once(self, mocker):
+        loads = mocker.patch("azext_iot.iothub.providers.route_query.json.loads", return_value={"a": 1})
+        message = build_message()
+        for condition in ["$body.a = 1", "$body.a > 0", "level = 'critical'"]:
+            compile_condition(condition)(message)
+        assert loads.call_count == 1
+
+        # routes that do not read the body never parse it
+        loads.reset_mock()
+        compile_condition("level = 'critical'")(build_message())
+        assert loads.call_count == 0
+
+    def test_invalid_body(self):
+        message = RoutingMessage(body="{not json", system_properties=CONFORMANCE_MESSAGE["message"]["systemProperties"])
+        assert compile_expression("$body")(message) is UNDEFINED
+
+    @pytest.mark.parametrize(
+        "name, expected",
+        [
+            ("connectionDeviceId", "connectiondeviceid"),
+            ("iothub-connection-device-id", "connectiondeviceid"),
+            ("iothub-enqueuedtime", "enqueuedtime"),
+            ("content_type", "contenttype"),
+        ],
+    )
+    def test_normalize_system_property(self, name, expected):
+        assert normalize_system_property(name) == expected
+
+    def test_system_properties(self):
+        message = RoutingMessage(system_properties={"iothub-connection-device-id": "dev1", "user-id": "u"})
+        assert compile_condition("$connectionDeviceId = 'dev1'")(message)
+        assert compile_condition("$iothub-connection-device-id = 'dev1'")(message)
+        assert compile_condition("$userId = 'u'")(message)
+        assert not compile_condition("$connectionModuleId = 'dev1'")(message)
+
+    @pytest.mark.parametrize(
+        "condition",
+        ["", "level =", "level == 'a'", "(level = 'a'", "level = 'a", "unknown(level)", "LENGTH()", "$body.", "a # b"],
+    )
+    def test_invalid_condition(self, condition):
+        if not condition:
+            # an empty condition is the same as true
+            assert compile_condition(condition)(build_message())
+            return
+        with pytest.raises(InvalidArgumentValueError):
+            compile_condition(condition)
+
+    def test_monitor_events_record(self):
+        record = {
+            "event": {
+                "origin": "dev1",
+                "payload": {"temperature": 31},
+                "annotations": {"iothub-connection-device-id": "dev1"},
+                "properties": {
+                    "system": {"content_type": "application/json", "content_encoding": "utf-8"},
+                    "application": {"level": "critical"},
+                },
+            }
+        }
+        message = RoutingMessage.from_json(record)
+        assert message.source == "devicemessages"
+        assert compile_condition(
+            "$body.temperature > 30 AND level = 'critical' AND $connectionDeviceId = 'dev1'"
+        )(message)
+
+
+def route(name, condition, source="DeviceMessages", enabled=True):
+    return SimpleNamespace(
+        name=name, source=source, condition=condition, endpoint_names=["events"], is_enabled=enabled
+    )
+
+
+class TestRouteSet(object):
+    def test_match(self):
+        route_set = RouteSet(
+            routes=[
+                route("hot", "$body.temperature > 30"),
+                route("critical", "level = 'critical'", enabled=False),
+                route("twins", "true", source="TwinChangeEvents"),
+                route("broken", "level =="),
+            ],
+            fallback_route=route("$fallback", "true"),
+        )
+        assert route_set.routes[3]["matched"] is None
+        assert "Invalid routing query" in route_set.routes[3]["error"]
+
+        assert route_set.match(build_message()) == ["hot", "critical"]
+        # disabled routes are counted but do not prevent the fallback
+        assert route_set.match(build_message({"appProperties": {"level": "critical"}})) == ["critical", "$fallback"]
+        assert route_set.match(build_message({"source": "TwinChangeEvents"})) == ["twins"]
+        # the fallback only applies to device messages
+        assert route_set.match(build_message({"routingSource": "DeviceLifecycleEvents"})) == []
+
+        assert [entry["matched"] for entry in route_set.routes] == [1, 2, 1, None]
+        assert route_set.fallback["matched"] == 1
+        assert route_set.unrouted == 1
+
+    def test_match_disabled_fallback(self):
+        route_set = RouteSet(routes=[{"name": "r", "source": "DeviceMessages", "condition": "false"}],
+                             fallback_route={"name": "$fallback", "condition": "true", "isEnabled": False})
+        assert route_set.match(build_message()) == []
+        assert route_set.unrouted == 1
+        assert route_set.fallback["matched"] == 0
+
+
+class TestMessageRouteEvaluate(object):
+    @pytest.fixture
+    def provider(self):
+        provider = MessageRoute.__new__(MessageRoute)
+        provider.hub_resource = SimpleNamespace(
+            properties=SimpleNamespace(
+                routing=SimpleNamespace(
+                    routes=[
+                        route("hot", "$body.temperature > 30"),
+                        route("critical", "level = 'critical'"),
+                        route("twins", "$twin.tags.floor = 2", source="TwinChangeEvents"),
+                    ],
+                    fallback_route=route("$fallback", "true"),
+                )
+            )
+        )
+        return provider
+
+    def test_evaluate(self, provider, tmp_path):
+        system_properties = CONFORMANCE_MESSAGE["message"]["systemProperties"]
+        lines = [
+            json.dumps({"body": '{"temperature": 35}', "systemProperties": system_properties}),
+            json.dumps({"body": '{"temperature": 25}', "systemProperties": system_properties}),
+            json.dumps({"body": "", "appProperties": {"level": "critical"}}),
+            "",
+            "{broken",
+            json.dumps(CONFORMANCE_MESSAGE),
+            json.dumps({"routingSource": "TwinChangeEvents", "twin": {"tags": {"floor": 2}}}),
+            json.dumps(["not", "a", "message"]),
+        ]
+        corpus = tmp_path / "corpus.ndjson"
+        corpus.write_text("\n".join(lines), encoding="utf-8")
+
+        result = provider.evaluate(corpus=str(corpus))
+        assert result["messages"] == 5
+        assert result["invalid"] == {"count": 2, "lines": [5, 8]}
+        assert {entry["name"]: entry["matched"] for entry in result["routes"]} == {"hot": 2, "critical": 2, "twins": 1}
+        assert result["fallback"]["matched"] == 1
+        assert result["unrouted"] == 0
+        assert result["messagesPerSecond"] >= 0
+
+        result = provider.evaluate(corpus=str(corpus), source_type="twinchangeevents")
+        assert result["messages"] == 1
+        assert [entry["name"] for entry in result["routes"]] == ["twins"]
+
+        # a single route is evaluated without the fallback route, like test_route
+        result = provider.evaluate(corpus=str(corpus), route_name="critical")
+        assert [(entry["name"], entry["matched"]) for entry in result["routes"]] == [("critical", 2)]
+        assert result["fallback"] is None
+        assert result["unrouted"] == 3
+
+    def test_evaluate_invalid_properties(self, provider, tmp_path):
+        lines = [
+            json.dumps({"body": [1, 2], "appProperties": None, "systemProperties": None}),
+            json.dumps({"systemProperties": [1]}),
+            json.dumps({"appProperties": "level"}),
+            json.dumps({"message": {"body": "", "appProperties": [["level", "critical"]]}}),
+            json.dumps({"event": {"payload": 1, "properties": [1]}}),
+            json.dumps({"event": {"payload": 1, "annotations": ["a"]}}),
+            json.dumps({"event": {"payload": 1, "properties": {"system": 1}}}),
+            json.dumps({"event": {"payload": 1, "properties": {"application": "critical"}}}),
+            json.dumps({"event": {"payload": 1, "properties": None, "annotations": None}}),
+        ]
+        corpus = tmp_path / "corpus.ndjson"
+        corpus.write_text("\n".join(lines), encoding="utf-8")
+
+        result = provider.evaluate(corpus=str(corpus))
+        assert result["messages"] == 2
+        assert result["invalid"]["count"] == 7
+        assert result["invalid"]["lines"] == [2, 3, 4, 5, 6]
+        assert result["fallback"]["matched"] == 2
+
+    def test_evaluate_monitor_events_output(self, provider, tmp_path, capsys):
+        handler = CommonHandler(
+            CommonHandlerArguments(output="json", common_parser_args=CommonParserArguments(properties=["all"]))
+        )
+        for temperature, level in [(35, "info"), (20, "critical"), (25, "info")]:
+            handler.parse_message(
+                Message(
+                    body=json.dumps({"temperature": temperature}).encode(),
+                    annotations={b"iothub-connection-device-id": b"dev1"},
+                    application_properties={b"level": level.encode()},
+                    properties=MessageProperties(content_type="application/json", content_encoding="utf-8"),
+                )
+            )
+        # events are pretty printed across many lines, --message-count adds a status line at the end
+        output = capsys.readouterr().out + "Successfully parsed 3 message(s).\n"
+        assert output.count("\n") > 40
+        corpus = tmp_path / "events.json"
+        corpus.write_text(output, encoding="utf-8")
+
+        result = provider.evaluate(corpus=str(corpus))
+        assert result["messages"] == 3
+        assert result["invalid"]["count"] == 1
+        assert {entry["name"]: entry["matched"] for entry in result["routes"]} == {"hot": 1, "critical": 1, "twins": 0}
+        assert result["fallback"]["matched"] == 1
+
+    def test_read_corpus(self):
+        event = json.dumps({"event": {"payload": {"temperature": 35}}}, indent=4)
+        stream = io.StringIO(
+            "\n".join([event, json.dumps({"body": "{}"}), "", "{", '    "body": 1', event, "not json", "{broken"])
+        )
+        records = [(line, record is not None, error is None) for line, record, error in read_corpus(stream)]
+        assert records == [
+            (1, True, True),
+            (8, True, True),
+            (10, False, False),
+            (12, True, True),
+            (19, False, False),
+            (20, False, False),
+        ]
+
+    def test_evaluate_missing_corpus(self, provider, tmp_path):
+        with pytest.raises(FileOperationError):
+            provider.evaluate(corpus=str(tmp_path / "missing.ndjson"))
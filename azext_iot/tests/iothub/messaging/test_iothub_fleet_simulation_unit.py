@@ -0,0 +1,250 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import random
+import re
+import threading
+import pytest
+import responses
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import monotonic
+from azure.cli.core.azclierror import (
+    InvalidArgumentValueError,
+    MutuallyExclusiveArgumentError,
+    RequiredArgumentMissingError,
+)
+from azext_iot.common.utility import compute_percentiles
+from azext_iot.iothub.providers import fleet_simulation as subject
+from azext_iot.tests.conftest import mock_target
+
+events_url = re.compile(r"https://{}/devices/([^/]+)/messages/events".format(mock_target["entity"]))
+registry_url = re.compile(r"https://{}/devices\?".format(mock_target["entity"]))
+
+
+class FakeTransport(object):
+    def __init__(self, throttled=None, failing=None):
+        self.connected = []
+        self.messages = []
+        self.throttled = throttled or set()
+        self.failing = failing or set()
+        self.closed = False
+
+    async def connect(self, device_id):
+        self.connected.append(device_id)
+
+    async def send(self, device_id, payload, properties):
+        if device_id in self.throttled:
+            raise subject.FleetThrottledError("429")
+        if device_id in self.failing:
+            raise ValueError("failure")
+        self.messages.append((device_id, json.loads(payload), properties))
+
+    async def close(self):
+        self.closed = True
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        StandInHandler.received.append((self.path, self.headers["Authorization"], json.loads(body)))
+        if "/devices/throttled/" in self.path:
+            self.send_response(429)
+            self.end_headers()
+            self.wfile.write(b'{"Message":"ErrorCode:ThrottlingException"}')
+            return
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def stand_in_endpoint():
+    StandInHandler.received = []
+    server = ThreadingServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+class TestFleetSchedules:
+    def test_constant(self):
+        delays = subject._send_delays("constant", 4, 10, random.Random(0))
+        assert [next(delays) for _ in range(3)] == [0.25, 0.25, 0.25]
+
+    def test_poisson(self):
+        delays = subject._send_delays("poisson", 10, 10, random.Random(0))
+        samples = [next(delays) for _ in range(5000)]
+        assert all(d >= 0 for d in samples)
+        assert 0.09 < sum(samples) / len(samples) < 0.11
+
+    def test_burst(self):
+        delays = subject._send_delays("burst", 2, 3, random.Random(0))
+        assert [next(delays) for _ in range(6)] == [1.5, 0, 0, 1.5, 0, 0]
+
+    def test_invalid(self):
+        with pytest.raises(InvalidArgumentValueError):
+            next(subject._send_delays("sometimes", 2, 3, random.Random(0)))
+
+
+class TestFleetSimulator:
+    def test_run(self):
+        transport = FakeTransport(throttled={"d1"}, failing={"d2"})
+        simulator = subject.FleetSimulator(
+            transport=transport,
+            device_ids=["d0", "d1", "d2", "d3"],
+            msg_count=5,
+            device_rate=200,
+            data="hello",
+            properties={"content-type": "application/json"},
+            seed=1,
+        )
+        result = simulator.run()
+
+        assert transport.closed
+        assert sorted(transport.connected) == ["d0", "d1", "d2", "d3"]
+        assert result["devices"] == 4
+        assert result["sent"] == 10
+        assert result["throttled"] == 5
+        assert result["failed"] == 5
+        assert result["messagesPerSecond"] > 0
+        assert set(result["latencyMs"]) == {"p50", "p90", "p99", "max"}
+
+        d0 = [payload for device_id, payload, _ in transport.messages if device_id == "d0"]
+        assert [p["data"] for p in d0] == ["hello #{}".format(i) for i in range(1, 6)]
+        assert all(p["deviceId"] == "d0" for p in d0)
+
+    def test_total_rate(self):
+        transport = FakeTransport()
+        simulator = subject.FleetSimulator(
+            transport=transport,
+            device_ids=["d{}".format(i) for i in range(10)],
+            msg_count=3,
+            device_rate=1000,
+            total_rate=100,
+        )
+        start = monotonic()
+        result = simulator.run()
+        assert result["sent"] == 30
+        # 30 messages at 100/s take at least ~0.29s regardless of the per device rate
+        assert monotonic() - start >= 0.28
+
+    def test_connect_failure(self):
+        class FailingConnect(FakeTransport):
+            async def connect(self, device_id):
+                raise ConnectionError("refused")
+
+        result = subject.FleetSimulator(
+            transport=FailingConnect(), device_ids=["d0", "d1"], msg_count=4, device_rate=100
+        ).run()
+        assert result["sent"] == 0
+        assert result["failed"] == 8
+        assert result["latencyMs"]["p50"] is None
+
+
+class TestHttpFleetTransport:
+    def test_stand_in_endpoint(self, stand_in_endpoint):
+        transport = subject.HttpFleetTransport(
+            hub_hostname=mock_target["entity"],
+            policy_name=mock_target["policy"],
+            policy_key=mock_target["primarykey"],
+            max_connections=8,
+            endpoint=stand_in_endpoint,
+        )
+        result = subject.FleetSimulator(
+            transport=transport,
+            device_ids=["d{}".format(i) for i in range(10)] + ["throttled"],
+            msg_count=3,
+            device_rate=100,
+        ).run()
+
+        assert result["sent"] == 30
+        assert result["throttled"] == 3
+        assert result["failed"] == 0
+        assert len(StandInHandler.received) == 33
+        path, auth, body = StandInHandler.received[0]
+        assert path.startswith("/devices/{}/messages/events?api-version=".format(body["deviceId"]))
+        assert auth.startswith("SharedAccessSignature sr={}".format(mock_target["entity"]))
+
+
+class TestFleetSimulationProvider:
+    def test_device_count(self, fixture_cmd, fixture_ghcs, mocked_response):
+        created = []
+        events = []
+
+        def registry_callback(request):
+            devices = json.loads(request.body)
+            created.extend(devices)
+            errors = [
+                {"deviceId": d["id"], "errorCode": "DeviceAlreadyExists", "errorStatus": "exists"}
+                for d in devices if d["id"] == "sim0"
+            ]
+            return (400 if errors else 200, {}, json.dumps({"isSuccessful": not errors, "errors": errors}))
+
+        def events_callback(request):
+            events.append((events_url.match(request.url).group(1), request.headers))
+            return (204, {}, "")
+
+        mocked_response.add_callback(
+            method=responses.POST, url=registry_url, callback=registry_callback, content_type="application/json"
+        )
+        mocked_response.add_callback(method=responses.POST, url=events_url, callback=events_callback)
+
+        provider = subject.FleetSimulationProvider(cmd=fixture_cmd, hub_name=mock_target["entity"])
+        result = provider.simulate_fleet(
+            device_count=150, device_prefix="sim", msg_count=2, device_rate=500, properties="iothub-app-a=b"
+        )
+
+        assert result["sent"] == 300
+        assert len(created) == 150
+        assert all(d["importMode"] == "create" for d in created)
+        assert len({device_id for device_id, _ in events}) == 150
+        assert events[0][1]["iothub-app-a"] == "b"
+        assert events[0][1]["content-type"] == "application/json"
+
+    def test_device_file(self, fixture_cmd, fixture_ghcs, mocked_response, tmp_path):
+        device_file = tmp_path / "devices.txt"
+        device_file.write_text("# fleet\ndeviceA\n\ndeviceB,key\n")
+        mocked_response.add(method=responses.POST, url=events_url, status=204)
+
+        provider = subject.FleetSimulationProvider(cmd=fixture_cmd, hub_name=mock_target["entity"])
+        result = provider.simulate_fleet(device_file=str(device_file), msg_count=3, device_rate=500)
+        assert result["devices"] == 2
+        assert result["sent"] == 6
+
+    @pytest.mark.parametrize(
+        "kwargs, error",
+        [
+            ({}, RequiredArgumentMissingError),
+            ({"device_count": 2, "device_file": "devices.txt"}, MutuallyExclusiveArgumentError),
+            ({"device_count": 2, "device_rate": 0}, InvalidArgumentValueError),
+            ({"device_count": 2, "total_rate": -1}, InvalidArgumentValueError),
+            ({"device_count": 2, "msg_count": 0}, InvalidArgumentValueError),
+        ],
+    )
+    def test_invalid_args(self, fixture_cmd, fixture_ghcs, kwargs, error):
+        provider = subject.FleetSimulationProvider(cmd=fixture_cmd, hub_name=mock_target["entity"])
+        with pytest.raises(error):
+            provider.simulate_fleet(**kwargs)
+
+
+class TestPercentiles:
+    def test_compute_percentiles(self):
+        assert compute_percentiles([], [50]) == {50: None}
+        assert compute_percentiles([5], [50, 99]) == {50: 5, 99: 5}
+        assert compute_percentiles(list(range(101, 0, -1)), [50, 90, 99]) == {50: 51, 90: 91, 99: 100}
+        assert compute_percentiles([1, 2], [50]) == {50: 1.5}
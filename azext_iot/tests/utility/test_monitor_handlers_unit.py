@@ -0,0 +1,296 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from uamqp.message import Message
+from azext_iot.monitor.handlers import stats_handler
+from azext_iot.monitor.handlers.central_handler import CentralHandler
+from azext_iot.monitor.handlers.common_handler import CommonHandler
+from azext_iot.monitor.message_filter import IdMatcher, MessageFilter
+from azext_iot.monitor.models.arguments import (
+    CentralHandlerArguments,
+    CommonHandlerArguments,
+    CommonParserArguments,
+    StatsHandlerArguments,
+)
+from azext_iot.monitor.models.enum import Severity
+from azext_iot.monitor.parsers import common_parser
+from azext_iot.monitor.parsers.issue import CentralIssue, IssueHandler, IssueStore
+
+enqueued = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def build_message(device_id, payload, partition="0", module_id=None, latency_ms=None, creation_time=None):
+    annotations = {
+        common_parser.DEVICE_ID_IDENTIFIER: device_id.encode(),
+        b"iothub-enqueuedtime": int(enqueued.timestamp() * 1000),
+    }
+    if module_id:
+        annotations[common_parser.MODULE_ID_IDENTIFIER] = module_id.encode()
+    if latency_ms is not None:
+        payload["timestamp"] = str((enqueued - timedelta(milliseconds=latency_ms)).replace(tzinfo=None))
+    app_properties = {}
+    if creation_time:
+        app_properties[stats_handler.CREATION_TIME_IDENTIFIER] = creation_time.encode()
+
+    message = Message(
+        body=json.dumps(payload).encode(), annotations=annotations, application_properties=app_properties
+    )
+    message.partition_id = partition
+    return message
+
+
+@pytest.fixture
+def handler(mocker):
+    mocker.patch("azext_iot.monitor.handlers.stats_handler.get_loop")
+
+    def _handler(summary_interval=5, timestamp_field="timestamp", **kwargs):
+        handler_args = CommonHandlerArguments(output="json", common_parser_args=CommonParserArguments(), **kwargs)
+        return stats_handler.StatsHandler(
+            StatsHandlerArguments(
+                common_handler_args=handler_args,
+                summary_interval=summary_interval,
+                timestamp_field=timestamp_field,
+            )
+        )
+
+    return _handler
+
+
+class TestStatsHandler:
+    def test_aggregates(self, handler, capsys):
+        subject = handler()
+        for i in range(10):
+            subject.parse_message(build_message("d1", {"i": i}, partition=str(i % 2), latency_ms=100 + i))
+        subject.parse_message(build_message("d2", {"blob": "x" * 2000}, partition="1", module_id="m1"))
+        subject.parse_message(
+            build_message("d2", {}, partition="1", creation_time="2023-01-01T11:59:59.500Z")
+        )
+
+        # Events are aggregated, never printed
+        assert capsys.readouterr().out == ""
+
+        result = subject.generate_final_stats()
+        assert result["messages"] == 12
+        assert result["partitions"]["0"]["messages"] == 5
+        assert result["partitions"]["1"]["messages"] == 7
+        assert result["devices"]["d1"]["messages"] == 10
+        assert list(result["modules"]) == ["d2/m1"]
+        assert result["modules"]["d2/m1"]["messages"] == 1
+
+        latency = result["latencyMs"]
+        assert latency["samples"] == 11
+        assert latency["missingTimestamps"] == 1
+        assert latency["max"] == 500
+        assert 100 <= latency["p50"] <= 109
+
+        histogram = result["payloadBytes"]["histogram"]
+        assert histogram == {"<=128": 11, "<=4096": 1}
+
+    def test_filters(self, handler):
+        subject = handler(device_id="d1*", module_id="")
+        subject.parse_message(build_message("d10", {}))
+        subject.parse_message(build_message("other", {}))
+        assert subject.generate_final_stats()["messages"] == 1
+
+    def test_summary_table(self, handler):
+        subject = handler()
+        for i in range(3):
+            subject.parse_message(build_message("d{}".format(i), {}, partition="3", latency_ms=20))
+        table = subject.generate_summary_table()
+        assert "3 message(s)" in table
+        assert "Partition" in table and "Device" in table
+        assert "Module" not in table
+
+        # Window counters reset after each summary
+        assert not subject.window_device_counts
+        assert "0.0" in subject.generate_summary_table().splitlines()[2]
+
+    def test_max_messages(self, handler, capsys):
+        subject = handler(max_messages=2)
+        subject.parse_message(build_message("d1", {}))
+        with pytest.raises(KeyboardInterrupt):
+            subject.parse_message(build_message("d1", {}))
+        assert "Successfully parsed 2 message(s)." in capsys.readouterr().out
+
+    def test_no_timestamp_field(self, handler):
+        subject = handler(timestamp_field=None)
+        subject.parse_message(build_message("d1", {}, latency_ms=10))
+        assert subject.generate_final_stats()["latencyMs"]["missingTimestamps"] == 1
+
+
+class TestStatsHelpers:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (1672574400, enqueued),
+            (1672574400000, enqueued),
+            ("2023-01-01T12:00:00Z", enqueued),
+            ("2023-01-01 12:00:00", enqueued),
+            (b"2023-01-01T13:00:00+01:00", enqueued),
+            (enqueued.replace(tzinfo=None), enqueued),
+            ("not a date", None),
+            (None, None),
+            (True, None),
+        ],
+    )
+    def test_parse_timestamp(self, value, expected):
+        assert stats_handler._parse_timestamp(value) == expected
+
+    def test_reservoir(self):
+        reservoir = stats_handler.Reservoir(size=100)
+        for i in range(1000):
+            reservoir.add(i)
+        assert len(reservoir.samples) == 100
+        summary = reservoir.summary()
+        assert summary["samples"] == 1000
+        assert summary["max"] == 999
+
+
+class TestMessageFilter:
+    @pytest.mark.parametrize(
+        "patterns, value, expected",
+        [
+            ([], "any", True),
+            (["dev1"], "dev1", True),
+            (["dev1"], "dev10", False),
+            (["dev*"], "dev10", True),
+            (["dev*"], "xdev10", False),
+            (["dev?"], "dev1", True),
+            (["dev?"], "dev10", False),
+            (["a.b*"], "axb", False),
+            (["a.b*"], "a.bc", True),
+            (["exact", "pre*", "*post"], "mypost", True),
+            (["exact", "pre*", "*post"], "exact", True),
+            (["exact", "pre*", "*post"], "postfix", False),
+            (["dev1"], b"dev1", True),
+            (["dev1"], None, False),
+        ],
+    )
+    def test_id_matcher(self, patterns, value, expected):
+        assert IdMatcher(patterns).matches(value) is expected
+
+    def test_devices_are_exact(self):
+        message_filter = MessageFilter(devices=["dev*", "other"])
+        assert message_filter.should_process_device("dev*")
+        assert not message_filter.should_process_device("dev1")
+
+    @pytest.mark.parametrize(
+        "kwargs, device_id, module_id, interface, expected",
+        [
+            ({}, "d1", None, None, True),
+            ({"device_id": "d*", "devices": ["d1", "d2"]}, "d1", None, None, True),
+            ({"device_id": "d*", "devices": ["d1", "d2"]}, "d3", None, None, False),
+            ({"device_id": "x*", "devices": ["d1"]}, "d1", None, None, False),
+            ({"module_id": "m1"}, "d1", "m1", None, True),
+            ({"module_id": "m1"}, "d1", None, None, False),
+            ({"interface_name": "dtmi:a;1"}, "d1", None, (common_parser.INTERFACE_NAME_IDENTIFIER_V2, b"dtmi:a;1"), True),
+            ({"interface_name": "dtmi:a;1"}, "d1", None, (common_parser.INTERFACE_NAME_IDENTIFIER_V1, b"dtmi:b;1"), False),
+            ({"interface_name": "dtmi:a;1"}, "d1", None, None, False),
+        ],
+    )
+    def test_accepts(self, kwargs, device_id, module_id, interface, expected):
+        message = build_message(device_id, {}, module_id=module_id)
+        if interface:
+            message.annotations[interface[0]] = interface[1]
+        assert MessageFilter(**kwargs).accepts(message) is expected
+
+    def test_rejected_not_parsed(self, mocker, capsys):
+        parser = mocker.patch("azext_iot.monitor.handlers.common_handler.CommonParser")
+        handler = CommonHandler(
+            CommonHandlerArguments(
+                output="json", common_parser_args=CommonParserArguments(), devices=["d{}".format(i) for i in range(5000)]
+            )
+        )
+        handler.parse_message(build_message("unknown", {}))
+        assert parser.call_count == 0
+
+        parser.return_value.parse_message.return_value = {"event": {}}
+        handler.parse_message(build_message("d4999", {}))
+        assert parser.call_count == 1
+        assert handler.message_count == 1
+
+
+class TestIssueStore:
+    def test_aggregates(self):
+        store = IssueStore(sample_size=2)
+        for i in range(1000):
+            store.add(
+                CentralIssue(
+                    Severity.error, "value {}".format(i), "message {}".format(i), "d{}".format(i % 2), "t1", kind="mismatch"
+                )
+            )
+        store.add(CentralIssue(Severity.warning, "unmodeled", "message", "d0", "t1"))
+
+        assert store.total == 1001
+        assert len(store) == 3
+
+        issues = store.get_issues()
+        assert [(i.severity, i.device_id, i.count) for i in issues] == [
+            (Severity.error, "d0", 500),
+            (Severity.error, "d1", 500),
+            (Severity.warning, "d0", 1),
+        ]
+        first = issues[0].json_repr()
+        assert first["details"] == "value 0"
+        assert first["samples"] == ["message 996", "message 998"]
+        assert first["message"] == "message 998"
+        assert first["template_id"] == "t1"
+        assert first["first_seen"] <= first["last_seen"]
+        assert "1001 issue(s) in 3 group(s)." in store.summary()
+
+    def test_group_limit(self):
+        store = IssueStore(max_groups=2)
+        for i in range(5):
+            store.add(CentralIssue(Severity.error, "details", "message", "d{}".format(i)))
+        assert len(store) == 2
+        assert store.total == 5
+        assert store.dropped == 3
+        assert "3 issue(s) over the group limit" in store.summary()
+
+    def test_issue_slots(self):
+        handler = IssueHandler()
+        handler.add_central_issue(Severity.info, "details", "message", "", "")
+        issue = handler.get_all_issues()[0]
+        assert not hasattr(issue, "__dict__")
+        assert issue.kind == "details"
+        assert issue.json_repr() == {
+            "severity": "info",
+            "details": "details",
+            "device_id": "Unknown",
+            "message": "message",
+            "template_id": "Unknown",
+        }
+
+
+class TestCentralHandler:
+    def test_issues_aggregated(self, mocker, capsys):
+        mocker.patch("azext_iot.monitor.handlers.central_handler.get_loop")
+        parser = mocker.patch("azext_iot.monitor.handlers.central_handler.CentralParser")
+        parser.return_value.issues_handler.get_issues_with_minimum_severity.side_effect = lambda severity: [
+            CentralIssue(Severity.error, "mismatch", "message", "d1", "t1", kind="schema_mismatch:temp")
+        ]
+        handler = CentralHandler(
+            central_device_provider=mocker.MagicMock(),
+            central_template_provider=mocker.MagicMock(),
+            central_handler_args=CentralHandlerArguments(
+                duration=0,
+                max_messages=0,
+                style="json",
+                progress_interval=1000,
+                common_handler_args=CommonHandlerArguments(output="json", common_parser_args=CommonParserArguments()),
+            ),
+            central_dns_suffix="azureiotcentral.com",
+        )
+        for _ in range(50):
+            handler.validate_message(build_message("d1", {}))
+
+        handler._print_results()
+        result = json.loads(capsys.readouterr().out.split("Processing and displaying results.")[1])
+        assert len(result) == 1
+        assert result[0]["count"] == 50
@@ -0,0 +1,192 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import asyncio
+import json
+import pytest
+from uamqp.message import Message
+from azext_iot.monitor import telemetry
+from azext_iot.monitor.checkpoint import CheckpointStore
+from azext_iot.monitor.models.target import Target
+
+
+class FakeReceiveClient(object):
+    instances = []
+    batches = []
+
+    def __init__(self, source, **kwargs):
+        self.source = source
+        self.kwargs = kwargs
+        self.batch_sizes = []
+        self.closed = False
+        FakeReceiveClient.instances.append(self)
+
+    async def open_async(self, connection=None):
+        pass
+
+    async def receive_message_batch_async(self, max_batch_size=None, **kwargs):
+        self.batch_sizes.append(max_batch_size)
+        return FakeReceiveClient.batches.pop(0) if FakeReceiveClient.batches else []
+
+    async def receive_messages_iter_async(self):
+        for batch in FakeReceiveClient.batches:
+            for msg in batch:
+                yield msg
+        FakeReceiveClient.batches = []
+
+    async def close_async(self):
+        self.closed = True
+
+
+def build_message(body, offset):
+    return Message(
+        body=body,
+        annotations={b"x-opt-offset": str(offset).encode(), b"x-opt-sequence-number": offset // 10},
+    )
+
+
+@pytest.fixture
+def fake_receive_client(mocker):
+    FakeReceiveClient.instances = []
+    FakeReceiveClient.batches = [
+        [build_message(b"a", 10), build_message(b"b", 20)],
+        [build_message(b"c", 30)],
+    ]
+    mocker.patch.object(telemetry.uamqp, "ReceiveClientAsync", FakeReceiveClient)
+    yield FakeReceiveClient
+    FakeReceiveClient.instances = []
+    FakeReceiveClient.batches = []
+
+
+@pytest.fixture
+def target(mocker):
+    return Target(hostname="myhub.servicebus.windows.net", path="myhub", partitions=["0"], auth=mocker.MagicMock())
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestMonitorEvents:
+    def test_batch_receive(self, fake_receive_client, target, capsys):
+        batches = []
+        meter = telemetry.ThroughputMeter(interval=0)
+
+        run(
+            telemetry._monitor_events(
+                target=target,
+                connection=None,
+                partition="3",
+                enqueued_time_utc=0,
+                on_message_received=None,
+                prefetch=500,
+                batch_size=100,
+                on_batch_received=batches.append,
+                meter=meter,
+            )
+        )
+
+        client = fake_receive_client.instances[0]
+        assert client.kwargs["prefetch"] == 500
+        assert client.batch_sizes == [100, 100, 100]
+        assert client.closed
+        assert [len(b) for b in batches] == [2, 1]
+        assert all(msg.partition_id == "3" for b in batches for msg in b)
+        assert meter.total == 3
+        assert "events/sec" in capsys.readouterr().err
+
+    def test_single_receive(self, fake_receive_client, target):
+        received = []
+        run(
+            telemetry._monitor_events(
+                target=target,
+                connection=None,
+                partition="1",
+                enqueued_time_utc=0,
+                on_message_received=received.append,
+            )
+        )
+
+        assert fake_receive_client.instances[0].kwargs["prefetch"] == 0
+        assert [msg.get_data() is not None for msg in received] == [True] * 3
+        assert all(msg.partition_id == "1" for msg in received)
+
+    def test_throughput_meter(self, capsys):
+        meter = telemetry.ThroughputMeter(interval=3600)
+        meter.add(10)
+        meter.add(5)
+        assert capsys.readouterr().err == ""
+
+        meter.report(final=True)
+        assert "Received 15 event(s) in total" in capsys.readouterr().err
+
+
+class TestCheckpoint:
+    def test_checkpoint_and_resume(self, fake_receive_client, target, tmp_path):
+        path = str(tmp_path / "checkpoints" / "hub.json")
+        store = CheckpointStore(path=path, event_hub="myhub", consumer_group="cg", interval=3600)
+        run(
+            telemetry._monitor_events(
+                target=target,
+                connection=None,
+                partition="0",
+                enqueued_time_utc=12345,
+                on_message_received=lambda msg: None,
+                checkpoint_store=store,
+            )
+        )
+        source = fake_receive_client.instances[0].source
+        assert source.get_filter() == b"amqp.annotation.x-opt-enqueuedtimeutc > 12345"
+
+        # Interval not reached yet, written on flush
+        assert not (tmp_path / "checkpoints").exists()
+        store.flush()
+        with open(path) as f:
+            content = json.load(f)
+        assert content["partitions"]["0"] == {"offset": "30", "sequenceNumber": 3, "enqueuedTime": None}
+
+        resumed = CheckpointStore(path=path, event_hub="myhub", consumer_group="cg", resume=True)
+        fake_receive_client.batches = [[build_message(b"d", 40)]]
+        run(
+            telemetry._monitor_events(
+                target=target,
+                connection=None,
+                partition="0",
+                enqueued_time_utc=12345,
+                on_message_received=None,
+                prefetch=10,
+                on_batch_received=lambda batch: None,
+                checkpoint_store=resumed,
+            )
+        )
+        source = fake_receive_client.instances[1].source
+        assert source.get_filter() == b"amqp.annotation.x-opt-offset > '30'"
+
+        resumed.flush()
+        with open(path) as f:
+            assert json.load(f)["partitions"]["0"]["offset"] == "40"
+
+    def test_resume_mismatch(self, tmp_path):
+        path = str(tmp_path / "hub.json")
+        with open(path, "w") as f:
+            json.dump({"eventHub": "other", "consumerGroup": "cg", "partitions": {"0": {"offset": "5"}}}, f)
+
+        assert CheckpointStore(path=path, event_hub="myhub", consumer_group="cg", resume=True).get_offset("0") is None
+        assert CheckpointStore(path=path, event_hub="other", consumer_group="cg", resume=True).get_offset("0") == "5"
+        assert CheckpointStore(path=str(tmp_path / "missing.json"), event_hub="x", consumer_group="cg", resume=True).stored == {}
+
+    def test_interval_flush(self, mocker, tmp_path):
+        path = str(tmp_path / "hub.json")
+        store = CheckpointStore(path=path, event_hub="myhub", consumer_group="cg", interval=10)
+        mocker.patch("azext_iot.monitor.checkpoint.monotonic", return_value=store.last_flush + 11)
+        store.update("2", build_message(b"x", 70))
+        with open(path) as f:
+            assert json.load(f)["partitions"]["2"]["offset"] == "70"
+        assert not store.dirty
@@ -0,0 +1,95 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import stat
+import pytest
+from azure.cli.core.azclierror import UnauthorizedError
+from azext_iot.common import target_cache as subject
+from azext_iot.common.utility import handle_service_exception
+from azext_iot.iothub.providers.discovery import IotHubDiscovery
+
+cache_key = {"subscription": "mysub", "resource_name": "myhub", "resource_group": ""}
+
+
+@pytest.fixture(autouse=True)
+def config_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    subject._served_entries.clear()
+    return tmp_path
+
+
+@pytest.fixture
+def cache_cmd(mocker):
+    cmd = mocker.MagicMock(name="cmd")
+    cmd.cli_ctx.cloud.name = "AzureCloud"
+    cmd.cli_ctx.config.getint.return_value = 300
+    return cmd
+
+
+class TestTargetCache:
+    def test_get_target_cache_disabled(self, mocker, cache_cmd):
+        assert subject.get_target_cache(mocker.MagicMock(spec=[]), "IoT Hub") is None
+
+        cache_cmd.cli_ctx.config.getint.return_value = 0
+        assert subject.get_target_cache(cache_cmd, "IoT Hub") is None
+
+    def test_set_get(self, cache_cmd):
+        cache = subject.get_target_cache(cache_cmd, "IoT Hub")
+        assert cache.get(**cache_key) is None
+
+        payload = {"entity": "myhub.azure-devices.net", "primarykey": "key"}
+        cache.set(payload, **cache_key)
+        assert cache.get(**cache_key) == payload
+        assert cache.get(**{**cache_key, "resource_group": "myrg"}) is None
+        assert subject.get_target_cache(cache_cmd, "IoT Hub Device Provisioning Service").get(**cache_key) is None
+
+        cache_files = os.listdir(cache.get_cache_dir())
+        assert len(cache_files) == 1
+        if os.name == "posix":
+            mode = os.stat(os.path.join(cache.get_cache_dir(), cache_files[0])).st_mode
+            assert stat.S_IMODE(mode) == stat.S_IRUSR | stat.S_IWUSR
+
+    def test_expired(self, mocker, cache_cmd):
+        cache = subject.get_target_cache(cache_cmd, "IoT Hub")
+        cache.set({"entity": "myhub"}, **cache_key)
+
+        mocker.patch("azext_iot.common.target_cache.time", return_value=10 ** 12)
+        assert cache.get(**cache_key) is None
+        assert not os.listdir(cache.get_cache_dir())
+
+    def test_invalidate_on_unauthorized(self, mocker, cache_cmd):
+        cache = subject.get_target_cache(cache_cmd, "IoT Hub")
+        cache.set({"entity": "myhub"}, **cache_key)
+        cache.set({"entity": "otherhub"}, **{**cache_key, "resource_name": "otherhub"})
+        assert cache.get(**cache_key)
+
+        error = mocker.MagicMock(name="error")
+        error.response.status_code = 401
+        error.response.text = "{}"
+        with pytest.raises(UnauthorizedError):
+            handle_service_exception(error)
+
+        assert cache.get(**cache_key) is None
+        assert cache.get(**{**cache_key, "resource_name": "otherhub"})
+
+
+class TestDiscoveryTargetCache:
+    def test_get_target_cached(self, mocker, cache_cmd):
+        mocker.patch("azext_iot.iothub.providers.discovery.iot_hub_service_factory")
+        mocker.patch("azext_iot.iothub.providers.discovery.get_subscription_id", return_value="mysub")
+        resolve = mocker.patch.object(
+            IotHubDiscovery, "_resolve_target", return_value={"entity": "myhub.azure-devices.net", "cmd": cache_cmd}
+        )
+
+        for _ in range(3):
+            target = IotHubDiscovery(cache_cmd).get_target(resource_name="myhub")
+            assert target["entity"] == "myhub.azure-devices.net"
+            assert target["cmd"] == cache_cmd
+        assert resolve.call_count == 1
+
+        IotHubDiscovery(cache_cmd).get_target(resource_name="myhub", policy_name="service")
+        assert resolve.call_count == 2
@@ -0,0 +1,106 @@
+# coding=utf-8
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Throughput of offline routing query evaluation, as used by `az iot hub message-route evaluate`.
+
+Generates a corpus of device messages in the test route shape and evaluates it against a routing
+table, once with routes that only read properties and once with routes that also query the body.
+Reports messages per second for the whole corpus loop, for decoding the corpus lines alone and for
+the compiled route set alone.
+
+    python scripts/benchmarks/route_query_benchmark.py --messages 200000
+"""
+
+import argparse
+import io
+import json
+import random
+from time import perf_counter
+from azext_iot.iothub.providers.route_query import RouteSet, RoutingMessage, evaluate_corpus
+
+PROPERTY_ROUTES = [
+    ("critical", "level = 'critical'"),
+    ("device", "$connectionDeviceId = 'device-7'"),
+    ("region", "region IN ['westus', 'eastus'] AND priority >= 3"),
+    ("flagged", "IS_DEFINED(flag) OR level = 'warning'"),
+    ("content", "$contentType = 'application/json' AND level <> 'debug'"),
+    ("building", "STARTS_WITH(building, 'b1')"),
+]
+BODY_ROUTES = PROPERTY_ROUTES[:3] + [
+    ("hot", "$body.temperature > 30"),
+    ("humid", "$body.humidity >= 80 AND level = 'info'"),
+    ("faulted", "IS_DEFINED($body.fault)"),
+]
+FALLBACK_ROUTE = {"name": "$fallback", "condition": "true", "isEnabled": True}
+
+
+def build_corpus(count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    levels = ["debug", "info", "warning", "critical"]
+    lines = []
+    for i in range(count):
+        body = {"temperature": round(rng.uniform(0, 40), 2), "humidity": rng.randint(0, 100)}
+        if i % 50 == 0:
+            body["fault"] = "sensor"
+        lines.append(json.dumps({
+            "body": json.dumps(body),
+            "appProperties": {
+                "level": rng.choice(levels),
+                "region": rng.choice(["westus", "eastus", "northeurope"]),
+                "priority": str(rng.randint(1, 5)),
+                "building": "b{}".format(rng.randint(1, 20)),
+            },
+            "systemProperties": {
+                "contentType": "application/json",
+                "contentEncoding": "utf-8",
+                "connectionDeviceId": "device-{}".format(i % 100),
+            },
+        }))
+    return "\n".join(lines) + "\n"
+
+
+def build_route_set(routes) -> RouteSet:
+    return RouteSet(
+        routes=[{"name": name, "source": "DeviceMessages", "condition": condition} for name, condition in routes],
+        fallback_route=FALLBACK_ROUTE,
+    )
+
+
+def rate(count: int, duration: float) -> str:
+    return "{:>10,.0f} messages/sec".format(count / duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages)
+    print("{:,} messages, {:.1f} MB corpus".format(args.messages, len(corpus) / 1e6))
+
+    start = perf_counter()
+    records = [json.loads(line) for line in corpus.splitlines()]
+    print("{:<36}{}".format("decode corpus lines only", rate(args.messages, perf_counter() - start)))
+
+    for label, routes in [("property routes", PROPERTY_ROUTES), ("property and body routes", BODY_ROUTES)]:
+        route_set = build_route_set(routes)
+        messages = [RoutingMessage.from_json(record) for record in records]
+        start = perf_counter()
+        for message in messages:
+            route_set.match(message)
+        print("{:<36}{}".format("{}, route set only".format(label), rate(args.messages, perf_counter() - start)))
+
+        route_set = build_route_set(routes)
+        start = perf_counter()
+        messages, invalid = evaluate_corpus(route_set, io.StringIO(corpus))
+        duration = perf_counter() - start
+        assert messages == args.messages and not invalid
+        print("{:<36}{}".format("{}, end to end".format(label), rate(messages, duration)))
+
+
+if __name__ == "__main__":
+    main()